@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message
+
+from resync.api.middleware.asgi import FusedHeaderMiddleware, HeaderLayer
+from resync.api.middleware.correlation_id import CorrelationIdMiddleware
+from resync.api.middleware.csp_middleware import CSPMiddleware
+from resync.config.security import security_header_layers
+
+Layer = Tuple[Type[HeaderLayer], Dict[str, Any]]
+
+
+def legacy(layer_cls: Type[HeaderLayer], kwargs: Dict[str, Any]) -> Type[BaseHTTPMiddleware]:
+    """The same layer in the previous BaseHTTPMiddleware shape."""
+
+    class LegacyLayer(BaseHTTPMiddleware):
+        def __init__(self, app: ASGIApp) -> None:
+            super().__init__(app)
+            self.layer = layer_cls(app, **kwargs)
+
+        async def dispatch(self, request: Request, call_next: Any) -> Response:
+            headers = self.layer.on_request(request.scope)
+            response = await call_next(request)
+            for name, value, overwrite in headers or ():
+                key = name.decode("latin-1")
+                if overwrite or key not in response.headers:
+                    response.headers[key] = value.decode("latin-1")
+            return response
+
+    LegacyLayer.__name__ = f"Legacy{layer_cls.__name__}"
+    return LegacyLayer
+
+
+def trivial_app() -> Starlette:
+    async def ping(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("pong")
+
+    return Starlette(routes=[Route("/ping-bench", ping)])
+
+
+def wrap(layers: Sequence[Layer], mode: str) -> ASGIApp:
+    """Wrap the trivial app; ``layers`` are listed outermost first."""
+    app: ASGIApp = trivial_app()
+    if mode == "fused":
+        return FusedHeaderMiddleware(app, layers=layers)
+    for cls, kwargs in reversed(layers):
+        app = legacy(cls, kwargs)(app) if mode == "legacy" else cls(app, **kwargs)
+    return app
+
+
+async def drive(app: ASGIApp, requests: int, concurrency: int) -> float:
+    """Issue ``requests`` in-process requests; returns seconds elapsed."""
+    scope_template = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping-bench",
+        "raw_path": b"/ping-bench",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("bench", 1234),
+    }
+
+    async def one() -> None:
+        received = False
+        done = asyncio.Event()
+
+        async def receive() -> Message:
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body"
+            ):
+                done.set()
+
+        await app(dict(scope_template), receive, send)
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            await one()
+
+    per_worker = requests // concurrency
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def measure(app: ASGIApp, requests: int, concurrency: int) -> Dict[str, float]:
+    await drive(app, min(requests, 500), concurrency)  # Warm up
+    elapsed = await drive(app, requests, concurrency)
+    done = requests // concurrency * concurrency
+    return {"us_per_request": elapsed / done * 1e6, "rps": done / elapsed}
+
+
+async def main() -> None:
+    """Per-layer overhead and end-to-end rps: BaseHTTPMiddleware vs pure ASGI."""
+    parser = argparse.ArgumentParser(description="ASGI middleware benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    layers: List[Layer] = [
+        *security_header_layers(),
+        (CSPMiddleware, {"report_only": True}),
+        (CorrelationIdMiddleware, {}),
+    ]
+
+    base = await measure(wrap([], "pure"), args.requests, args.concurrency)
+    print(f"Bare app: {base['us_per_request']:.1f} us/request, {base['rps']:,.0f} rps")
+    print()
+    print(f"{'Layer':<38} {'BaseHTTP us':>12} {'Pure ASGI us':>13}")
+    for layer in layers:
+        row = []
+        for mode in ("legacy", "pure"):
+            result = await measure(wrap([layer], mode), args.requests, args.concurrency)
+            row.append(result["us_per_request"] - base["us_per_request"])
+        print(f"{layer[0].__name__:<38} {row[0]:>12.1f} {row[1]:>13.1f}")
+
+    print()
+    print(f"Full stack ({len(layers)} layers)")
+    print(f"{'Mode':<38} {'us/request':>12} {'rps':>13}")
+    for label, mode in (
+        ("BaseHTTPMiddleware, stacked", "legacy"),
+        ("Pure ASGI, stacked", "pure"),
+        ("Pure ASGI, fused", "fused"),
+    ):
+        result = await measure(wrap(layers, mode), args.requests, args.concurrency)
+        print(f"{label:<38} {result['us_per_request']:>12.1f} {result['rps']:>13,.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
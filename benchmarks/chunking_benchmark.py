@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import time
+from typing import Callable, Iterator, List
+
+from resync.core.chunking import chunk_documents, chunk_text, get_tokenizer
+
+WORDS = (
+    "job stream workstation ended abend dependency plan schedule resource "
+    "prompt operator restart output conman master domain agent"
+).split()
+
+
+def make_corpus(documents: int, paragraphs: int, seed: int = 0) -> List[str]:
+    """Markdown-like runbooks with headings, paragraphs and identifiers."""
+    rng = random.Random(seed)
+    corpus = []
+    for d in range(documents):
+        lines = [f"# Runbook {d}", ""]
+        for p in range(paragraphs):
+            if p % 5 == 0:
+                lines += [f"## Step {p}", ""]
+            sentences = [
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18)))
+                + f" JOB_{rng.randint(0, 9999)}."
+                for _ in range(rng.randint(2, 6))
+            ]
+            lines += [" ".join(s.capitalize() for s in sentences), ""]
+        corpus.append("\n".join(lines))
+    return corpus
+
+
+def legacy_char_chunks(
+    text: str, chunk_size: int = 1000, chunk_overlap: int = 200
+) -> Iterator[str]:
+    """The previous file_ingestor chunker: fixed character windows."""
+    start = 0
+    while start < len(text):
+        yield text[start : start + chunk_size]
+        start += chunk_size - chunk_overlap
+
+
+def legacy_rag_chunks(
+    text: str, max_tokens: int = 512, overlap_tokens: int = 64
+) -> Iterator[str]:
+    """The previous RAG chunker: one decode per window, or sentences without tiktoken."""
+    encoding = get_tokenizer().encoding
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        start = 0
+        while start < len(tokens):
+            end = min(start + max_tokens, len(tokens))
+            yield encoding.decode(tokens[start:end])
+            start = max(0, end - overlap_tokens)
+            if end == len(tokens):
+                break
+        return
+
+    sents = re.split(r"(?<=[.!?])\s+", re.sub(r"\s+", " ", text).strip())
+    buf: List[str] = []
+    cur = 0
+    for s in sents:
+        t = max(1, len(s) // 4)
+        if cur + t > max_tokens and buf:
+            yield " ".join(buf)
+            buf = [buf[-1]]
+            cur = max(1, len(buf[0]) // 4)
+        buf.append(s)
+        cur += t
+    if buf:
+        yield " ".join(buf)
+
+
+def measure(
+    name: str, corpus: List[str], run: Callable[[List[str]], int], repeat: int
+) -> None:
+    size_mb = sum(len(t.encode("utf-8")) for t in corpus) / 1e6
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = run(corpus)
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<34} {chunks:>8} chunks {size_mb / best:>8.2f} MB/s")
+
+
+def main() -> None:
+    """Chunking throughput of the previous chunkers and the shared engine."""
+    parser = argparse.ArgumentParser(description="Chunking throughput benchmark")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.documents, args.paragraphs)
+    tokenizer = "tiktoken" if get_tokenizer().encoding is not None else "word fallback"
+    size_mb = sum(len(t.encode("utf-8")) for t in corpus) / 1e6
+    print(f"{len(corpus)} documents, {size_mb:.1f} MB, tokenizer: {tokenizer}")
+
+    measure(
+        "legacy file_ingestor (chars)",
+        corpus,
+        lambda docs: sum(1 for t in docs for _ in legacy_char_chunks(t)),
+        args.repeat,
+    )
+    measure(
+        "legacy RAG chunker",
+        corpus,
+        lambda docs: sum(
+            1 for t in docs for _ in legacy_rag_chunks(t, args.max_tokens, args.overlap)
+        ),
+        args.repeat,
+    )
+    measure(
+        "engine chunk_text",
+        corpus,
+        lambda docs: sum(
+            1 for t in docs for _ in chunk_text(t, args.max_tokens, args.overlap)
+        ),
+        args.repeat,
+    )
+    measure(
+        f"engine chunk_documents ({args.workers} procs)",
+        corpus,
+        lambda docs: sum(
+            map(
+                len,
+                chunk_documents(
+                    docs,
+                    args.max_tokens,
+                    args.overlap,
+                    max_workers=args.workers,
+                    min_parallel_chars=0,
+                ),
+            )
+        ),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+from resync.core.embedding_service import AsyncEmbeddingService
+
+
+class SimulatedEmbeddingsAPI:
+    """``client.embeddings`` with a fixed latency per call and per text."""
+
+    def __init__(self, call_latency: float, text_latency: float, max_in_flight: int):
+        self.call_latency = call_latency
+        self.text_latency = text_latency
+        self.calls = 0
+        self.texts = 0
+        # Provider-side concurrency limit, as with per-key rate limits
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def create(self, model: str, input: List[str]) -> SimpleNamespace:
+        async with self._slots:
+            self.calls += 1
+            self.texts += len(input)
+            await asyncio.sleep(self.call_latency + self.text_latency * len(input))
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=[0.0] * 8) for i in range(len(input))]
+        )
+
+
+class PerRequestEmbedder:
+    """The previous EmbeddingService: one API call per embed()."""
+
+    def __init__(self, api: SimulatedEmbeddingsAPI):
+        self.api = api
+
+    async def embed(self, text: str) -> List[float]:
+        response = await self.api.create(model="bench", input=[text])
+        return response.data[0].embedding
+
+
+async def run(mode: str, queries: List[str], concurrency: int, args) -> Dict[str, float]:
+    api = SimulatedEmbeddingsAPI(args.call_ms / 1000, args.text_ms / 1000, args.provider_limit)
+    with tempfile.TemporaryDirectory() as tmp:
+        if mode == "per-request":
+            embedder = PerRequestEmbedder(api)
+        else:
+            embedder = AsyncEmbeddingService(
+                model="bench",
+                dim=8,
+                cache_path=Path(tmp) / "embeddings.db",
+                client=SimpleNamespace(embeddings=api),
+            )
+        latencies: List[float] = []
+        pending = iter(queries)
+
+        async def client() -> None:
+            for text in pending:
+                started = time.perf_counter()
+                await embedder.embed(text)
+                latencies.append(time.perf_counter() - started)
+
+        wall = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        wall = time.perf_counter() - wall
+        if isinstance(embedder, AsyncEmbeddingService):
+            await embedder.stop()
+
+    latencies.sort()
+    return {
+        "calls": api.calls,
+        "texts": api.texts,
+        "throughput": len(queries) / wall,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+async def main() -> None:
+    """API calls, texts sent and latency for concurrent query embeddings."""
+    parser = argparse.ArgumentParser(description="Embedding micro-batching benchmark")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=250, help="Distinct query texts")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--call-ms", type=float, default=80.0)
+    parser.add_argument("--text-ms", type=float, default=0.2)
+    parser.add_argument("--provider-limit", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    distinct = [f"status of job {i} on workstation prod{i % 9:02d}" for i in range(args.distinct)]
+    queries = [rng.choice(distinct) for _ in range(args.queries)]
+
+    for concurrency in args.concurrency:
+        print(f"{args.queries:,} queries ({args.distinct:,} distinct), concurrency {concurrency}")
+        print(
+            f"{'Mode':<12} {'API calls':>10} {'Texts sent':>11} {'Queries/s':>10} "
+            f"{'p50 ms':>8} {'p99 ms':>8}"
+        )
+        for mode in ("per-request", "batched"):
+            r = await run(mode, queries, concurrency, args)
+            print(
+                f"{mode:<12} {r['calls']:>10,} {r['texts']:>11,} {r['throughput']:>10,.0f} "
+                f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
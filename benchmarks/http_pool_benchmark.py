@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+
+from resync.core.pools.base_pool import ConnectionPoolConfig
+from resync.core.pools.http_pool import HTTPConnectionPool, http2_available
+
+RESPONSE_BODY = b'{"status":"SUCC"}'
+
+
+class LocalHTTP11Server:
+    """Minimal keep-alive HTTP/1.1 server that answers every request after a delay."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.server: asyncio.AbstractServer | None = None
+        self.port = 0
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(self.latency)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s" % (len(RESPONSE_BODY), RESPONSE_BODY)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{self.port}"
+
+    async def stop(self) -> None:
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+class _H2ServerProtocol(asyncio.Protocol):
+    """Cleartext (prior knowledge) HTTP/2 server protocol built on ``h2``."""
+
+    def __init__(self, latency: float) -> None:
+        import h2.config
+        import h2.connection
+
+        self.latency = latency
+        self.conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        self.transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data: bytes) -> None:
+        import h2.events
+
+        for event in self.conn.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                asyncio.ensure_future(self._respond(event.stream_id))
+        self.transport.write(self.conn.data_to_send())
+
+    async def _respond(self, stream_id: int) -> None:
+        await asyncio.sleep(self.latency)
+        if self.transport is None or self.transport.is_closing():
+            return
+        self.conn.send_headers(
+            stream_id,
+            [
+                (":status", "200"),
+                ("content-type", "application/json"),
+                ("content-length", str(len(RESPONSE_BODY))),
+            ],
+        )
+        self.conn.send_data(stream_id, RESPONSE_BODY, end_stream=True)
+        self.transport.write(self.conn.data_to_send())
+
+
+class LocalHTTP2Server:
+    """Minimal h2c server that answers every stream after a delay."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> str:
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_server(
+            lambda: _H2ServerProtocol(self.latency), "127.0.0.1", 0
+        )
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+async def run_pool_benchmark(
+    label: str,
+    base_url: str,
+    http2: bool,
+    max_connections: int,
+    total_requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    """
+    Drive a pool with concurrent GETs and report throughput and pool wait.
+
+    Args:
+        label: Name of the run
+        base_url: Local server URL
+        http2: Whether to use HTTP/2 (prior knowledge)
+        max_connections: Pool size
+        total_requests: Requests to issue
+        concurrency: Requests in flight at once
+
+    Returns:
+        Dictionary with benchmark results
+    """
+    pool = HTTPConnectionPool(
+        ConnectionPoolConfig(
+            pool_name=label, min_size=1, max_size=max_connections, connection_timeout=60
+        ),
+        base_url,
+        http2=http2,
+        http2_prior_knowledge=http2,
+    )
+    await pool.initialize()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one_request() -> None:
+        async with semaphore:
+            async with pool.get_connection() as client:
+                start = time.perf_counter()
+                response = await client.get("/model/jobdefinition/JOB001")
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    duration = time.perf_counter() - start_time
+    stats = pool.get_stats_copy()
+    await pool.close()
+
+    return {
+        "mode": label,
+        "requests": total_requests,
+        "duration_seconds": duration,
+        "requests_per_second": total_requests / duration,
+        "avg_latency_ms": statistics.mean(latencies),
+        "p95_latency_ms": statistics.quantiles(latencies, n=20)[18],
+        "avg_pool_wait_ms": stats["average_wait_time"] * 1000,
+    }
+
+
+async def main() -> None:
+    """Compare HTTP/1.1 and HTTP/2 pools against local servers."""
+    parser = argparse.ArgumentParser(description="HTTP/1.1 vs HTTP/2 pool benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--connections", type=int, default=10)
+    parser.add_argument(
+        "--latency-ms", type=float, default=5.0, help="Simulated upstream latency"
+    )
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    results = []
+    http11_server = LocalHTTP11Server(latency)
+    url = await http11_server.start()
+    try:
+        results.append(
+            await run_pool_benchmark(
+                "http/1.1", url, False, args.connections, args.requests, args.concurrency
+            )
+        )
+    finally:
+        await http11_server.stop()
+
+    if http2_available():
+        http2_server = LocalHTTP2Server(latency)
+        url = await http2_server.start()
+        try:
+            results.append(
+                await run_pool_benchmark(
+                    "http/2", url, True, args.connections, args.requests, args.concurrency
+                )
+            )
+        finally:
+            await http2_server.stop()
+    else:
+        print("h2 is not installed; skipping HTTP/2 run")
+
+    print(
+        f"{'Mode':<10} {'Req/s':>10} {'Avg ms':>10} {'P95 ms':>10} {'Pool wait ms':>14}"
+    )
+    for result in results:
+        print(
+            f"{result['mode']:<10} {result['requests_per_second']:>10.0f} "
+            f"{result['avg_latency_ms']:>10.2f} {result['p95_latency_ms']:>10.2f} "
+            f"{result['avg_pool_wait_ms']:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
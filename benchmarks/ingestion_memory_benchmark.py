@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import docx
+import openpyxl
+import pypdf
+import structlog
+
+from resync.core.file_ingestor import (
+    chunk_segments,
+    chunk_text,
+    iter_docx,
+    iter_excel,
+    iter_pdf,
+    read_excel,
+)
+
+DEFAULT_FILES_DIR = Path(__file__).resolve().parent.parent / "benchmark_files"
+
+
+def whole_document_pdf(path: Path) -> str:
+    """The previous read_pdf: one string for the whole document."""
+    reader = pypdf.PdfReader(path)
+    return "".join(page.extract_text() for page in reader.pages if page.extract_text())
+
+
+def whole_document_docx(path: Path) -> str:
+    """The previous read_docx: full python-docx tree, then one string."""
+    document = docx.Document(path)
+    return "\n".join(para.text for para in document.paragraphs if para.text)
+
+
+WHOLE_DOCUMENT_READERS: dict[str, Callable[[Path], str]] = {
+    ".pdf": whole_document_pdf,
+    ".docx": whole_document_docx,
+    ".xlsx": read_excel,
+}
+STREAMING_READERS = {".pdf": iter_pdf, ".docx": iter_docx, ".xlsx": iter_excel}
+
+
+class IngestionMemoryBenchmark:
+    """Compares peak Python heap of whole-document vs streaming chunking."""
+
+    def measure(self, label: str, run: Callable[[], int]) -> dict[str, Any]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        chunks = run()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"mode": label, "chunks": chunks, "seconds": elapsed, "peak_mb": peak / 2**20}
+
+    def run_file(self, path: Path) -> list[dict[str, Any]]:
+        suffix = path.suffix.lower()
+        whole = WHOLE_DOCUMENT_READERS[suffix]
+        streaming = STREAMING_READERS[suffix]
+
+        def run_whole() -> int:
+            # Mirrors the old ingest path: full text, then a list of all chunks
+            return len(list(chunk_text(whole(path))))
+
+        def run_streaming() -> int:
+            return sum(1 for _ in chunk_segments(streaming(path)))
+
+        results = [
+            self.measure("whole", run_whole),
+            self.measure("streaming", run_streaming),
+        ]
+        for result in results:
+            result["file"] = path.name
+            result["size_mb"] = path.stat().st_size / 2**20
+        return results
+
+
+def write_synthetic_xlsx(path: Path, rows: int) -> Path:
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("export")
+    for i in range(rows):
+        sheet.append([i, f"JOB_{i:08d}", "SUCC", "workstation-01", f"note {i} " * 4])
+    workbook.save(path)
+    return path
+
+
+def write_synthetic_docx(path: Path, paragraphs: int) -> Path:
+    document = docx.Document()
+    for i in range(paragraphs):
+        document.add_paragraph(f"Paragraph {i}: " + "runbook step text " * 10)
+    document.save(path)
+    return path
+
+
+async def main() -> None:
+    """Measure ingestion memory for the files in benchmark_files/."""
+    parser = argparse.ArgumentParser(description="Streaming ingestion memory benchmark")
+    parser.add_argument("--files-dir", type=Path, default=DEFAULT_FILES_DIR)
+    parser.add_argument(
+        "--synthetic-rows",
+        type=int,
+        default=0,
+        help="Also generate an XLSX export with this many rows",
+    )
+    parser.add_argument(
+        "--synthetic-paragraphs",
+        type=int,
+        default=0,
+        help="Also generate a DOCX with this many paragraphs",
+    )
+    args = parser.parse_args()
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    benchmark = IngestionMemoryBenchmark()
+    files = sorted(
+        p for p in args.files_dir.iterdir() if p.suffix.lower() in STREAMING_READERS
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic_rows:
+            files.append(
+                write_synthetic_xlsx(Path(tmp) / "synthetic.xlsx", args.synthetic_rows)
+            )
+        if args.synthetic_paragraphs:
+            files.append(
+                write_synthetic_docx(
+                    Path(tmp) / "synthetic.docx", args.synthetic_paragraphs
+                )
+            )
+        results = [result for path in files for result in benchmark.run_file(path)]
+
+    print(
+        f"{'File':<18} {'Size MB':>8} {'Mode':<10} {'Chunks':>8} "
+        f"{'Seconds':>8} {'Peak MB':>8}"
+    )
+    for result in results:
+        print(
+            f"{result['file']:<18} {result['size_mb']:>8.2f} {result['mode']:<10} "
+            f"{result['chunks']:>8} {result['seconds']:>8.3f} {result['peak_mb']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
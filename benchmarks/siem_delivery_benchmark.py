@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any
+
+from aiohttp import web
+
+from resync.core.siem_integrator import SIEMConfiguration, SIEMIntegrator, SIEMType
+
+
+class LocalSIEMServer:
+    """Local stand-in for a Splunk HEC and an Elasticsearch bulk endpoint."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.available = True
+        self.events = {"splunk": 0, "elk": 0}
+        self.requests = {"splunk": 0, "elk": 0}
+        self.runner: web.AppRunner | None = None
+
+    async def _unavailable(self) -> web.Response | None:
+        await asyncio.sleep(self.latency)
+        if not self.available:
+            return web.Response(status=503, text="unavailable")
+        return None
+
+    async def _server_info(self, request: web.Request) -> web.Response:
+        return web.json_response({"generator": {"version": "9.0"}})
+
+    async def _cluster_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "green"})
+
+    async def _hec(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        error = await self._unavailable()
+        if error:
+            return error
+        self.requests["splunk"] += 1
+        self.events["splunk"] += body.count(b"\n") + 1
+        return web.json_response({"text": "Success", "code": 0})
+
+    async def _bulk(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        error = await self._unavailable()
+        if error:
+            return error
+        count = body.count(b"\n") // 2
+        self.requests["elk"] += 1
+        self.events["elk"] += count
+        items = [{"index": {"status": 201}}] * count
+        return web.Response(
+            body=json.dumps({"errors": False, "items": items}),
+            content_type="application/json",
+        )
+
+    async def start(self) -> str:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/services/server/info", self._server_info)
+        app.router.add_post("/services/collector/event", self._hec)
+        app.router.add_get("/_cluster/health", self._cluster_health)
+        app.router.add_post("/_bulk", self._bulk)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self.runner:
+            await self.runner.cleanup()
+
+
+async def run_delivery_benchmark(
+    url: str,
+    server: LocalSIEMServer,
+    events: int,
+    batch_size: int,
+    outage_seconds: float,
+) -> dict[str, Any]:
+    """Push ``events`` through the integrator and time end-to-end delivery."""
+    with tempfile.TemporaryDirectory() as spool_directory:
+        integrator = SIEMIntegrator(
+            {"flush_interval_seconds": 0.05, "spool_directory": spool_directory}
+        )
+        for name, siem_type in (("splunk", SIEMType.SPLUNK), ("elk", SIEMType.ELK_STACK)):
+            integrator.add_siem_connector(
+                name,
+                SIEMConfiguration(
+                    siem_type=siem_type,
+                    name=name,
+                    endpoint_url=url,
+                    batch_size=batch_size,
+                    retry_attempts=1,
+                    max_queue_size=events,
+                ),
+            )
+        for connector in integrator.connectors.values():
+            await connector.connect()
+        integrator.event_queue = asyncio.Queue(maxsize=events)
+        integrator.circuit_breaker.recovery_timeout = 0.5
+
+        await integrator.start()
+        start = time.perf_counter()
+        if outage_seconds:
+            server.available = False
+        for i in range(events):
+            await integrator.send_security_event(
+                "login", "low", f"benchmark event {i}", user_id=f"user-{i % 100}"
+            )
+        if outage_seconds:
+            await asyncio.sleep(outage_seconds)
+            spooled = integrator.get_system_metrics()["events"]["spooled"]
+            server.available = True
+        else:
+            spooled = 0
+
+        while min(server.events.values()) < events:
+            await asyncio.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        await integrator.stop()
+
+    return {
+        "events": events,
+        "seconds": elapsed,
+        "events_per_second": events / elapsed,
+        "requests": dict(server.requests),
+        "spooled_during_outage": spooled,
+    }
+
+
+async def main() -> None:
+    """Measure SIEM delivery throughput against local HEC and bulk stand-ins."""
+    parser = argparse.ArgumentParser(description="SIEM delivery pipeline benchmark")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--latency-ms", type=float, default=5.0, help="Simulated SIEM latency"
+    )
+    parser.add_argument(
+        "--outage-seconds",
+        type=float,
+        default=0.0,
+        help="Reject deliveries for this long to exercise the spool",
+    )
+    args = parser.parse_args()
+
+    server = LocalSIEMServer(args.latency_ms / 1000)
+    url = await server.start()
+    try:
+        result = await run_delivery_benchmark(
+            url, server, args.events, args.batch_size, args.outage_seconds
+        )
+    finally:
+        await server.stop()
+
+    print(
+        f"{'Events':>8} {'Seconds':>9} {'Events/s':>10} "
+        f"{'Splunk reqs':>12} {'ELK reqs':>9} {'Spooled':>8}"
+    )
+    print(
+        f"{result['events']:>8} {result['seconds']:>9.2f} "
+        f"{result['events_per_second']:>10.0f} {result['requests']['splunk']:>12} "
+        f"{result['requests']['elk']:>9} {result['spooled_during_outage']:>8}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
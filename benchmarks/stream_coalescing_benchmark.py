@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, List
+
+from starlette.types import Message
+from starlette.websockets import WebSocket
+
+from resync.api.utils.stream_handler import STREAM_SUBPROTOCOL, AgentResponseStreamer
+
+WORDS = (
+    "the job failed on workstation prod01 because its predecessor was held "
+    "check the schedule and rerun the stream after the maintenance window "
+    "return code abend limit priority dependency resolved"
+).split()
+
+
+class LegacyStreamer:
+    """The previous _stream_chunks: string concatenation, one send_json per token."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.full_response = ""
+
+    async def stream_response(self, agent: Any, query: str) -> str:
+        async for chunk in agent.stream(query):
+            chunk_str = str(chunk)
+            self.full_response += chunk_str
+            await self.websocket.send_json(
+                {
+                    "type": "stream",
+                    "sender": "agent",
+                    "message": chunk_str,
+                    "is_chunk": True,
+                }
+            )
+        await self.websocket.send_json({"type": "stream_end"})
+        return self.full_response
+
+
+class TokenAgent:
+    """Yields ``tokens`` at about ``rate`` tokens per second (0: unpaced)."""
+
+    def __init__(self, tokens: List[str], rate: float):
+        self.tokens = tokens
+        self.rate = rate
+
+    async def _generate(self) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i, token in enumerate(self.tokens):
+            if self.rate and i % 20 == 0:
+                delay = started + i / self.rate - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield token
+
+    def stream(self, query: str) -> AsyncIterator[str]:
+        return self._generate()
+
+
+class WireCounter:
+    """ASGI send that counts frames and bytes, raw and permessage-deflated."""
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.raw_bytes = 0
+        self.deflated_bytes = 0
+        # Context takeover, as browsers and uvicorn negotiate by default
+        self._deflate = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] != "websocket.send":
+            return
+        payload = message.get("bytes")
+        if payload is None:
+            payload = message["text"].encode("utf-8")
+        self.frames += 1
+        self.raw_bytes += len(payload)
+        compressed = self._deflate.compress(payload)
+        compressed += self._deflate.flush(zlib.Z_SYNC_FLUSH)
+        self.deflated_bytes += len(compressed) - 4  # Trailing 00 00 ff ff dropped
+
+
+async def connected_websocket(counter: WireCounter, binary: bool) -> WebSocket:
+    messages = [{"type": "websocket.connect"}]
+
+    async def receive() -> Message:
+        return messages.pop() if messages else {"type": "websocket.disconnect"}
+
+    scope = {
+        "type": "websocket",
+        "path": "/ws/bench",
+        "headers": [],
+        "subprotocols": [STREAM_SUBPROTOCOL] if binary else [],
+    }
+    websocket = WebSocket(scope, receive, counter.send)
+    await websocket.accept()
+    return websocket
+
+
+async def run(mode: str, tokens: List[str], rate: float) -> Dict[str, float]:
+    counter = WireCounter()
+    websocket = await connected_websocket(counter, binary=mode == "binary")
+    streamer: Any = (
+        LegacyStreamer(websocket) if mode == "legacy" else AgentResponseStreamer(websocket)
+    )
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    response = await streamer.stream_response(TokenAgent(tokens, rate), "query")
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    assert response == "".join(tokens)
+    return {
+        "frames": counter.frames,
+        "frames_per_s": counter.frames / wall,
+        "cpu_ms": cpu * 1000,
+        "wall_s": wall,
+        "raw_kb": counter.raw_bytes / 1024,
+        "deflated_kb": counter.deflated_bytes / 1024,
+    }
+
+
+async def main() -> None:
+    """Frames, CPU and wire bytes per response: per-token frames vs coalesced."""
+    parser = argparse.ArgumentParser(description="Agent response streaming benchmark")
+    parser.add_argument("--tokens", type=int, default=10000)
+    parser.add_argument(
+        "--rates",
+        type=float,
+        nargs="+",
+        default=[0, 2000],
+        help="Tokens per second from the agent; 0 is as fast as possible",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    tokens = [rng.choice(WORDS) + " " for _ in range(args.tokens)]
+
+    for rate in args.rates:
+        label = "unpaced" if not rate else f"{rate:,.0f} tokens/s"
+        print(f"{args.tokens:,} tokens, {label}")
+        print(
+            f"{'Mode':<12} {'Frames':>8} {'Frames/s':>10} {'CPU ms':>8} "
+            f"{'Wall s':>7} {'Raw KB':>8} {'Deflated KB':>12}"
+        )
+        for mode in ("legacy", "coalesced", "binary"):
+            r = await run(mode, tokens, rate)
+            print(
+                f"{mode:<12} {r['frames']:>8,.0f} {r['frames_per_s']:>10,.0f} "
+                f"{r['cpu_ms']:>8.1f} {r['wall_s']:>7.2f} {r['raw_kb']:>8.1f} "
+                f"{r['deflated_kb']:>12.1f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import TraceIdRatioBased
+from opentelemetry.trace import Status, StatusCode
+
+from resync.core.distributed_tracing import (
+    TailSamplingPolicy,
+    TailSamplingSpanProcessor,
+)
+
+
+class CountingExporter(SpanExporter):
+    """Exporter that only counts spans, so export cost does not skew results."""
+
+    def __init__(self) -> None:
+        self.spans = 0
+        self.batches = 0
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        self.spans += len(spans)
+        self.batches += 1
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+class TracingOverheadBenchmark:
+    """
+    Measure per-request tracing overhead for each sampling mode.
+
+    Each simulated request opens a root span with a few child spans, and
+    one request in ``error_every`` fails, which tail sampling must keep.
+    Head sampling records only its sampled fraction, while tail sampling
+    records every span and pays for the buffering, so the difference is the
+    price of never losing a failing or slow trace.
+    """
+
+    def __init__(self, spans_per_request: int = 4, error_every: int = 100):
+        self.spans_per_request = spans_per_request
+        self.error_every = error_every
+
+    def _build(self, mode: str) -> tuple[Optional[trace.Tracer], Any, CountingExporter]:
+        exporter = CountingExporter()
+        if mode == "disabled":
+            return None, None, exporter
+
+        batch = BatchSpanProcessor(exporter, max_queue_size=8192, schedule_delay_millis=500)
+        if mode == "head":
+            provider = TracerProvider(sampler=TraceIdRatioBased(0.1))
+            provider.add_span_processor(batch)
+        else:
+            provider = TracerProvider()
+            provider.add_span_processor(
+                TailSamplingSpanProcessor(
+                    batch,
+                    policy=TailSamplingPolicy(
+                        latency_threshold_ms=50.0, baseline_rate=0.01
+                    ),
+                )
+            )
+        return provider.get_tracer(__name__), provider, exporter
+
+    def _request(self, tracer: Optional[trace.Tracer], n: int) -> None:
+        if tracer is None:
+            return
+        with tracer.start_as_current_span(
+            "http.request", attributes={"http.route": "/api/v1/status"}
+        ) as root:
+            for i in range(self.spans_per_request - 1):
+                with tracer.start_as_current_span(f"step_{i}") as span:
+                    span.set_attribute("step", i)
+            if n % self.error_every == 0:
+                root.set_status(Status(StatusCode.ERROR, "simulated failure"))
+
+    def _finish(self, provider: Any) -> None:
+        if provider is not None:
+            provider.force_flush()
+            provider.shutdown()
+
+    def run_unpaced(self, mode: str, requests: int) -> Dict[str, Any]:
+        """Issue requests back to back and report CPU cost per request."""
+        tracer, provider, exporter = self._build(mode)
+        start = time.perf_counter()
+        for n in range(1, requests + 1):
+            self._request(tracer, n)
+        duration = time.perf_counter() - start
+        self._finish(provider)
+        return {
+            "mode": mode,
+            "us_per_request": duration / requests * 1e6,
+            "spans_exported": exporter.spans,
+            "export_batches": exporter.batches,
+        }
+
+    async def run_paced(self, mode: str, rps: int, seconds: float) -> Dict[str, Any]:
+        """Issue requests at a fixed rate and report tracing CPU per request."""
+        tracer, provider, exporter = self._build(mode)
+        interval = 1.0 / rps
+        total = int(rps * seconds)
+        cpu_start = time.process_time()
+        next_at = time.perf_counter()
+        for n in range(1, total + 1):
+            self._request(tracer, n)
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        cpu = time.process_time() - cpu_start
+        self._finish(provider)
+        return {
+            "mode": mode,
+            "cpu_us_per_request": cpu / total * 1e6,
+            "cpu_percent": cpu / seconds * 100,
+            "spans_exported": exporter.spans,
+        }
+
+
+async def main() -> None:
+    """Compare disabled, head-sampled and tail-sampled tracing."""
+    parser = argparse.ArgumentParser(description="Tracing overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rps", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    benchmark = TracingOverheadBenchmark()
+    modes = ("disabled", "head", "tail")
+
+    print(f"Unpaced: {args.requests} requests, {benchmark.spans_per_request} spans each")
+    print(f"{'Mode':<10} {'us/request':>12} {'Spans out':>10} {'Batches':>8}")
+    for mode in modes:
+        result = benchmark.run_unpaced(mode, args.requests)
+        print(
+            f"{mode:<10} {result['us_per_request']:>12.1f} "
+            f"{result['spans_exported']:>10} {result['export_batches']:>8}"
+        )
+
+    print(f"\nPaced: {args.rps} rps for {args.seconds}s")
+    print(f"{'Mode':<10} {'CPU us/req':>12} {'CPU %':>8} {'Spans out':>10}")
+    for mode in modes:
+        result = await benchmark.run_paced(mode, args.rps, args.seconds)
+        print(
+            f"{mode:<10} {result['cpu_us_per_request']:>12.1f} "
+            f"{result['cpu_percent']:>8.1f} {result['spans_exported']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
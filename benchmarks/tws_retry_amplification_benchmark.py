@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+from resync.core.resilience import retry_with_backoff_async
+from resync.core.retry_budget import BudgetedRetry, RetryBudget
+
+
+class StrugglingServer:
+    """Fails each request with a fixed probability and counts them."""
+
+    def __init__(self, failure_rate: float, latency: float) -> None:
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.requests = 0
+
+    async def request(self, timeout: float | None = None) -> str:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise ConnectionError("TWS unavailable")
+        return "ok"
+
+
+async def nested_retries(server: StrugglingServer) -> str:
+    """The previous layout: 2 endpoint retries around 3 transport retries."""
+
+    async def transport() -> str:
+        return await retry_with_backoff_async(
+            server.request, retries=3, base_delay=0.0, retry_on=(ConnectionError,)
+        )
+
+    return await retry_with_backoff_async(
+        transport, retries=2, base_delay=0.0, retry_on=(ConnectionError,)
+    )
+
+
+def budgeted_retries(budget_ratio: float) -> Callable[[StrugglingServer], Awaitable[str]]:
+    """The single retry layer now used by OptimizedTWSClient."""
+    retry = BudgetedRetry(
+        "benchmark",
+        budget=RetryBudget(ratio=budget_ratio, min_retries_per_second=0.1),
+        max_retries=2,
+        base_delay=0.0,
+        retry_on=(ConnectionError,),
+    )
+
+    async def call(server: StrugglingServer) -> str:
+        return await retry.call(server.request)
+
+    return call
+
+
+async def run_calls(
+    call: Callable[[StrugglingServer], Awaitable[str]],
+    failure_rate: float,
+    calls: int,
+    latency: float,
+    concurrency: int,
+) -> dict[str, Any]:
+    server = StrugglingServer(failure_rate, latency)
+    remaining = iter(range(calls))
+    succeeded = 0
+
+    async def worker() -> None:
+        nonlocal succeeded
+        for _ in remaining:
+            try:
+                await call(server)
+                succeeded += 1
+            except ConnectionError:
+                pass
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {
+        "requests_per_call": server.requests / calls,
+        "success_rate": succeeded / calls,
+    }
+
+
+async def main() -> None:
+    """Compare HTTP requests per logical call: nested vs budgeted retries."""
+    parser = argparse.ArgumentParser(description="TWS retry amplification benchmark")
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--budget-ratio", type=float, default=0.1)
+    parser.add_argument(
+        "--failure-rates", type=float, nargs="+", default=[0.0, 0.1, 0.5, 0.9, 1.0]
+    )
+    args = parser.parse_args()
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR)
+    )
+    logging.getLogger().setLevel(logging.ERROR)
+
+    print(
+        f"{'Failure':>8} {'Nested req/call':>16} {'Nested ok':>10} "
+        f"{'Budget req/call':>16} {'Budget ok':>10}"
+    )
+    for rate in args.failure_rates:
+        latency = args.latency_ms / 1000
+        nested = await run_calls(
+            nested_retries, rate, args.calls, latency, args.concurrency
+        )
+        budgeted = await run_calls(
+            budgeted_retries(args.budget_ratio),
+            rate,
+            args.calls,
+            latency,
+            args.concurrency,
+        )
+        print(
+            f"{rate:>8.0%} {nested['requests_per_call']:>16.2f} "
+            f"{nested['success_rate']:>10.1%} {budgeted['requests_per_call']:>16.2f} "
+            f"{budgeted['success_rate']:>10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,6 +9,11 @@ from .ingest import IngestService
 from .interfaces import Embedder
 from .interfaces import Retriever
 from .interfaces import VectorStore
+from .lexical_index import LexicalIndex
+from .lexical_index import get_default_lexical_index
+from .lexical_index import reciprocal_rank_fusion
+from .reindex import ReindexJob
+from .reindex import ReindexReport
 from .retriever import RagRetriever
 from .vector_store import QdrantVectorStore
 from .vector_store import get_default_store
@@ -22,4 +27,9 @@ __all__ = [
     "get_default_store",
     "RagRetriever",
     "IngestService",
+    "LexicalIndex",
+    "get_default_lexical_index",
+    "reciprocal_rank_fusion",
+    "ReindexJob",
+    "ReindexReport",
 ]
\ No newline at end of file
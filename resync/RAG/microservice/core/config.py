@@ -32,6 +32,16 @@ class RagConfig:
     ef_search_max: int = int(os.getenv("RAG_EF_SEARCH_MAX", "128"))
     max_neighbors: int = int(os.getenv("RAG_MAX_NEIGHBORS", "32"))
     enable_rerank: bool = _bool("RAG_RERANKER_ON", False)
+    enable_hybrid: bool = _bool("RAG_HYBRID_ON", True)
+    lexical_index_path: str = os.getenv(
+        "RAG_LEXICAL_INDEX_PATH", "rag_lexical_index.jsonl"
+    )
+    rrf_k: int = int(os.getenv("RAG_RRF_K", "60"))
+    hybrid_candidates: int = int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))
+    read_alias: str = os.getenv("RAG_READ_ALIAS", "knowledge")
+    reindex_max_rate: float = float(os.getenv("RAG_REINDEX_MAX_RATE", "200"))
+    reindex_latency_slo_ms: float = float(os.getenv("RAG_REINDEX_LATENCY_SLO_MS", "150"))
+    reindex_min_recall: float = float(os.getenv("RAG_REINDEX_MIN_RECALL", "0.9"))
 
 
 CFG = RagConfig()
\ No newline at end of file
@@ -1,41 +1,34 @@
 """
 Embedding service for generating vector embeddings using OpenAI or deterministic fallback.
 
-Supports batch embedding with fallback to SHA-256 hash-based vectors for development.
+Delegates to the shared ``AsyncEmbeddingService``, which batches concurrent
+requests into single API calls, caches embeddings by text hash and falls back
+to SHA-256 hash-based vectors for development.
 """
 
-import hashlib
-import os
-from typing import List
+from typing import List, Optional
+
+from resync.core.embedding_service import AsyncEmbeddingService, get_embedding_service
 
 from .config import CFG
 from .interfaces import Embedder
 
-# Optional imports
-# OpenAI (production)
-try:
-    from openai import OpenAI  # openai>=1.x
-
-    _HAS_OPENAI = True
-except ImportError:
-    _HAS_OPENAI = False
-
 
 class EmbeddingService(Embedder):
     """
     Service for generating text embeddings using OpenAI or deterministic fallback.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, service: Optional[AsyncEmbeddingService] = None) -> None:
         """
         Initialize the embedding service.
 
-        Uses OpenAI if API key is set; otherwise, uses deterministic hash-based fallback.
+        Uses the process-wide embedding service for the RAG config's model
+        and dimension unless one is given; it is stopped with the other
+        shared services on shutdown. It uses OpenAI if API key is set;
+        otherwise, a deterministic hash-based fallback.
         """
-        self._use_openai = _HAS_OPENAI and bool(os.getenv("OPENAI_API_KEY"))
-        self._client = (
-            OpenAI(api_key=os.getenv("OPENAI_API_KEY")) if self._use_openai else None
-        )
+        self._service = service or get_embedding_service(CFG.embed_model, CFG.embed_dim)
 
     async def embed(self, text: str) -> List[float]:
         """
@@ -47,13 +40,13 @@ class EmbeddingService(Embedder):
         Returns:
             List[float]: Embedding vector.
         """
-        return (await self.embed_batch([text]))[0]
+        return await self._service.embed(text)
 
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """
         Embed a batch of text strings into vectors.
 
-        Uses OpenAI if available; otherwise, uses deterministic hash-based fallback.
+        Concurrent calls share API requests; cached texts are not sent again.
 
         Args:
             texts: List of input texts to embed.
@@ -61,29 +54,4 @@ class EmbeddingService(Embedder):
         Returns:
             List[List[float]]: List of embedding vectors.
         """
-        if self._use_openai:
-            resp = self._client.embeddings.create(model=CFG.embed_model, input=texts)  # type: ignore[union-attr]
-            return [d.embedding for d in resp.data]  # type: ignore[attr-defined]
-        # Fallback determinístico para dev/CI (não semântico, mas estável)
-        return [self._hash_vec(t) for t in texts]
-
-    def _hash_vec(self, text: str) -> List[float]:
-        """
-        Generate a deterministic embedding vector from text using SHA-256 hash.
-
-        This is a fallback for development/CI environments where OpenAI is not available.
-        The hash is spread across the embedding dimension.
-
-        Args:
-            text: Input text to hash.
-
-        Returns:
-            List[float]: Deterministic embedding vector.
-        """
-        dim = CFG.embed_dim
-        buf = [0.0] * dim
-        h = hashlib.sha256(text.encode("utf-8")).digest()
-        # espalha 32 bytes ao longo do vetor
-        for i, b in enumerate(h):
-            buf[(i * 64) % dim] = b / 255.0
-        return buf
\ No newline at end of file
+        return await self._service.embed_batch(texts)
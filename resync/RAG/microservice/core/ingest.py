@@ -2,20 +2,24 @@
 Idempotent document ingestion service for RAG systems.
 
 Handles chunking, deduplication by SHA-256, batch embedding, and upsert to Qdrant.
+Batches of documents are chunked in parallel across processes.
 Integrates Prometheus metrics for observability.
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
 import time
 from typing import Any
 
+from .chunking import chunk_documents
 from .chunking import chunk_text
 from .config import CFG
 from .interfaces import Embedder
 from .interfaces import VectorStore
+from .lexical_index import LexicalIndex
 from .monitoring import embed_seconds
 from .monitoring import jobs_total
 from .monitoring import upsert_seconds
@@ -26,16 +30,24 @@ logger = logging.getLogger(__name__)
 class IngestService:
     """
     Ingestão idempotente:
-    - chunking "token-aware"
+    - chunking "token-aware" (em paralelo para lotes de documentos)
     - dedup por sha256 do chunk normalizado
     - embed em lote com batch fixo
     - upsert no Qdrant com payload completo
+    - indexação BM25 no índice léxico, quando houver
     """
 
-    def __init__(self, embedder: Embedder, store: VectorStore, batch_size: int = 128):
+    def __init__(
+        self,
+        embedder: Embedder,
+        store: VectorStore,
+        batch_size: int = 128,
+        lexical_index: LexicalIndex | None = None,
+    ):
         self.embedder = embedder
         self.store = store
         self.batch_size = batch_size
+        self.lexical_index = lexical_index
 
     async def ingest_document(
         self,
@@ -49,6 +61,46 @@ class IngestService:
         graph_version: int = 1,
     ) -> int:
         chunks = list(chunk_text(text, max_tokens=512, overlap_tokens=64))
+        return await self._ingest_chunks(
+            chunks,
+            tenant=tenant,
+            doc_id=doc_id,
+            source=source,
+            ts_iso=ts_iso,
+            tags=tags,
+            graph_version=graph_version,
+        )
+
+    async def ingest_documents(self, documents: list[dict[str, Any]]) -> int:
+        """
+        Ingests many documents, chunking them in parallel across processes.
+
+        Each document is a dict with the keyword arguments of
+        ``ingest_document``. Returns the total number of chunks upserted.
+        """
+        chunks_per_doc = await asyncio.to_thread(
+            chunk_documents,
+            [doc["text"] for doc in documents],
+            max_tokens=512,
+            overlap_tokens=64,
+        )
+        total = 0
+        for doc, chunks in zip(documents, chunks_per_doc):
+            fields = {k: v for k, v in doc.items() if k != "text"}
+            total += await self._ingest_chunks(chunks, **fields)
+        return total
+
+    async def _ingest_chunks(
+        self,
+        chunks: list[str],
+        *,
+        tenant: str,
+        doc_id: str,
+        source: str,
+        ts_iso: str,
+        tags: list[str] | None = None,
+        graph_version: int = 1,
+    ) -> int:
         if not chunks:
             return 0
 
@@ -79,6 +131,8 @@ class IngestService:
                     "neighbors": [],
                     "graph_version": graph_version,
                     "sha256": sha,
+                    # Texto do chunk: permite reembutir ao reindexar (reindex.py)
+                    "text": ck_norm,
                 }
             )
             texts_for_embed.append(ck_norm)
@@ -101,6 +155,14 @@ class IngestService:
                     payloads=payloads[start : start + self.batch_size],
                     collection=CFG.collection_write,
                 )
+            if self.lexical_index is not None:
+                await asyncio.to_thread(
+                    self.lexical_index.add_batch,
+                    ids[start : start + self.batch_size],
+                    batch_texts,
+                    payloads[start : start + self.batch_size],
+                    CFG.collection_write,
+                )
             total_upsert += len(batch_texts)
 
         jobs_total.labels(status="ingested").inc()
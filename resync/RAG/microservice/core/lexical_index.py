@@ -0,0 +1,312 @@
+"""
+BM25 lexical side index for hybrid retrieval.
+
+Dense embeddings are weak on exact identifiers such as TWS job names,
+workstation IDs and message codes (``AWSBH001E``). This index keeps an
+inverted index of the same chunks that are upserted to Qdrant and scores
+them with BM25, so the retriever can fuse lexical and vector rankings.
+
+The index lives in memory, keyed by collection, and is persisted as an
+append-only JSON-lines file: one line per chunk with its collection, term
+frequencies and payload, and one per deleted chunk. Re-adding a chunk id
+replaces it; the file is compacted on load, and while running, when most
+of its lines are stale.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import CFG
+
+logger = logging.getLogger(__name__)
+
+# Words, plus identifiers joined by - . # @ $ (AWSBH001E, PAYROLL-01#DAILY)
+_TOKEN_RE = re.compile(r"\w+(?:[-.#@$]\w+)*")
+_PART_RE = re.compile(r"[^\W_]+")
+
+# Below this many lines the file is not compacted while running
+_MIN_COMPACT_LINES = 1000
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase terms of ``text``.
+
+    Compound identifiers are indexed whole and by their parts, so both
+    ``payroll_daily`` and ``payroll`` find a job named ``PAYROLL_DAILY``.
+    """
+    terms: List[str] = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        terms.append(token)
+        parts = _PART_RE.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+def _matches(payload: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    """Same semantics as the Qdrant MatchValue filters: equality, or membership for lists."""
+    if not filters:
+        return True
+    for key, value in filters.items():
+        if value is None:
+            continue
+        actual = payload.get(key)
+        if isinstance(actual, list):
+            if value not in actual:
+                return False
+        elif actual != value:
+            return False
+    return True
+
+
+class _CollectionIndex:
+    """BM25 postings and statistics of the chunks of one collection."""
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.terms: Dict[str, Dict[str, int]] = {}
+        self.payloads: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+
+    def add(self, chunk_id: str, terms: Dict[str, int], payload: Dict[str, Any]) -> None:
+        self.remove(chunk_id)
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[chunk_id] = tf
+        length = sum(terms.values())
+        self.terms[chunk_id] = terms
+        self.lengths[chunk_id] = length
+        self.payloads[chunk_id] = payload
+        self.total_length += length
+
+    def remove(self, chunk_id: str) -> bool:
+        terms = self.terms.pop(chunk_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self.postings[term]
+            del postings[chunk_id]
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(chunk_id)
+        del self.payloads[chunk_id]
+        return True
+
+    def scores(self, terms: Iterable[str], k1: float, b: float) -> Dict[str, float]:
+        count = len(self.lengths)
+        if not count:
+            return {}
+        avg_length = self.total_length / count
+        scores: Dict[str, float] = {}
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for chunk_id, tf in postings.items():
+                norm = k1 * (1 - b + b * self.lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (k1 + 1) / (
+                    tf + norm
+                )
+        return scores
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 inverted index over RAG chunks, persisted to ``path``.
+
+    Chunks are kept per collection, with their own BM25 statistics, so a
+    search only sees the collection it is run against. ``add_batch`` and
+    ``delete`` default to the write collection and ``search`` to the read
+    collection. ``search`` returns hits in the shape of ``VectorStore.query``
+    results (``id``, ``score``, ``payload``). All methods are thread-safe,
+    so searches can run in a worker thread next to the vector query.
+    """
+
+    def __init__(
+        self, path: str | Path | None = None, k1: float = 1.2, b: float = 0.75
+    ):
+        self.path = Path(path) if path else None
+        self.k1 = k1
+        self.b = b
+        self._collections: Dict[str, _CollectionIndex] = {}
+        self._lines = 0  # Lines in the file, including replaced and deleted chunks
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return sum(len(index.lengths) for index in self._collections.values())
+
+    def add_batch(
+        self,
+        ids: List[str],
+        texts: List[str],
+        payloads: List[Dict[str, Any]],
+        collection: Optional[str] = None,
+    ) -> None:
+        """Index chunks, replacing any already indexed under the same id."""
+        collection = collection or CFG.collection_write
+        records = [
+            {
+                "id": chunk_id,
+                "collection": collection,
+                "terms": dict(Counter(tokenize(text))),
+                "payload": payload,
+            }
+            for chunk_id, text, payload in zip(ids, texts, payloads)
+        ]
+        with self._lock:
+            index = self._collections.setdefault(collection, _CollectionIndex())
+            for record in records:
+                index.add(record["id"], record["terms"], record["payload"])
+            self._persist(records)
+
+    def delete(self, ids: Iterable[str], collection: Optional[str] = None) -> int:
+        """Remove chunks from the index; returns how many were indexed."""
+        collection = collection or CFG.collection_write
+        with self._lock:
+            index = self._collections.get(collection)
+            if index is None:
+                return 0
+            removed = [chunk_id for chunk_id in ids if index.remove(chunk_id)]
+            if not index.lengths:
+                del self._collections[collection]
+            self._persist(
+                {"id": chunk_id, "collection": collection, "deleted": True}
+                for chunk_id in removed
+            )
+            return len(removed)
+
+    def drop_collection(self, collection: str) -> int:
+        """Remove every chunk of ``collection``; returns how many there were."""
+        with self._lock:
+            index = self._collections.pop(collection, None)
+            if index is None:
+                return 0
+            if self.path is not None:
+                self._compact()
+            return len(index.lengths)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        collection: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Best ``top_k`` chunks of ``collection`` for ``query`` by BM25 score."""
+        terms = set(tokenize(query))
+        with self._lock:
+            index = self._collections.get(collection or CFG.collection_read)
+            if index is None or not terms:
+                return []
+            scores = index.scores(terms, self.k1, self.b)
+            if filters:
+                scores = {
+                    chunk_id: score
+                    for chunk_id, score in scores.items()
+                    if _matches(index.payloads[chunk_id], filters)
+                }
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [
+                {"id": chunk_id, "score": score, "payload": index.payloads[chunk_id]}
+                for chunk_id, score in best
+            ]
+
+    def _persist(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append records, compacting once most lines of the file are stale."""
+        if self.path is None:
+            return
+        self._lines += self._append(records)
+        if self._lines > max(2 * len(self), _MIN_COMPACT_LINES):
+            self._compact()
+
+    def _append(self, records: Iterable[Dict[str, Any]]) -> int:
+        lines = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                lines += 1
+        return lines
+
+    def _load(self) -> None:
+        lines = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    record = json.loads(line)
+                    # Lines written before indexes were kept per collection
+                    collection = record.get("collection") or CFG.collection_write
+                    index = self._collections.setdefault(collection, _CollectionIndex())
+                    if record.get("deleted"):
+                        index.remove(record["id"])
+                    else:
+                        index.add(record["id"], record["terms"], record["payload"])
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    # A torn last line after a crash loses one chunk at most
+                    logger.warning("Skipping invalid lexical index line %s: %s", lines, e)
+        self._collections = {
+            name: index for name, index in self._collections.items() if index.lengths
+        }
+        self._lines = lines
+        logger.info("Loaded lexical index %s: %s chunks", self.path, len(self))
+        if lines > 2 * len(self):
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        lines = 0
+        with open(tmp, "w", encoding="utf-8") as f:
+            for collection, index in self._collections.items():
+                for chunk_id, terms in index.terms.items():
+                    record = {
+                        "id": chunk_id,
+                        "collection": collection,
+                        "terms": terms,
+                        "payload": index.payloads[chunk_id],
+                    }
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    lines += 1
+        os.replace(tmp, self.path)
+        self._lines = lines
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[List[Dict[str, Any]]], k: int = 60, top_k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked hit lists by reciprocal rank: ``sum(1 / (k + rank))``.
+
+    Hits are matched by ``id``. The first list a hit appears in provides its
+    fields; ``score`` is replaced by the fused score.
+    """
+    fused: Dict[str, float] = {}
+    hits: Dict[str, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            hit_id = hit["id"]
+            fused[hit_id] = fused.get(hit_id, 0.0) + 1.0 / (k + rank)
+            hits.setdefault(hit_id, hit)
+    order = sorted(fused, key=fused.__getitem__, reverse=True)
+    if top_k is not None:
+        order = order[:top_k]
+    return [{**hits[hit_id], "score": fused[hit_id]} for hit_id in order]
+
+
+def get_default_lexical_index() -> LexicalIndex:
+    return LexicalIndex(CFG.lexical_index_path)
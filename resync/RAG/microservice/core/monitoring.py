@@ -13,4 +13,11 @@ query_seconds = Histogram("rag_query_seconds", "Latency for vector queries")
 jobs_total = Counter("rag_jobs_total", "RAG jobs", ["status"])
 collection_vectors = Gauge(
     "rag_collection_vectors", "Vectors in current read collection"
-)
\ No newline at end of file
+)
+reindex_points_total = Counter(
+    "rag_reindex_points_total", "Points processed by reindex jobs", ["status"]
+)
+reindex_probe_seconds = Histogram(
+    "rag_reindex_probe_seconds", "Read-path query latency probed during reindex"
+)
+alias_swaps_total = Counter("rag_alias_swaps_total", "Read alias swaps", ["reason"])
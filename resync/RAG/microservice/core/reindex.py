@@ -0,0 +1,310 @@
+"""
+Zero-downtime reindexing of the RAG collection through a read alias.
+
+Queries and ingestion go through an alias (``RAG_READ_ALIAS``; point
+``RAG_COLLECTION_READ`` and ``QDRANT_COLLECTION`` at it), which the vector
+store creates on first use for a ``<alias>_v1`` collection. A ``ReindexJob``
+builds the next version of the collection behind the alias
+(``knowledge_v1`` -> ``knowledge_v2``) by re-embedding the text of every
+chunk with the job's embedder. It writes at a throttled rate that backs off
+while read-path latency is over the SLO, validates the point count and the
+self-recall of sampled chunks, and then flips the alias to the new version
+in one atomic Qdrant operation. Documents ingested while the job runs land
+in the old version and are copied over, including those written just
+before the flip. The previous version is kept, so ``rollback`` can flip the
+alias back.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from .config import CFG
+from .interfaces import Embedder
+from .monitoring import alias_swaps_total
+from .monitoring import reindex_points_total
+from .monitoring import reindex_probe_seconds
+from .vector_store import QdrantVectorStore
+
+logger = logging.getLogger(__name__)
+
+# Points written while a pass runs are picked up by another pass, up to this many
+_MAX_PASSES = 3
+
+
+@dataclass
+class ReindexReport:
+    """Outcome of a reindex job."""
+
+    alias: str
+    source: str
+    target: str
+    points_read: int = 0
+    points_embedded: int = 0
+    # Points without text in their payload keep their vector, when the
+    # dimension did not change; otherwise they are skipped
+    points_copied: int = 0
+    points_skipped: int = 0
+    source_count: int = 0
+    target_count: int = 0
+    recall: Optional[float] = None
+    throttled_seconds: float = 0.0
+    duration_seconds: float = 0.0
+    flipped: bool = False
+    errors: List[str] = field(default_factory=list)
+
+
+def next_version(collection: str) -> str:
+    """``knowledge_v1`` -> ``knowledge_v2``; unversioned names get ``_v2``."""
+    m = re.fullmatch(r"(.*_v)(\d+)", collection)
+    if m:
+        return f"{m.group(1)}{int(m.group(2)) + 1}"
+    return f"{collection}_v2"
+
+
+class ReindexJob:
+    """
+    Builds ``target`` from the collection behind ``alias`` and flips the alias.
+
+    ``max_rate`` caps the points written per second. Before each batch, a
+    probe query is timed against the source collection. While the probe
+    takes longer than ``latency_slo`` seconds, the pause between batches is
+    doubled, and it is halved again once latency recovers. The alias is only
+    flipped if every point of the source was written to the target, and if
+    at least ``min_recall`` of ``recall_samples`` sampled chunks are found by
+    their own vector within ``recall_k`` results.
+
+    Ingestion must write through the alias (``write_collection``, by default
+    ``QDRANT_COLLECTION``); otherwise new documents would keep landing in the
+    old version after the flip, so the job refuses to run. It also refuses
+    when the alias name is taken by a real collection, which an alias
+    could never replace.
+    """
+
+    def __init__(
+        self,
+        store: QdrantVectorStore,
+        embedder: Embedder,
+        alias: Optional[str] = None,
+        write_collection: Optional[str] = None,
+        source: Optional[str] = None,
+        target: Optional[str] = None,
+        dim: Optional[int] = None,
+        batch_size: int = 64,
+        max_rate: Optional[float] = None,
+        latency_slo: Optional[float] = None,
+        recall_samples: int = 50,
+        recall_k: int = 10,
+        min_recall: Optional[float] = None,
+    ):
+        self.store = store
+        self.embedder = embedder
+        self.alias = alias or CFG.read_alias
+        self.write_collection = write_collection or CFG.collection_write
+        self.source = source
+        self.target = target
+        self.dim = dim or CFG.embed_dim
+        self.batch_size = max(1, batch_size)
+        self.max_rate = CFG.reindex_max_rate if max_rate is None else max_rate
+        self.latency_slo = (
+            CFG.reindex_latency_slo_ms / 1000 if latency_slo is None else latency_slo
+        )
+        self.recall_samples = recall_samples
+        self.recall_k = recall_k
+        self.min_recall = CFG.reindex_min_recall if min_recall is None else min_recall
+
+        self._backoff = 0.0
+        self._probe_vector: Optional[List[float]] = None
+        self._samples: List[Tuple[str, List[float]]] = []
+        self._sampled = 0
+        self._rng = random.Random(0)
+
+    async def run(self) -> ReindexReport:
+        """Build, validate and (if valid) publish the new version."""
+        started = time.perf_counter()
+        if self.write_collection != self.alias:
+            raise ValueError(
+                f"Ingestion writes to collection '{self.write_collection}', not alias "
+                f"'{self.alias}'; documents ingested during or after the reindex "
+                "would be lost. Point QDRANT_COLLECTION at the alias."
+            )
+        if await self.store.is_collection(self.alias):
+            raise ValueError(
+                f"'{self.alias}' is a collection, not an alias, so it cannot be "
+                f"flipped. Move its points to a versioned collection (e.g. "
+                f"'{self.alias}_v1') and create the alias '{self.alias}' for it."
+            )
+        source = self.source or await self.store.get_alias_target(self.alias)
+        if source is None:
+            raise ValueError(
+                f"Alias '{self.alias}' does not exist; create it for the "
+                "collection to reindex, or pass source"
+            )
+        target = self.target or next_version(source)
+        if target == source:
+            raise ValueError(f"Reindex target must differ from source '{source}'")
+        report = ReindexReport(alias=self.alias, source=source, target=target)
+        if CFG.collection_read != self.alias:
+            logger.warning(
+                "Reads use collection %s, not alias %s; they will not see the reindex",
+                CFG.collection_read,
+                self.alias,
+            )
+
+        source_dim = await self.store.vector_size(source)
+        self._probe_vector = [1.0] + [0.0] * (source_dim - 1)
+        await self.store.ensure_collection(target, self.dim)
+        logger.info("Reindexing %s -> %s (alias %s)", source, target, self.alias)
+
+        copy_vectors = source_dim == self.dim
+        seen: Set[Any] = set()
+        for _ in range(_MAX_PASSES):
+            if not await self._copy_pass(report, seen, copy_vectors=copy_vectors):
+                break
+
+        await self._validate(report)
+        if report.errors:
+            logger.error(
+                "Reindex %s -> %s failed validation, alias unchanged: %s",
+                source,
+                target,
+                "; ".join(report.errors),
+            )
+        else:
+            await self.store.swap_alias(self.alias, target)
+            alias_swaps_total.labels(reason="reindex").inc()
+            report.flipped = True
+            logger.info("Alias %s now points to %s (was %s)", self.alias, target, source)
+            # New documents now go to the target; copy those that reached the
+            # source between the last pass and the flip
+            await self._copy_pass(report, seen, copy_vectors=copy_vectors)
+        report.duration_seconds = time.perf_counter() - started
+        return report
+
+    async def rollback(self, report: ReindexReport) -> None:
+        """Point the alias back to the collection it served before ``report``."""
+        await self.store.swap_alias(report.alias, report.source)
+        alias_swaps_total.labels(reason="rollback").inc()
+        logger.info("Alias %s rolled back to %s", report.alias, report.source)
+
+    async def _copy_pass(
+        self, report: ReindexReport, seen: Set[Any], copy_vectors: bool
+    ) -> bool:
+        """Copy points not seen yet; returns whether there were any."""
+        found = False
+        offset = None
+        while True:
+            batch_started = time.perf_counter()
+            page, offset = await self.store.scroll(
+                report.source,
+                limit=self.batch_size,
+                offset=offset,
+                with_vectors=copy_vectors,
+            )
+            new = [p for p in page if p["id"] not in seen]
+            if new:
+                found = True
+                seen.update(p["id"] for p in new)
+                await self._write(report, new)
+                await self._pace(report, len(new), batch_started)
+            if offset is None:
+                return found
+
+    async def _write(self, report: ReindexReport, points: List[Dict[str, Any]]) -> None:
+        report.points_read += len(points)
+        with_text = [p for p in points if p["payload"].get("text")]
+        vectors = (
+            await self.embedder.embed_batch([p["payload"]["text"] for p in with_text])
+            if with_text
+            else []
+        )
+        by_id = {p["id"]: v for p, v in zip(with_text, vectors)}
+        report.points_embedded += len(with_text)
+
+        ids, batch_vectors, payloads = [], [], []
+        for p in points:
+            vector = by_id.get(p["id"], p.get("vector"))
+            if vector is None:
+                report.points_skipped += 1
+                continue
+            if p["id"] not in by_id:
+                report.points_copied += 1
+            ids.append(p["id"])
+            batch_vectors.append(vector)
+            payloads.append(p["payload"])
+            self._sample(p["id"], vector)
+        if ids:
+            await self.store.upsert_batch(
+                ids=ids, vectors=batch_vectors, payloads=payloads, collection=report.target
+            )
+        reindex_points_total.labels(status="written").inc(len(ids))
+        reindex_points_total.labels(status="skipped").inc(len(points) - len(ids))
+
+    def _sample(self, point_id: Any, vector: List[float]) -> None:
+        # Reservoir sampling: every written point is equally likely to be checked
+        self._sampled += 1
+        if len(self._samples) < self.recall_samples:
+            self._samples.append((str(point_id), vector))
+        else:
+            slot = self._rng.randrange(self._sampled)
+            if slot < self.recall_samples:
+                self._samples[slot] = (str(point_id), vector)
+
+    async def _pace(self, report: ReindexReport, written: int, batch_started: float) -> None:
+        if self.latency_slo:
+            probe_started = time.perf_counter()
+            await self.store.query(
+                vector=self._probe_vector, top_k=10, collection=report.source
+            )
+            latency = time.perf_counter() - probe_started
+            reindex_probe_seconds.observe(latency)
+            if latency > self.latency_slo:
+                self._backoff = min(max(self._backoff * 2, 0.05), 5.0)
+            else:
+                self._backoff = self._backoff / 2 if self._backoff > 0.01 else 0.0
+
+        wait = self._backoff
+        if self.max_rate:
+            wait += max(0.0, written / self.max_rate - (time.perf_counter() - batch_started))
+        if wait > 0:
+            report.throttled_seconds += wait
+            await asyncio.sleep(wait)
+
+    async def _validate(self, report: ReindexReport) -> None:
+        report.source_count = await self.store.count(report.source)
+        report.target_count = await self.store.count(report.target)
+        expected = report.source_count - report.points_skipped
+        if report.points_skipped:
+            report.errors.append(
+                f"{report.points_skipped} points have no text to re-embed"
+            )
+        if report.target_count < expected:
+            report.errors.append(
+                f"{report.target} has {report.target_count} points, expected {expected}"
+            )
+
+        if not self._samples:
+            return
+        found = 0
+        for point_id, vector in self._samples:
+            hits = await self.store.query(
+                vector=vector, top_k=self.recall_k, collection=report.target
+            )
+            found += any(h["id"] == point_id for h in hits)
+        report.recall = found / len(self._samples)
+        if report.recall < self.min_recall:
+            report.errors.append(
+                f"recall@{self.recall_k} {report.recall:.2f} is below {self.min_recall:.2f}"
+            )
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import math
 from typing import Any
 from typing import List
@@ -8,18 +10,64 @@ from .config import CFG
 from .interfaces import Embedder
 from .interfaces import Retriever
 from .interfaces import VectorStore
+from .lexical_index import LexicalIndex
+from .lexical_index import reciprocal_rank_fusion
 from .monitoring import query_seconds
 
+logger = logging.getLogger(__name__)
+
 
 class RagRetriever(Retriever):
-    def __init__(self, embedder: Embedder, store: VectorStore):
+    """
+    Dense retrieval from the vector store, optionally fused with BM25.
+
+    With a lexical index (and ``RAG_HYBRID_ON``), the BM25 search runs in a
+    worker thread while the query is embedded and searched in Qdrant; both
+    candidate lists are merged by reciprocal rank fusion, so chunks that
+    contain an exact identifier from the query rank high without a large
+    ``top_k``.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        store: VectorStore,
+        lexical_index: LexicalIndex | None = None,
+    ):
         self.embedder = embedder
         self.store = store
+        self.lexical_index = lexical_index
 
     async def retrieve(
         self, query: str, top_k: int = 10, filters: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
         top_k = min(top_k, CFG.max_top_k)
+        if self.lexical_index is None or not CFG.enable_hybrid:
+            return await self._dense(query, top_k, filters)
+
+        candidates = min(max(top_k, CFG.hybrid_candidates), CFG.max_top_k)
+        lexical = asyncio.create_task(
+            asyncio.to_thread(
+                self.lexical_index.search, query, candidates, filters, CFG.collection_read
+            )
+        )
+        try:
+            dense_hits = await self._dense(query, candidates, filters)
+        except BaseException:
+            lexical.cancel()
+            raise
+        try:
+            lexical_hits = await lexical
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Lexical search failed, using vector results only: %s", e)
+            return dense_hits[:top_k]
+        return reciprocal_rank_fusion(
+            [dense_hits, lexical_hits], k=CFG.rrf_k, top_k=top_k
+        )
+
+    async def _dense(
+        self, query: str, top_k: int, filters: dict[str, Any] | None
+    ) -> list[dict[str, Any]]:
         vec = await self.embedder.embed(query)
         ef = CFG.ef_search_base + int(math.log2(max(10, top_k)) * 8)
         ef = min(ef, CFG.ef_search_max)
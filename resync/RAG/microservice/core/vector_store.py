@@ -57,19 +57,50 @@ class QdrantVectorStore(VectorStore):
         )
         self._collection_default = collection or CFG.collection_write
         self._dim = dim
-        self._ensure_collection(self._collection_default)
+        if self._collection_default == CFG.read_alias:
+            self._ensure_alias(self._collection_default)
+        else:
+            self._ensure_collection(self._collection_default)
 
-    def _ensure_collection(self, collection: str) -> None:
+    def _ensure_alias(self, alias: str) -> None:
+        """Point ``alias`` at a new ``<alias>_v1`` collection if it does not exist."""
+        if any(a.alias_name == alias for a in self._client.get_aliases().aliases):
+            return
+        if self._is_collection(alias):
+            # Never shadowed by a new collection; ReindexJob refuses to run on it
+            logger.warning(
+                "Qdrant collection %s has the name of the read alias; "
+                "it cannot be reindexed",
+                alias,
+            )
+            return
+        first = f"{alias}_v1"
+        self._ensure_collection(first)
+        logger.info("Creating Qdrant alias %s -> %s", alias, first)
+        self._client.update_collection_aliases(
+            change_aliases_operations=[
+                qm.CreateAliasOperation(
+                    create_alias=qm.CreateAlias(collection_name=first, alias_name=alias)
+                )
+            ]
+        )
+
+    def _is_collection(self, name: str) -> bool:
+        return any(c.name == name for c in self._client.get_collections().collections)
+
+    def _ensure_collection(self, collection: str, dim: Optional[int] = None) -> None:
         try:
             self._client.get_collection(collection)
             return
         except Exception:  # pylint: disable=broad-exception-caught
             pass
         logger.info("Creating Qdrant collection: %s", collection)
-        _to_thread(
-            self._client.recreate_collection,
+        # Síncrono: os índices de payload abaixo precisam da coleção criada
+        self._client.create_collection(
             collection_name=collection,
-            vectors_config=qm.VectorParams(size=self._dim, distance=qm.Distance.COSINE),
+            vectors_config=qm.VectorParams(
+                size=dim or self._dim, distance=qm.Distance.COSINE
+            ),
             optimizers_config=qm.OptimizersConfigDiff(default_segment_number=2),
             hnsw_config=qm.HnswConfigDiff(m=16, ef_construct=256),
             shard_number=1,
@@ -154,8 +185,69 @@ class QdrantVectorStore(VectorStore):
 
     async def count(self, collection: Optional[str] = None) -> int:
         col = collection or CFG.collection_read
-        info = await _to_thread(self._client.get_collection, col)
-        return int(info.vectors_count or 0)
+        res = await _to_thread(self._client.count, collection_name=col, exact=True)
+        return int(res.count)
+
+    async def ensure_collection(self, collection: str, dim: Optional[int] = None) -> None:
+        """Create ``collection`` with ``dim``-sized vectors and payload indexes if missing."""
+        await _to_thread(self._ensure_collection, collection, dim)
+
+    async def vector_size(self, collection: str) -> int:
+        info = await _to_thread(self._client.get_collection, collection)
+        return int(info.config.params.vectors.size)
+
+    async def scroll(
+        self,
+        collection: str,
+        limit: int,
+        offset: Any = None,
+        with_vectors: bool = False,
+    ) -> tuple[List[Dict[str, Any]], Any]:
+        """One page of points in id order, and the offset of the next page (None at the end)."""
+        res, next_offset = await _to_thread(
+            self._client.scroll,
+            collection_name=collection,
+            limit=limit,
+            offset=offset,
+            with_payload=True,
+            with_vectors=with_vectors,
+        )
+        points = []
+        for r in res:
+            item = {"id": r.id, "payload": r.payload or {}}
+            if with_vectors and getattr(r, "vector", None) is not None:
+                item["vector"] = r.vector
+            points.append(item)
+        return points, next_offset
+
+    async def is_collection(self, name: str) -> bool:
+        """Whether ``name`` is a concrete collection rather than an alias."""
+        return await _to_thread(self._is_collection, name)
+
+    async def get_alias_target(self, alias: str) -> Optional[str]:
+        """Collection that ``alias`` points to, or None if there is no such alias."""
+        res = await _to_thread(self._client.get_aliases)
+        for a in res.aliases:
+            if a.alias_name == alias:
+                return a.collection_name
+        return None
+
+    async def swap_alias(self, alias: str, collection: str) -> None:
+        """Point ``alias`` at ``collection`` in one atomic Qdrant operation."""
+        operations = []
+        if await self.get_alias_target(alias) is not None:
+            operations.append(
+                qm.DeleteAliasOperation(delete_alias=qm.DeleteAlias(alias_name=alias))
+            )
+        operations.append(
+            qm.CreateAliasOperation(
+                create_alias=qm.CreateAlias(collection_name=collection, alias_name=alias)
+            )
+        )
+        await _to_thread(
+            self._client.update_collection_aliases,
+            change_aliases_operations=operations,
+        )
 
     async def exists_by_sha256(
         self, sha256: str, collection: Optional[str] = None
@@ -98,4 +98,24 @@ async def test_ingest_metrics_called(ingest_service, mock_embedder, mock_vector_
 
     # Verify metrics were incremented
     assert ingest_service.store.upsert_seconds.time.called
-    assert ingest_service.store.embed_seconds.time.called
\ No newline at end of file
+    assert ingest_service.store.embed_seconds.time.called
+
+
+@pytest.mark.asyncio
+async def test_ingest_documents_batch(ingest_service, mock_vector_store):
+    docs = [
+        {
+            "tenant": "test",
+            "doc_id": f"doc{i}",
+            "source": "test",
+            "text": f"Document {i}. It has content.",
+            "ts_iso": "2025-10-18T00:00:00Z",
+        }
+        for i in range(3)
+    ]
+
+    result = await ingest_service.ingest_documents(docs)
+
+    assert result == 3
+    ids = [c.kwargs["ids"] for c in mock_vector_store.upsert_batch.call_args_list]
+    assert ids == [["doc0#c000000"], ["doc1#c000000"], ["doc2#c000000"]]
@@ -0,0 +1,149 @@
+"""
+Unit tests for the BM25 lexical index and hybrid retrieval.
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from resync.RAG.microservice.core.config import CFG
+from resync.RAG.microservice.core import lexical_index
+from resync.RAG.microservice.core.interfaces import Embedder, VectorStore
+from resync.RAG.microservice.core.lexical_index import (
+    LexicalIndex,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from resync.RAG.microservice.core.retriever import RagRetriever
+
+CHUNKS = {
+    "doc1#c000000": "Job PAYROLL_DAILY ended with AWSBH001E on workstation CPU_PROD01.",
+    "doc1#c000001": "The payroll stream runs daily after the ledger close.",
+    "doc2#c000000": "Workstation CPU_TEST02 is linked to the master domain manager.",
+    "doc2#c000001": "Message AWSJR002W is a warning about a missing dependency.",
+}
+
+
+def payload(chunk_id):
+    return {"doc_id": chunk_id.split("#")[0], "chunk_id": chunk_id, "tags": ["tws"]}
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = LexicalIndex(tmp_path / "lexical.jsonl")
+    ids = list(CHUNKS)
+    idx.add_batch(ids, [CHUNKS[i] for i in ids], [payload(i) for i in ids])
+    return idx
+
+
+def test_tokenize_keeps_identifiers_and_parts():
+    terms = tokenize("Job PAYROLL_DAILY failed: AWSBH001E")
+    assert "payroll_daily" in terms
+    assert "payroll" in terms
+    assert "awsbh001e" in terms
+
+
+def test_exact_identifier_ranks_first(index):
+    hits = index.search("what does AWSBH001E mean", top_k=1)
+    assert [h["id"] for h in hits] == ["doc1#c000000"]
+    assert hits[0]["payload"]["doc_id"] == "doc1"
+
+
+def test_filters_match_payload(index):
+    hits = index.search("workstation", top_k=10, filters={"doc_id": "doc2"})
+    assert [h["id"] for h in hits] == ["doc2#c000000"]
+    assert index.search("workstation", filters={"tags": "other"}) == []
+
+
+def test_readding_replaces_chunk(index):
+    index.add_batch(["doc1#c000000"], ["Job rescheduled"], [payload("doc1#c000000")])
+    assert index.search("AWSBH001E") == []
+    assert len(index) == len(CHUNKS)
+
+
+def test_index_reloads_from_disk(index, tmp_path):
+    index.add_batch(["doc1#c000000"], ["Job rescheduled"], [payload("doc1#c000000")])
+
+    reloaded = LexicalIndex(tmp_path / "lexical.jsonl")
+
+    assert len(reloaded) == len(CHUNKS)
+    assert reloaded.search("AWSJR002W", top_k=1)[0]["id"] == "doc2#c000001"
+    assert reloaded.search("AWSBH001E") == []
+
+
+def test_delete_removes_chunks_across_reload(index, tmp_path):
+    assert index.delete(["doc1#c000000", "missing"]) == 1
+    assert index.search("AWSBH001E") == []
+
+    reloaded = LexicalIndex(tmp_path / "lexical.jsonl")
+
+    assert len(reloaded) == len(CHUNKS) - 1
+    assert reloaded.search("AWSBH001E") == []
+
+
+def test_collections_are_searched_separately(index, tmp_path):
+    index.add_batch(
+        ["doc3#c000000"], ["AWSBH001E in the staging copy"], [payload("doc3#c000000")],
+        collection="staging",
+    )
+
+    assert [h["id"] for h in index.search("AWSBH001E")] == ["doc1#c000000"]
+    hits = index.search("AWSBH001E", collection="staging")
+    assert [h["id"] for h in hits] == ["doc3#c000000"]
+
+    assert index.drop_collection("staging") == 1
+    reloaded = LexicalIndex(tmp_path / "lexical.jsonl")
+    assert reloaded.search("AWSBH001E", collection="staging") == []
+    assert len(reloaded) == len(CHUNKS)
+
+
+def test_lines_without_collection_belong_to_write_collection(tmp_path):
+    path = tmp_path / "lexical.jsonl"
+    record = {"id": "doc1#c000000", "terms": {"awsbh001e": 1}, "payload": {}}
+    path.write_text(json.dumps(record) + "\n")
+
+    index = LexicalIndex(path)
+
+    hits = index.search("AWSBH001E", collection=CFG.collection_write)
+    assert [h["id"] for h in hits] == ["doc1#c000000"]
+
+
+def test_stale_lines_compacted_while_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(lexical_index, "_MIN_COMPACT_LINES", 4)
+    path = tmp_path / "lexical.jsonl"
+    index = LexicalIndex(path)
+    for _ in range(5):
+        index.add_batch(["doc1#c000000"], ["Job rescheduled"], [payload("doc1#c000000")])
+
+    assert len(path.read_text().splitlines()) < 5
+    assert len(LexicalIndex(path)) == 1
+
+
+def test_reciprocal_rank_fusion():
+    dense = [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.8}]
+    lexical = [{"id": "b", "score": 7.0}, {"id": "c", "score": 3.0}]
+
+    fused = reciprocal_rank_fusion([dense, lexical], k=60)
+
+    assert [h["id"] for h in fused] == ["b", "a", "c"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retrieval_surfaces_identifier_match(index):
+    embedder = AsyncMock(spec=Embedder)
+    embedder.embed.return_value = [0.1] * CFG.embed_dim
+    store = AsyncMock(spec=VectorStore)
+    # Dense search misses the chunk with the exact message code
+    store.query.return_value = [
+        {"id": "doc2#c000001", "score": 0.81, "payload": payload("doc2#c000001")},
+        {"id": "doc1#c000001", "score": 0.80, "payload": payload("doc1#c000001")},
+    ]
+    retriever = RagRetriever(embedder, store, index)
+
+    results = await retriever.retrieve("AWSBH001E on CPU_PROD01", top_k=2)
+
+    assert "doc1#c000000" in [r["id"] for r in results]
+    assert len(results) == 2
+    assert store.query.call_args.kwargs["top_k"] == CFG.hybrid_candidates
@@ -0,0 +1,244 @@
+"""
+Unit tests for alias-swap reindexing.
+"""
+
+import hashlib
+import math
+
+import pytest
+
+from resync.RAG.microservice.core import vector_store
+from resync.RAG.microservice.core.reindex import ReindexJob, next_version
+
+
+def vector_for(text, dim):
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [digest[i % len(digest)] / 255.0 - 0.5 for i in range(dim)]
+
+
+class FakeEmbedder:
+    def __init__(self, dim):
+        self.dim = dim
+        self.calls = 0
+
+    async def embed(self, text):
+        return vector_for(text, self.dim)
+
+    async def embed_batch(self, texts):
+        self.calls += 1
+        return [vector_for(t, self.dim) for t in texts]
+
+
+class FakeStore:
+    """Collections and aliases in memory, with exact cosine search."""
+
+    def __init__(self):
+        self.collections = {}
+        self.dims = {}
+        self.aliases = {}
+        self.query_delay = 0.0
+
+    def _resolve(self, name):
+        return self.aliases.get(name, name)
+
+    async def ensure_collection(self, collection, dim=None):
+        self.collections.setdefault(collection, {})
+        self.dims.setdefault(collection, dim)
+
+    async def vector_size(self, collection):
+        return self.dims[self._resolve(collection)]
+
+    async def scroll(self, collection, limit, offset=None, with_vectors=False):
+        points = sorted(self.collections[self._resolve(collection)].items())
+        start = offset or 0
+        page = [
+            {"id": pid, "payload": dict(payload), **({"vector": vec} if with_vectors else {})}
+            for pid, (vec, payload) in points[start : start + limit]
+        ]
+        next_offset = start + limit if start + limit < len(points) else None
+        return page, next_offset
+
+    async def upsert_batch(self, ids, vectors, payloads, collection=None):
+        target = self.collections[self._resolve(collection)]
+        for pid, vec, payload in zip(ids, vectors, payloads):
+            target[pid] = (vec, payload)
+
+    async def query(self, vector, top_k, collection=None, **kwargs):
+        import asyncio
+
+        await asyncio.sleep(self.query_delay)
+
+        def cos(a, b):
+            na = math.sqrt(sum(x * x for x in a))
+            nb = math.sqrt(sum(x * x for x in b))
+            return sum(x * y for x, y in zip(a, b)) / (na * nb) if na and nb else 0.0
+
+        points = self.collections[self._resolve(collection)]
+        ranked = sorted(points.items(), key=lambda item: cos(vector, item[1][0]), reverse=True)
+        return [{"id": str(pid), "score": 1.0, "payload": p} for pid, (_, p) in ranked[:top_k]]
+
+    async def count(self, collection=None):
+        return len(self.collections[self._resolve(collection)])
+
+    async def is_collection(self, name):
+        return name in self.collections
+
+    async def get_alias_target(self, alias):
+        return self.aliases.get(alias)
+
+    async def swap_alias(self, alias, collection):
+        self.aliases[alias] = collection
+
+
+def make_job(store, embedder, **kwargs):
+    """An unthrottled job whose ingestion writes through the alias."""
+    kwargs.setdefault("write_collection", "knowledge")
+    return ReindexJob(store, embedder, alias="knowledge", max_rate=0, **kwargs)
+
+
+@pytest.fixture
+def store():
+    s = FakeStore()
+    s.collections["knowledge_v1"] = {
+        i: (vector_for(f"chunk {i}", 8), {"doc_id": "doc", "text": f"chunk {i}"})
+        for i in range(40)
+    }
+    s.dims["knowledge_v1"] = 8
+    s.aliases["knowledge"] = "knowledge_v1"
+    return s
+
+
+def test_next_version():
+    assert next_version("knowledge_v1") == "knowledge_v2"
+    assert next_version("knowledge_v9") == "knowledge_v10"
+    assert next_version("knowledge") == "knowledge_v2"
+
+
+@pytest.mark.asyncio
+async def test_reindex_builds_next_version_and_flips_alias(store):
+    embedder = FakeEmbedder(16)
+    job = make_job(store, embedder, dim=16, batch_size=16)
+
+    report = await job.run()
+
+    assert report.flipped, report.errors
+    assert (report.source, report.target) == ("knowledge_v1", "knowledge_v2")
+    assert store.aliases["knowledge"] == "knowledge_v2"
+    assert report.target_count == 40
+    assert report.recall == 1.0
+    assert len(store.collections["knowledge_v2"][0][0]) == 16
+    # The old version is kept for rollback
+    assert len(store.collections["knowledge_v1"]) == 40
+
+    await job.rollback(report)
+    assert store.aliases["knowledge"] == "knowledge_v1"
+
+
+@pytest.mark.asyncio
+async def test_alias_unchanged_when_points_cannot_be_reindexed(store):
+    store.collections["knowledge_v1"][3] = (vector_for("x", 8), {"doc_id": "doc"})
+    job = make_job(store, FakeEmbedder(16), dim=16)
+
+    report = await job.run()
+
+    assert not report.flipped
+    assert report.points_skipped == 1
+    assert store.aliases["knowledge"] == "knowledge_v1"
+
+
+@pytest.mark.asyncio
+async def test_points_without_text_keep_vector_when_dim_unchanged(store):
+    store.collections["knowledge_v1"][3] = (vector_for("x", 8), {"doc_id": "doc"})
+    job = make_job(store, FakeEmbedder(8), dim=8)
+
+    report = await job.run()
+
+    assert report.flipped, report.errors
+    assert report.points_copied == 1
+    assert store.collections["knowledge_v2"][3][0] == vector_for("x", 8)
+
+
+@pytest.mark.asyncio
+async def test_backs_off_while_read_latency_over_slo(store):
+    store.query_delay = 0.01
+    job = make_job(store, FakeEmbedder(8), dim=8, batch_size=10, latency_slo=0.001)
+
+    report = await job.run()
+
+    assert report.flipped
+    assert report.throttled_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_refuses_to_run_when_writes_bypass_alias(store):
+    job = make_job(store, FakeEmbedder(8), write_collection="knowledge_v1")
+
+    with pytest.raises(ValueError, match="QDRANT_COLLECTION"):
+        await job.run()
+
+    assert store.aliases["knowledge"] == "knowledge_v1"
+    assert "knowledge_v2" not in store.collections
+
+
+@pytest.mark.asyncio
+async def test_points_ingested_before_flip_reach_new_version(store):
+    job = make_job(store, FakeEmbedder(8), dim=8)
+    swap_alias = store.swap_alias
+
+    async def ingest_then_swap(alias, collection):
+        # A document ingested through the alias just before the flip
+        await store.upsert_batch(
+            ids=[100],
+            vectors=[vector_for("late", 8)],
+            payloads=[{"doc_id": "late", "text": "late"}],
+            collection="knowledge",
+        )
+        await swap_alias(alias, collection)
+
+    store.swap_alias = ingest_then_swap
+
+    report = await job.run()
+
+    assert report.flipped, report.errors
+    assert 100 in store.collections["knowledge_v2"]
+
+
+@pytest.mark.asyncio
+async def test_refuses_to_run_when_alias_name_is_a_collection(store):
+    store.collections["knowledge"] = store.collections.pop("knowledge_v1")
+    store.dims["knowledge"] = store.dims.pop("knowledge_v1")
+    del store.aliases["knowledge"]
+    job = make_job(store, FakeEmbedder(8))
+
+    with pytest.raises(ValueError, match="not an alias"):
+        await job.run()
+
+    assert "knowledge_v2" not in store.collections
+
+
+@pytest.mark.skipif(not vector_store.QDRANT_AVAILABLE, reason="qdrant-client missing")
+@pytest.mark.asyncio
+async def test_reindex_through_bootstrapped_alias():
+    store = vector_store.QdrantVectorStore(url=":memory:", collection="knowledge", dim=8)
+    assert await store.get_alias_target("knowledge") == "knowledge_v1"
+    assert not await store.is_collection("knowledge")
+
+    await store.upsert_batch(
+        ids=[1, 2, 3],
+        vectors=[vector_for(f"chunk {i}", 8) for i in range(3)],
+        payloads=[{"doc_id": "doc", "text": f"chunk {i}"} for i in range(3)],
+    )
+    # Without probes or recall checks: this qdrant-client has no search()
+    job = make_job(store, FakeEmbedder(8), dim=8, latency_slo=0, recall_samples=0)
+
+    report = await job.run()
+
+    assert report.flipped, report.errors
+    assert await store.get_alias_target("knowledge") == "knowledge_v2"
+    await store.upsert_batch(
+        ids=[4],
+        vectors=[vector_for("chunk 4", 8)],
+        payloads=[{"doc_id": "doc", "text": "chunk 4"}],
+    )
+    assert await store.count("knowledge") == 4
+    assert await store.count("knowledge_v1") == 3
@@ -10,12 +10,19 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import weakref
 from typing import Any, Protocol
 
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 
-from resync.api.utils.stream_handler import AgentResponseStreamer
+from resync.api.utils.stream_handler import (
+    AgentResponseStreamer,
+    negotiate_stream_subprotocol,
+)
+from resync.core.conversation_sink import (
+    AuditorScheduler,
+    Conversation,
+    ConversationSink,
+)
 from resync.core.exceptions import (
     AgentExecutionError,
     AuditError,
@@ -28,7 +35,9 @@ from resync.core.fastapi_di import get_agent_manager, get_knowledge_graph
 from resync.core.ia_auditor import analyze_and_flag_memories
 from resync.core.interfaces import IAgentManager, IKnowledgeGraph
 from resync.core.llm_wrapper import optimized_llm
+from resync.core.retry_budget import deadline
 from resync.core.security import SafeAgentID, sanitize_input
+from resync.settings import settings
 
 # --- Logging Setup ---
 logger = logging.getLogger(__name__)
@@ -40,8 +49,16 @@ knowledge_graph_dependency = Depends(get_knowledge_graph)
 # --- APIRouter Initialization ---
 chat_router = APIRouter()
 
-# Optional: track background tasks for observability (non-blocking)
-_bg_tasks: "weakref.WeakSet[asyncio.Task[Any]]" = weakref.WeakSet()
+# Conversations are persisted and audited in the background, off the
+# per-message path; both are created on first use (see below)
+_conversation_sink: ConversationSink | None = None
+_auditor_scheduler: AuditorScheduler | None = None
+# Replaced sinks still writing what they hold; awaited on shutdown
+_retiring_sinks: set[asyncio.Task] = set()
+
+# Bounds the TWS calls (retries included) made by the agent's tools while
+# answering one message
+AGENT_DEADLINE_SECONDS = getattr(settings, "CHAT_AGENT_DEADLINE_SECONDS", 60.0)
 
 
 class SupportsAgentMeta(Protocol):
@@ -160,7 +177,7 @@ async def _finalize_and_store_interaction(
     sanitized_query: str,
     full_response: str,
 ) -> None:
-    """Sends the final message, stores the conversation, and schedules the auditor."""
+    """Sends the final message and queues the conversation for storage and audit."""
     # Send a final message indicating the stream has ended
     await websocket.send_json(
         {
@@ -177,22 +194,59 @@ async def _finalize_and_store_interaction(
     agent_description = getattr(agent, "description", "No description")
     agent_model = getattr(agent, "llm_model", getattr(agent, "model", "Unknown Model"))
 
-    # Store the interaction in the Knowledge Graph
-    await knowledge_graph.add_conversation(
-        user_query=sanitized_query,
-        agent_response=full_response,
-        agent_id=agent_id,
-        context={
-            "agent_name": agent_name,
-            "agent_description": agent_description,
-            "model_used": str(agent_model),
-        },
+    # Queue the interaction for the Knowledge Graph; the sink writes it in a
+    # batch and then schedules the IA Auditor
+    await _get_conversation_sink(knowledge_graph).submit(
+        Conversation(
+            user_query=sanitized_query,
+            agent_response=full_response,
+            agent_id=agent_id,
+            context={
+                "agent_name": agent_name,
+                "agent_description": agent_description,
+                "model_used": str(agent_model),
+            },
+        )
     )
 
-    # Schedule the IA Auditor to run in the background
-    logger.info("Scheduling IA Auditor to run in the background.")
-    task = asyncio.create_task(run_auditor_safely())
-    _bg_tasks.add(task)
+
+def _get_auditor_scheduler() -> AuditorScheduler:
+    """Shared auditor scheduler, started on the running event loop."""
+    global _auditor_scheduler
+    if _auditor_scheduler is None:
+        # Resolved at sweep time so run_auditor_safely can be patched
+        _auditor_scheduler = AuditorScheduler(lambda: run_auditor_safely())
+    _auditor_scheduler.start()
+    return _auditor_scheduler
+
+
+def _get_conversation_sink(knowledge_graph: IKnowledgeGraph) -> ConversationSink:
+    """Shared conversation sink for ``knowledge_graph``, started on first use."""
+    global _conversation_sink
+    sink = _conversation_sink
+    if sink is None or sink.knowledge_graph is not knowledge_graph or not sink.running:
+        if sink is not None and sink.running:
+            task = asyncio.create_task(sink.stop())  # Writes what it still holds
+            _retiring_sinks.add(task)
+            task.add_done_callback(_retiring_sinks.discard)
+        scheduler = _get_auditor_scheduler()
+        sink = ConversationSink(knowledge_graph, on_stored=scheduler.notify)
+        sink.start()
+        _conversation_sink = sink
+    return sink
+
+
+async def shutdown_chat_background_tasks() -> None:
+    """Write queued conversations and stop the auditor scheduler."""
+    global _conversation_sink, _auditor_scheduler
+    if _conversation_sink is not None:
+        await _conversation_sink.stop()
+        _conversation_sink = None
+    if _retiring_sinks:
+        await asyncio.gather(*_retiring_sinks, return_exceptions=True)
+    if _auditor_scheduler is not None:
+        await _auditor_scheduler.stop()
+        _auditor_scheduler = None
 
 
 async def _handle_agent_interaction(
@@ -247,7 +301,8 @@ async def _handle_agent_interaction(
 
         # 2. Stream agent's response to client and get's full response
         streamer = AgentResponseStreamer(websocket)
-        full_response = await streamer.stream_response(agent, enhanced_query)
+        with deadline(AGENT_DEADLINE_SECONDS):
+            full_response = await streamer.stream_response(agent, enhanced_query)
 
         # 3. Finalize the interaction: send final message, store, and audit
         await _finalize_and_store_interaction(
@@ -292,7 +347,7 @@ async def _setup_websocket_session(
     websocket: WebSocket, agent_id: SafeAgentID
 ) -> SupportsAgentMeta | Any:
     """Handles WebSocket connection setup and agent retrieval."""
-    await websocket.accept()
+    await websocket.accept(subprotocol=negotiate_stream_subprotocol(websocket))
     logger.info("WebSocket connection established for agent %s", agent_id)
 
     agent_manager: IAgentManager = get_agent_manager()
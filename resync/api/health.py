@@ -7,6 +7,7 @@ from typing import Any
 from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel
 
+from resync.core.health_history import STATUS_BY_CODE, STATUS_CODES
 from resync.core.health_models import (
     ComponentType,
     HealthStatus,
@@ -112,7 +113,7 @@ async def get_health_summary(
     """
     try:
         health_service = await get_health_check_service()
-        health_result = await health_service.perform_comprehensive_health_check()
+        health_result = await health_service.get_cached_health_check()
 
         # If auto_enable is true and health is good, attempt to enable any disabled components
         if auto_enable and health_result.overall_status != HealthStatus.UNHEALTHY:
@@ -165,7 +166,7 @@ async def get_core_health() -> CoreHealthResponse:
     """
     try:
         health_service = await get_health_check_service()
-        health_result = await health_service.perform_comprehensive_health_check()
+        health_result = await health_service.get_cached_health_check()
 
         # Filter only core components
         core_components = {
@@ -249,7 +250,7 @@ async def get_detailed_health(
     """
     try:
         health_service = await get_health_check_service()
-        health_result = await health_service.perform_comprehensive_health_check()
+        health_result = await health_service.get_cached_health_check()
 
         # Convert components to response format
         components_response = {
@@ -270,15 +271,17 @@ async def get_detailed_health(
         # Get history if requested
         history_data = []
         if include_history:
-            history = health_service.get_health_history(history_hours)
+            history = health_service.query_health_history(history_hours)
             history_data = [
                 {
-                    "timestamp": entry.timestamp.isoformat(),
-                    "overall_status": entry.overall_status.value,
-                    "overall_status_color": get_status_color(entry.overall_status),
-                    "summary": get_status_description(entry.overall_status),
+                    "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+                    "overall_status": STATUS_BY_CODE[code].value,
+                    "overall_status_color": get_status_color(STATUS_BY_CODE[code]),
+                    "summary": get_status_description(STATUS_BY_CODE[code]),
                 }
-                for entry in history
+                for timestamp, code in zip(
+                    history["timestamps"], history["overall_status"], strict=True
+                )
             ]
 
         return DetailedHealthResponse(
@@ -300,6 +303,54 @@ async def get_detailed_health(
         ) from e
 
 
+@router.get("/history")
+async def get_health_history(
+    hours: float = Query(1, description="Hours of history to return", gt=0, le=2160),
+    component: list[str] | None = Query(
+        None, description="Components to include (default: all)"
+    ),
+    resolution_seconds: int | None = Query(
+        None,
+        description="Minimum bucket width (default: finest covering the range)",
+        gt=0,
+    ),
+) -> dict[str, Any]:
+    """
+    Get columnar health history for dashboards.
+
+    Returns parallel lists of bucket timestamps (epoch seconds), worst overall
+    status code and, per component, worst status code and mean latency.
+    Older ranges are served from 1-minute or 1-hour downsampled buckets.
+
+    Returns:
+        dict[str, Any]: Columnar history with the status code legend
+    """
+    try:
+        health_service = await get_health_check_service()
+        history = health_service.query_health_history(
+            hours, components=component, resolution_seconds=resolution_seconds
+        )
+        history["status_codes"] = {
+            state.value: code for state, code in STATUS_CODES.items()
+        }
+        return history
+
+    except HTTPException as e:
+        # Re-raise HTTPException to preserve the original status code and detail
+        raise e
+    except (ValueError, OverflowError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid health history range: {str(e)}",
+        ) from e
+    except Exception as e:
+        logger.error(f"Health history query failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Health history system error: {str(e)}",
+        ) from e
+
+
 @router.get("/ready")
 async def readiness_probe() -> dict[str, Any]:
     """
@@ -313,7 +364,7 @@ async def readiness_probe() -> dict[str, Any]:
     """
     try:
         health_service = await get_health_check_service()
-        health_result = await health_service.perform_comprehensive_health_check()
+        health_result = await health_service.get_cached_health_check()
 
         # Check only core components for readiness
         core_components = {
@@ -495,7 +546,7 @@ async def get_redis_health() -> dict[str, Any]:
     """
     try:
         health_service = await get_health_check_service()
-        health_result = await health_service.perform_comprehensive_health_check()
+        health_result = await health_service.get_cached_health_check()
 
         redis_component = health_result.components.get("redis")
 
@@ -0,0 +1,150 @@
+"""Pure-ASGI building blocks for the application's middleware stack.
+
+``BaseHTTPMiddleware`` runs every layer in its own task, pipes the body
+through a memory stream and re-wraps the response, so each layer costs a
+task switch per request and streaming responses are buffered between
+layers. The middleware here pass ``scope``/``receive``/``send`` straight
+through instead:
+
+- ``HeaderLayer`` is the base for middleware that only record request state
+  and add response headers. It decides its headers when the request arrives
+  and injects them into the ``http.response.start`` message; the body is
+  never touched.
+- ``FusedHeaderMiddleware`` runs several header layers as a single ASGI
+  middleware with one ``send`` wrapper, with the same result as stacking
+  them with ``add_middleware``.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# (lowercase name, value, overwrite). Without overwrite the header is only
+# added when the response does not already carry it (``setdefault``).
+ResponseHeader = Tuple[bytes, bytes, bool]
+
+
+def encode_headers(
+    headers: Dict[str, str], overwrite: bool = True
+) -> List[ResponseHeader]:
+    """Pre-encode a static header mapping for ``apply_headers``."""
+    return [
+        (name.lower().encode("latin-1"), value.encode("latin-1"), overwrite)
+        for name, value in headers.items()
+    ]
+
+
+def get_header(scope: Scope, name: bytes) -> Optional[str]:
+    """First value of request header ``name`` (lowercase bytes), if any."""
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def get_state(scope: Scope) -> Dict[str, Any]:
+    """The dict behind ``request.state`` for this request."""
+    return scope.setdefault("state", {})
+
+
+def apply_headers(message: Message, headers: Iterable[ResponseHeader]) -> None:
+    """Add ``headers`` to an ``http.response.start`` message in place."""
+    raw = list(message.get("headers", ()))
+    present = {key.lower() for key, _ in raw}
+    for name, value, overwrite in headers:
+        if name in present:
+            if not overwrite:
+                continue
+            raw = [(key, val) for key, val in raw if key.lower() != name]
+        raw.append((name, value))
+        present.add(name)
+    message["headers"] = raw
+
+
+class HeaderLayer(ABC):
+    """
+    Pure-ASGI middleware that only adds response headers.
+
+    Subclasses implement ``on_request``, which may record request state
+    (``get_state(scope)``) and returns the headers for the response, or
+    None to leave it untouched. Non-HTTP scopes are passed through.
+    """
+
+    def __init__(self, app: Optional[ASGIApp] = None):
+        self.app = app
+
+    @abstractmethod
+    def on_request(self, scope: Scope) -> Optional[Sequence[ResponseHeader]]:
+        """Record request state and return the headers for the response."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = self.on_request(scope)
+        if not headers:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                apply_headers(message, headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class FusedHeaderMiddleware:
+    """
+    Several ``HeaderLayer``s run as one middleware.
+
+    ``layers`` are ``(cls, kwargs)`` pairs listed outermost first, the
+    order their ``on_request`` hooks run in. Response headers are applied
+    innermost first, so an outer layer overrides an inner one exactly as
+    when the layers are stacked one by one.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        layers: Sequence[Tuple[Type[HeaderLayer], Dict[str, Any]]],
+    ):
+        self.app = app
+        self.layers = [cls(app, **kwargs) for cls, kwargs in layers]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        collected: List[Sequence[ResponseHeader]] = []
+        for layer in self.layers:
+            headers = layer.on_request(scope)
+            if headers:
+                collected.append(headers)
+        if not collected:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                apply_headers(message, chain.from_iterable(reversed(collected)))
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+__all__ = [
+    "FusedHeaderMiddleware",
+    "HeaderLayer",
+    "ResponseHeader",
+    "apply_headers",
+    "encode_headers",
+    "get_header",
+    "get_state",
+]
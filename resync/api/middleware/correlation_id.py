@@ -12,11 +12,18 @@ O Correlation ID é:
 
 import logging
 import uuid
-from typing import Callable, Optional
+from typing import Optional, Sequence
 
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Scope
+
+from resync.api.middleware.asgi import (
+    HeaderLayer,
+    ResponseHeader,
+    get_header,
+    get_state,
+)
+from resync.core.context import set_correlation_id
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +32,7 @@ CORRELATION_ID_HEADER = "X-Correlation-ID"
 CORRELATION_ID_CTX_KEY = "correlation_id"
 
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
+class CorrelationIdMiddleware(HeaderLayer):
     """Middleware para gerenciar Correlation IDs em requisições HTTP.
 
     Funcionalidades:
@@ -35,6 +42,9 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
     - Adiciona ao header da resposta
     - Disponibiliza para logging
 
+    Middleware ASGI puro: o ID é definido no contextvar dentro da mesma
+    task que executa o endpoint, sem cópia de contexto por camada.
+
     Attributes:
         header_name: Nome do header HTTP para o Correlation ID
         generate_if_missing: Se True, gera ID quando não fornecido
@@ -42,7 +52,7 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
 
     def __init__(
         self,
-        app: ASGIApp,
+        app: Optional[ASGIApp] = None,
         header_name: str = CORRELATION_ID_HEADER,
         generate_if_missing: bool = True,
     ):
@@ -56,58 +66,41 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.header_name = header_name
         self.generate_if_missing = generate_if_missing
+        self._header_key = header_name.lower().encode("latin-1")
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Processa a requisição adicionando Correlation ID.
+    def on_request(self, scope: Scope) -> Optional[Sequence[ResponseHeader]]:
+        """Extrai ou gera o Correlation ID e devolve o header da resposta.
 
         Args:
-            request: Requisição HTTP
-            call_next: Próximo handler na cadeia
+            scope: Scope ASGI da requisição
 
         Returns:
-            Resposta HTTP com Correlation ID no header
+            Header com o Correlation ID, ou None se não houver ID
         """
-        # Extrair ou gerar Correlation ID
-        correlation_id = request.headers.get(self.header_name)
+        correlation_id = get_header(scope, self._header_key)
 
         if not correlation_id and self.generate_if_missing:
             correlation_id = self._generate_correlation_id()
             logger.debug(
-                f"Generated new correlation ID: {correlation_id}",
+                "Generated new correlation ID: %s",
+                correlation_id,
                 extra={"correlation_id": correlation_id},
             )
         elif correlation_id:
             logger.debug(
-                f"Using existing correlation ID: {correlation_id}",
+                "Using existing correlation ID: %s",
+                correlation_id,
                 extra={"correlation_id": correlation_id},
             )
 
-        # Armazenar no contexto da requisição
-        if correlation_id:
-            request.state.correlation_id = correlation_id
-
-            # Também disponibilizar via contextvars para acesso global
-            from resync.core.context import set_correlation_id
-
-            set_correlation_id(correlation_id)
-
-        # Processar requisição
-        try:
-            response = await call_next(request)
-        except Exception as e:
-            # Garantir que correlation_id está disponível mesmo em caso de erro
-            logger.error(
-                f"Error processing request: {str(e)}",
-                extra={"correlation_id": correlation_id},
-                exc_info=True,
-            )
-            raise
+        if not correlation_id:
+            return None
 
-        # Adicionar Correlation ID ao header da resposta
-        if correlation_id:
-            response.headers[self.header_name] = correlation_id
+        # Armazenar no contexto da requisição e no contextvar global
+        get_state(scope)[CORRELATION_ID_CTX_KEY] = correlation_id
+        set_correlation_id(correlation_id)
 
-        return response
+        return [(self._header_key, correlation_id.encode("latin-1"), True)]
 
     def _generate_correlation_id(self) -> str:
         """Gera um novo Correlation ID único.
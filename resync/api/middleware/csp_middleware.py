@@ -3,70 +3,85 @@
 import base64
 import logging
 import secrets
+from typing import Optional, Sequence
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Scope
 
-from resync.csp_validation import CSPValidationError, process_csp_report
+from resync.api.middleware.asgi import (
+    HeaderLayer,
+    ResponseHeader,
+    encode_headers,
+    get_state,
+)
 
 logger = logging.getLogger(__name__)
 
-
-class CSPMiddleware(BaseHTTPMiddleware):
+# Headers sent alongside the policy on every response
+_STATIC_SECURITY_HEADERS = encode_headers(
+    {
+        "X-Content-Type-Options": "nosniff",
+        # Clickjacking protection
+        "X-Frame-Options": "DENY",
+        # For legacy browsers
+        "X-XSS-Protection": "1; mode=block",
+        # Privacy protection
+        "Referrer-Policy": "strict-origin-when-cross-origin",
+    }
+)
+
+
+class CSPMiddleware(HeaderLayer):
     """
     Middleware that implements Content Security Policy (CSP) with nonce generation.
 
     This middleware generates cryptographically secure nonces for each request
     and adds appropriate CSP headers to protect against XSS and other attacks.
+    The headers are injected into the response start message, so streaming
+    responses pass through unbuffered.
     """
 
-    def __init__(self, app, report_only: bool = False):
+    def __init__(self, app: Optional[ASGIApp] = None, report_only: bool = False):
         """
         Initialize CSP middleware.
 
         Args:
-            app: The FastAPI application
+            app: The ASGI application
             report_only: If True, CSP violations are reported but not enforced
         """
         super().__init__(app)
         self.report_only = report_only
+        self._header_key = (
+            b"content-security-policy-report-only"
+            if report_only
+            else b"content-security-policy"
+        )
         # Don't import settings here to avoid potential circular imports
         # Import will be done lazily when needed
         self._settings = None  # Will be set when first needed
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
+    def on_request(self, scope: Scope) -> Optional[Sequence[ResponseHeader]]:
         """
-        Process each request and add CSP headers.
+        Generate the request nonce and the CSP headers for its response.
 
         Args:
-            request: The incoming request
-            call_next: The next middleware or endpoint
+            scope: The ASGI request scope
 
         Returns:
-            Response with CSP headers
+            Headers to add to the response
         """
         # Generate cryptographically secure nonce for this request
         nonce = self._generate_nonce()
 
         # Store nonce in request state for template access
-        request.state.csp_nonce = nonce
+        get_state(scope)["csp_nonce"] = nonce
 
         # Generate CSP policy with the nonce
         csp_policy = self._generate_csp_policy(nonce)
 
-        # Process the request
-        response = await call_next(request)
-
-        # Add CSP headers to response
-        self._add_csp_headers(response, csp_policy)
-
-        # Handle CSP violations if this is the CSP violation endpoint
-        if request.url.path == "/csp-violation-report":
-            await self._handle_csp_violation_report(request)
-
-        return response
+        return [
+            (self._header_key, csp_policy.encode("latin-1"), True),
+            *_STATIC_SECURITY_HEADERS,
+        ]
 
     def _generate_nonce(self) -> str:
         """
@@ -134,76 +149,8 @@ class CSPMiddleware(BaseHTTPMiddleware):
 
         return "; ".join(policy_parts)
 
-    def _add_csp_headers(self, response: Response, csp_policy: str) -> None:
-        """
-        Add CSP headers to the response.
-
-        Args:
-            response: The response object
-            csp_policy: The CSP policy string
-        """
-        header_name = (
-            "Content-Security-Policy-Report-Only"
-            if self.report_only
-            else "Content-Security-Policy"
-        )
-        response.headers[header_name] = csp_policy
-
-        # Also add X-Content-Type-Options for additional security
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
-        # Add X-Frame-Options for clickjacking protection
-        response.headers["X-Frame-Options"] = "DENY"
-
-        # Add X-XSS-Protection for legacy browsers
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Add Referrer-Policy for privacy protection
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
 
-    async def _handle_csp_violation_report(self, request: Request) -> None:
-        """
-        Handle CSP violation reports with rate limiting and proper logging.
-
-        Args:
-            request: The request containing CSP violation report
-        """
-        try:
-            if request.method != "POST":
-                return
-
-            # Process the CSP report with enhanced validation
-            try:
-                result = await process_csp_report(request)
-
-                # Log specific violation details from sanitized data
-                report = result.get("report", {})
-                csp_report = (
-                    report.get("csp-report", {})
-                    if isinstance(report, dict) and "csp-report" in report
-                    else report
-                )
-
-                logger.warning(
-                    f"CSP Violation: blocked-uri={csp_report.get('blocked-uri', 'unknown')}, "
-                    f"violated-directive={csp_report.get('violated-directive', 'unknown')}, "
-                    f"effective-directive={csp_report.get('effective-directive', 'unknown')}, "
-                    f"script-sample={csp_report.get('script-sample', 'none')}"
-                )
-            except CSPValidationError as e:
-                logger.warning(f"Invalid CSP violation report: {e}")
-                # We still return 200 to avoid giving attackers information
-                return
-            except Exception as e:
-                logger.error(f"Error processing CSP violation report: {e}")
-                # We still return 200 to avoid giving attackers information
-                return
-
-        except Exception as e:
-            logger.error(f"Error processing CSP violation report: {e}")
-
-
-def create_csp_middleware(app) -> CSPMiddleware:
+def create_csp_middleware(app: ASGIApp) -> ASGIApp:
     """
     Factory function to create CSP middleware with configuration from settings.
 
@@ -211,7 +158,7 @@ def create_csp_middleware(app) -> CSPMiddleware:
         app: The FastAPI application
 
     Returns:
-        Configured CSPMiddleware instance
+        Configured CSPMiddleware instance, or ``app`` when CSP is disabled
     """
     # Import settings lazily to avoid circular imports
     from resync.settings import settings
@@ -224,8 +171,8 @@ def create_csp_middleware(app) -> CSPMiddleware:
 
     if not csp_enabled:
         logger.info("CSP middleware disabled via settings")
-        # Return a no-op middleware
-        return BaseHTTPMiddleware(app)
+        # No middleware: hand back the application itself
+        return app
 
     logger.info(f"CSP middleware initialized (report_only={report_only})")
     return CSPMiddleware(app, report_only=report_only)
@@ -1,74 +1,98 @@
 import hmac
 import secrets
+from http.cookies import SimpleCookie
 
-from fastapi import HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
 
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
-class CSRFProtectionMiddleware(BaseHTTPMiddleware):
+
+class CSRFProtectionMiddleware:
     """
     CSRF protection with:
     - Double-submit cookie pattern
     - HMAC validation
     - SameSite cookies
+
+    Pure ASGI: only headers and cookies are inspected, the request body is
+    never read and the response is streamed through.
     """
 
-    def __init__(self, app, secret_key: str):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, secret_key: str):
+        self.app = app
         self.secret_key = secret_key.encode()
         self.cookie_name = "csrf_token"
         self.header_name = "X-CSRF-Token"
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Dispatch method to handle CSRF protection.
+        Validate the CSRF token before passing the request on.
         """
-        # Skip for safe methods
-        if request.method in ["GET", "HEAD", "OPTIONS"]:
-            return await call_next(request)
-
-        # Skip for public endpoints
-        if self._is_public_endpoint(request.url.path):
-            return await call_next(request)
+        # Skip for non-HTTP scopes, safe methods and public endpoints
+        if (
+            scope["type"] != "http"
+            or scope["method"] in _SAFE_METHODS
+            or self._is_public_endpoint(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
 
         # Validate CSRF token
+        request = Request(scope)
         cookie_token = request.cookies.get(self.cookie_name)
         header_token = request.headers.get(self.header_name)
 
         if not cookie_token or not header_token:
-            raise HTTPException(status_code=403, detail="CSRF token missing")
+            await self._reject(scope, receive, send, "CSRF token missing")
+            return
 
         # Validate tokens match and are valid
         if not self._validate_csrf_tokens(cookie_token, header_token):
             logger.warning(
                 "CSRF token validation failed",
                 extra={
-                    "ip": request.client.host,
+                    "ip": request.client.host if request.client else None,
                     "path": request.url.path,
                     "user_agent": request.headers.get("user-agent"),
                 },
             )
-            raise HTTPException(status_code=403, detail="CSRF token validation failed")
-
-        response = await call_next(request)
+            await self._reject(scope, receive, send, "CSRF token validation failed")
+            return
 
         # Rotate token for high-security operations
-        if request.url.path in self._high_security_endpoints():
-            new_token = self._generate_csrf_token()
-            response.set_cookie(
-                key=self.cookie_name,
-                value=new_token,
-                httponly=True,
-                secure=True,
-                samesite="strict",
-                max_age=3600,
-            )
-
-        return response
+        if scope["path"] not in self._high_security_endpoints():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_new_token(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                cookie: SimpleCookie = SimpleCookie()
+                cookie[self.cookie_name] = self._generate_csrf_token()
+                cookie[self.cookie_name]["path"] = "/"
+                cookie[self.cookie_name]["httponly"] = True
+                cookie[self.cookie_name]["secure"] = True
+                cookie[self.cookie_name]["samesite"] = "strict"
+                cookie[self.cookie_name]["max-age"] = 3600
+                MutableHeaders(scope=message).append(
+                    "set-cookie", cookie.output(header="").strip()
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_new_token)
+
+    async def _reject(
+        self, scope: Scope, receive: Receive, send: Send, detail: str
+    ) -> None:
+        """Answer 403 with the same body an HTTPException would produce."""
+        response = JSONResponse({"detail": detail}, status_code=403)
+        await response(scope, receive, send)
 
     def _generate_csrf_token(self) -> str:
         """Generate cryptographically secure CSRF token."""
@@ -2,10 +2,9 @@
 
 import logging
 import time
-from collections.abc import Callable
 from typing import Any
 
-from fastapi import Request, Response
+from fastapi import Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from resync.core.utils.error_utils import (
@@ -17,68 +16,77 @@ from resync.core.utils.error_utils import (
     log_error_response,
 )
 from resync_new.utils.exceptions import ResyncException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
 
-class GlobalExceptionHandlerMiddleware(BaseHTTPMiddleware):
-    """Middleware for handling all exceptions and returning standardized error responses."""
+class GlobalExceptionHandlerMiddleware:
+    """Middleware for handling all exceptions and returning standardized error responses.
 
-    def __init__(self, app):
-        super().__init__(app)
+    Pure ASGI: requests and streaming responses pass through untouched. An
+    exception raised before the response has started is turned into a
+    standardized JSON error; once headers are sent it can only propagate.
+    """
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Any]
-    ) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and handle any exceptions that occur."""
-        correlation_id = generate_correlation_id()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Reuse the ID from CorrelationIdMiddleware when it ran first, and
+        # store it in request state for use in other parts of the application
+        state = scope.setdefault("state", {})
+        correlation_id = state.get("correlation_id") or generate_correlation_id()
+        state["correlation_id"] = correlation_id
         start_time = time.time()
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
         try:
-            # Store correlation ID in request state for use in other parts of the application
-            request.state.correlation_id = correlation_id
-            response = await call_next(request)
-
-            # Log request processing time for performance monitoring
-            processing_time = time.time() - start_time
-            if processing_time > 1.0:  # Log slow requests (>1 second)
-                logger.warning(
-                    f"Slow request detected: {request.method} {request.url.path} took {processing_time:.2f}s",
-                    extra={"correlation_id": correlation_id},
+            await self.app(scope, receive, send_tracking_start)
+        except Exception as exc:
+            if response_started:
+                raise
+            request = Request(scope, receive)
+            if isinstance(exc, RequestValidationError):
+                # Handle FastAPI validation errors
+                response = await self._handle_validation_error(
+                    request, exc, correlation_id
+                )
+            elif isinstance(exc, ResyncException):
+                # Handle custom Resync exceptions
+                response = await self._handle_resync_exception(
+                    request, exc, correlation_id
+                )
+            else:
+                # Handle all other exceptions
+                response = await self._handle_generic_exception(
+                    request, exc, correlation_id
                 )
-
-            return response
-
-        except RequestValidationError as exc:
-            # Handle FastAPI validation errors
-            response = await self._handle_validation_error(
-                request, exc, correlation_id
-            )
-            self._log_error_metrics(
-                request, exc.__class__.__name__, time.time() - start_time
-            )
-            return response
-
-        except ResyncException as exc:
-            # Handle custom Resync exceptions
-            response = await self._handle_resync_exception(
-                request, exc, correlation_id
-            )
             self._log_error_metrics(
                 request, exc.__class__.__name__, time.time() - start_time
             )
-            return response
-
-        except Exception as exc:
-            # Handle all other exceptions
-            response = await self._handle_generic_exception(
-                request, exc, correlation_id
-            )
-            self._log_error_metrics(
-                request, exc.__class__.__name__, time.time() - start_time
+            await response(scope, receive, send)
+            return
+
+        # Log request processing time for performance monitoring
+        processing_time = time.time() - start_time
+        if processing_time > 1.0:  # Log slow requests (>1 second)
+            logger.warning(
+                f"Slow request detected: {scope['method']} {scope['path']} "
+                f"took {processing_time:.2f}s",
+                extra={"correlation_id": correlation_id},
             )
-            return response
 
     def _log_error_metrics(
         self, request: Request, error_type: str, processing_time: float
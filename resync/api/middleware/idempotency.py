@@ -7,8 +7,8 @@ múltiplas vezes.
 
 Características:
 - Validação automática de chaves de idempotência
-- Bloqueio de processamento concorrente
-- Cache automático de respostas
+- Bloqueio de processamento concorrente (reivindicação atômica no Redis)
+- Cache automático de respostas, capturadas enquanto são transmitidas
 - Integração com sistema de logging estruturado
 - Headers customizáveis
 
@@ -16,13 +16,16 @@ Author: Resync Team
 Date: October 2025
 """
 
+import base64
 import json
-from typing import Callable, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 
-from fastapi import HTTPException, Request, Response
+from fastapi import Response
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from resync.api.middleware.asgi import get_header
 from resync.core.context import get_correlation_id
 from resync.core.idempotency import IdempotencyManager
 from resync.core.structured_logger import get_logger
@@ -30,18 +33,63 @@ from resync.core.structured_logger import get_logger
 logger = get_logger(__name__)
 
 
-class IdempotencyMiddleware(BaseHTTPMiddleware):
+class _ResponseCapture:
     """
-    Middleware FastAPI para processamento de idempotency keys
+    Wraps ``send`` to stream the response through while keeping one copy
+    of a successful body, up to ``max_bytes``, for the idempotency cache.
+    """
+
+    def __init__(self, send: Send, max_bytes: int):
+        self._send = send
+        self.max_bytes = max_bytes
+        self.status_code = 500
+        self.media_type: Optional[str] = None
+        self.body: Optional[bytearray] = None
+        self.complete = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+            # Só cachear respostas de sucesso
+            if 200 <= self.status_code < 300:
+                self.body = bytearray()
+            for key, value in message.get("headers", ()):
+                if key.lower() == b"content-type":
+                    self.media_type = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if self.body is not None:
+                if len(self.body) + len(chunk) > self.max_bytes:
+                    self.body = None  # Too large to cache; stop capturing
+                else:
+                    self.body += chunk
+            if not message.get("more_body", False):
+                self.complete = True
+        await self._send(message)
+
+    @property
+    def cacheable(self) -> bool:
+        return self.complete and self.body is not None
+
+
+class IdempotencyMiddleware:
+    """
+    Middleware ASGI para processamento de idempotency keys
 
     Intercepta requisições HTTP, valida chaves de idempotência e
     gerencia cache de respostas para prevenir execução duplicada
     de operações críticas.
+
+    A chave é reivindicada em uma única operação atômica no Redis
+    (``IdempotencyManager.claim``): requisições concorrentes com a mesma
+    chave recebem 409 em vez de executarem a operação de novo. A resposta
+    é repassada ao cliente em streaming e copiada uma única vez para o
+    cache enquanto passa.
     """
 
     def __init__(
         self,
-        app: Callable,
+        app: ASGIApp,
         idempotency_manager: IdempotencyManager,
         idempotency_header: str = "Idempotency-Key",
         exclude_paths: Optional[Set[str]] = None,
@@ -51,15 +99,16 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         Inicializa middleware de idempotency
 
         Args:
-            app: Aplicação FastAPI
+            app: Aplicação ASGI
             idempotency_manager: Gerenciador de idempotency
             idempotency_header: Nome do header para chave de idempotência
             exclude_paths: Caminhos excluídos do middleware
             exclude_methods: Métodos HTTP excluídos do middleware
         """
-        super().__init__(app)
+        self.app = app
         self.idempotency_manager = idempotency_manager
         self.idempotency_header = idempotency_header
+        self._header_name = idempotency_header.lower().encode("latin-1")
         self.exclude_paths = exclude_paths or {
             "/health",
             "/metrics",
@@ -76,131 +125,119 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
             exclude_methods=list(self.exclude_methods),
         )
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Processa requisição através do middleware
 
         Args:
-            request: Requisição FastAPI
-            call_next: Próximo handler na cadeia
-
-        Returns:
-            Resposta HTTP
+            scope: Escopo ASGI
+            receive: Canal de recebimento ASGI
+            send: Canal de envio ASGI
         """
         # Verificar se deve aplicar idempotency
-        if not self._should_apply_idempotency(request):
-            return await call_next(request)
+        if scope["type"] != "http" or not self._should_apply_idempotency(scope):
+            await self.app(scope, receive, send)
+            return
 
         # Extrair chave de idempotência
-        idempotency_key = self._extract_idempotency_key(request)
+        idempotency_key = get_header(scope, self._header_name)
         if not idempotency_key:
             # Se endpoint requer idempotency mas não foi fornecida, erro 400
-            if self._requires_idempotency(request):
-                raise HTTPException(
-                    status_code=400,
-                    detail="Idempotency-Key header required for this operation",
+            if self._requires_idempotency(scope):
+                await self._reject(
+                    scope,
+                    receive,
+                    send,
+                    400,
+                    f"{self.idempotency_header} header required for this operation",
                 )
             else:
                 # Para endpoints opcionais, continua sem idempotency
-                return await call_next(request)
+                await self.app(scope, receive, send)
+            return
 
         correlation_id = get_correlation_id()
 
         logger.debug(
             "Processing request with idempotency key",
             idempotency_key=idempotency_key,
-            path=request.url.path,
-            method=request.method,
+            path=scope["path"],
+            method=scope["method"],
             correlation_id=correlation_id,
         )
 
-        try:
-            # Verificar se já existe resposta em cache
-            cached_response = await self.idempotency_manager.get_cached_response(
-                idempotency_key, await self._extract_request_data(request)
-            )
-
-            if cached_response:
-                logger.info(
-                    "Returning cached response for idempotency key",
-                    idempotency_key=idempotency_key,
-                    status_code=cached_response["status_code"],
-                    correlation_id=correlation_id,
-                )
-
-                # Retornar resposta cacheada
-                return self._create_response_from_cache(cached_response)
-
-            # Verificar se operação já está em processamento
-            if await self.idempotency_manager.is_processing(idempotency_key):
-                logger.warning(
-                    "Operation already in progress for idempotency key",
-                    idempotency_key=idempotency_key,
-                    correlation_id=correlation_id,
-                )
-
-                raise HTTPException(
-                    status_code=409, detail="Operation already in progress"
-                )
-
-            # Marcar como em processamento
-            marked = await self.idempotency_manager.mark_processing(idempotency_key)
-            if not marked:
-                logger.error(
-                    "Failed to mark operation as processing",
-                    idempotency_key=idempotency_key,
-                    correlation_id=correlation_id,
-                )
-                # Continua mesmo se falhar, para não bloquear operação
-
-            try:
-                # Executar operação
-                response = await call_next(request)
-
-                # Cache da resposta se for bem-sucedida
-                if self._should_cache_response(response):
-                    await self._cache_response(idempotency_key, response, request)
+        # O body é lido uma vez para o hash e repassado à aplicação
+        body = await self._read_body(receive)
+        request_data = self._extract_request_data(scope, body)
+        receive = self._replay_body(body, receive)
 
-                return response
+        # Resposta em cache, marca de processamento ou conflito, atomicamente
+        claim = await self.idempotency_manager.claim(idempotency_key, request_data)
 
-            finally:
-                # Sempre limpar marca de processamento
-                await self.idempotency_manager.clear_processing(idempotency_key)
+        if claim.cached:
+            logger.info(
+                "Returning cached response for idempotency key",
+                idempotency_key=idempotency_key,
+                status_code=claim.response["status_code"],
+                correlation_id=correlation_id,
+            )
+            response = self._create_response_from_cache(claim.response)
+            await response(scope, receive, send)
+            return
 
-        except HTTPException:
-            # Re-lançar exceções HTTP sem modificação
-            raise
-        except Exception as e:
-            # Para outras exceções, log e re-lança
-            logger.error(
-                "Unexpected error in idempotency middleware",
+        if claim.in_progress:
+            logger.warning(
+                "Operation already in progress for idempotency key",
                 idempotency_key=idempotency_key,
-                error=str(e),
                 correlation_id=correlation_id,
             )
+            await self._reject(scope, receive, send, 409, "Operation already in progress")
+            return
+
+        if not claim.claimed:
+            # Chave inválida, colisão ou Redis indisponível: não bloquear a operação
+            await self.app(scope, receive, send)
+            return
+
+        capture = _ResponseCapture(
+            send, self.idempotency_manager.config.max_response_size_kb * 1024
+        )
+        try:
+            # Executar operação
+            await self.app(scope, receive, capture)
+        except BaseException:
+            await self.idempotency_manager.release(idempotency_key, claim.token)
             raise
 
-    def _should_apply_idempotency(self, request: Request) -> bool:
+        if capture.cacheable:
+            await self._cache_response(
+                idempotency_key, capture, scope, request_data, claim.token
+            )
+        else:
+            # Sempre liberar a marca de processamento
+            await self.idempotency_manager.release(idempotency_key, claim.token)
+
+    def _should_apply_idempotency(self, scope: Scope) -> bool:
         """
         Verifica se deve aplicar idempotency nesta requisição
 
         Args:
-            request: Requisição HTTP
+            scope: Escopo ASGI da requisição
 
         Returns:
             True se deve aplicar idempotency
         """
         # Excluir caminhos específicos
-        if request.url.path in self.exclude_paths:
+        if scope["path"] in self.exclude_paths:
             return False
 
         # Excluir métodos específicos
-        if request.method in self.exclude_methods:
+        if scope["method"] in self.exclude_methods:
             return False
 
         return True
 
-    def _requires_idempotency(self, request: Request) -> bool:
+    def _requires_idempotency(self, scope: Scope) -> bool:
         """
         Verifica se endpoint requer idempotency obrigatoriamente
 
@@ -208,169 +245,132 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         geralmente requerem idempotency.
 
         Args:
-            request: Requisição HTTP
+            scope: Escopo ASGI da requisição
 
         Returns:
             True se requer idempotency
         """
         # Métodos que modificam estado requerem idempotency
-        return request.method in {"POST", "PUT", "PATCH", "DELETE"}
-
-    def _extract_idempotency_key(self, request: Request) -> Optional[str]:
-        """
-        Extrai chave de idempotência do header
-
-        Args:
-            request: Requisição HTTP
-
-        Returns:
-            Chave de idempotência ou None
-        """
-        return request.headers.get(self.idempotency_header)
-
-    async def _extract_request_data(self, request: Request) -> Dict:
+        return scope["method"] in {"POST", "PUT", "PATCH", "DELETE"}
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        """Lê o body completo da requisição"""
+        chunks: List[bytes] = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    def _replay_body(self, body: bytes, receive: Receive) -> Receive:
+        """Canal de recebimento que entrega ``body`` e depois repassa ``receive``"""
+        pending = True
+
+        async def replay() -> Message:
+            nonlocal pending
+            if pending:
+                pending = False
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
+
+    def _extract_request_data(self, scope: Scope, body: bytes) -> Dict:
         """
         Extrai dados relevantes da requisição para hash
 
         Args:
-            request: Requisição HTTP
+            scope: Escopo ASGI da requisição
+            body: Body da requisição
 
         Returns:
             Dicionário com dados da requisição
         """
-        try:
-            # Para requisições com body, incluir no hash
-            if request.method in {"POST", "PUT", "PATCH"}:
-                body = await request.body()
-                if body:
-                    try:
-                        json_data = json.loads(body)
-                        return {
-                            "method": request.method,
-                            "path": str(request.url.path),
-                            "query_params": dict(request.query_params),
-                            "body": json_data,
-                        }
-                    except json.JSONDecodeError:
-                        # Se não for JSON, usar body como string
-                        return {
-                            "method": request.method,
-                            "path": str(request.url.path),
-                            "query_params": dict(request.query_params),
-                            "body": body.decode("utf-8", errors="ignore"),
-                        }
-
-            # Para outros métodos, usar apenas path e query
-            return {
-                "method": request.method,
-                "path": str(request.url.path),
-                "query_params": dict(request.query_params),
-            }
-
-        except Exception as e:
-            logger.warning(
-                "Failed to extract request data for idempotency", error=str(e)
-            )
-            # Em caso de erro, retornar dados mínimos
-            return {"method": request.method, "path": str(request.url.path)}
-
-    def _should_cache_response(self, response: Response) -> bool:
-        """
-        Verifica se deve cachear a resposta
-
-        Args:
-            response: Resposta HTTP
-
-        Returns:
-            True se deve cachear
-        """
-        # Só cachear respostas de sucesso
-        return 200 <= response.status_code < 300
+        request_data: Dict[str, Any] = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_params": dict(QueryParams(scope.get("query_string", b""))),
+        }
+        # Para requisições com body, incluir no hash
+        if scope["method"] in {"POST", "PUT", "PATCH"} and body:
+            try:
+                request_data["body"] = json.loads(body)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # Se não for JSON, usar body como string
+                request_data["body"] = body.decode("utf-8", errors="ignore")
+        return request_data
 
     async def _cache_response(
-        self, idempotency_key: str, response: Response, request: Request
+        self,
+        idempotency_key: str,
+        capture: _ResponseCapture,
+        scope: Scope,
+        request_data: Dict,
+        claim_token: str,
     ) -> None:
         """
         Cache da resposta para idempotency
 
         Args:
             idempotency_key: Chave de idempotência
-            response: Resposta HTTP
-            request: Requisição original
+            capture: Resposta capturada
+            scope: Escopo ASGI da requisição original
+            request_data: Dados da requisição para hash
+            claim_token: Token da reivindicação da chave
         """
+        body = bytes(capture.body)
         try:
-            # Extrair dados da resposta
-            response_data = await self._extract_response_data(response)
-
-            # Metadata da requisição
-            metadata = {
-                "method": request.method,
-                "path": str(request.url.path),
-                "user_agent": request.headers.get("User-Agent"),
-                "correlation_id": get_correlation_id(),
+            response_data = {
+                "body": body.decode("utf-8"),
+                "body_encoding": "utf-8",
             }
+        except UnicodeDecodeError:
+            response_data = {
+                "body": base64.b64encode(body).decode("ascii"),
+                "body_encoding": "base64",
+            }
+        response_data["media_type"] = capture.media_type
+
+        # Metadata da requisição
+        metadata = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "user_agent": get_header(scope, b"user-agent"),
+            "correlation_id": get_correlation_id(),
+        }
 
-            # Cache da resposta
-            success = await self.idempotency_manager.cache_response(
+        # Grava a resposta e libera a marca de processamento na mesma operação
+        success = await self.idempotency_manager.cache_response(
+            idempotency_key=idempotency_key,
+            response_data=response_data,
+            status_code=capture.status_code,
+            request_data=request_data,
+            metadata=metadata,
+            claim_token=claim_token,
+        )
+
+        if success:
+            logger.debug(
+                "Response cached for idempotency",
                 idempotency_key=idempotency_key,
-                response_data=response_data,
-                status_code=response.status_code,
-                request_data=await self._extract_request_data(request),
-                metadata=metadata,
+                status_code=capture.status_code,
             )
-
-            if success:
-                logger.debug(
-                    "Response cached for idempotency",
-                    idempotency_key=idempotency_key,
-                    status_code=response.status_code,
-                )
-            else:
-                logger.warning(
-                    "Failed to cache response for idempotency",
-                    idempotency_key=idempotency_key,
-                )
-
-        except Exception as e:
-            logger.error(
-                "Error caching response for idempotency",
+        else:
+            logger.warning(
+                "Failed to cache response for idempotency",
                 idempotency_key=idempotency_key,
-                error=str(e),
             )
+            await self.idempotency_manager.release(idempotency_key, claim_token)
 
-    async def _extract_response_data(self, response: Response) -> Dict:
-        """
-        Extrai dados da resposta para cache
-
-        Args:
-            response: Resposta HTTP
-
-        Returns:
-            Dados da resposta
-        """
-        try:
-            # Para respostas JSON, extrair dados
-            if hasattr(response, "body") and response.body:
-                try:
-                    # Handle different types of response body
-                    if isinstance(response.body, (bytes, bytearray)):
-                        return json.loads(response.body.decode("utf-8"))
-                    elif isinstance(response.body, str):
-                        return json.loads(response.body)
-                    elif hasattr(response.body, "decode"):
-                        return json.loads(response.body.decode("utf-8"))
-                    else:
-                        # Fallback for other types
-                        return json.loads(str(response.body))
-                except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
-                    pass
-
-            # Para outros tipos, retornar estrutura básica
-            return {"message": "Response cached", "status_code": response.status_code}
-
-        except Exception as e:
-            logger.warning("Failed to extract response data", error=str(e))
-            return {"cached": True, "status_code": response.status_code}
+    async def _reject(
+        self, scope: Scope, receive: Receive, send: Send, status_code: int, detail: str
+    ) -> None:
+        """Responde com o mesmo body que uma HTTPException produziria"""
+        response = JSONResponse({"detail": detail}, status_code=status_code)
+        await response(scope, receive, send)
 
     def _create_response_from_cache(self, cached: Dict) -> Response:
         """
@@ -384,18 +384,33 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         """
         # Adicionar header indicando que veio do cache
         headers = {"X-Idempotency-Cache": "HIT"}
+        data = cached["data"]
+
+        # Body capturado pelo middleware: repassado byte a byte
+        if isinstance(data, dict) and "body_encoding" in data:
+            body = (
+                base64.b64decode(data["body"])
+                if data["body_encoding"] == "base64"
+                else data["body"].encode("utf-8")
+            )
+            return Response(
+                content=body,
+                status_code=cached["status_code"],
+                media_type=data.get("media_type"),
+                headers=headers,
+            )
 
         # Criar resposta baseada no tipo de dados
-        if isinstance(cached["data"], dict):
+        if isinstance(data, dict):
             return JSONResponse(
-                content=cached["data"],
+                content=data,
                 status_code=cached["status_code"],
                 headers=headers,
             )
         else:
             # Para outros tipos, criar resposta genérica
             return JSONResponse(
-                content={"result": cached["data"]},
+                content={"result": data},
                 status_code=cached["status_code"],
                 headers=headers,
             )
@@ -422,32 +437,30 @@ class IdempotencyConfig:
 
 
 def create_idempotency_middleware(
-    idempotency_manager: IdempotencyManager, config: Optional[IdempotencyConfig] = None
-) -> Callable:
+    app: ASGIApp,
+    idempotency_manager: IdempotencyManager,
+    config: Optional[IdempotencyConfig] = None,
+) -> ASGIApp:
     """
     Factory function para criar middleware de idempotency
 
     Args:
+        app: Aplicação ASGI a envolver
         idempotency_manager: Gerenciador de idempotency
         config: Configuração opcional
 
     Returns:
-        Função middleware para FastAPI
+        Aplicação envolvida pelo middleware
     """
     config = config or IdempotencyConfig()
 
-    async def idempotency_middleware(request: Request, call_next: Callable) -> Response:
-        middleware = IdempotencyMiddleware(
-            app=None,  # Não usado quando aplicado como função
-            idempotency_manager=idempotency_manager,
-            idempotency_header=config.header_name,
-            exclude_paths=config.exclude_paths,
-            exclude_methods=config.exclude_methods,
-        )
-
-        return await middleware.dispatch(request, call_next)
-
-    return idempotency_middleware
+    return IdempotencyMiddleware(
+        app,
+        idempotency_manager=idempotency_manager,
+        idempotency_header=config.header_name,
+        exclude_paths=config.exclude_paths,
+        exclude_methods=config.exclude_methods,
+    )
 
 
 # Funções utilitárias
@@ -3,29 +3,90 @@ Streaming utilities for WebSocket communication.
 
 This module provides classes for handling real-time streaming of agent responses
 over WebSocket connections with proper error handling and message formatting.
+
+Tokens are not sent one frame each: they are coalesced into frames of up to
+``max_frame_chars`` characters, flushed at least every ``flush_interval``
+seconds, and the first token is sent right away. Frames reuse a
+pre-serialized JSON envelope, or are sent as raw UTF-8 binary frames when
+the client offers the ``STREAM_SUBPROTOCOL`` WebSocket subprotocol.
 """
 
+import asyncio
+import json
 from collections.abc import AsyncIterator
-from typing import Any
+from typing import Any, List, Optional
 
 from fastapi import WebSocket, WebSocketDisconnect
-from resync_new.utils.simple_logger import get_logger
+
+from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
 
+# Clients that offer this subprotocol receive stream chunks as binary frames
+# holding the UTF-8 text; every other message stays a JSON text frame
+STREAM_SUBPROTOCOL = "resync.stream.v1.binary"
+
+DEFAULT_FLUSH_INTERVAL = 0.04
+DEFAULT_MAX_FRAME_CHARS = 4096
+
+# Same bytes send_json would produce for {"type": "stream", "sender":
+# "agent", "message": ..., "is_chunk": ...}, minus the per-frame dict
+_STREAM_PREFIX = '{"type":"stream","sender":"agent","message":'
+_CHUNK_SUFFIX = ',"is_chunk":true}'
+_MESSAGE_SUFFIX = ',"is_chunk":false}'
+_STREAM_END = '{"type":"stream_end"}'
+
+
+def negotiate_stream_subprotocol(websocket: WebSocket) -> Optional[str]:
+    """The subprotocol to accept the connection with, if the client offered it."""
+    if STREAM_SUBPROTOCOL in websocket.scope.get("subprotocols", ()):
+        return STREAM_SUBPROTOCOL
+    return None
+
 
 class AgentResponseStreamer:
     """Handles streaming of agent responses over WebSocket with robust error handling."""
 
-    def __init__(self, websocket: WebSocket):
+    def __init__(
+        self,
+        websocket: WebSocket,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_frame_chars: int = DEFAULT_MAX_FRAME_CHARS,
+        binary: Optional[bool] = None,
+    ):
         """
         Initialize the streamer with a WebSocket connection.
 
         Args:
             websocket: The WebSocket connection to stream messages to
+            flush_interval: Longest time a token waits to be sent, in seconds
+            max_frame_chars: Characters after which a frame is sent at once
+            binary: Send chunks as binary frames; by default, only when the
+                client offered STREAM_SUBPROTOCOL
         """
         self.websocket = websocket
-        self.full_response: str = ""
+        self.flush_interval = flush_interval
+        self.max_frame_chars = max_frame_chars
+        self.binary = (
+            binary
+            if binary is not None
+            else negotiate_stream_subprotocol(websocket) is not None
+        )
+        self.frames_sent = 0
+
+        self._parts: List[str] = []  # The whole response, joined on demand
+        self._pending: List[str] = []  # Tokens not sent yet
+        self._pending_chars = 0
+        self._send_lock = asyncio.Lock()
+
+    @property
+    def full_response(self) -> str:
+        """The response accumulated so far."""
+        return "".join(self._parts)
+
+    @full_response.setter
+    def full_response(self, value: str) -> None:
+        self._parts = [value]
 
     async def stream_response(self, agent: Any, query: str) -> str:
         """
@@ -85,29 +146,61 @@ class AgentResponseStreamer:
         await self._send_stream_message(self.full_response)
 
     async def _stream_chunks(self, stream: AsyncIterator[str]) -> None:
-        """Stream response chunks to client."""
-        async for chunk in stream:
-            chunk_str = str(chunk)
-            self.full_response += chunk_str
-            await self._send_stream_message(chunk_str, is_chunk=True)
+        """Stream response chunks to client, coalesced into frames."""
+        flusher = asyncio.create_task(self._flush_periodically())
+        try:
+            async for chunk in stream:
+                chunk_str = str(chunk)
+                if not chunk_str:
+                    continue
+                self._parts.append(chunk_str)
+                self._pending.append(chunk_str)
+                self._pending_chars += len(chunk_str)
+
+                if flusher.done():
+                    flusher.result()  # Raises the send error, e.g. a disconnect
+                if not self.frames_sent or self._pending_chars >= self.max_frame_chars:
+                    await self._flush()
+        finally:
+            # Taking the lock first means the flusher is not in the middle of
+            # a send when it is cancelled
+            async with self._send_lock:
+                flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+        await self._flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        """Send the pending tokens as one frame."""
+        async with self._send_lock:
+            if not self._pending:
+                return
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._pending_chars = 0
+            if self.binary:
+                await self.websocket.send_bytes(text.encode("utf-8"))
+            else:
+                await self._send_stream_message(text, is_chunk=True)
+            self.frames_sent += 1
 
     async def _send_stream_message(
         self, message: str, is_chunk: bool = False
     ) -> None:
         """Send a stream message to the client."""
-        message_type = "stream"
-        await self.websocket.send_json(
-            {
-                "type": message_type,
-                "sender": "agent",
-                "message": message,
-                "is_chunk": is_chunk,
-            }
+        await self.websocket.send_text(
+            _STREAM_PREFIX
+            + json.dumps(message, ensure_ascii=False)
+            + (_CHUNK_SUFFIX if is_chunk else _MESSAGE_SUFFIX)
         )
 
     async def _send_stream_end(self) -> None:
         """Send stream end marker to client."""
-        await self.websocket.send_json({"type": "stream_end"})
+        await self.websocket.send_text(_STREAM_END)
 
     async def _send_error(self, message: str) -> None:
         """Send error message to client if possible."""
@@ -1,5 +1,6 @@
 """Enhanced security validation with async context managers and improved type hints."""
 
+import codecs
 import hmac
 import ipaddress
 import re
@@ -14,10 +15,12 @@ from ipaddress import IPv4Address, IPv6Address
 from typing import (
     Any,
     AsyncGenerator,
+    AsyncIterable,
     Dict,
     List,
     Optional,
     Pattern,
+    Sequence,
     Tuple,
     Type,
     TypeVar,
@@ -39,7 +42,9 @@ except ImportError:
 
 from pydantic import BaseModel, Field
 
+from resync.api.middleware.asgi import HeaderLayer, ResponseHeader, encode_headers
 from resync.api.validation.common import SanitizationLevel, sanitize_input
+from resync.api.validation.threat_scanner import XSS_PATTERNS, get_threat_scanner
 from resync.settings import settings
 
 # Type aliases for better readability
@@ -82,18 +87,10 @@ TRUSTED_IP_RANGES: List[str] = [
     "192.168.0.0/16",  # private network
 ]
 
-# Suspicious patterns to detect in inputs
+# Suspicious patterns to detect in inputs. Detection itself goes through the
+# shared scanner in threat_scanner; these are kept for direct use.
 SUSPICIOUS_PATTERNS: List[Pattern[str]] = [
-    re.compile(r"(?i)<script[^>]*>.*?</script>", re.DOTALL),
-    re.compile(r"(?i)javascript\s*:"),
-    re.compile(r"(?i)vbscript\s*:"),
-    re.compile(r"(?i)on\w+\s*="),
-    re.compile(r"(?i)expression\s*\("),
-    re.compile(r"(?i)data\s*:"),
-    re.compile(r"(?i)eval\s*\("),
-    re.compile(r"(?i)alert\s*\("),
-    re.compile(r"(?i)document\.cookie"),
-    re.compile(r"(?i)document\.write"),
+    re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in XSS_PATTERNS
 ]
 
 
@@ -657,35 +654,44 @@ class EnhancedSecurityValidator:
         """
         Detect security threats in input data.
 
+        Only rules whose keyword occurs in the input are run; the most
+        severe category found is reported.
+
         Args:
             input_data: Input data to scan
 
         Returns:
             Detected threat type or None
         """
-        input_lower = input_data.lower()
-
-        # Check for suspicious patterns
-        for regex_pattern in SUSPICIOUS_PATTERNS:
-            if regex_pattern.search(input_data):
-                return ThreatType.XSS
+        threat = get_threat_scanner().scan(input_data)
+        return ThreatType(threat) if threat else None
 
-        # Check for SQL injection patterns
-        sql_patterns = [
-            r"(?i)\b(union|select|insert|update|delete|drop|create|alter|exec|execute)\b",
-            r"(?i)--|#|/\*|\*/",
-            r"(?i)'(\s*)or(\s*)'1'='1",
-        ]
+    async def detect_threats_in_stream(
+        self, chunks: AsyncIterable[bytes], encoding: str = "utf-8"
+    ) -> Optional[ThreatType]:
+        """
+        Detect security threats in a body as it arrives, e.g. ``request.stream()``.
 
-        for sql_pattern in sql_patterns:
-            if re.search(sql_pattern, input_lower):
-                return ThreatType.SQL_INJECTION
+        The body is never held in memory; reading stops at the first XSS
+        match, since nothing later can outrank it.
 
-        # Check for path traversal
-        if ".." in input_data or "%2e%2e" in input_lower:
-            return ThreatType.RECONNAISSANCE
+        Args:
+            chunks: Body chunks
+            encoding: Body text encoding
 
-        return None
+        Returns:
+            Detected threat type or None
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        scan = get_threat_scanner().stream()
+        async for chunk in chunks:
+            scan.feed(decoder.decode(chunk))
+            if scan.done:
+                break
+        else:
+            scan.feed(decoder.decode(b"", final=True))
+        threat = scan.finish()
+        return ThreatType(threat) if threat else None
 
     async def rate_limit_check(
         self, identifier: str, limit: int = 100, window_seconds: int = 60
@@ -909,29 +915,22 @@ async def validate_input(
 
 
 # Security Headers Middleware
-class SecurityHeadersMiddleware:
+class SecurityHeadersMiddleware(HeaderLayer):
     """Middleware to add security headers to all responses."""
 
-    def __init__(self, app: Any) -> None:
-        self.app = app
-
-    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
-        async def send_with_security_headers(message: Any) -> None:
-            if message["type"] == "http.response.start":
-                # Add security headers
-                headers = [(k, v) for k, v in message.get("headers", [])]
-                headers.extend(
-                    [
-                        (b"x-content-type-options", b"nosniff"),
-                        (b"x-frame-options", b"DENY"),
-                        (b"x-xss-protection", b"1; mode=block"),
-                        (b"referrer-policy", b"strict-origin-when-cross-origin"),
-                    ]
-                )
-                message["headers"] = headers
-            await send(message)
+    # Only added when the response does not set them already
+    HEADERS = encode_headers(
+        {
+            "X-Content-Type-Options": "nosniff",
+            "X-Frame-Options": "DENY",
+            "X-XSS-Protection": "1; mode=block",
+            "Referrer-Policy": "strict-origin-when-cross-origin",
+        },
+        overwrite=False,
+    )
 
-        await self.app(scope, receive, send_with_security_headers)
+    def on_request(self, scope: Any) -> Sequence[ResponseHeader]:
+        return self.HEADERS
 
 
 # Export all public classes and functions
@@ -1,5 +1,6 @@
 """Enhanced security validation with async context managers and improved type hints."""
 
+import codecs
 import hmac
 import ipaddress
 import re
@@ -14,10 +15,12 @@ from ipaddress import IPv4Address, IPv6Address
 from typing import (
     Any,
     AsyncGenerator,
+    AsyncIterable,
     Dict,
     List,
     Optional,
     Pattern,
+    Sequence,
     Tuple,
     TypeVar,
     Union,
@@ -38,7 +41,9 @@ except ImportError:
 
 from pydantic import BaseModel, Field
 
+from resync.api.middleware.asgi import HeaderLayer, ResponseHeader, encode_headers
 from resync.api.validation.common import SanitizationLevel, sanitize_input
+from resync.api.validation.threat_scanner import XSS_PATTERNS, get_threat_scanner
 from resync.settings import settings
 
 # Type aliases for better readability
@@ -79,18 +84,10 @@ TRUSTED_IP_RANGES: List[str] = [
     "192.168.0.0/16",  # private network
 ]
 
-# Suspicious patterns to detect in inputs
-SUSPICIOUS_PATTERNS: List[Pattern] = [
-    re.compile(r"(?i)<script[^>]*>.*?</script>", re.DOTALL),
-    re.compile(r"(?i)javascript\s*:"),
-    re.compile(r"(?i)vbscript\s*:"),
-    re.compile(r"(?i)on\w+\s*="),
-    re.compile(r"(?i)expression\s*\("),
-    re.compile(r"(?i)data\s*:"),
-    re.compile(r"(?i)eval\s*\("),
-    re.compile(r"(?i)alert\s*\("),
-    re.compile(r"(?i)document\.cookie"),
-    re.compile(r"(?i)document\.write"),
+# Suspicious patterns to detect in inputs. Detection itself goes through the
+# shared scanner in threat_scanner; these are kept for direct use.
+SUSPICIOUS_PATTERNS: List[Pattern[str]] = [
+    re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in XSS_PATTERNS
 ]
 
 
@@ -249,7 +246,6 @@ class EnhancedSecurityValidator:
         self.session_store: Dict[str, SecurityContext] = {}
         # Performance optimization: cache for repeated validations
         self._validation_cache: Dict[str, InputValidationResult] = {}
-        self._threat_cache: Dict[str, ThreatType | None] = {}
 
     @asynccontextmanager
     async def security_context(
@@ -647,7 +643,10 @@ class EnhancedSecurityValidator:
 
     def _detect_threats(self, input_data: str) -> Optional[ThreatType]:
         """
-        Detect security threats in input data with caching for performance.
+        Detect security threats in input data.
+
+        Only rules whose keyword occurs in the input are run; the most
+        severe category found is reported.
 
         Args:
             input_data: Input data to scan
@@ -655,41 +654,35 @@ class EnhancedSecurityValidator:
         Returns:
             Detected threat type or None
         """
-        # Performance optimization: cache results for repeated inputs
-        cache_key = hash(input_data)
-        if cache_key in self._threat_cache:
-            return self._threat_cache[cache_key]
+        threat = get_threat_scanner().scan(input_data)
+        return ThreatType(threat) if threat else None
 
-        input_lower = input_data.lower()
+    async def detect_threats_in_stream(
+        self, chunks: AsyncIterable[bytes], encoding: str = "utf-8"
+    ) -> Optional[ThreatType]:
+        """
+        Detect security threats in a body as it arrives, e.g. ``request.stream()``.
 
-        # Check for suspicious patterns
-        for pattern in SUSPICIOUS_PATTERNS:
-            if pattern.search(input_data):
-                return ThreatType.XSS
-
-        # Check for SQL injection patterns (compiled once for performance)
-        if not hasattr(self, "_sql_patterns_compiled"):
-            self._sql_patterns_compiled = [
-                re.compile(
-                    r"(?i)\b(union|select|insert|update|delete|drop|create|alter|exec|execute)\b"
-                ),
-                re.compile(r"(?i)--|#|/\*|\*/"),
-                re.compile(r"(?i)'(\s*)or(\s*)'1'='1"),
-            ]
-
-        for compiled_pattern in self._sql_patterns_compiled:
-            if compiled_pattern.search(input_lower):
-                return ThreatType.SQL_INJECTION
-
-        # Check for path traversal
-        if ".." in input_data or "%2e%2e" in input_lower:
-            threat = ThreatType.RECONNAISSANCE
-        else:
-            threat = None
+        The body is never held in memory; reading stops at the first XSS
+        match, since nothing later can outrank it.
+
+        Args:
+            chunks: Body chunks
+            encoding: Body text encoding
 
-        # Cache the result
-        self._threat_cache[cache_key] = threat
-        return threat
+        Returns:
+            Detected threat type or None
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        scan = get_threat_scanner().stream()
+        async for chunk in chunks:
+            scan.feed(decoder.decode(chunk))
+            if scan.done:
+                break
+        else:
+            scan.feed(decoder.decode(b"", final=True))
+        threat = scan.finish()
+        return ThreatType(threat) if threat else None
 
     async def rate_limit_check(
         self, identifier: str, limit: int = 100, window_seconds: int = 60
@@ -936,29 +929,22 @@ async def validate_input(
 
 
 # Security Headers Middleware
-class SecurityHeadersMiddleware:
+class SecurityHeadersMiddleware(HeaderLayer):
     """Middleware to add security headers to all responses."""
 
-    def __init__(self, app):  
-        self.app = app
-
-    async def __call__(self, scope, receive, send):  
-        async def send_with_security_headers(message):
-            if message["type"] == "http.response.start":
-                # Add security headers
-                headers = [(k, v) for k, v in message.get("headers", [])]
-                headers.extend(
-                    [
-                        (b"x-content-type-options", b"nosniff"),
-                        (b"x-frame-options", b"DENY"),
-                        (b"x-xss-protection", b"1; mode=block"),
-                        (b"referrer-policy", b"strict-origin-when-cross-origin"),
-                    ]
-                )
-                message["headers"] = headers
-            await send(message)
+    # Only added when the response does not set them already
+    HEADERS = encode_headers(
+        {
+            "X-Content-Type-Options": "nosniff",
+            "X-Frame-Options": "DENY",
+            "X-XSS-Protection": "1; mode=block",
+            "Referrer-Policy": "strict-origin-when-cross-origin",
+        },
+        overwrite=False,
+    )
 
-        await self.app(scope, receive, send_with_security_headers)
+    def on_request(self, scope: Any) -> Sequence[ResponseHeader]:
+        return self.HEADERS
 
 
 # Export all public classes and functions
@@ -0,0 +1,253 @@
+"""Keyword-prefiltered threat scanner for input validation.
+
+Every threat rule (XSS, SQL injection and path traversal) has a trigger: a
+literal that is part of every match of the rule. The input is lowercased
+once, each trigger is looked up with a plain substring search, and only the
+rules whose trigger is present are confirmed with their regular expression,
+run case-insensitively on the original input.
+Clean input, the common case, never reaches the regex engine except for the
+few rules whose trigger is an everyday word. Rules are checked in priority
+order, so the first confirmed category is the most severe one. Large bodies
+can be fed in chunks through ``ThreatScan``.
+"""
+
+import re
+from typing import Iterable, List, Optional, Pattern, Sequence, Tuple
+
+# A rule is (trigger, pattern). The trigger is a lowercase literal contained
+# in every match of the pattern; a pattern of None means the trigger alone
+# is the rule. Patterns are matched case-insensitively against the original
+# input, which lowercasing can change (e.g. "İ" becomes "i" plus a mark).
+Rule = Tuple[str, Optional[str]]
+
+XSS_RULES: List[Rule] = [
+    ("<script", r"<script[^>]*>.*?</script>"),
+    ("javascript", r"javascript\s*:"),
+    ("vbscript", r"vbscript\s*:"),
+    ("on", r"on\w+\s*="),
+    ("expression", r"expression\s*\("),
+    ("data", r"data\s*:"),
+    ("eval", r"eval\s*\("),
+    ("alert", r"alert\s*\("),
+    ("document.cookie", None),
+    ("document.write", None),
+]
+SQL_INJECTION_RULES: List[Rule] = [
+    ("union", r"\bunion\b"),
+    ("select", r"\bselect\b"),
+    ("insert", r"\binsert\b"),
+    ("update", r"\bupdate\b"),
+    ("delete", r"\bdelete\b"),
+    ("drop", r"\bdrop\b"),
+    ("create", r"\bcreate\b"),
+    ("alter", r"\balter\b"),
+    ("exec", r"\bexec(?:ute)?\b"),
+    ("--", None),
+    ("#", None),
+    ("/*", None),
+    ("*/", None),
+    ("'1'='1", r"'\s*or\s*'1'='1"),
+]
+PATH_TRAVERSAL_RULES: List[Rule] = [("..", None), ("%2e%2e", None)]
+
+XSS_PATTERNS: List[str] = [
+    pattern if pattern is not None else re.escape(trigger)
+    for trigger, pattern in XSS_RULES
+]
+
+# Categories in priority order: the first one with a match anywhere in the
+# input is the one reported. Values match ThreatType.
+DEFAULT_RULES: Sequence[Tuple[str, Sequence[Rule]]] = (
+    ("xss", XSS_RULES),
+    ("sql_injection", SQL_INJECTION_RULES),
+    ("reconnaissance", PATH_TRAVERSAL_RULES),
+)
+
+# In streaming mode a <script> element is tracked by its opening and closing
+# tags, so the element and its opening tag may span any number of chunks
+_SCRIPT_ELEMENT = r"<script[^>]*>.*?</script>"
+_SCRIPT_OPEN = re.compile("<script", re.IGNORECASE)
+_SCRIPT_CLOSE = re.compile("</script>", re.IGNORECASE)
+_WORD = re.compile(r"\w")
+
+_Compiled = Tuple[str, Optional[Pattern[str]]]
+
+
+class ThreatScanner:
+    """
+    Precompiled scanner over prioritized threat rules.
+
+    ``rules`` is a sequence of ``(category, rules)`` in priority order.
+    ``scan`` returns the highest-priority category found in the input, or
+    None.
+    """
+
+    def __init__(
+        self, rules: Sequence[Tuple[str, Sequence[Rule]]] = DEFAULT_RULES
+    ):
+        self.categories = [category for category, _ in rules]
+        self._rules: List[List[_Compiled]] = [
+            [
+                (
+                    trigger,
+                    re.compile(pattern, re.IGNORECASE | re.DOTALL)
+                    if pattern
+                    else None,
+                )
+                for trigger, pattern in category_rules
+            ]
+            for _, category_rules in rules
+        ]
+
+    def scan(self, text: str) -> Optional[str]:
+        """Highest-priority threat category in ``text``, or None."""
+        lowered = text.lower()
+        for category, rules in zip(self.categories, self._rules):
+            for trigger, pattern in rules:
+                if trigger in lowered and (
+                    pattern is None or pattern.search(text) is not None
+                ):
+                    return category
+        return None
+
+    def stream(self, overlap: int = 1024) -> "ThreatScan":
+        """Incremental scan for input arriving in chunks."""
+        return ThreatScan(self, overlap)
+
+
+class ThreatScan:
+    """
+    Incremental threat scan over chunks of one input.
+
+    The last ``overlap`` characters of each chunk are kept and rescanned
+    with the next one, so any match up to that length is found across chunk
+    boundaries. ``<script>`` elements are found at any length.
+    """
+
+    def __init__(self, scanner: ThreatScanner, overlap: int = 1024):
+        self._scanner = scanner
+        self._overlap = overlap
+        self._carry = ""
+        self._offset = 0  # Absolute position of the start of _carry
+        # _carry starts with one character of context once the input has been
+        # cut, so a leading \b sees what came before the overlap
+        self._lead = 0
+        self._best = len(scanner.categories)
+        # Absolute positions after the first "<script" and after its ">"
+        self._script_tag_at: Optional[int] = None
+        self._script_open_at: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """True once a top-priority threat is found; nothing can change it."""
+        return self._best == 0
+
+    @property
+    def result(self) -> Optional[str]:
+        """Highest-priority threat category seen so far, or None."""
+        if self._best < len(self._scanner.categories):
+            return self._scanner.categories[self._best]
+        return None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Scan the next chunk; returns ``result`` so far."""
+        if not self.done:
+            self._scan(self._carry + chunk, final=False)
+        return self.result
+
+    def finish(self) -> Optional[str]:
+        """Scan what is left after the last chunk; returns ``result``."""
+        if not self.done:
+            self._scan(self._carry, final=True)
+        return self.result
+
+    def feed_all(self, chunks: Iterable[str]) -> Optional[str]:
+        """Feed chunks until they run out or a top-priority threat is found."""
+        for chunk in chunks:
+            self.feed(chunk)
+            if self.done:
+                return self.result
+        return self.finish()
+
+    def _scan(self, text: str, final: bool) -> None:
+        # Rescanning the overlap can only find matches already counted,
+        # which never lower _best again, so no deduplication is needed
+        lowered = text.lower()
+        for rank in range(self._best):
+            if any(
+                self._confirm(text, lowered, trigger, pattern, final)
+                for trigger, pattern in self._scanner._rules[rank]
+            ):
+                self._best = rank
+                break
+
+        cut = max(len(text) - self._overlap - 1, 0)
+        if cut:
+            self._lead = 1
+        self._carry = text[cut:]
+        self._offset += cut
+
+    def _confirm(
+        self,
+        text: str,
+        lowered: str,
+        trigger: str,
+        pattern: Optional[Pattern[str]],
+        final: bool,
+    ) -> bool:
+        if pattern is not None and pattern.pattern == _SCRIPT_ELEMENT:
+            return self._script_element(text)
+        if trigger not in lowered:
+            return False
+        if pattern is None:
+            return True
+
+        pos = self._lead
+        while True:
+            match = pattern.search(text, pos)
+            if match is None:
+                return False
+            if final or match.end() < len(text) or not _WORD.match(text[-1]):
+                return True
+            # A trailing \b may not hold once more text arrives; the match
+            # is rescanned from the overlap with the next chunk
+            pos = match.start() + 1
+
+    def _script_element(self, text: str) -> bool:
+        # The first "<script" is the one the element regex would match: any
+        # later opening tag shares its ">" or has one after it
+        if self._script_tag_at is None:
+            found = _SCRIPT_OPEN.search(text, self._lead)
+            if found is None:
+                return False
+            self._script_tag_at = self._offset + found.end()
+        if self._script_open_at is None:
+            found = text.find(">", max(self._script_tag_at - self._offset, 0))
+            if found == -1:
+                return False
+            self._script_open_at = self._offset + found + 1
+        start = max(self._script_open_at - self._offset, 0)
+        return _SCRIPT_CLOSE.search(text, start) is not None
+
+
+_default_scanner: Optional[ThreatScanner] = None
+
+
+def get_threat_scanner() -> ThreatScanner:
+    """Shared scanner for the default rules (compiled on first use)."""
+    global _default_scanner
+    if _default_scanner is None:
+        _default_scanner = ThreatScanner()
+    return _default_scanner
+
+
+__all__ = [
+    "DEFAULT_RULES",
+    "PATH_TRAVERSAL_RULES",
+    "SQL_INJECTION_RULES",
+    "ThreatScan",
+    "ThreatScanner",
+    "XSS_PATTERNS",
+    "XSS_RULES",
+    "get_threat_scanner",
+]
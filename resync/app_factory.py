@@ -5,6 +5,7 @@ This module is imported by resync/main.py and provides the actual application
 initialization logic following the factory pattern.
 """
 
+import asyncio
 import hashlib
 import os
 import sys
@@ -87,11 +88,16 @@ class ApplicationFactory:
         """
         # Startup
         logger.info("application_startup_initiated")
+        config_watcher: Optional[asyncio.Task] = None
 
         try:
             # Import here to avoid circular dependencies
+            from resync.api.chat import shutdown_chat_background_tasks
             from resync.api_gateway.container import setup_dependencies
+            from resync.core.chunking import shutdown_chunking_pool
+            from resync.core.config_watcher import watch_agent_config
             from resync.core.container import app_container
+            from resync.core.embedding_service import shutdown_embedding_service
             from resync.core.exceptions import (
                 ConfigurationError,
                 RedisAuthError,
@@ -101,6 +107,7 @@ class ApplicationFactory:
             )
             from resync.core.interfaces import (
                 IAgentManager,
+                IConnectionManager,
                 IKnowledgeGraph,
                 ITWSClient,
             )
@@ -124,6 +131,15 @@ class ApplicationFactory:
             # Setup dependencies
             setup_dependencies(tws_client, agent_manager, knowledge_graph)
 
+            # Build the configured agents before the first chat, and rebuild
+            # them whenever the agent config file changes
+            await agent_manager.load_agents_from_config()
+            config_watcher = asyncio.create_task(
+                watch_agent_config(
+                    agent_manager, await app_container.get(IConnectionManager)
+                )
+            )
+
             # Initialize CQRS dispatcher
             initialize_dispatcher(tws_client, tws_monitor)
 
@@ -210,6 +226,11 @@ class ApplicationFactory:
             app_logger.info("application_shutdown_initiated")
 
             try:
+                if config_watcher is not None:
+                    config_watcher.cancel()
+                await shutdown_chat_background_tasks()
+                await shutdown_embedding_service()
+                await asyncio.to_thread(shutdown_chunking_pool)
                 await shutdown_tws_monitor()
                 logger.info("application_shutdown_completed")
                 app_logger.info("application_shutdown_successful")
@@ -317,18 +338,21 @@ class ApplicationFactory:
 
     def _configure_middleware(self) -> None:
         """Configure all middleware in the correct order."""
+        from resync.api.middleware.asgi import FusedHeaderMiddleware
         from resync.api.middleware.correlation_id import CorrelationIdMiddleware
         from resync.api.middleware.cors_config import CORSConfig
         from resync.api.middleware.csp_middleware import CSPMiddleware
         from resync.api.middleware.error_handler import GlobalExceptionHandlerMiddleware
+        from resync.config.security import security_header_layers
 
-        # 1. Correlation ID (must be first)
-        self.app.add_middleware(CorrelationIdMiddleware)
+        # All middleware here is pure ASGI: no per-layer task or body
+        # re-wrapping, and streaming responses are passed through as sent.
+        # add_middleware wraps, so the last one added runs first.
 
-        # 2. Global Exception Handler
+        # 1. Global Exception Handler (innermost, right around the routes)
         self.app.add_middleware(GlobalExceptionHandlerMiddleware)
 
-        # 3. CORS Configuration
+        # 2. CORS Configuration
         cors_config = CORSConfig()
         cors_policy = cors_config.get_policy(settings.environment.value)
 
@@ -341,13 +365,17 @@ class ApplicationFactory:
             max_age=cors_policy.max_age,
         )
 
-        # 4. CSP Middleware
-        self.app.add_middleware(CSPMiddleware, report_only=not settings.is_production)
-
-        # 5. Additional security headers
-        from resync.config.security import add_additional_security_headers
-
-        add_additional_security_headers(self.app)
+        # 3. Header-only layers fused into one middleware with a single
+        # send wrapper: security headers, CSP and the Correlation ID, which
+        # is therefore set before the exception handler and routes run.
+        self.app.add_middleware(
+            FusedHeaderMiddleware,
+            layers=[
+                *security_header_layers(),
+                (CSPMiddleware, {"report_only": not settings.is_production}),
+                (CorrelationIdMiddleware, {}),
+            ],
+        )
 
         logger.info("middleware_configured")
 
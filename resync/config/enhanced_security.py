@@ -3,27 +3,29 @@ Enhanced security configuration for Resync application with production-ready set
 """
 
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 
 from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Scope
 
+from resync.api.middleware.asgi import HeaderLayer, ResponseHeader, encode_headers
 from resync.api.validation.enhanced_security_fixed import SecurityHeadersMiddleware
 from resync.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
-class EnhancedSecurityMiddleware(BaseHTTPMiddleware):
+class EnhancedSecurityMiddleware(HeaderLayer):
     """
     Enhanced security middleware with comprehensive protection mechanisms.
+
+    The header set is fixed at construction and pre-encoded, so a request
+    costs one path check and a header list merge.
     """
 
     def __init__(
         self,
-        app: FastAPI,
+        app: Optional[ASGIApp] = None,
         enable_hsts: bool = True,
         enable_csp: bool = True,
         enable_referrer_policy: bool = True,
@@ -42,7 +44,7 @@ class EnhancedSecurityMiddleware(BaseHTTPMiddleware):
         Initialize enhanced security middleware.
 
         Args:
-            app: FastAPI application instance
+            app: ASGI application
             enable_hsts: Enable HTTP Strict Transport Security
             enable_csp: Enable Content Security Policy
             enable_referrer_policy: Enable Referrer Policy
@@ -73,57 +75,51 @@ class EnhancedSecurityMiddleware(BaseHTTPMiddleware):
             permissions_policy or self._default_permissions_policy()
         )
         self.feature_policy = feature_policy or self._default_feature_policy()
+        self._skip_static = settings.is_production
+        self._headers = encode_headers(self._security_headers())
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    def on_request(self, scope: Scope) -> Optional[Sequence[ResponseHeader]]:
         """
-        Process request with enhanced security headers.
+        Security headers for this request's response.
 
         Args:
-            request: Incoming request
-            call_next: Next middleware/handler
+            scope: ASGI request scope
 
         Returns:
-            Response with security headers
+            Pre-encoded security headers, or None for skipped paths
         """
-        # Skip security headers for certain paths
-        if self._should_skip_security_headers(request):
-            return await call_next(request)
-
-        response = await call_next(request)
-
-        # Add security headers
-        self._add_security_headers(response)
-
-        return response
+        if self._should_skip_security_headers(scope["path"]):
+            return None
+        return self._headers
 
-    def _should_skip_security_headers(self, request: Request) -> bool:
+    def _should_skip_security_headers(self, path: str) -> bool:
         """
         Determine if security headers should be skipped for this request.
 
         Args:
-            request: Incoming request
+            path: Request path
 
         Returns:
             True if security headers should be skipped
         """
         # Skip for health check endpoints
-        if request.url.path in ["/health", "/health/", "/ping", "/ping/"]:
+        if path in ("/health", "/health/", "/ping", "/ping/"):
             return True
 
         # Skip for static files in production (handled by web server)
-        if settings.is_production and request.url.path.startswith("/static/"):
+        if self._skip_static and path.startswith("/static/"):
             return True
 
         return False
 
-    def _add_security_headers(self, response: Response) -> None:
+    def _security_headers(self) -> Dict[str, str]:
         """
-        Add security headers to response.
+        Build the security headers added to responses.
 
-        Args:
-            response: Response to add headers to
+        Returns:
+            Header name to value mapping
         """
-        headers = response.headers
+        headers: Dict[str, str] = {}
 
         # HTTP Strict Transport Security (HSTS)
         if self.enable_hsts:
@@ -172,6 +168,8 @@ class EnhancedSecurityMiddleware(BaseHTTPMiddleware):
         headers["Cross-Origin-Opener-Policy"] = "same-origin"
         headers["Cross-Origin-Resource-Policy"] = "same-origin"
 
+        return headers
+
     def _default_csp(self) -> str:
         """
         Generate default Content Security Policy.
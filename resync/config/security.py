@@ -3,41 +3,39 @@ Additional security headers and configuration for Resync application.
 """
 
 import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
 from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 
-from .enhanced_security import configure_enhanced_security
+from resync.api.middleware.asgi import HeaderLayer, ResponseHeader, encode_headers
+
+from resync.api.validation.enhanced_security_fixed import SecurityHeadersMiddleware
+
+from .enhanced_security import EnhancedSecurityMiddleware, configure_enhanced_security
 
 logger = logging.getLogger(__name__)
 
 
-class AdditionalSecurityHeadersMiddleware(BaseHTTPMiddleware):
+class AdditionalSecurityHeadersMiddleware(HeaderLayer):
     """
     Additional security headers middleware.
     This middleware adds extra security headers to responses.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-
-        # Add additional security headers
-        # Strict-Transport-Security: Force HTTPS (only if app is deployed with HTTPS)
-        # Note: Only enable if using HTTPS in production
-        # response.headers.setdefault("Strict-Transport-Security", "max-age=31536000; includeSubDomains")
+    # Strict-Transport-Security: Force HTTPS (only if app is deployed with HTTPS)
+    # Note: Only enable if using HTTPS in production
+    # "Strict-Transport-Security": "max-age=31536000; includeSubDomains"
+    HEADERS = encode_headers(
+        {
+            "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+            # Feature-Policy header (deprecated but still supported by some browsers)
+            "Feature-Policy": "geolocation 'none'; microphone 'none'; camera 'none'",
+        },
+        overwrite=False,
+    )
 
-        # Permissions-Policy header
-        response.headers.setdefault(
-            "Permissions-Policy", "geolocation=(), microphone=(), camera=()"
-        )
-
-        # Feature-Policy header (deprecated but still supported by some browsers)
-        response.headers.setdefault(
-            "Feature-Policy", "geolocation 'none'; microphone 'none'; camera 'none'"
-        )
-
-        return response
+    def on_request(self, scope: Any) -> Sequence[ResponseHeader]:
+        return self.HEADERS
 
 
 def add_additional_security_headers(app: FastAPI) -> None:
@@ -53,3 +51,22 @@ def add_additional_security_headers(app: FastAPI) -> None:
     # Add additional security headers middleware
     app.add_middleware(AdditionalSecurityHeadersMiddleware)
     logger.info("Additional security headers middleware added")
+
+
+def security_header_layers(
+    security_middleware_config: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[Type[HeaderLayer], Dict[str, Any]]]:
+    """
+    The layers added by ``add_additional_security_headers``, for fusing.
+
+    Args:
+        security_middleware_config: Configuration for EnhancedSecurityMiddleware
+
+    Returns:
+        ``(middleware, kwargs)`` pairs, outermost first, for FusedHeaderMiddleware
+    """
+    return [
+        (AdditionalSecurityHeadersMiddleware, {}),
+        (SecurityHeadersMiddleware, {}),
+        (EnhancedSecurityMiddleware, security_middleware_config or {}),
+    ]
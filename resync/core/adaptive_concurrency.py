@@ -0,0 +1,296 @@
+"""
+Adaptive concurrency limiting for outbound calls.
+
+This module provides a concurrency limiter whose in-flight limit follows the
+observed health of the downstream service instead of a fixed semaphore size:
+- Gradient adjustment: the limit grows while latency stays near its long-term
+  baseline and shrinks as queueing inside the downstream inflates latency
+- Multiplicative decrease on errors and timeouts (AIMD style)
+- Priority classes so interactive calls are admitted before background work
+- Queueing delay, in-flight count and current limit exported as metrics
+
+Priorities are carried in a context variable so callers can mark a whole
+operation without threading a parameter through every client method::
+
+    with request_priority(RequestPriority.INTERACTIVE):
+        status = await tws_client.get_system_status()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+from resync.core.exceptions import ServiceUnavailableError
+from resync.core.metrics import MetricCounter, MetricGauge, MetricHistogram
+from resync.core.structured_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Admission priority for limited calls (lower value is served first)."""
+
+    INTERACTIVE = 0  # User-facing calls, e.g. chat tool invocations
+    DEFAULT = 1  # Dashboards and API reads
+    BACKGROUND = 2  # Monitoring loops and batch jobs
+
+
+_request_priority: ContextVar[RequestPriority] = ContextVar(
+    "request_priority", default=RequestPriority.DEFAULT
+)
+
+
+def get_request_priority() -> RequestPriority:
+    """Return the priority of the current execution context."""
+    return _request_priority.get()
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Run the enclosed calls (and tasks they spawn) with the given priority."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limiter with a latency-gradient adaptive limit.
+
+    Each completed call reports its round-trip time. The limiter keeps a
+    short-term and a long-term exponential moving average of RTT; their ratio
+    (the gradient) scales the limit down when latency rises above baseline,
+    while a ``sqrt(limit)`` headroom term lets it probe upward when latency is
+    flat. Calls that fail with a "drop" exception (timeouts, connection
+    errors, 5xx) cut the limit multiplicatively.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        smoothing: float = 0.2,
+        rtt_tolerance: float = 1.5,
+        long_window: int = 600,
+        short_window: int = 10,
+        backoff_ratio: float = 0.9,
+        max_queue_delay: Optional[float] = None,
+        drop_on: Tuple[type, ...] = (asyncio.TimeoutError, ConnectionError),
+        limit_gauge: Optional[MetricGauge] = None,
+        inflight_gauge: Optional[MetricGauge] = None,
+        queue_delay_histogram: Optional[MetricHistogram] = None,
+        rejections_counter: Optional[MetricCounter] = None,
+    ):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.smoothing = smoothing
+        self.rtt_tolerance = rtt_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.max_queue_delay = max_queue_delay
+        self.drop_on = drop_on
+
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._inflight = 0
+        self._long_alpha = 2.0 / (long_window + 1)
+        self._short_alpha = 2.0 / (short_window + 1)
+        self._long_rtt: Optional[float] = None
+        self._short_rtt: Optional[float] = None
+        self._waiters: List[Deque[asyncio.Future]] = [
+            deque() for _ in RequestPriority
+        ]
+
+        self._limit_gauge = limit_gauge
+        self._inflight_gauge = inflight_gauge
+        self._queue_delay_histogram = queue_delay_histogram
+        self._rejections_counter = rejections_counter
+
+        # Statistics
+        self.total_calls = 0
+        self.dropped_calls = 0
+        self.rejected_calls = 0
+        self.last_queue_delay = 0.0
+
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """Current in-flight limit."""
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        """Number of calls currently holding a permit."""
+        return self._inflight
+
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting for a permit."""
+        return sum(len(waiters) for waiters in self._waiters)
+
+    def _publish(self) -> None:
+        if self._limit_gauge is not None:
+            self._limit_gauge.set(self.limit)
+        if self._inflight_gauge is not None:
+            self._inflight_gauge.set(self._inflight)
+
+    def _has_priority_waiters(self, priority: RequestPriority) -> bool:
+        """Check whether calls of equal or higher priority are already waiting."""
+        return any(self._waiters[p] for p in range(priority + 1))
+
+    async def acquire(self, priority: Optional[RequestPriority] = None) -> float:
+        """
+        Wait for a permit.
+
+        Returns:
+            Time spent queued, in seconds
+
+        Raises:
+            ServiceUnavailableError: If ``max_queue_delay`` elapses first
+        """
+        priority = get_request_priority() if priority is None else priority
+        started = time.perf_counter()
+
+        if self._inflight < self.limit and not self._has_priority_waiters(priority):
+            self._inflight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[priority].append(waiter)
+            try:
+                if self.max_queue_delay is None:
+                    await waiter
+                else:
+                    await asyncio.wait_for(waiter, self.max_queue_delay)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if waiter.done() and not waiter.cancelled():
+                    # The permit was granted just as we gave up; hand it on
+                    self._release_permit()
+                else:
+                    try:
+                        self._waiters[priority].remove(waiter)
+                    except ValueError:
+                        pass
+                if isinstance(e, asyncio.TimeoutError):
+                    self.rejected_calls += 1
+                    if self._rejections_counter is not None:
+                        self._rejections_counter.increment()
+                    raise ServiceUnavailableError(
+                        f"Concurrency limit queue timeout for {self.name}",
+                        details={
+                            "limit": self.limit,
+                            "inflight": self._inflight,
+                            "queued": self.queued,
+                        },
+                    ) from e
+                raise
+
+        queue_delay = time.perf_counter() - started
+        self.last_queue_delay = queue_delay
+        if self._queue_delay_histogram is not None:
+            self._queue_delay_histogram.observe(queue_delay)
+        self._publish()
+        return queue_delay
+
+    def _release_permit(self) -> None:
+        """Return a permit and admit waiters up to the current limit."""
+        self._inflight -= 1
+        for waiters in self._waiters:
+            while waiters and self._inflight < self.limit:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._inflight += 1
+                    waiter.set_result(None)
+            if self._inflight >= self.limit:
+                break
+        self._publish()
+
+    def release(self, rtt: Optional[float], inflight: int, dropped: bool = False) -> None:
+        """
+        Return a permit and feed the outcome of the call into the limit.
+
+        Args:
+            rtt: Round-trip time of the call, or None to skip the sample
+            inflight: In-flight count observed when the call started
+            dropped: Whether the call failed in a way that signals overload
+        """
+        self.total_calls += 1
+        if dropped:
+            self.dropped_calls += 1
+            self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+        elif rtt is not None:
+            self._update_limit(rtt, inflight)
+        self._release_permit()
+
+    def _update_limit(self, rtt: float, inflight: int) -> None:
+        """Apply a gradient update from an RTT sample."""
+        if self._long_rtt is None or self._short_rtt is None:
+            self._long_rtt = self._short_rtt = rtt
+            return
+
+        self._short_rtt += self._short_alpha * (rtt - self._short_rtt)
+        self._long_rtt += self._long_alpha * (rtt - self._long_rtt)
+
+        # After a latency regime change, let the baseline catch up quickly
+        if self._long_rtt / self._short_rtt > 2.0:
+            self._long_rtt *= 0.95
+
+        # Do not grow the limit while the caller is not using it
+        if inflight < self._limit / 2:
+            return
+
+        gradient = max(
+            0.5, min(1.0, self.rtt_tolerance * self._long_rtt / self._short_rtt)
+        )
+        new_limit = self._limit * gradient + math.sqrt(self._limit)
+        new_limit = self._limit * (1 - self.smoothing) + new_limit * self.smoothing
+        self._limit = max(self.min_limit, min(self.max_limit, new_limit))
+
+    @asynccontextmanager
+    async def limit_call(
+        self, priority: Optional[RequestPriority] = None
+    ) -> AsyncIterator[None]:
+        """Hold a permit for the duration of the block and record its outcome."""
+        await self.acquire(priority)
+        inflight = self._inflight
+        started = time.perf_counter()
+        try:
+            yield
+        except self.drop_on:
+            self.release(None, inflight, dropped=True)
+            raise
+        except BaseException:
+            # Client-side failures say nothing about downstream capacity
+            self.release(None, inflight)
+            raise
+        else:
+            self.release(time.perf_counter() - started, inflight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return limiter statistics."""
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "queued": self.queued,
+            "queued_by_priority": {
+                priority.name.lower(): len(self._waiters[priority])
+                for priority in RequestPriority
+            },
+            "long_rtt": self._long_rtt,
+            "short_rtt": self._short_rtt,
+            "total_calls": self.total_calls,
+            "dropped_calls": self.dropped_calls,
+            "rejected_calls": self.rejected_calls,
+            "last_queue_delay": self.last_queue_delay,
+        }
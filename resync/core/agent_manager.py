@@ -11,16 +11,18 @@ This module provides comprehensive agent management functionality including:
 from __future__ import annotations
 
 import asyncio
+import inspect
+import json
 import threading
-from typing import Any, Callable, Optional, List
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, List
 
 import structlog
-from resync.core.fastapi_di import get_service
 from resync.core.interfaces import ITWSClient
-from resync.tool_definitions.tws_tools import (
-    tws_status_tool,
-    tws_troubleshooting_tool,
-)
+
+if TYPE_CHECKING:
+    from resync.services.tws_service import OptimizedTWSClient
 
 # Configure agent manager logger
 agent_logger = structlog.get_logger("resync.agent_manager")
@@ -158,7 +160,6 @@ from resync.core.exceptions import (
 )  # Renamed from AgentExecutionError for broader scope
 from resync.core.metrics import runtime_metrics
 from resync.services.mock_tws_service import MockTWSClient
-from resync.services.tws_service import OptimizedTWSClient
 from resync.settings import settings
 
 from .global_utils import get_environment_tags, get_global_correlation_id
@@ -198,9 +199,104 @@ class AgentManager:
                     cls._instance = super().__new__(cls)
         return cls._instance
 
-    async def load_agents_from_config(self, config_path: str | None = None) -> None:
-        """Loads agent configurations from settings or specified path."""
-        # Implementation for loading agents from config
+    async def load_agents_from_config(self, config_path: str | Path | None = None) -> None:
+        """
+        Loads agent configurations from the agent config file and rebuilds
+        the agents whose configuration changed.
+
+        Agents in the file are merged over the built-in ones by id. A missing
+        or invalid file leaves the current configuration untouched. Changed
+        agents, and agents not built yet, are built by ``warm_up``, so chats
+        holding the previous instance finish with it while new chats get the
+        new one. At startup this is the only call needed to warm up agents.
+        """
+        path = Path(config_path) if config_path else self._config_path()
+        file_configs = self._read_agent_configs(path)
+        if file_configs is None:
+            await self.warm_up()
+            return
+
+        previous = {config.id: config for config in self.agent_configs}
+        merged = {config.id: config for config in self._builtin_configs}
+        merged.update({config.id: config for config in file_configs})
+        self.agent_configs = list(merged.values())
+
+        for agent_id in set(previous) - set(merged):
+            self.agents.pop(agent_id, None)
+        changed = [
+            agent_id
+            for agent_id, config in merged.items()
+            if previous.get(agent_id) != config or agent_id not in self.agents
+        ]
+        logger.info(
+            "agent_configs_loaded",
+            path=str(path),
+            agents=len(merged),
+            rebuilding=changed,
+        )
+        await self.warm_up(changed)
+
+    async def warm_up(self, agent_ids: Iterable[str] | None = None) -> dict[str, float]:
+        """
+        Builds agents ahead of their first chat.
+
+        The TWS client and tool schemas are resolved once, then the agents
+        in ``agent_ids`` (by default, every configured agent not built yet)
+        are created concurrently, at most MAX_CONCURRENT_AGENT_CREATIONS at a
+        time. Each new instance replaces the previous one only once it is
+        fully built; agents that fail to build keep their previous instance.
+
+        Returns:
+            Seconds spent building each agent that was built
+        """
+        ids = (
+            list(agent_ids)
+            if agent_ids is not None
+            else [
+                config.id
+                for config in self.agent_configs
+                if config.id not in self.agents
+            ]
+        )
+        if not ids:
+            return {}
+
+        started = time.perf_counter()
+        await self.get_tws_client()
+        self._agent_tools()
+        semaphore = asyncio.Semaphore(
+            getattr(self.settings, "MAX_CONCURRENT_AGENT_CREATIONS", 5)
+        )
+
+        async def build(agent_id: str) -> float:
+            async with semaphore:
+                build_started = time.perf_counter()
+                agent = await self._create_agent(agent_id)
+                elapsed = time.perf_counter() - build_started
+            if agent is None:
+                raise AgentError(f"Agent '{agent_id}' could not be created")
+            self.agents[agent_id] = agent
+            return elapsed
+
+        results = await asyncio.gather(
+            *(build(agent_id) for agent_id in ids), return_exceptions=True
+        )
+        timings: dict[str, float] = {}
+        for agent_id, result in zip(ids, results):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    "agent_warm_up_failed", agent_id=agent_id, error=str(result)
+                )
+            else:
+                timings[agent_id] = result
+        runtime_metrics.agent_active_count.set(len(self.agents))
+        logger.info(
+            "agents_warmed_up",
+            agents=len(timings),
+            failed=len(ids) - len(timings),
+            duration_seconds=round(time.perf_counter() - started, 3),
+        )
+        return timings
 
     async def get_agent(self, agent_id: str) -> Any:
         """Retrieves an agent by its ID."""
@@ -208,65 +304,59 @@ class AgentManager:
         if agent_id in self.agents:
             return self.agents[agent_id]
 
-        # Create agent on demand
+        # Create agent on demand; warm_up normally did this already
+        runtime_metrics.agent_cold_starts.increment()
         agent = await self._create_agent(agent_id)
         if agent:
             self.agents[agent_id] = agent
+            runtime_metrics.agent_active_count.set(len(self.agents))
         return agent
 
     async def _create_agent(self, agent_id: str) -> Any:
         """Create an agent instance for the given ID."""
         try:
             # Get agent configuration
-            agent_config = None
-            for config in self.agent_configs:
-                if config.id == agent_id:
-                    agent_config = config
-                    break
-
+            agent_config = await self.get_agent_config(agent_id)
             if not agent_config:
                 logger.warning(f"No configuration found for agent '{agent_id}'")
                 return None
 
-            # Get TWS client for tools
-            if not self.tws_client:
-                async with self._tws_init_lock:
-                    if not self.tws_client:
-                        from resync.core.fastapi_di import get_service
-                        from resync.core.interfaces import ITWSClient
-
-                        try:
-                            self.tws_client = await get_service(ITWSClient)
-                        except Exception as e:
-                            logger.warning(f"Failed to get TWS client: {e}")
-                            self.tws_client = None
+            # Tools share one TWS client and are prepared once per manager
+            await self.get_tws_client()
+            tools = self._tools_for(agent_config)
+            instructions = (
+                f"You are a {agent_config.name} assistant for TWS operations. "
+                f"{agent_config.backstory}"
+            )
 
-            # Create agent with tools
+            started = time.perf_counter()
             if AGNO_AVAILABLE:
                 # Create real agent with tools
                 agent = Agent(
                     model=agent_config.model_name,
-                    tools=list(self.tools.values()),
-                    instructions=f"You are a {agent_config.name} assistant for TWS operations. {agent_config.backstory}",
+                    tools=tools,
+                    instructions=instructions,
                     name=agent_config.name,
                 )
                 logger.info(f"Created real agent: {agent}")
-                return agent
             else:
                 # Create mock agent with ALL required attributes - FIXED
                 agent = MockAgent(
-                    tools=list(self.tools.values()),
+                    tools=tools,
                     model=agent_config.model_name,
-                    instructions=f"You are a {agent_config.name} assistant for TWS operations. {agent_config.backstory}",
+                    instructions=instructions,
                     name=agent_config.name,
                     description=agent_config.backstory,  # ✅ PASSAR DESCRIPTION
                 )
                 logger.info(
                     f"Created mock agent: {agent}, has arun: {hasattr(agent, 'arun')}"
                 )
-                return agent
+            runtime_metrics.agent_initializations.increment()
+            runtime_metrics.agent_creation_time.observe(time.perf_counter() - started)
+            return agent
 
         except Exception as e:
+            runtime_metrics.agent_creation_failures.increment()
             logger.error(f"Failed to create agent '{agent_id}': {e}")
             return None
 
@@ -281,10 +371,12 @@ class AgentManager:
                 return config
         return None
 
-    def _create_tws_client(self) -> Any:
-        """Creates a TWS client instance."""
+    async def _create_tws_client(self) -> Any:
+        """Resolves the TWS client from the DI container."""
+        from resync.core.fastapi_di import get_service
+
         try:
-            return get_service(ITWSClient)()
+            return await get_service(ITWSClient)()
         except Exception as e:
             logger.warning(f"Failed to get TWS client: {e}")
             return None
@@ -294,12 +386,22 @@ class AgentManager:
         if not self.tws_client:
             async with self._tws_init_lock:
                 if not self.tws_client:
-                    self.tws_client = self._tws_client_factory()
+                    client = self._tws_client_factory()
+                    if inspect.isawaitable(client):
+                        client = await client
+                    self.tws_client = client
+                    self._inject_tws_client(client)
         return self.tws_client
 
     def _discover_tools(self) -> dict[str, Any]:
         """Discover available tools for agents."""
         try:
+            # Imported here: the tools pull in the TWS client implementation
+            from resync.tool_definitions.tws_tools import (
+                tws_status_tool,
+                tws_troubleshooting_tool,
+            )
+
             return {
                 "get_tws_status": tws_status_tool.get_tws_status,
                 "analyze_tws_failures": tws_troubleshooting_tool.analyze_failures,
@@ -308,6 +410,74 @@ class AgentManager:
             logger.warning(f"Could not import TWS tools: {e}")
             return {}
 
+    def _inject_tws_client(self, client: Any) -> None:
+        """Hands the shared TWS client to tool instances that have none yet."""
+        if client is None:
+            return
+        for tool in self.tools.values():
+            owner = getattr(tool, "__self__", None)
+            if owner is not None and getattr(owner, "tws_client", False) is None:
+                owner.tws_client = client
+
+    def _agent_tools(self) -> dict[str, Any]:
+        """
+        Tools in the form handed to agents, prepared once per manager.
+
+        With agno, each tool is converted to a Function once, so its JSON
+        schema is not derived again for every agent that is built.
+        """
+        if self._tool_cache is None:
+            prepared = dict(self.tools)
+            if AGNO_AVAILABLE:
+                try:
+                    from agno.tools.function import Function
+
+                    prepared = {
+                        name: Function.from_callable(tool)
+                        for name, tool in self.tools.items()
+                    }
+                except Exception as e:  # Older agno: let Agent derive schemas
+                    logger.warning(f"Could not prepare tool schemas: {e}")
+            self._tool_cache = prepared
+        return self._tool_cache
+
+    def _tools_for(self, agent_config: AgentConfig) -> list[Any]:
+        """The agent's configured tools; all tools if none of them is known."""
+        tools = self._agent_tools()
+        selected = [tools[name] for name in agent_config.tools if name in tools]
+        return selected or list(tools.values())
+
+    def _config_path(self) -> Path:
+        path = getattr(self.settings, "AGENT_CONFIG_PATH", None)
+        if path is None:
+            path = Path(getattr(self.settings, "BASE_DIR", ".")) / "config" / "agents.json"
+        return Path(path)
+
+    def _read_agent_configs(self, path: Path) -> Optional[list[AgentConfig]]:
+        """Agent configurations in ``path``, or None if it cannot be used."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            logger.warning("agent_config_file_not_found", path=str(path))
+            return None
+        except (OSError, ValueError) as e:
+            logger.error("agent_config_file_invalid", path=str(path), error=str(e))
+            return None
+
+        configs = []
+        for entry in data.get("agents", []) if isinstance(data, dict) else []:
+            try:
+                entry = {"agent_type": AgentType.CHAT, **entry}
+                configs.append(AgentConfig(**entry))
+            except (TypeError, ValueError) as e:
+                logger.error(
+                    "agent_config_entry_invalid",
+                    path=str(path),
+                    agent_id=entry.get("id") if isinstance(entry, dict) else None,
+                    error=str(e),
+                )
+        return configs
+
     def __init__(
         self,
         settings_module: Any = settings,
@@ -398,7 +568,10 @@ class AgentManager:
                             verbose=False,
                         ),
                     ]
+                    self._builtin_configs = list(self.agent_configs)
                     self.tools: dict[str, Any] = self._discover_tools()
+                    # Tools prepared for agents; shared by every build
+                    self._tool_cache: Optional[dict[str, Any]] = None
                     self.tws_client: Optional[OptimizedTWSClient] = None
                     self._mock_tws_client: Optional[MockTWSClient] = None
                     # Async lock to prevent race conditions during TWS client initialization
@@ -8,27 +8,43 @@ This module provides intelligent anomaly detection capabilities using:
 - Risk scoring and alerting system
 - Performance optimized for production use
 - Self-learning and model updates
+
+Requests are enqueued and scored in micro-batches (one ``decision_function``
+call per batch); models are trained off the event loop in a worker process,
+swapped in atomically and persisted so restarts do not begin untrained.
 """
 
 from __future__ import annotations
 
 import asyncio
 import hashlib
+import os
 import time
+import zlib
+from abc import ABC, abstractmethod
 from collections import defaultdict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
+import joblib
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from sklearn.svm import OneClassSVM
 from sklearn.preprocessing import StandardScaler
 
+from resync.core.exceptions import ServiceUnavailableError
 from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _stable_hash(value: str, modulo: int) -> int:
+    """Hash a string consistently across processes (unlike ``hash()``)."""
+    return zlib.crc32(value.encode("utf-8")) % modulo
+
+
 @dataclass
 class AnomalyMetrics:
     """Metrics collected for anomaly detection."""
@@ -47,18 +63,18 @@ class AnomalyMetrics:
     geo_location: Optional[Dict[str, Any]] = None
     custom_metrics: Dict[str, Any] = field(default_factory=dict)
 
-    def to_feature_vector(self) -> np.ndarray:
-        """Convert metrics to numerical feature vector for ML."""
-        # Create feature vector from metrics
+    def to_feature_row(self) -> List[float]:
+        """Convert metrics to a flat list of numerical features."""
+        # Stable hashes keep features comparable with persisted models
         features = [
             float(self.response_time),
             float(self.status_code),
             float(self.request_size),
             float(self.response_size),
-            hash(self.endpoint) % 1000,  # Hash endpoint to numeric
-            hash(self.method) % 100,  # Hash method to numeric
-            hash(self.user_agent) % 1000 if self.user_agent else 0,
-            hash(self.ip_address) % 1000 if self.ip_address else 0,
+            _stable_hash(self.endpoint, 1000),  # Hash endpoint to numeric
+            _stable_hash(self.method, 100),  # Hash method to numeric
+            _stable_hash(self.user_agent, 1000) if self.user_agent else 0,
+            _stable_hash(self.ip_address, 1000) if self.ip_address else 0,
         ]
 
         # Add custom metrics
@@ -66,11 +82,15 @@ class AnomalyMetrics:
             if isinstance(value, (int, float)):
                 features.append(float(value))
             elif isinstance(value, str):
-                features.append(hash(value) % 1000)
+                features.append(_stable_hash(value, 1000))
             else:
                 features.append(0.0)
 
-        return np.array(features).reshape(1, -1)
+        return features
+
+    def to_feature_vector(self) -> np.ndarray:
+        """Convert metrics to numerical feature vector for ML."""
+        return np.array(self.to_feature_row(), dtype=float).reshape(1, -1)
 
 
 @dataclass
@@ -116,6 +136,12 @@ class MLModelConfig:
     training_window_hours: int = 24
     min_samples_for_training: int = 1000
     retrain_interval_hours: int = 6
+    retrain_check_interval_seconds: float = 60.0
+    training_executor: str = "process"  # "process" or "thread"
+    training_n_jobs: int = 1  # sklearn n_jobs inside the training worker
+
+    # Model persistence (None disables it)
+    model_directory: Optional[str] = None
 
     # Model selection
     primary_model: str = (
@@ -125,118 +151,240 @@ class MLModelConfig:
 
     # Performance tuning
     batch_size: int = 100
+    batch_window_ms: float = 5.0  # Max wait to fill a scoring micro-batch
+    max_queue_size: int = 10000
     max_memory_mb: int = 500
 
 
-class IsolationForestDetector:
-    """Isolation Forest based anomaly detector."""
+@dataclass
+class TrainedModel:
+    """A fitted scaler/model pair, swapped in as a single reference."""
+
+    scaler: StandardScaler
+    model: Any
+    trained_at: float
+    samples: int
+
+    @property
+    def n_features(self) -> int:
+        return int(self.scaler.n_features_in_)
+
+
+def _fit_model(
+    method: str, params: Dict[str, Any], feature_matrix: np.ndarray
+) -> Tuple[StandardScaler, Any]:
+    """
+    Fit a scaler and model (runs in a training worker process).
+
+    Must stay a module-level function so it can be pickled to the worker.
+    """
+    scaler = StandardScaler().fit(feature_matrix)
+    scaled_features = scaler.transform(feature_matrix)
+
+    if method == "isolation_forest":
+        model = IsolationForest(**params)
+    else:
+        model = OneClassSVM(**params)
+    model.fit(scaled_features)
+    return scaler, model
+
+
+class _SklearnDetector(ABC):
+    """Shared training, persistence and batch scoring for sklearn detectors."""
+
+    method = ""
 
     def __init__(self, config: MLModelConfig):
         self.config = config
-        self.model = None
-        self.scaler = StandardScaler()
-        self.is_trained = False
+        self.state: Optional[TrainedModel] = None
         self.training_data = deque(maxlen=config.min_samples_for_training * 2)
-        self.last_trained = 0
 
-    async def detect(self, metrics: AnomalyMetrics) -> AnomalyScore:
-        """Detect anomalies using Isolation Forest."""
-        if not self.is_trained or self._should_retrain():
-            await self._train_model()
+    @property
+    def is_trained(self) -> bool:
+        return self.state is not None
 
-        if not self.is_trained:
-            # Not enough data for training, return low-risk score
-            return AnomalyScore(
-                is_anomaly=False,
-                confidence=0.1,
-                risk_level="low",
-                detection_method="isolation_forest",
-                feature_importance={},
-                metrics=metrics,
-            )
+    @property
+    def model(self) -> Any:
+        return self.state.model if self.state else None
 
-        try:
-            feature_vector = metrics.to_feature_vector()
-            scaled_features = self.scaler.transform(feature_vector)
+    @property
+    def last_trained(self) -> float:
+        return self.state.trained_at if self.state else 0
 
-            # Get anomaly score (-1 for outliers, 1 for inliers)
-            score = self.model.decision_function(scaled_features)[0]
+    @abstractmethod
+    def _model_params(self) -> Dict[str, Any]:
+        """Keyword arguments of the sklearn estimator."""
 
-            # Convert to anomaly probability (higher = more anomalous)
-            anomaly_score = (score + 1) / 2  # Convert from [-1,1] to [0,1]
+    @abstractmethod
+    def _scores_from_decisions(
+        self, decisions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Map decision_function output to (anomaly score in [0,1], is_anomaly)."""
 
-            # Determine if it's an anomaly
-            is_anomaly = anomaly_score > (
-                1 - self.config.isolation_forest_contamination
-            )
+    @abstractmethod
+    def _calculate_risk_level(self, anomaly_score: float) -> str:
+        """Risk level of an anomaly score."""
 
-            # Calculate risk level
-            risk_level = self._calculate_risk_level(anomaly_score)
+    @abstractmethod
+    def _get_feature_importance(self) -> Dict[str, float]:
+        """Relative importance of each feature for the current model."""
 
-            return AnomalyScore(
-                is_anomaly=is_anomaly,
-                confidence=anomaly_score,
-                risk_level=risk_level,
-                detection_method="isolation_forest",
-                feature_importance=self._get_feature_importance(),
-                metrics=metrics,
-            )
+    def _untrained_score(self, metrics: AnomalyMetrics, confidence: float = 0.1) -> AnomalyScore:
+        return AnomalyScore(
+            is_anomaly=False,
+            confidence=confidence,
+            risk_level="low",
+            detection_method=self.method,
+            feature_importance={},
+            metrics=metrics,
+        )
+
+    def score_matrix(
+        self, feature_matrix: np.ndarray
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Score a stacked feature matrix with one decision_function call.
 
+        Returns:
+            (anomaly scores, anomaly flags), or None if no usable model
+        """
+        state = self.state  # Single read: a concurrent swap cannot split it
+        if state is None or feature_matrix.shape[1] != state.n_features:
+            return None
+        decisions = state.model.decision_function(state.scaler.transform(feature_matrix))
+        return self._scores_from_decisions(decisions)
+
+    def score_batch(
+        self, feature_matrix: np.ndarray, metrics_batch: List[AnomalyMetrics]
+    ) -> List[AnomalyScore]:
+        """Score a batch of requests."""
+        try:
+            scored = self.score_matrix(feature_matrix)
         except Exception as e:
-            logger.warning(f"Isolation Forest detection error: {e}")
-            return AnomalyScore(
-                is_anomaly=False,
-                confidence=0.0,
-                risk_level="low",
-                detection_method="isolation_forest",
-                feature_importance={},
+            logger.warning(f"{self.method} detection error: {e}")
+            return [self._untrained_score(m, 0.0) for m in metrics_batch]
+
+        if scored is None:
+            return [self._untrained_score(m) for m in metrics_batch]
+
+        scores, flags = scored
+        importance = self._get_feature_importance()
+        return [
+            AnomalyScore(
+                is_anomaly=bool(flag),
+                confidence=float(score),
+                risk_level=self._calculate_risk_level(float(score)),
+                detection_method=self.method,
+                feature_importance=importance,
                 metrics=metrics,
             )
+            for metrics, score, flag in zip(metrics_batch, scores, flags)
+        ]
 
-    async def _train_model(self) -> None:
-        """Train or retrain the Isolation Forest model."""
+    async def detect(self, metrics: AnomalyMetrics) -> AnomalyScore:
+        """Score a single request (training happens in the background)."""
+        return self.score_batch(metrics.to_feature_vector(), [metrics])[0]
+
+    def _should_retrain(self) -> bool:
+        """Check if model should be retrained."""
         if len(self.training_data) < self.config.min_samples_for_training:
-            return
+            return False
+        if not self.is_trained:
+            return True
 
-        try:
-            # Convert training data to feature matrix
-            feature_matrix = np.vstack(
-                [m.to_feature_vector()[0] for m in self.training_data]
-            )
+        time_since_training = time.time() - self.last_trained
+        return time_since_training > (self.config.retrain_interval_hours * 3600)
 
-            # Fit scaler
-            self.scaler.fit(feature_matrix)
+    async def train(self, executor: Optional[Executor] = None) -> bool:
+        """
+        Fit a new model off the event loop and swap it in atomically.
 
-            # Scale features
-            scaled_features = self.scaler.transform(feature_matrix)
+        Scoring keeps using the previous model until the new one is ready.
 
-            # Train model
-            self.model = IsolationForest(
-                n_estimators=self.config.isolation_forest_n_estimators,
-                contamination=self.config.isolation_forest_contamination,
-                random_state=self.config.isolation_forest_random_state,
-                n_jobs=-1,
-            )
+        Returns:
+            True if a new model was installed
+        """
+        if len(self.training_data) < self.config.min_samples_for_training:
+            return False
 
-            self.model.fit(scaled_features)
-            self.is_trained = True
-            self.last_trained = time.time()
+        rows = [m.to_feature_row() for m in list(self.training_data)]
+        width = len(rows[0])
+        feature_matrix = np.array([r for r in rows if len(r) == width], dtype=float)
 
-            logger.info(
-                f"Isolation Forest model trained with {len(self.training_data)} samples"
+        try:
+            loop = asyncio.get_running_loop()
+            scaler, model = await loop.run_in_executor(
+                executor, _fit_model, self.method, self._model_params(), feature_matrix
             )
-
         except Exception as e:
-            logger.error(f"Isolation Forest training error: {e}")
-            self.is_trained = False
+            logger.error(f"{self.method} training error: {e}")
+            return False
+
+        self.state = TrainedModel(
+            scaler=scaler,
+            model=model,
+            trained_at=time.time(),
+            samples=len(feature_matrix),
+        )
+        logger.info(f"{self.method} model trained with {len(feature_matrix)} samples")
+        return True
+
+    def _model_path(self, directory: str) -> Path:
+        return Path(directory) / f"{self.method}.joblib"
+
+    def save_model(self, directory: str) -> bool:
+        """Persist the current model (blocking; run via a thread)."""
+        state = self.state
+        if state is None:
+            return False
+        path = self._model_path(directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+        return True
+
+    def load_model(self, directory: str) -> bool:
+        """Load a persisted model (blocking; run via a thread)."""
+        path = self._model_path(directory)
+        if not path.exists():
+            return False
+        try:
+            state = joblib.load(path)
+        except Exception as e:
+            logger.warning(f"Could not load {self.method} model from {path}: {e}")
+            return False
+        if not isinstance(state, TrainedModel):
+            return False
+        self.state = state
+        logger.info(f"{self.method} model loaded from {path}")
+        return True
 
-    def _should_retrain(self) -> bool:
-        """Check if model should be retrained."""
-        if not self.is_trained:
-            return True
+    def add_training_sample(self, metrics: AnomalyMetrics) -> None:
+        """Add sample to training data."""
+        self.training_data.append(metrics)
 
-        time_since_training = time.time() - self.last_trained
-        return time_since_training > (self.config.retrain_interval_hours * 3600)
+
+class IsolationForestDetector(_SklearnDetector):
+    """Isolation Forest based anomaly detector."""
+
+    method = "isolation_forest"
+
+    def _model_params(self) -> Dict[str, Any]:
+        return {
+            "n_estimators": self.config.isolation_forest_n_estimators,
+            "contamination": self.config.isolation_forest_contamination,
+            "random_state": self.config.isolation_forest_random_state,
+            "n_jobs": self.config.training_n_jobs,
+        }
+
+    def _scores_from_decisions(
+        self, decisions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # decision_function is negative for outliers and positive for inliers,
+        # centred on the contamination threshold
+        anomaly_scores = np.clip(0.5 - decisions, 0.0, 1.0)
+        return anomaly_scores, decisions < 0
 
     def _calculate_risk_level(self, anomaly_score: float) -> str:
         """Calculate risk level based on anomaly score."""
@@ -264,110 +412,25 @@ class IsolationForestDetector:
             "ip_address": 0.05,
         }
 
-    def add_training_sample(self, metrics: AnomalyMetrics) -> None:
-        """Add sample to training data."""
-        self.training_data.append(metrics)
-
 
-class OneClassSVMDetector:
+class OneClassSVMDetector(_SklearnDetector):
     """One-Class SVM based anomaly detector."""
 
-    def __init__(self, config: MLModelConfig):
-        self.config = config
-        self.model = None
-        self.scaler = StandardScaler()
-        self.is_trained = False
-        self.training_data = deque(maxlen=config.min_samples_for_training * 2)
-        self.last_trained = 0
-
-    async def detect(self, metrics: AnomalyMetrics) -> AnomalyScore:
-        """Detect anomalies using One-Class SVM."""
-        if not self.is_trained or self._should_retrain():
-            await self._train_model()
-
-        if not self.is_trained:
-            return AnomalyScore(
-                is_anomaly=False,
-                confidence=0.1,
-                risk_level="low",
-                detection_method="one_class_svm",
-                feature_importance={},
-                metrics=metrics,
-            )
-
-        try:
-            feature_vector = metrics.to_feature_vector()
-            scaled_features = self.scaler.transform(feature_vector)
-
-            # Get decision function (negative = outlier)
-            decision = self.model.decision_function(scaled_features)[0]
-
-            # Convert to anomaly score (0-1 scale)
-            # decision_function returns negative for outliers, positive for inliers
-            anomaly_score = 1 / (1 + np.exp(decision))  # Sigmoid transformation
-
-            is_anomaly = decision < 0  # Negative decision = anomaly
-
-            risk_level = self._calculate_risk_level(anomaly_score)
-
-            return AnomalyScore(
-                is_anomaly=is_anomaly,
-                confidence=anomaly_score,
-                risk_level=risk_level,
-                detection_method="one_class_svm",
-                feature_importance=self._get_feature_importance(),
-                metrics=metrics,
-            )
-
-        except Exception as e:
-            logger.warning(f"One-Class SVM detection error: {e}")
-            return AnomalyScore(
-                is_anomaly=False,
-                confidence=0.0,
-                risk_level="low",
-                detection_method="one_class_svm",
-                feature_importance={},
-                metrics=metrics,
-            )
-
-    async def _train_model(self) -> None:
-        """Train One-Class SVM model."""
-        if len(self.training_data) < self.config.min_samples_for_training:
-            return
-
-        try:
-            feature_matrix = np.vstack(
-                [m.to_feature_vector()[0] for m in self.training_data]
-            )
+    method = "one_class_svm"
 
-            self.scaler.fit(feature_matrix)
-            scaled_features = self.scaler.transform(feature_matrix)
-
-            self.model = OneClassSVM(
-                nu=self.config.svm_nu,
-                kernel=self.config.svm_kernel,
-                gamma=self.config.svm_gamma,
-            )
-
-            self.model.fit(scaled_features)
-            self.is_trained = True
-            self.last_trained = time.time()
-
-            logger.info(
-                f"One-Class SVM model trained with {len(self.training_data)} samples"
-            )
-
-        except Exception as e:
-            logger.error(f"One-Class SVM training error: {e}")
-            self.is_trained = False
-
-    def _should_retrain(self) -> bool:
-        """Check if model should be retrained."""
-        if not self.is_trained:
-            return True
+    def _model_params(self) -> Dict[str, Any]:
+        return {
+            "nu": self.config.svm_nu,
+            "kernel": self.config.svm_kernel,
+            "gamma": self.config.svm_gamma,
+        }
 
-        time_since_training = time.time() - self.last_trained
-        return time_since_training > (self.config.retrain_interval_hours * 3600)
+    def _scores_from_decisions(
+        self, decisions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # decision_function returns negative for outliers, positive for inliers
+        anomaly_scores = 1 / (1 + np.exp(decisions))  # Sigmoid transformation
+        return anomaly_scores, decisions < 0
 
     def _calculate_risk_level(self, anomaly_score: float) -> str:
         """Calculate risk level based on anomaly score."""
@@ -393,10 +456,6 @@ class OneClassSVMDetector:
             "ip_address": 0.05,
         }
 
-    def add_training_sample(self, metrics: AnomalyMetrics) -> None:
-        """Add sample to training data."""
-        self.training_data.append(metrics)
-
 
 class EnsembleAnomalyDetector:
     """Ensemble anomaly detector combining multiple ML models."""
@@ -409,14 +468,38 @@ class EnsembleAnomalyDetector:
         }
         self.ensemble_weights = {"isolation_forest": 0.6, "one_class_svm": 0.4}
 
+    @property
+    def is_trained(self) -> bool:
+        return all(detector.is_trained for detector in self.detectors.values())
+
+    @property
+    def training_data(self) -> deque:
+        return self.detectors["isolation_forest"].training_data
+
+    def score_batch(
+        self, feature_matrix: np.ndarray, metrics_batch: List[AnomalyMetrics]
+    ) -> List[AnomalyScore]:
+        """Score a batch of requests with every detector and combine them."""
+        per_detector = {
+            name: detector.score_batch(feature_matrix, metrics_batch)
+            for name, detector in self.detectors.items()
+        }
+        return [
+            self._combine(
+                [(name, results[i]) for name, results in per_detector.items()],
+                metrics,
+            )
+            for i, metrics in enumerate(metrics_batch)
+        ]
+
     async def detect(self, metrics: AnomalyMetrics) -> AnomalyScore:
         """Detect anomalies using ensemble approach."""
-        results = []
-        for name, detector in self.detectors.items():
-            result = await detector.detect(metrics)
-            results.append((name, result))
+        return self.score_batch(metrics.to_feature_vector(), [metrics])[0]
 
-        # Combine results using weighted voting
+    def _combine(
+        self, results: List[Tuple[str, AnomalyScore]], metrics: AnomalyMetrics
+    ) -> AnomalyScore:
+        """Combine per-detector results using weighted voting."""
         combined_score = 0.0
         total_weight = 0.0
         anomaly_votes = 0
@@ -464,12 +547,39 @@ class EnsembleAnomalyDetector:
             metrics=metrics,
         )
 
+    def _should_retrain(self) -> bool:
+        return any(d._should_retrain() for d in self.detectors.values())
+
+    async def train(self, executor: Optional[Executor] = None) -> bool:
+        """Train every detector that is due."""
+        trained = False
+        for detector in self.detectors.values():
+            if detector._should_retrain():
+                trained = await detector.train(executor) or trained
+        return trained
+
+    def save_model(self, directory: str) -> bool:
+        return any([d.save_model(directory) for d in self.detectors.values()])
+
+    def load_model(self, directory: str) -> bool:
+        return any([d.load_model(directory) for d in self.detectors.values()])
+
     def add_training_sample(self, metrics: AnomalyMetrics) -> None:
         """Add training sample to all detectors."""
         for detector in self.detectors.values():
             detector.add_training_sample(metrics)
 
 
+def _fail_waiters(
+    batch: List[Tuple[AnomalyMetrics, Optional[asyncio.Future], bool]],
+    error: BaseException,
+) -> None:
+    """Fail the callers in ``batch`` that are still waiting for a score."""
+    for _, future, _ in batch:
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+
 class AnomalyDetectionEngine:
     """
     Main anomaly detection engine with real-time processing.
@@ -480,6 +590,11 @@ class AnomalyDetectionEngine:
     - Adaptive thresholding and model updates
     - Alert generation and risk scoring
     - Performance optimized for high-throughput
+
+    ``analyze_request`` only enqueues; a scoring loop drains the queue in
+    micro-batches of up to ``batch_size`` requests (waiting at most
+    ``batch_window_ms`` to fill one) and scores each batch with a single
+    vectorized model call.
     """
 
     def __init__(self, config: Optional[MLModelConfig] = None):
@@ -501,29 +616,45 @@ class AnomalyDetectionEngine:
             "low": 0.3,
         }
 
-        # Metrics collection
-        self.metrics_buffer = deque(maxlen=10000)
+        # Scoring queue: (metrics, result future or None, generate_alert)
+        self._score_queue: Optional[
+            asyncio.Queue[Tuple[AnomalyMetrics, Optional[asyncio.Future], bool]]
+        ] = None
         self.anomaly_history = deque(maxlen=1000)
 
         # Statistics
         self.total_requests = 0
         self.anomalies_detected = 0
         self.false_positives = 0
+        self.dropped_requests = 0
+        self.batches_scored = 0
         self.last_model_update = time.time()
 
         # Background tasks
         self._processing_task: Optional[asyncio.Task] = None
         self._training_task: Optional[asyncio.Task] = None
+        self._training_executor: Optional[Executor] = None
         self._running = False
 
-        # Thread safety
-        self._lock = asyncio.Lock()
+    @property
+    def metrics_buffer(self) -> asyncio.Queue:
+        """Queue of requests waiting to be scored."""
+        if self._score_queue is None:
+            self._score_queue = asyncio.Queue(maxsize=self.config.max_queue_size)
+        return self._score_queue
 
     async def start(self) -> None:
         """Start the anomaly detection engine."""
         if self._running:
             return
 
+        if self.config.model_directory:
+            loaded = await asyncio.to_thread(
+                self.primary_detector.load_model, self.config.model_directory
+            )
+            if loaded:
+                self.last_model_update = time.time()
+
         self._running = True
         self._processing_task = asyncio.create_task(self._processing_loop())
         self._training_task = asyncio.create_task(self._training_loop())
@@ -545,44 +676,65 @@ class AnomalyDetectionEngine:
                 except asyncio.CancelledError:
                     pass
 
+        # Requests still queued will not be scored: fail their callers
+        queued = self._drain_batch(self.metrics_buffer.qsize())
+        self.dropped_requests += len(queued)
+        _fail_waiters(queued, ServiceUnavailableError("Anomaly detection engine stopped"))
+
+        if self._training_executor is not None:
+            self._training_executor.shutdown(wait=False, cancel_futures=True)
+            self._training_executor = None
+
         logger.info("Anomaly detection engine stopped")
 
     async def analyze_request(
-        self, metrics: AnomalyMetrics, generate_alert: bool = True
-    ) -> AnomalyScore:
+        self,
+        metrics: AnomalyMetrics,
+        generate_alert: bool = True,
+        wait: bool = False,
+    ) -> Optional[AnomalyScore]:
         """
         Analyze a request for anomalies.
 
+        The request is only enqueued: the request path never waits for
+        scoring, and anomalies surface through alerts.
+
         Args:
             metrics: Request metrics to analyze
             generate_alert: Whether to generate alerts for anomalies
+            wait: Wait for the micro-batch containing this request to be
+                scored and return its result (for tests and offline use)
 
         Returns:
-            Anomaly detection result
+            Anomaly detection result when waiting; None otherwise, or when
+            the scoring queue is full and the request was shed
         """
-        async with self._lock:
-            self.total_requests += 1
-
-            # Add to buffer for batch processing
-            self.metrics_buffer.append(metrics)
-
-            # Perform real-time detection
-            result = await self.primary_detector.detect(metrics)
-
-            # Store result
-            self.anomaly_history.append(result)
-
-            # Update statistics
-            if result.is_anomaly:
-                self.anomalies_detected += 1
+        self.total_requests += 1
+        future = asyncio.get_running_loop().create_future() if wait else None
 
-                # Generate alert if requested
-                if generate_alert and result.confidence > self.alert_thresholds.get(
-                    result.risk_level, 0.5
-                ):
-                    await self._generate_alert(result)
+        try:
+            self.metrics_buffer.put_nowait((metrics, future, generate_alert))
+        except asyncio.QueueFull:
+            self.dropped_requests += 1
+            return None
 
-            return result
+        if future is None:
+            return None
+        if not self._running:
+            # No scoring loop: score inline
+            await self._process_batch(self._drain_batch())
+        return await future
+
+    def _drain_batch(
+        self, limit: Optional[int] = None
+    ) -> List[Tuple[AnomalyMetrics, Optional[asyncio.Future], bool]]:
+        """Take up to ``limit`` (default batch_size) queued requests without waiting."""
+        limit = self.config.batch_size if limit is None else limit
+        batch = []
+        queue = self.metrics_buffer
+        while len(batch) < limit and not queue.empty():
+            batch.append(queue.get_nowait())
+        return batch
 
     async def _generate_alert(self, result: AnomalyScore) -> None:
         """Generate alert for detected anomaly."""
@@ -615,17 +767,26 @@ class AnomalyDetectionEngine:
         # (email, Slack, PagerDuty, etc.)
 
     async def _processing_loop(self) -> None:
-        """Background processing loop for batch operations."""
+        """Background loop that scores queued requests in micro-batches."""
+        queue = self.metrics_buffer
+        window = self.config.batch_window_ms / 1000
+        last_cleanup = time.monotonic()
+
         while self._running:
             try:
-                await asyncio.sleep(10)  # Process every 10 seconds
+                batch = [await queue.get()]
+                batch.extend(self._drain_batch(self.config.batch_size - 1))
+
+                # Give a partly filled batch a short window to fill up
+                if len(batch) < self.config.batch_size and window > 0:
+                    await asyncio.sleep(window)
+                    batch.extend(self._drain_batch(self.config.batch_size - len(batch)))
 
-                # Batch process buffered metrics
-                if len(self.metrics_buffer) >= self.config.batch_size:
-                    await self._process_batch()
+                await self._process_batch(batch)
 
-                # Clean old history
-                await self._cleanup_history()
+                if time.monotonic() - last_cleanup > 60:
+                    await self._cleanup_history()
+                    last_cleanup = time.monotonic()
 
             except asyncio.CancelledError:
                 break
@@ -636,47 +797,110 @@ class AnomalyDetectionEngine:
         """Background training loop for model updates."""
         while self._running:
             try:
-                await asyncio.sleep(3600)  # Check every hour
-
-                # Check if models need retraining
-                if len(self.metrics_buffer) >= self.config.min_samples_for_training:
-                    await self._update_models()
+                await asyncio.sleep(self.config.retrain_check_interval_seconds)
+                await self._update_models()
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Training loop error: {e}")
 
-    async def _process_batch(self) -> None:
-        """Process a batch of buffered metrics."""
-        batch_size = min(len(self.metrics_buffer), self.config.batch_size)
-        batch = []
+    async def _process_batch(
+        self, batch: List[Tuple[AnomalyMetrics, Optional[asyncio.Future], bool]]
+    ) -> None:
+        """
+        Score a micro-batch of queued requests with one model call.
+
+        Every waiting caller is resolved: with its score, or with the
+        scoring error if the batch could not be scored or was cancelled.
+        """
+        if not batch:
+            return
 
-        # Extract batch
-        for _ in range(batch_size):
-            if self.metrics_buffer:
-                batch.append(self.metrics_buffer.popleft())
+        error: BaseException = ServiceUnavailableError("Anomaly scoring was interrupted")
+        try:
+            metrics_batch = [item[0] for item in batch]
+            try:
+                results = self._score(metrics_batch)
+            except Exception as e:
+                logger.error("anomaly_batch_scoring_failed", batch_size=len(batch), error=str(e))
+                error = e
+                return
+            self.batches_scored += 1
 
-        # Add samples to training data
-        for metrics in batch:
-            self.primary_detector.add_training_sample(metrics)
+            for (metrics, future, generate_alert), result in zip(batch, results):
+                try:
+                    self._record(metrics, result)
+                    # Generate alert if requested
+                    if (
+                        result.is_anomaly
+                        and generate_alert
+                        and result.confidence
+                        > self.alert_thresholds.get(result.risk_level, 0.5)
+                    ):
+                        await self._generate_alert(result)
+                except Exception as e:
+                    # The score stands; only its bookkeeping or alert failed
+                    logger.error("anomaly_alert_failed", error=str(e))
+
+                if future is not None and not future.done():
+                    future.set_result(result)
+
+            logger.debug(f"Processed batch of {len(batch)} metrics samples")
+        finally:
+            _fail_waiters(batch, error)
+
+    def _score(self, metrics_batch: List[AnomalyMetrics]) -> List[AnomalyScore]:
+        rows = [metrics.to_feature_row() for metrics in metrics_batch]
+        width = len(rows[0])
+        if all(len(row) == width for row in rows):
+            return self.primary_detector.score_batch(
+                np.array(rows, dtype=float), metrics_batch
+            )
+        # Mixed custom metrics: score each feature width separately
+        return [
+            self.primary_detector.score_batch(np.array([row], dtype=float), [m])[0]
+            for row, m in zip(rows, metrics_batch)
+        ]
 
-        logger.debug(f"Processed batch of {len(batch)} metrics samples")
+    def _record(self, metrics: AnomalyMetrics, result: AnomalyScore) -> None:
+        self.primary_detector.add_training_sample(metrics)
+        self.anomaly_history.append(result)
+        if result.is_anomaly:
+            self.anomalies_detected += 1
+
+    def _get_training_executor(self) -> Executor:
+        """Create the single-worker training executor on first use."""
+        if self._training_executor is None:
+            if self.config.training_executor == "process":
+                self._training_executor = ProcessPoolExecutor(max_workers=1)
+            else:
+                self._training_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="anomaly-training"
+                )
+        return self._training_executor
 
-    async def _update_models(self) -> None:
-        """Update ML models with new training data."""
+    async def _update_models(self) -> bool:
+        """Retrain models that are due and persist the result."""
         try:
-            # Force retraining if needed
-            if hasattr(self.primary_detector, "_should_retrain"):
-                if self.primary_detector._should_retrain():
-                    # Retraining is handled automatically in detect() method
-                    pass
+            if not self.primary_detector._should_retrain():
+                return False
+
+            trained = await self.primary_detector.train(self._get_training_executor())
+            if not trained:
+                return False
 
             self.last_model_update = time.time()
+            if self.config.model_directory:
+                await asyncio.to_thread(
+                    self.primary_detector.save_model, self.config.model_directory
+                )
             logger.info("ML models updated with new training data")
+            return True
 
         except Exception as e:
             logger.error(f"Model update error: {e}")
+            return False
 
     async def _cleanup_history(self) -> None:
         """Clean up old history data."""
@@ -706,7 +930,9 @@ class AnomalyDetectionEngine:
                 "anomalies_detected": self.anomalies_detected,
                 "detection_rate": detection_rate,
                 "false_positives": self.false_positives,
-                "buffer_size": len(self.metrics_buffer),
+                "buffer_size": self.metrics_buffer.qsize(),
+                "dropped_requests": self.dropped_requests,
+                "batches_scored": self.batches_scored,
             },
             "risk_distribution": dict(risk_distribution),
             "models": {
@@ -0,0 +1,571 @@
+"""
+Parallel hash-chain verification for encrypted audit trails.
+
+This module verifies the integrity of the blocks written by
+``EncryptedAuditTrail``:
+- Entry content hashes, entry hash chain links and HMAC signatures
+- Block hashes and the links between consecutive blocks
+- Block ranges verified concurrently in a process pool
+- Signed checkpoints so later runs only verify new blocks
+- Progress streamed as verification proceeds
+
+It has no dependency on the running service and can be used offline::
+
+    python -m resync.core.audit_chain_verifier --directory data/audit_logs \\
+        --key-file audit_keys.json
+
+The key file is the JSON document produced by
+``KeyManager.export_key_material()``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from cryptography.fernet import Fernet
+
+CHECKPOINT_FILE_NAME = "verification_checkpoint.json"
+
+_ENTRY_CONTENT_FIELDS = (
+    "entry_id",
+    "timestamp",
+    "event_type",
+    "user_id",
+    "resource_id",
+    "action",
+    "details",
+    "ip_address",
+    "user_agent",
+    "session_id",
+)
+
+
+def block_number(block_file: Path) -> int:
+    """Numeric id of a ``block_NNNNNN`` file, or -1 if its name has none."""
+    try:
+        return int(Path(block_file).stem.split("_", 1)[1])
+    except (IndexError, ValueError):
+        return -1
+
+
+def _block_links(sealed_chain_hash: str, block_hash: str) -> Tuple[str, ...]:
+    """
+    Values the first entry of the next block may link to.
+
+    A block's ``previous_block_hash`` seals the chain hash of its last entry,
+    and the next block's first entry continues that chain. Blocks written
+    before entries chained across blocks link to the previous block hash.
+    """
+    return (sealed_chain_hash, block_hash)
+
+
+def compute_entry_hash(entry: Dict[str, Any]) -> str:
+    """Compute the SHA-256 content hash of a serialized audit entry."""
+    content = {name: entry.get(name) for name in _ENTRY_CONTENT_FIELDS}
+    content_str = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content_str.encode()).hexdigest()
+
+
+def compute_chain_hash(previous_hash: str, hash_value: str) -> str:
+    """Compute the running chain hash for an entry."""
+    if not previous_hash:
+        return hash_value
+    return hashlib.sha256(f"{previous_hash}:{hash_value}".encode()).hexdigest()
+
+
+def compute_entry_signature(hmac_key: bytes, entry: Dict[str, Any]) -> str:
+    """Compute the HMAC signature of a serialized audit entry."""
+    content = f"{entry['entry_id']}:{entry['hash_value']}:{entry['chain_hash']}"
+    return hmac.new(hmac_key, content.encode(), hashlib.sha256).hexdigest()
+
+
+def compute_block_hash(
+    block_id: str, created_at: float, entry_hashes: List[str], previous_block_hash: str
+) -> str:
+    """Compute the hash of a block from its entry hashes."""
+    content = {
+        "block_id": block_id,
+        "created_at": created_at,
+        "entries": entry_hashes,
+        "previous_block_hash": previous_block_hash,
+    }
+    content_str = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content_str.encode()).hexdigest()
+
+
+def verify_entries(
+    entries: List[Dict[str, Any]],
+    hmac_key: Optional[bytes],
+    check_chain: bool = True,
+    check_signatures: bool = True,
+) -> List[str]:
+    """
+    Verify a contiguous run of serialized entries.
+
+    Returns:
+        List of issue descriptions (empty when the entries are intact)
+    """
+    issues: List[str] = []
+    previous_chain_hash: Optional[str] = None
+
+    for entry in entries:
+        entry_id = entry.get("entry_id", "?")
+
+        if compute_entry_hash(entry) != entry.get("hash_value"):
+            issues.append(f"entry_hash_mismatch:{entry_id}")
+
+        if check_chain:
+            if (
+                previous_chain_hash is not None
+                and entry.get("previous_hash") != previous_chain_hash
+            ):
+                issues.append(f"chain_link_broken:{entry_id}")
+            expected_chain = compute_chain_hash(
+                entry.get("previous_hash", ""), entry.get("hash_value", "")
+            )
+            if expected_chain != entry.get("chain_hash"):
+                issues.append(f"chain_hash_mismatch:{entry_id}")
+            previous_chain_hash = entry.get("chain_hash")
+
+        if check_signatures and hmac_key is not None:
+            expected_signature = compute_entry_signature(hmac_key, entry)
+            if not hmac.compare_digest(expected_signature, entry.get("signature", "")):
+                issues.append(f"signature_invalid:{entry_id}")
+
+    return issues
+
+
+@dataclass
+class BlockVerificationTask:
+    """Everything a worker process needs to verify one block."""
+
+    block_id: str
+    path: str
+    fernet_key: Optional[bytes]
+    compressed: bool
+    block_hash: str
+    previous_block_hash: str
+    created_at: float
+
+
+@dataclass
+class BlockVerificationResult:
+    """Outcome of verifying a single block."""
+
+    block_id: str
+    valid: bool
+    issues: List[str] = field(default_factory=list)
+    entries_verified: int = 0
+    first_previous_hash: str = ""
+    last_chain_hash: str = ""
+    block_hash: str = ""
+
+
+def _read_block_entries(task: BlockVerificationTask) -> List[Dict[str, Any]]:
+    """Read and decrypt a block file into serialized entries."""
+    payload = Path(task.path).read_bytes()
+    if payload[:1] == b"{":
+        # Legacy JSON block with base64-wrapped ciphertext
+        payload = base64.b64decode(json.loads(payload)["encrypted_data"])
+
+    data = Fernet(task.fernet_key).decrypt(payload)
+    if task.compressed:
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def verify_block(
+    task: BlockVerificationTask,
+    hmac_key: Optional[bytes],
+    check_chain: bool = True,
+    check_signatures: bool = True,
+) -> BlockVerificationResult:
+    """Verify one block in isolation (cross-block links are checked by the caller)."""
+    result = BlockVerificationResult(
+        block_id=task.block_id, valid=True, block_hash=task.block_hash
+    )
+
+    if task.fernet_key is None:
+        result.valid = False
+        result.issues.append(f"encryption_key_unavailable:{task.block_id}")
+        return result
+
+    try:
+        entries = _read_block_entries(task)
+    except Exception as e:
+        result.valid = False
+        result.issues.append(f"block_unreadable:{task.block_id}:{type(e).__name__}")
+        return result
+
+    result.issues.extend(
+        verify_entries(entries, hmac_key, check_chain, check_signatures)
+    )
+    result.entries_verified = len(entries)
+
+    if entries:
+        result.first_previous_hash = entries[0].get("previous_hash", "")
+        result.last_chain_hash = entries[-1].get("chain_hash", "")
+
+    if check_chain and entries and task.previous_block_hash != result.last_chain_hash:
+        result.issues.append(f"block_previous_hash_mismatch:{task.block_id}")
+
+    expected_block_hash = compute_block_hash(
+        task.block_id,
+        task.created_at,
+        [entry.get("hash_value", "") for entry in entries],
+        task.previous_block_hash,
+    )
+    if expected_block_hash != task.block_hash:
+        result.issues.append(f"block_hash_mismatch:{task.block_id}")
+
+    result.valid = not result.issues
+    return result
+
+
+def verify_block_range(
+    tasks: List[BlockVerificationTask],
+    hmac_key: Optional[bytes],
+    check_chain: bool = True,
+    check_signatures: bool = True,
+) -> List[BlockVerificationResult]:
+    """Verify a contiguous range of blocks (process pool entry point)."""
+    return [
+        verify_block(task, hmac_key, check_chain, check_signatures) for task in tasks
+    ]
+
+
+@dataclass
+class VerificationCheckpoint:
+    """Signed record of the last block whose chain was fully verified."""
+
+    block_id: str
+    block_hash: str
+    blocks_verified: int
+    entries_verified: int
+    verified_at: float
+    signature: str = ""
+
+    def _content(self) -> bytes:
+        return (
+            f"{self.block_id}:{self.block_hash}:{self.blocks_verified}:"
+            f"{self.entries_verified}:{self.verified_at!r}"
+        ).encode()
+
+    def sign(self, hmac_key: bytes) -> None:
+        """Sign the checkpoint with the audit HMAC key."""
+        self.signature = hmac.new(hmac_key, self._content(), hashlib.sha256).hexdigest()
+
+    def is_authentic(self, hmac_key: bytes) -> bool:
+        """Check the checkpoint signature."""
+        expected = hmac.new(hmac_key, self._content(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, self.signature)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional[VerificationCheckpoint]:
+        """Load a checkpoint from disk, if present."""
+        try:
+            return cls(**json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            return None
+
+    def save(self, path: Path) -> None:
+        """Persist the checkpoint atomically."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(asdict(self)), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+class ChainVerifier:
+    """
+    Verify the block chain of an audit log directory.
+
+    Block ranges are verified in parallel; cross-block links are checked once
+    all ranges have completed. When every block verifies, a signed checkpoint
+    is written so the next run only covers blocks appended since.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        key_lookup: Callable[[str], Optional[bytes]],
+        hmac_key: Optional[bytes],
+        check_chain: bool = True,
+        check_signatures: bool = True,
+        max_workers: Optional[int] = None,
+        blocks_per_task: int = 16,
+        use_processes: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.key_lookup = key_lookup
+        self.hmac_key = hmac_key
+        self.check_chain = check_chain
+        self.check_signatures = check_signatures
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.blocks_per_task = max(1, blocks_per_task)
+        self.use_processes = use_processes
+        self.checkpoint_path = self.directory / CHECKPOINT_FILE_NAME
+
+    def load_indexes(self) -> List[Dict[str, Any]]:
+        """Load block sidecar indexes in chain order."""
+        indexes = []
+        # Numeric order: block_1000000 follows block_999999
+        index_files = sorted(
+            self.directory.glob("block_*.idx"), key=lambda f: (block_number(f), f.name)
+        )
+        for index_file in index_files:
+            try:
+                indexes.append(json.loads(index_file.read_text(encoding="utf-8")))
+            except Exception:
+                indexes.append({"block_id": index_file.stem, "unreadable": True})
+        return indexes
+
+    def _load_checkpoint(
+        self, indexes: List[Dict[str, Any]], issues: List[str]
+    ) -> Optional[VerificationCheckpoint]:
+        """Load the checkpoint if it is authentic and still matches the chain."""
+        checkpoint = VerificationCheckpoint.load(self.checkpoint_path)
+        if checkpoint is None or self.hmac_key is None:
+            return None
+        if not checkpoint.is_authentic(self.hmac_key):
+            # Signed with another key (e.g. before a restart); verify from scratch
+            return None
+
+        for index in indexes:
+            if index.get("block_id") == checkpoint.block_id:
+                if index.get("block_hash") != checkpoint.block_hash:
+                    issues.append(f"checkpoint_mismatch:{checkpoint.block_id}")
+                    return None
+                return checkpoint
+
+        issues.append(f"checkpoint_block_missing:{checkpoint.block_id}")
+        return None
+
+    def _build_task(self, index: Dict[str, Any]) -> BlockVerificationTask:
+        block_id = index["block_id"]
+        return BlockVerificationTask(
+            block_id=block_id,
+            path=str(self.directory / f"{block_id}.audit"),
+            fernet_key=self.key_lookup(index.get("encryption_key_id", "")),
+            compressed=index.get("compressed", True),
+            block_hash=index.get("block_hash", ""),
+            previous_block_hash=index.get("previous_block_hash", ""),
+            created_at=index.get("created_at", 0.0),
+        )
+
+    def _create_executor(self) -> Executor:
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="audit_verify"
+        )
+
+    async def iter_verify(
+        self, incremental: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Verify the chain, yielding progress events.
+
+        Yields ``{"event": "progress", ...}`` after each completed block range
+        and a final ``{"event": "complete", ...}`` summary.
+        """
+        started = time.time()
+        issues: List[str] = []
+        indexes = await asyncio.to_thread(self.load_indexes)
+
+        checkpoint = self._load_checkpoint(indexes, issues) if incremental else None
+        start_position = 0
+        base_blocks = base_entries = 0
+        expected_links: Tuple[str, ...] = ()
+        if checkpoint is not None:
+            positions = [index.get("block_id") for index in indexes]
+            start_position = positions.index(checkpoint.block_id) + 1
+            base_blocks = checkpoint.blocks_verified
+            base_entries = checkpoint.entries_verified
+            checkpoint_index = indexes[start_position - 1]
+            expected_links = _block_links(
+                checkpoint_index.get("previous_block_hash", ""), checkpoint.block_hash
+            )
+
+        pending = indexes[start_position:]
+        for index in pending:
+            if index.get("unreadable"):
+                issues.append(f"index_unreadable:{index['block_id']}")
+        tasks = [self._build_task(index) for index in pending if not index.get("unreadable")]
+        ranges = [
+            tasks[i : i + self.blocks_per_task]
+            for i in range(0, len(tasks), self.blocks_per_task)
+        ]
+
+        results: Dict[str, BlockVerificationResult] = {}
+        if ranges:
+            loop = asyncio.get_running_loop()
+            executor = self._create_executor()
+            try:
+                futures = [
+                    loop.run_in_executor(
+                        executor,
+                        verify_block_range,
+                        block_range,
+                        self.hmac_key,
+                        self.check_chain,
+                        self.check_signatures,
+                    )
+                    for block_range in ranges
+                ]
+                for future in asyncio.as_completed(futures):
+                    for result in await future:
+                        results[result.block_id] = result
+                    yield {
+                        "event": "progress",
+                        "blocks_verified": len(results),
+                        "blocks_total": len(tasks),
+                        "entries_verified": sum(
+                            r.entries_verified for r in results.values()
+                        ),
+                    }
+            finally:
+                # Shutting down waits for running ranges (e.g. when the caller
+                # stops iterating early), so keep that off the event loop
+                await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+        # Walk the results in chain order to check cross-block links and find
+        # the longest verified prefix for the next checkpoint.
+        last_good: Optional[BlockVerificationResult] = None
+        prefix_blocks = prefix_entries = 0
+        prefix_intact = True
+        for i, task in enumerate(tasks):
+            result = results[task.block_id]
+            issues.extend(result.issues)
+            linked = True
+            if (
+                self.check_chain
+                and result.entries_verified
+                and (i > 0 or checkpoint is not None)
+                and result.first_previous_hash not in expected_links
+            ):
+                issues.append(f"block_link_broken:{task.block_id}")
+                linked = False
+            expected_links = _block_links(task.previous_block_hash, task.block_hash)
+
+            if prefix_intact and result.valid and linked:
+                last_good = result
+                prefix_blocks += 1
+                prefix_entries += result.entries_verified
+            else:
+                prefix_intact = False
+
+        if last_good is not None and self.hmac_key is not None:
+            new_checkpoint = VerificationCheckpoint(
+                block_id=last_good.block_id,
+                block_hash=last_good.block_hash,
+                blocks_verified=base_blocks + prefix_blocks,
+                entries_verified=base_entries + prefix_entries,
+                verified_at=time.time(),
+            )
+            new_checkpoint.sign(self.hmac_key)
+            await asyncio.to_thread(new_checkpoint.save, self.checkpoint_path)
+
+        yield {
+            "event": "complete",
+            "valid": not issues,
+            "issues": issues,
+            "blocks_verified": len(tasks),
+            "entries_verified": sum(r.entries_verified for r in results.values()),
+            "blocks_skipped_by_checkpoint": start_position,
+            "checkpoint_block_id": checkpoint.block_id if checkpoint else None,
+            "duration_seconds": time.time() - started,
+        }
+
+    async def verify(
+        self,
+        incremental: bool = True,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Verify the chain and return the final summary."""
+        summary: Dict[str, Any] = {}
+        async for event in self.iter_verify(incremental=incremental):
+            if event["event"] == "complete":
+                summary = event
+            elif progress_callback is not None:
+                progress_callback(event)
+        return summary
+
+
+def load_key_material(path: Path) -> tuple[Dict[str, bytes], Optional[bytes]]:
+    """
+    Load exported key material.
+
+    Returns:
+        Tuple of (Fernet keys by key ID, HMAC key)
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    keys = {
+        key_id: base64.urlsafe_b64encode(base64.b64decode(key_data))
+        for key_id, key_data in data.get("keys", {}).items()
+    }
+    hmac_key = base64.b64decode(data["hmac_key"]) if data.get("hmac_key") else None
+    return keys, hmac_key
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point for offline verification."""
+    parser = argparse.ArgumentParser(
+        description="Verify the hash chain of an encrypted audit log directory"
+    )
+    parser.add_argument(
+        "--directory", required=True, help="Audit log directory to verify"
+    )
+    parser.add_argument(
+        "--key-file", required=True, help="Key material exported by KeyManager"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument(
+        "--blocks-per-task", type=int, default=16, help="Blocks verified per task"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the checkpoint and verify every block",
+    )
+    args = parser.parse_args(argv)
+
+    keys, hmac_key = load_key_material(Path(args.key_file))
+    verifier = ChainVerifier(
+        directory=Path(args.directory),
+        key_lookup=keys.get,
+        hmac_key=hmac_key,
+        max_workers=args.workers,
+        blocks_per_task=args.blocks_per_task,
+    )
+
+    def report(event: Dict[str, Any]) -> None:
+        print(
+            f"verified {event['blocks_verified']}/{event['blocks_total']} blocks "
+            f"({event['entries_verified']} entries)",
+            file=sys.stderr,
+        )
+
+    summary = asyncio.run(
+        verifier.verify(incremental=not args.full, progress_callback=report)
+    )
+    print(json.dumps(summary, indent=2))
+    return 0 if summary.get("valid") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
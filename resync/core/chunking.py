@@ -0,0 +1,285 @@
+# resync/core/chunking.py
+"""
+Token-aware text chunking shared by the knowledge-graph and RAG ingestion paths.
+
+Text is processed line by line. Each line is encoded once, with tiktoken
+when its encoding is available and with a word-level approximation
+otherwise, and the start offset of every token is kept. A chunk is then a
+slice of the original text between two token offsets: windows and their
+overlaps are never decoded again. Cuts prefer, in order, the start of a
+heading, a paragraph, a line or a sentence within the second half of the
+window. The overlap of the next chunk starts at a sentence or line start
+when there is one.
+
+Because lines are tokenized independently, chunking a stream of segments
+gives exactly the chunks of their joined text, which is what lets
+``chunk_segments`` stream large documents in bounded memory. Many documents
+can be chunked in parallel across processes with ``chunk_documents``, which
+reuses one worker pool across calls.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+import threading
+from bisect import bisect_right
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import accumulate, repeat
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from resync.core.structured_logger import get_logger
+
+logger = get_logger(__name__)
+
+# Optional import
+try:
+    import tiktoken
+
+    _HAS_TIKTOKEN = True
+except ImportError:
+    _HAS_TIKTOKEN = False
+
+DEFAULT_ENCODING = "cl100k_base"
+DEFAULT_MAX_TOKENS = 512
+DEFAULT_OVERLAP_TOKENS = 64
+
+# Boundary priorities of the token that starts a chunk
+_SENTENCE, _LINE, _PARAGRAPH, _HEADING = 1, 2, 3, 4
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+_HEADING_LINE = re.compile(r"\s{0,3}#{1,6}\s")
+# Fallback tokens: a word or a punctuation mark, with its leading whitespace
+_FALLBACK_TOKEN = re.compile(r"\s*(?:\w+|[^\w\s])")
+_match_start = re.Match.start
+
+
+class _Tokenizer:
+    """Token start offsets of a line, with tiktoken or the fallback."""
+
+    def __init__(self, encoding: Any = None):
+        self.encoding = encoding
+        self._byte_lengths: dict[int, int] = {}
+
+    def offsets(self, line: str) -> List[int]:
+        if self.encoding is None:
+            return list(map(_match_start, _FALLBACK_TOKEN.finditer(line)))
+        tokens = self.encoding.encode_ordinary(line)
+        if not line.isascii():
+            return self.encoding.decode_with_offsets(tokens)[1]
+        # ASCII: character offsets are byte offsets, so add up token lengths
+        lengths = self._byte_lengths
+        decode = self.encoding.decode_single_token_bytes
+        sizes = []
+        for token in tokens:
+            size = lengths.get(token)
+            if size is None:
+                size = lengths[token] = len(decode(token))
+            sizes.append(size)
+        return list(accumulate(sizes[:-1], initial=0)) if sizes else []
+
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(encoding_name: str = DEFAULT_ENCODING) -> _Tokenizer:
+    """Tokenizer for ``encoding_name``, loaded once per process."""
+    if _HAS_TIKTOKEN:
+        try:
+            return _Tokenizer(tiktoken.get_encoding(encoding_name))
+        except Exception as e:  # Encoding files are downloaded on first use
+            logger.warning(
+                "tiktoken_encoding_unavailable", encoding=encoding_name, error=str(e)
+            )
+    return _Tokenizer()
+
+
+class _ChunkStream:
+    """Incremental chunker over lines; see ``chunk_segments``."""
+
+    def __init__(self, max_tokens: int, overlap_tokens: int, tokenizer: _Tokenizer):
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = max(0, min(overlap_tokens, max_tokens - 1))
+        self.tokenizer = tokenizer
+        self.text = ""
+        self.offsets: List[int] = []  # Start of each token in self.text
+        self.priority: List[int] = []  # Boundary priority of each token
+        self.start = 0  # First token of the next chunk
+        self.end = 0  # Token after the last emitted chunk
+        self._lines = 0
+        self._after_blank = False
+
+    def add_line(self, line: str) -> Iterator[str]:
+        base = len(self.text) + (1 if self._lines else 0)
+        self.text = f"{self.text}\n{line}" if self._lines else line
+        self._lines += 1
+
+        if not line.strip():
+            self._after_blank = True
+            return
+        offsets = self.tokenizer.offsets(line)
+        if not offsets:
+            return
+        priority = [0] * len(offsets)
+        for m in _SENTENCE_END.finditer(line):
+            if m.end() < len(line):
+                index = bisect_right(offsets, m.end()) - 1
+                priority[index] = max(priority[index], _SENTENCE)
+        if _HEADING_LINE.match(line):
+            priority[0] = _HEADING
+        else:
+            priority[0] = _PARAGRAPH if self._after_blank else _LINE
+        self._after_blank = False
+
+        self.offsets.extend(map(base.__add__, offsets) if base else offsets)
+        self.priority.extend(priority)
+        # A cut is final once a token after the window is known
+        while len(self.offsets) > self.start + self.max_tokens:
+            yield from self._emit()
+        # Drop consumed text, so the buffer stays within about two windows
+        if self.start >= self.max_tokens:
+            self._trim()
+
+    def finish(self) -> Iterator[str]:
+        # The tail is only emitted if it goes past the last chunk's overlap
+        if self.end < len(self.offsets) and self.text[self.offsets[self.end] :].strip():
+            chunk = self.text[self.offsets[self.start] :].strip()
+            if chunk:
+                yield chunk
+        self.start = self.end = len(self.offsets)
+
+    def _emit(self) -> Iterator[str]:
+        start, end = self.start, self.start + self.max_tokens
+        # Latest token with the best boundary in the second half of the window,
+        # else the latest word start there
+        best, cut = 0, None
+        for index in range(end, start + self.max_tokens // 2, -1):
+            if self.priority[index] > best:
+                best, cut = self.priority[index], index
+                if best == _HEADING:
+                    break
+            elif cut is None and self._word_start(index):
+                cut = index
+        end = cut or end
+
+        chunk = self.text[self.offsets[start] : self.offsets[end]].strip()
+        if chunk:
+            yield chunk
+        self.end = end
+
+        next_start = end
+        if self.overlap_tokens:
+            # Earliest boundary in the overlap, else its earliest word start
+            window = range(end - self.overlap_tokens, end)
+            next_start = next(
+                (i for i in window if self.priority[i]),
+                next((i for i in window if self._word_start(i)), window.start),
+            )
+        self.start = max(next_start, start + 1)
+
+    def _word_start(self, index: int) -> bool:
+        offset = self.offsets[index]
+        return offset == 0 or self.text[offset].isspace() or self.text[offset - 1].isspace()
+
+    def _trim(self) -> None:
+        shift = self.offsets[self.start]
+        self.text = self.text[shift:]
+        self.offsets = [offset - shift for offset in self.offsets[self.start :]]
+        self.priority = self.priority[self.start :]
+        self.end -= self.start
+        self.start = 0
+
+
+def chunk_segments(
+    segments: Iterable[str],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    encoding_name: str = DEFAULT_ENCODING,
+) -> Iterator[str]:
+    """
+    Chunks a stream of text segments, joined by newlines, without joining them.
+
+    Yields exactly what ``chunk_text("\\n".join(segments))`` would, while
+    holding about one chunk plus the current line in memory.
+    """
+    stream = _ChunkStream(max_tokens, overlap_tokens, get_tokenizer(encoding_name))
+    for segment in segments:
+        for line in segment.split("\n"):
+            yield from stream.add_line(line)
+    yield from stream.finish()
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    encoding_name: str = DEFAULT_ENCODING,
+) -> Iterator[str]:
+    """
+    Chunk text in a token-aware way, respecting heading, paragraph and
+    sentence boundaries and applying overlap.
+    """
+    if not text:
+        return iter(())
+    return chunk_segments([text], max_tokens, overlap_tokens, encoding_name)
+
+
+def _chunk_list(
+    text: str, max_tokens: int, overlap_tokens: int, encoding_name: str
+) -> List[str]:
+    return list(chunk_text(text, max_tokens, overlap_tokens, encoding_name))
+
+
+# Worker pool shared by chunk_documents calls, started on first use
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared chunking pool, restarted if ``workers`` changed."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                # Work already submitted to the old pool still completes
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_chunking_pool() -> None:
+    """Stop the shared chunking pool; the next parallel call starts a new one."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        pool, _pool, _pool_workers = _pool, None, 0
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def chunk_documents(
+    texts: Sequence[str],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    encoding_name: str = DEFAULT_ENCODING,
+    max_workers: Optional[int] = None,
+    min_parallel_chars: int = 1 << 20,
+    executor: Optional[Executor] = None,
+) -> List[List[str]]:
+    """
+    Chunks of each text, in order, computed across worker processes.
+
+    Small batches (under ``min_parallel_chars`` in total) are chunked in
+    this process, where starting workers would cost more than it saves.
+    Larger ones run on ``executor`` when given, otherwise on a module-level
+    pool of ``max_workers`` processes kept between calls.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    args = (repeat(max_tokens), repeat(overlap_tokens), repeat(encoding_name))
+    if workers < 2 or len(texts) < 2 or sum(map(len, texts)) < min_parallel_chars:
+        return list(map(_chunk_list, texts, *args))
+    pool = executor if executor is not None else _get_pool(workers)
+    chunksize = max(1, len(texts) // (workers * 4))
+    return list(pool.map(_chunk_list, texts, *args, chunksize=chunksize))
@@ -1,41 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
 import logging
-from typing import cast
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
 
-logger = logging.getLogger(__name__)
+from watchfiles import awatch
 
-# Lazy imports to avoid circular dependencies
-def _get_container():
-    """Lazy import of container."""
-    from resync.core.di_container import container
-    return container
+from resync.core.interfaces import IAgentManager, IConnectionManager
 
-def _get_interfaces():
-    """Lazy import of interfaces."""
-    from resync.core.interfaces import IAgentManager, IConnectionManager
-    return IAgentManager, IConnectionManager
+logger = logging.getLogger(__name__)
 
 
-async def handle_config_change() -> None:
+async def handle_config_change(
+    agent_manager: IAgentManager,
+    connection_manager: Optional[IConnectionManager] = None,
+) -> None:
     """
     Handles the reloading of agent configurations and notifies clients.
     """
-    try:
-        # Resolve dependencies from the DI container (lazy imports)
-        from resync.core.agent_manager import AgentManager
-        from resync.core.connection_manager import ConnectionManager
-
-        container = _get_container()
-        IAgentManager, IConnectionManager = _get_interfaces()
-
-        agent_manager = cast(AgentManager, container.get(IAgentManager))
-        connection_manager = cast(ConnectionManager, container.get(IConnectionManager))
-    except Exception as e:
-        logger.error("Failed to resolve dependencies from DI container", error=str(e), exc_info=True)
-        return
-
     logger.info("Configuration change detected. Reloading agents...")
     try:
         # Trigger the agent manager to reload its configuration
@@ -46,6 +31,9 @@ async def handle_config_change() -> None:
         agents = await agent_manager.get_all_agents()
         agent_list = [{"id": agent.id, "name": agent.name} for agent in agents]
 
+        if connection_manager is None:
+            return
+
         # Notify all connected WebSocket clients about the change
         await connection_manager.broadcast(
             json.dumps(
@@ -59,4 +47,47 @@ async def handle_config_change() -> None:
         logger.info("Broadcasted config update to all clients.")
 
     except Exception as e:
-        logger.error("error_handling_config_change", error=str(e), exc_info=True)
+        logger.error(f"Error handling agent config change: {e}", exc_info=True)
+
+
+async def watch_agent_config(
+    agent_manager: IAgentManager,
+    connection_manager: Optional[IConnectionManager] = None,
+    config_path: Path | None = None,
+    on_change: Optional[Callable[[], Awaitable[None]]] = None,
+    debounce_ms: int = 500,
+) -> None:
+    """
+    Reloads agents whenever the agent config file changes, until cancelled.
+
+    The parent directory is watched, so editors that replace the file
+    instead of writing it in place are handled too. Reloads run one at a
+    time; in-flight chats keep the agent instance they already hold.
+    ``on_change`` defaults to reloading ``agent_manager`` and notifying the
+    clients of ``connection_manager``.
+    """
+    if on_change is None:
+        on_change = functools.partial(
+            handle_config_change, agent_manager, connection_manager
+        )
+    if config_path is None:
+        from resync.settings import settings
+
+        config_path = Path(
+            getattr(settings, "AGENT_CONFIG_PATH", None)
+            or Path(settings.BASE_DIR) / "config" / "agents.json"
+        )
+    config_path = Path(config_path).resolve()
+    if not config_path.parent.is_dir():
+        logger.warning(f"Agent config directory not found: {config_path.parent}")
+        return
+
+    logger.info(f"Watching agent config file: {config_path}")
+    try:
+        async for changes in awatch(config_path.parent, debounce=debounce_ms):
+            if any(Path(path).resolve() == config_path for _, path in changes):
+                await on_change()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Agent config watcher stopped: {e}", exc_info=True)
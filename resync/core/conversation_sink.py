@@ -0,0 +1,325 @@
+# resync/core/conversation_sink.py
+"""
+Write-behind persistence of chat conversations and coalesced IA auditing.
+
+The chat WebSocket loop hands each finished interaction to a
+``ConversationSink`` and goes back to reading the next message. A single
+worker writes queued conversations to the knowledge graph in batches, and
+reports what it stored to an ``AuditorScheduler``, which turns any number
+of triggers into one auditor sweep per interval or per N new memories.
+Neither Neo4j nor the LLM auditor is on the per-message path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from resync.core.interfaces import IKnowledgeGraph
+from resync.core.metrics import runtime_metrics
+from resync.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Conversation:
+    """One user query and agent response, as passed to add_conversation."""
+
+    user_query: str
+    agent_response: str
+    agent_id: str
+    context: Dict[str, Any] = field(default_factory=dict)
+
+
+class AuditorScheduler:
+    """
+    Coalesces auditor triggers into periodic sweeps.
+
+    ``notify`` records new memories without doing any work. A sweep runs
+    once ``batch_threshold`` memories are pending, or ``interval`` seconds
+    after the previous check if any are pending at all. Sweeps never
+    overlap; triggers that arrive during a sweep are folded into the next.
+    """
+
+    def __init__(
+        self,
+        audit: Callable[[], Awaitable[Any]],
+        interval: Optional[float] = None,
+        batch_threshold: Optional[int] = None,
+    ):
+        self.audit = audit
+        self.interval = (
+            interval
+            if interval is not None
+            else getattr(settings, "AUDITOR_SWEEP_INTERVAL_SECONDS", 60.0)
+        )
+        self.batch_threshold = batch_threshold or getattr(
+            settings, "AUDITOR_SWEEP_BATCH_THRESHOLD", 50
+        )
+        self.pending = 0
+        self.sweeps = 0
+
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler loop is alive on the current event loop."""
+        return _running_here(self._task)
+
+    def start(self) -> None:
+        """Start the scheduler loop."""
+        if not self.running:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduler; a sweep in progress is cancelled."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self, count: int = 1) -> None:
+        """Record ``count`` new memories for the next sweep."""
+        self.pending += count
+        if self.pending > count:
+            runtime_metrics.auditor_triggers_coalesced.increment(count)
+        if self.pending >= self.batch_threshold:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self.pending:
+                continue
+
+            logger.info(f"Running IA auditor sweep for {self.pending} new memories")
+            self.pending = 0
+            self.sweeps += 1
+            runtime_metrics.auditor_sweeps.increment()
+            try:
+                await self.audit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"IA auditor sweep failed: {e}", exc_info=True)
+
+
+class ConversationSink:
+    """
+    Batches conversation writes to the knowledge graph behind the chat loop.
+
+    ``submit`` only queues the conversation. A worker writes batches of up
+    to ``batch_size`` conversations, or whatever arrived within
+    ``flush_interval`` seconds of the first one, through
+    ``add_conversations`` when the knowledge graph has it. Failed batches
+    are retried with exponential backoff and then dropped with an error.
+    When the queue is full, ``submit`` waits for room, so a Neo4j outage
+    backs up into the chat loop only after ``max_queue_size`` conversations.
+    """
+
+    def __init__(
+        self,
+        knowledge_graph: IKnowledgeGraph,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_queue_size: Optional[int] = None,
+        retry_attempts: int = 3,
+        retry_delay: float = 0.5,
+        on_stored: Optional[Callable[[int], None]] = None,
+    ):
+        self.knowledge_graph = knowledge_graph
+        self.batch_size = max(
+            1, batch_size or getattr(settings, "CONVERSATION_SINK_BATCH_SIZE", 50)
+        )
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else getattr(settings, "CONVERSATION_SINK_FLUSH_INTERVAL_SECONDS", 0.5)
+        )
+        self.max_queue_size = max_queue_size or getattr(
+            settings, "CONVERSATION_SINK_MAX_QUEUE_SIZE", 10000
+        )
+        self.retry_attempts = max(1, retry_attempts)
+        self.retry_delay = retry_delay
+        self.on_stored = on_stored
+        self.queue: asyncio.Queue[Conversation] = asyncio.Queue(
+            maxsize=self.max_queue_size
+        )
+
+        # Statistics
+        self.batches_written = 0
+        self.conversations_written = 0
+        self.conversations_dropped = 0
+
+        self._in_flight: List[Conversation] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker is alive on the current event loop."""
+        return _running_here(self._task)
+
+    def start(self) -> None:
+        """Start the write worker."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker and write whatever is still queued."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._in_flight:
+            await self._write(self._in_flight, attempts=1)
+            self._in_flight = []
+        await self.flush()
+
+    async def submit(self, conversation: Conversation) -> None:
+        """Queue a conversation; waits only while the queue is full."""
+        if self.queue.full():
+            logger.warning(
+                "Conversation queue is full; waiting for the knowledge graph"
+            )
+        await self.queue.put(conversation)
+        runtime_metrics.conversation_queue_depth.set(self.queue.qsize())
+
+    async def flush(self) -> None:
+        """Write everything queued right now."""
+        while not self.queue.empty():
+            await self._write(self._drain(self.batch_size), attempts=1)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get write statistics."""
+        return {
+            "queued": self.queue.qsize(),
+            "batches_written": self.batches_written,
+            "conversations_written": self.conversations_written,
+            "conversations_dropped": self.conversations_dropped,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                batch = await self._next_batch()
+                if batch:
+                    self._in_flight = batch
+                    await self._write(batch)
+                    self._in_flight = []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Conversation sink error: {e}", exc_info=True)
+                self._in_flight = []
+
+    async def _next_batch(self) -> List[Conversation]:
+        """Wait for a conversation, then collect more for up to flush_interval."""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            batch.extend(self._drain(self.batch_size - len(batch)))
+            if len(batch) >= self.batch_size:
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        runtime_metrics.conversation_queue_depth.set(self.queue.qsize())
+        return batch
+
+    def _drain(self, limit: int) -> List[Conversation]:
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    async def _write(
+        self, batch: List[Conversation], attempts: Optional[int] = None
+    ) -> bool:
+        attempts = attempts or self.retry_attempts
+        total = len(batch)
+        # _store removes what it has written, so retries (and stop() after
+        # a cancel) only write the rest
+        pending = batch
+        for attempt in range(attempts):
+            try:
+                await self._store(pending)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Failed to store {len(pending)} conversations "
+                    f"(attempt {attempt + 1}/{attempts}): {e}"
+                )
+                if attempt + 1 < attempts:
+                    await asyncio.sleep(self.retry_delay * (2**attempt))
+                continue
+
+            self.batches_written += 1
+            self._stored(total)
+            runtime_metrics.conversation_batch_size.observe(total)
+            return True
+
+        logger.error(
+            f"Dropping {len(pending)} conversations after {attempts} attempts"
+        )
+        self._stored(total - len(pending))
+        self.conversations_dropped += len(pending)
+        runtime_metrics.conversation_write_failures.increment(len(pending))
+        return False
+
+    async def _store(self, pending: List[Conversation]) -> None:
+        add_conversations = getattr(self.knowledge_graph, "add_conversations", None)
+        if len(pending) > 1 and add_conversations is not None:
+            await add_conversations([asdict(c) for c in pending])
+            pending.clear()
+            return
+        while pending:
+            conversation = pending[0]
+            await self.knowledge_graph.add_conversation(
+                user_query=conversation.user_query,
+                agent_response=conversation.agent_response,
+                agent_id=conversation.agent_id,
+                context=conversation.context,
+            )
+            pending.pop(0)
+
+    def _stored(self, count: int) -> None:
+        if not count:
+            return
+        self.conversations_written += count
+        runtime_metrics.conversations_persisted.increment(count)
+        if self.on_stored:
+            self.on_stored(count)
+
+
+def _running_here(task: Optional[asyncio.Task]) -> bool:
+    """A worker task is only usable from the loop it was created on."""
+    if task is None or task.done():
+        return False
+    try:
+        return task.get_loop() is asyncio.get_running_loop()
+    except RuntimeError:
+        return False
@@ -4,7 +4,7 @@ Distributed Tracing System with OpenTelemetry and Jaeger.
 This module provides comprehensive distributed tracing capabilities including:
 - Automatic instrumentation of HTTP requests, database calls, and async operations
 - Context propagation across service boundaries
-- Intelligent sampling strategies
+- Intelligent sampling strategies (head-based or tail-based)
 - Integration with Jaeger for trace visualization
 - Custom span creation for business logic tracking
 - Performance monitoring of traced operations
@@ -19,16 +19,24 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import functools
+import threading
 import time
+from collections import OrderedDict
 from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor, TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.trace.sampling import Sampler, SamplingResult, Decision
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_ON,
+    Decision,
+    Sampler,
+    SamplingResult,
+)
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 try:
@@ -181,6 +189,226 @@ class IntelligentSampler(Sampler):
             self.latency_threshold = 0.9 * self.latency_threshold + 0.1 * latency
 
 
+@dataclass
+class TailSamplingPolicy:
+    """
+    Rules applied when a trace ends to decide whether it is exported.
+
+    Rules are checked in order: errors, slow traces, route rules, then the
+    baseline rate. Route rules map a route prefix (matched against
+    ``http.route``, ``http.target`` or ``http_url`` of the root span) to a
+    keep probability, so ``{"/health": 0.0, "/api/v1/chat": 1.0}`` drops
+    health checks and keeps every chat request.
+    """
+
+    keep_errors: bool = True
+    latency_threshold_ms: float = 1000.0
+    route_rules: Dict[str, float] = field(default_factory=dict)
+    baseline_rate: float = 0.01
+
+    def decide(
+        self,
+        root: ReadableSpan,
+        has_error: bool,
+        baseline_rate: Optional[float] = None,
+    ) -> Tuple[bool, str]:
+        """
+        Decide whether to keep a finished trace.
+
+        Returns:
+            Tuple of (keep, reason)
+        """
+        if has_error and self.keep_errors:
+            return True, "error"
+
+        duration_ms = (root.end_time - root.start_time) / 1_000_000
+        if duration_ms >= self.latency_threshold_ms:
+            return True, "latency"
+
+        rate = self.baseline_rate if baseline_rate is None else baseline_rate
+        reason = "baseline"
+        if self.route_rules:
+            attributes = root.attributes or {}
+            route = (
+                attributes.get("http.route")
+                or attributes.get("http.target")
+                or attributes.get("http_url")
+            )
+            if route:
+                path = urlparse(str(route)).path or str(route)
+                for prefix, route_rate in self.route_rules.items():
+                    if path.startswith(prefix):
+                        rate, reason = route_rate, "route"
+                        break
+
+        # Use the low 64 bits of the trace id for consistent sampling
+        keep = (root.context.trace_id & 0xFFFFFFFFFFFFFFFF) < rate * (1 << 64)
+        return keep, reason
+
+
+class SpanRingBuffer:
+    """
+    Fixed-capacity buffer of finished spans for a single trace.
+
+    Slots are allocated once; when a trace produces more spans than the
+    capacity, the oldest spans are overwritten (the root span always ends
+    last, so it is never lost).
+    """
+
+    __slots__ = ("_slots", "_capacity", "_next", "_count", "has_error", "dropped")
+
+    def __init__(self, capacity: int):
+        self._slots: List[Optional[ReadableSpan]] = [None] * capacity
+        self._capacity = capacity
+        self._next = 0
+        self._count = 0
+        self.has_error = False
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, span: ReadableSpan) -> None:
+        """Add a span, overwriting the oldest one when full."""
+        if self._count == self._capacity:
+            self.dropped += 1
+        else:
+            self._count += 1
+        self._slots[self._next] = span
+        self._next = (self._next + 1) % self._capacity
+        if span.status.status_code is StatusCode.ERROR:
+            self.has_error = True
+
+    def drain(self) -> List[ReadableSpan]:
+        """Return buffered spans oldest first and release the slots."""
+        start = (self._next - self._count) % self._capacity
+        spans = [
+            self._slots[(start + i) % self._capacity] for i in range(self._count)
+        ]
+        self._slots = []
+        self._count = 0
+        return spans  # type: ignore[return-value]
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Span processor that buffers spans per trace and samples at trace end.
+
+    Every span is recorded, but spans are only held in a per-trace
+    :class:`SpanRingBuffer` until the local root span ends. The policy then
+    decides from the whole trace (errors, latency, route) and only kept
+    traces are handed to the wrapped export processor, which batches them.
+    Late spans of already-decided traces follow the recorded decision.
+    """
+
+    def __init__(
+        self,
+        export_processor: SpanProcessor,
+        policy: Optional[TailSamplingPolicy] = None,
+        max_spans_per_trace: int = 256,
+        max_pending_traces: int = 10_000,
+        sampler: Optional[IntelligentSampler] = None,
+    ):
+        self.export_processor = export_processor
+        self.policy = policy or TailSamplingPolicy()
+        self.max_spans_per_trace = max_spans_per_trace
+        self.max_pending_traces = max_pending_traces
+        self.sampler = sampler
+
+        self._pending: "OrderedDict[int, SpanRingBuffer]" = OrderedDict()
+        self._decided: "OrderedDict[int, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats: Dict[str, int] = {
+            "traces_kept": 0,
+            "traces_dropped": 0,
+            "traces_evicted": 0,
+            "spans_exported": 0,
+            "spans_overwritten": 0,
+        }
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        """Nothing to do until spans end."""
+
+    def on_end(self, span: ReadableSpan) -> None:
+        """Buffer the span and decide the trace when its local root ends."""
+        trace_id = span.context.trace_id
+        is_root = span.parent is None or span.parent.is_remote
+
+        with self._lock:
+            decided = self._decided.get(trace_id)
+            if decided is not None:
+                if decided:
+                    self.stats["spans_exported"] += 1
+                    self.export_processor.on_end(span)
+                return
+
+            buffer = self._pending.get(trace_id)
+            if buffer is None:
+                buffer = SpanRingBuffer(self.max_spans_per_trace)
+                self._pending[trace_id] = buffer
+                # Bound memory: decide the oldest unfinished traces early
+                while len(self._pending) > self.max_pending_traces:
+                    _, oldest = self._pending.popitem(last=False)
+                    self.stats["traces_evicted"] += 1
+                    spans = oldest.drain()
+                    if spans:
+                        self._finish(spans[-1].context.trace_id, oldest, spans)
+            buffer.append(span)
+
+            if is_root:
+                del self._pending[trace_id]
+                self._finish(trace_id, buffer, buffer.drain(), root=span)
+
+    def _finish(
+        self,
+        trace_id: int,
+        buffer: SpanRingBuffer,
+        spans: List[ReadableSpan],
+        root: Optional[ReadableSpan] = None,
+    ) -> None:
+        """Apply the policy to a trace and export it if kept (lock held)."""
+        root = root or spans[-1]
+        baseline = None
+        if self.sampler is not None:
+            baseline = self.sampler._calculate_adaptive_rate()
+        keep, _reason = self.policy.decide(root, buffer.has_error, baseline)
+
+        if self.sampler is not None:
+            self.sampler.record_request(
+                has_error=buffer.has_error,
+                latency=(root.end_time - root.start_time) / 1e9,
+            )
+
+        self._decided[trace_id] = keep
+        if len(self._decided) > self.max_pending_traces:
+            self._decided.popitem(last=False)
+
+        self.stats["spans_overwritten"] += buffer.dropped
+        if keep:
+            self.stats["traces_kept"] += 1
+            self.stats["spans_exported"] += len(spans)
+            for buffered in spans:
+                self.export_processor.on_end(buffered)
+        else:
+            self.stats["traces_dropped"] += 1
+
+    @property
+    def pending_traces(self) -> int:
+        """Number of traces still waiting for their root span."""
+        return len(self._pending)
+
+    def shutdown(self) -> None:
+        """Drop unfinished traces and shut down the export processor."""
+        with self._lock:
+            self._pending.clear()
+        self.export_processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Flush kept spans through the export processor."""
+        return self.export_processor.force_flush(timeout_millis)
+
+
 @dataclass
 class TraceConfiguration:
     """Configuration for distributed tracing system."""
@@ -197,6 +425,14 @@ class TraceConfiguration:
     adaptive_sampling: bool = True
     max_sampling_rate: float = 1.0
 
+    # "head" decides when a trace starts; "tail" buffers spans and decides
+    # at trace end (sampling_rate then applies to traces no rule keeps)
+    sampling_mode: str = "head"
+    tail_latency_threshold_ms: float = 1000.0
+    tail_route_rules: Dict[str, float] = field(default_factory=dict)
+    tail_max_spans_per_trace: int = 256
+    tail_max_pending_traces: int = 10_000
+
     # Performance configuration
     max_batch_size: int = 512
     export_timeout_seconds: int = 30
@@ -209,6 +445,7 @@ class TraceConfiguration:
     auto_instrument_external_calls: bool = True
 
     # Custom configuration
+    span_exporter: Optional[Any] = None  # Overrides the Jaeger exporter
     custom_span_processors: List[Any] = field(default_factory=list)
     custom_instrumentations: List[Any] = field(default_factory=list)
 
@@ -234,6 +471,7 @@ class DistributedTracingManager:
         self.tracer_provider: Optional[TracerProvider] = None
         self.tracer: Optional[trace.Tracer] = None
         self.jaeger_exporter: Optional[JaegerExporter] = None
+        self.tail_processor: Optional[TailSamplingSpanProcessor] = None
 
         # Instrumentation state
         self._instrumented = False
@@ -263,32 +501,54 @@ class DistributedTracingManager:
         self.tracer_provider = TracerProvider()
 
         # Configure sampling
+        adaptive_sampler: Optional[IntelligentSampler] = None
         if self.config.adaptive_sampling:
-            sampler = IntelligentSampler(
+            adaptive_sampler = IntelligentSampler(
                 self.config.sampling_rate, self.config.max_sampling_rate
             )
+            sampler = adaptive_sampler
         else:
-            from opentelemetry.sdk.trace.sampling import TraceIdRatioBasedSampler
+            from opentelemetry.sdk.trace.sampling import TraceIdRatioBased
 
-            sampler = TraceIdRatioBasedSampler(self.config.sampling_rate)
+            sampler = TraceIdRatioBased(self.config.sampling_rate)
 
-        self.tracer_provider.sampler = sampler
+        # Tail sampling records every span and decides when the trace ends
+        tail_sampling = self.config.sampling_mode == "tail"
+        self.tracer_provider.sampler = ALWAYS_ON if tail_sampling else sampler
 
         # Configure Jaeger exporter
-        self.jaeger_exporter = JaegerExporter(
-            agent_host_name=urlparse(self.config.jaeger_endpoint).hostname,
-            agent_port=int(urlparse(self.config.jaeger_endpoint).port or 14268),
-            collector_endpoint=self.config.jaeger_endpoint,
-        )
+        if self.config.span_exporter is not None:
+            self.jaeger_exporter = self.config.span_exporter
+        else:
+            self.jaeger_exporter = JaegerExporter(
+                agent_host_name=urlparse(self.config.jaeger_endpoint).hostname,
+                agent_port=int(urlparse(self.config.jaeger_endpoint).port or 14268),
+                collector_endpoint=self.config.jaeger_endpoint,
+            )
 
         # Add span processors
-        span_processor = BatchSpanProcessor(
+        span_processor: SpanProcessor = BatchSpanProcessor(
             self.jaeger_exporter,
+            max_queue_size=self.config.max_queue_size,
             max_export_batch_size=self.config.max_batch_size,
             export_timeout_millis=self.config.export_timeout_seconds * 1000,
             schedule_delay_millis=5000,
         )
 
+        if tail_sampling:
+            self.tail_processor = TailSamplingSpanProcessor(
+                span_processor,
+                policy=TailSamplingPolicy(
+                    latency_threshold_ms=self.config.tail_latency_threshold_ms,
+                    route_rules=dict(self.config.tail_route_rules),
+                    baseline_rate=self.config.sampling_rate,
+                ),
+                max_spans_per_trace=self.config.tail_max_spans_per_trace,
+                max_pending_traces=self.config.tail_max_pending_traces,
+                sampler=adaptive_sampler,
+            )
+            span_processor = self.tail_processor
+
         self.tracer_provider.add_span_processor(span_processor)
 
         # Add console processor for development
@@ -398,7 +658,10 @@ class DistributedTracingManager:
     @contextlib.contextmanager
     def trace_context(self, operation_name: str, **attributes):
         """Context manager for creating trace spans."""
-        with self.tracer.start_as_span(operation_name, attributes=attributes) as span:
+        start_time = time.perf_counter()
+        with self.tracer.start_as_current_span(
+            operation_name, attributes=attributes, record_exception=False
+        ) as span:
             # Store trace context
             if span.get_span_context().is_valid:
                 trace_id = format(span.get_span_context().trace_id, "032x")
@@ -422,7 +685,8 @@ class DistributedTracingManager:
             finally:
                 # Update span with performance metrics
                 span.set_attribute(
-                    "performance.duration_ms", span.end_time - span.start_time
+                    "performance.duration_ms",
+                    (time.perf_counter() - start_time) * 1000,
                 )
 
     def trace_method(self, operation_name: Optional[str] = None):
@@ -524,8 +788,10 @@ class DistributedTracingManager:
 
     def create_child_span(self, parent_span: trace.Span, name: str, **attributes):
         """Create a child span from a parent span."""
-        with self.tracer.start_as_span(
-            name, parent=parent_span, attributes=attributes
+        with self.tracer.start_as_current_span(
+            name,
+            context=trace.set_span_in_context(parent_span),
+            attributes=attributes,
         ) as child_span:
             self.trace_metrics["spans_created"] += 1
             return child_span
@@ -587,10 +853,19 @@ class DistributedTracingManager:
                 "export_errors": self.trace_metrics["export_errors"],
                 "sampling_decisions": self.trace_metrics["sampling_decisions"],
             },
+            "tail_sampling": (
+                {
+                    **self.tail_processor.stats,
+                    "pending_traces": self.tail_processor.pending_traces,
+                }
+                if self.tail_processor
+                else None
+            ),
             "configuration": {
                 "jaeger_endpoint": self.config.jaeger_endpoint,
                 "sampling_rate": self.config.sampling_rate,
                 "adaptive_sampling": self.config.adaptive_sampling,
+                "sampling_mode": self.config.sampling_mode,
                 "auto_instrumentation": {
                     "http": self.config.auto_instrument_http,
                     "database": self.config.auto_instrument_db,
@@ -0,0 +1,432 @@
+# resync/core/embedding_service.py
+"""
+Shared asynchronous embedding service.
+
+The knowledge graph, the RAG retriever and RAG ingestion all embed text
+through one ``AsyncEmbeddingService``. Concurrent requests are grouped into
+micro-batches: a worker collects the texts that arrive within ``max_wait``
+seconds of each other, up to ``batch_size``, and embeds them in one API
+call. Embeddings are cached by a hash of model, dimension and text, in
+memory and in SQLite, so a text is only sent to the API once across restarts, and
+identical texts requested at the same time share one result. Without an
+OpenAI key the service returns deterministic hash-based vectors, so
+development and CI work offline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from resync.core.metrics import runtime_metrics
+from resync.core.structured_logger import get_logger
+from resync.settings import settings
+
+# OpenAI (production)
+try:
+    from openai import AsyncOpenAI  # openai>=1.x
+
+    _HAS_OPENAI = True
+except ImportError:
+    _HAS_OPENAI = False
+
+logger = get_logger(__name__)
+
+# SQLite limits the number of parameters in one statement
+_SQLITE_MAX_PARAMS = 500
+
+
+def hash_embedding(text: str, dim: int) -> List[float]:
+    """
+    Deterministic embedding vector from the SHA-256 of ``text``.
+
+    Not semantic, but stable: the fallback for development and CI
+    environments without an embedding API.
+    """
+    buf = [0.0] * dim
+    h = hashlib.sha256(text.encode("utf-8")).digest()
+    # espalha 32 bytes ao longo do vetor
+    for i, b in enumerate(h):
+        buf[(i * 64) % dim] = b / 255.0
+    return buf
+
+
+def embedding_key(model: str, dim: int, text: str) -> str:
+    """Cache key of the ``dim``-dimensional embedding of ``text`` by ``model``."""
+    return hashlib.sha256(f"{model}\x00{dim}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def default_model() -> str:
+    """Embedding model configured for the process."""
+    return getattr(
+        settings, "EMBED_MODEL", os.getenv("EMBED_MODEL", "text-embedding-3-small")
+    )
+
+
+def default_dim() -> int:
+    """Embedding dimension configured for the process."""
+    return int(getattr(settings, "EMBED_DIM", os.getenv("EMBED_DIM", "1536")))
+
+
+def supports_dimensions(model: str) -> bool:
+    """Whether the embeddings API accepts ``dimensions`` for ``model``."""
+    # Only the text-embedding-3 family can shorten its vectors
+    return model.startswith("text-embedding-3")
+
+
+class SQLiteEmbeddingCache:
+    """Embeddings persisted in SQLite as float32 blobs, keyed by text hash."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, array]:
+        """Stored embeddings for whichever of ``keys`` are present."""
+        found: Dict[str, array] = {}
+        with self._lock:
+            for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                chunk = keys[start : start + _SQLITE_MAX_PARAMS]
+                rows = self._conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN"
+                    f" ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector
+        return found
+
+    def put_many(self, items: Dict[str, array]) -> None:
+        """Insert or replace embeddings."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                [(key, vector.tobytes(), now) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        """Number of stored embeddings."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class AsyncEmbeddingService:
+    """
+    Micro-batching, cached text embedder.
+
+    ``embed`` and ``embed_batch`` return cached embeddings right away and
+    queue the rest. A worker embeds queued texts in API calls of up to
+    ``batch_size`` texts, with at most ``max_concurrent_calls`` calls in
+    flight; new texts keep queueing while calls are running, so batches
+    grow with load. A failed call fails the requests waiting on it; nothing
+    is cached for them and the next request for the same text retries.
+
+    The worker and pending requests belong to the event loop that created
+    them; the service rebinds itself when used from another loop.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        dim: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        max_concurrent_calls: Optional[int] = None,
+        memory_cache_size: Optional[int] = None,
+        cache_path: str | Path | None = None,
+        client: Any = None,
+    ):
+        self.model = model or default_model()
+        self.dim = dim or default_dim()
+        self.batch_size = max(1, batch_size or getattr(settings, "EMBEDDING_BATCH_SIZE", 128))
+        self.max_wait = (
+            max_wait
+            if max_wait is not None
+            else getattr(settings, "EMBEDDING_BATCH_MAX_WAIT_SECONDS", 0.005)
+        )
+        self.max_concurrent_calls = max(
+            1, max_concurrent_calls or getattr(settings, "EMBEDDING_MAX_CONCURRENT_CALLS", 4)
+        )
+        self.memory_cache_size = (
+            memory_cache_size
+            if memory_cache_size is not None
+            else getattr(settings, "EMBEDDING_MEMORY_CACHE_SIZE", 2048)
+        )
+        self.cache_path = Path(
+            cache_path
+            or getattr(settings, "EMBEDDING_CACHE_PATH", None)
+            or Path(getattr(settings, "BASE_DIR", ".")) / "embedding_cache.db"
+        )
+
+        if client is None and _HAS_OPENAI and os.getenv("OPENAI_API_KEY"):
+            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self._client = client
+
+        # Statistics
+        self.api_calls = 0
+        self.texts_embedded = 0
+        self.cache_hits = 0
+
+        # float32 arrays take a fifth of the memory of lists of floats
+        self._memory: OrderedDict[str, array] = OrderedDict()
+        self._disk: Optional[SQLiteEmbeddingCache] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: asyncio.Queue[Tuple[str, str]] = asyncio.Queue()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._calls: Set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(self.max_concurrent_calls)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def uses_fallback(self) -> bool:
+        """True when embeddings are the deterministic hash-based vectors."""
+        return self._client is None
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text."""
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts, in order; duplicates are embedded once."""
+        if not texts:
+            return []
+        if self._client is None:
+            return [hash_embedding(text, self.dim) for text in texts]
+
+        self._bind_loop()
+        keys = [embedding_key(self.model, self.dim, text) for text in texts]
+        unique = dict(zip(keys, texts))
+        found = await self._cached(list(unique))
+        self.cache_hits += len(found)
+        runtime_metrics.embedding_cache_hits.increment(len(found))
+
+        waiting: Dict[str, asyncio.Future] = {}
+        for key, text in unique.items():
+            if key in found:
+                continue
+            future = self._pending.get(key)
+            if future is None:
+                future = self._loop.create_future()
+                self._pending[key] = future
+                self._queue.put_nowait((key, text))
+                runtime_metrics.embedding_cache_misses.increment()
+            else:
+                runtime_metrics.embedding_requests_coalesced.increment()
+            waiting[key] = future
+
+        if waiting:
+            self._ensure_worker()
+            # Shielded: a cancelled caller must not cancel a result that
+            # other callers share
+            vectors = await asyncio.gather(
+                *(asyncio.shield(future) for future in waiting.values())
+            )
+            found.update(zip(waiting, vectors))
+        return [found[key].tolist() for key in keys]
+
+    async def stop(self) -> None:
+        """Stop the worker, wait for calls in flight and close the cache."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._calls:
+            await asyncio.gather(*self._calls, return_exceptions=True)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding service stopped"))
+                future.exception()
+        self._pending = {}
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get embedding statistics."""
+        return {
+            "model": self.model,
+            "fallback": self.uses_fallback,
+            "api_calls": self.api_calls,
+            "texts_embedded": self.texts_embedded,
+            "cache_hits": self.cache_hits,
+            "memory_cached": len(self._memory),
+            "queued": self._queue.qsize(),
+        }
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Pending work of another (usually finished) loop cannot complete here
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._pending = {}
+        self._calls = set()
+        self._slots = asyncio.Semaphore(self.max_concurrent_calls)
+        self._task = None
+
+    def _ensure_worker(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _cache(self) -> SQLiteEmbeddingCache:
+        if self._disk is None:
+            self._disk = SQLiteEmbeddingCache(self.cache_path)
+        return self._disk
+
+    async def _cached(self, keys: List[str]) -> Dict[str, array]:
+        found: Dict[str, array] = {}
+        missing = []
+        for key in keys:
+            vector = self._memory.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                self._memory.move_to_end(key)
+                found[key] = vector
+        if missing:
+            try:
+                stored = await asyncio.to_thread(self._cache().get_many, missing)
+            except sqlite3.Error as e:
+                logger.warning("embedding_cache_read_failed", error=str(e))
+                stored = {}
+            for key, vector in stored.items():
+                self._remember(key, vector)
+            found.update(stored)
+        return found
+
+    def _remember(self, key: str, vector: array) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_cache_size:
+            self._memory.popitem(last=False)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            await self._slots.acquire()
+            call = asyncio.create_task(self._embed_remote(batch))
+            self._calls.add(call)
+            call.add_done_callback(self._calls.discard)
+
+    async def _next_batch(self) -> List[Tuple[str, str]]:
+        """Wait for a text, then collect more for up to max_wait."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.batch_size:
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - loop.time()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _embed_remote(self, batch: List[Tuple[str, str]]) -> None:
+        try:
+            started = time.perf_counter()
+            options = {"dimensions": self.dim} if supports_dimensions(self.model) else {}
+            response = await self._client.embeddings.create(
+                model=self.model, input=[text for _, text in batch], **options
+            )
+            data = sorted(response.data, key=lambda d: d.index)
+            vectors = {key: array("f", d.embedding) for (key, _), d in zip(batch, data)}
+            if len(vectors) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} embeddings, got {len(response.data)}"
+                )
+            if any(len(vector) != self.dim for vector in vectors.values()):
+                raise ValueError(
+                    f"{self.model} returned embeddings that are not {self.dim}-dimensional"
+                )
+        except Exception as e:
+            logger.error("embedding_call_failed", texts=len(batch), error=str(e))
+            runtime_metrics.embedding_api_failures.increment()
+            for key, _ in batch:
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                    future.exception()  # Retrieved even if every caller left
+            return
+        finally:
+            self._slots.release()
+
+        self.api_calls += 1
+        self.texts_embedded += len(batch)
+        runtime_metrics.embedding_api_calls.increment()
+        runtime_metrics.embedding_batch_size.observe(len(batch))
+        runtime_metrics.embedding_latency.observe(time.perf_counter() - started)
+        for key, vector in vectors.items():
+            self._remember(key, vector)
+            future = self._pending.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+        try:
+            await asyncio.to_thread(self._cache().put_many, vectors)
+        except sqlite3.Error as e:
+            logger.warning("embedding_cache_write_failed", error=str(e))
+
+
+_embedding_services: Dict[Tuple[str, int], AsyncEmbeddingService] = {}
+
+
+def get_embedding_service(
+    model: Optional[str] = None, dim: Optional[int] = None
+) -> AsyncEmbeddingService:
+    """
+    Shared embedding service for ``model`` and ``dim`` (created on first use).
+
+    Both default to the process configuration; callers that need another
+    model or dimension share one service per combination.
+    """
+    key = (model or default_model(), dim or default_dim())
+    service = _embedding_services.get(key)
+    if service is None:
+        service = _embedding_services[key] = AsyncEmbeddingService(*key)
+    return service
+
+
+async def shutdown_embedding_service() -> None:
+    """Stop every shared embedding service that was started."""
+    services = list(_embedding_services.values())
+    _embedding_services.clear()
+    for service in services:
+        await service.stop()
@@ -7,8 +7,15 @@ This module provides cryptographically secure audit trails including:
 - Key rotation and secure key management
 - Tamper detection and forensic analysis
 - Compressed archival of historical logs
-- Efficient search and retrieval capabilities
+- Indexed search with decrypt-on-demand over archived blocks
 - Compliance-ready audit reporting
+
+Each flushed block is stored as raw Fernet ciphertext (``block_NNNNNN.audit``)
+next to a small plaintext sidecar index (``block_NNNNNN.idx``) holding the
+block's time range, event types and Bloom filters over user and resource IDs.
+Searches consult the indexes first and only decrypt candidate blocks.
+Blocks found without an index, such as legacy JSON blocks, are indexed when
+the trail starts.
 """
 
 from __future__ import annotations
@@ -19,15 +26,18 @@ import gzip
 import hashlib
 import hmac
 import json
+import math
+import os
 import time
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 import secrets
 
+from resync.core.audit_chain_verifier import ChainVerifier, block_number, verify_entries
 from resync.core.structured_logger import get_logger
 
 logger = get_logger(__name__)
@@ -154,6 +164,7 @@ class AuditLogBlock:
     block_hash: str = ""
     signature: str = ""
     previous_block_hash: str = ""
+    encryption_key_id: str = ""  # Key actually used to encrypt the block
 
     def generate_block_hash(self) -> str:
         """Generate hash for the entire block."""
@@ -169,6 +180,162 @@ class AuditLogBlock:
         return self.block_hash
 
 
+class BloomFilter:
+    """Compact Bloom filter used by block indexes to rule out blocks cheaply."""
+
+    def __init__(
+        self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None
+    ):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.01) -> BloomFilter:
+        """Create a filter sized for ``capacity`` items at ``error_rate``."""
+        capacity = max(1, capacity)
+        num_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = int(round((num_bits / capacity) * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        """Yield bit positions for a value using double hashing."""
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, value: str) -> None:
+        """Add a value to the filter."""
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def might_contain(self, value: str) -> bool:
+        """Return False only if the value was definitely never added."""
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize filter for the sidecar index."""
+        return {
+            "num_bits": self.num_bits,
+            "num_hashes": self.num_hashes,
+            "bits": base64.b64encode(bytes(self.bits)).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> BloomFilter:
+        """Restore filter from its serialized form."""
+        return cls(
+            num_bits=data["num_bits"],
+            num_hashes=data["num_hashes"],
+            bits=bytearray(base64.b64decode(data["bits"])),
+        )
+
+
+@dataclass
+class BlockIndex:
+    """Plaintext sidecar index describing the contents of an encrypted block."""
+
+    block_id: str
+    start_time: float
+    end_time: float
+    entries_count: int
+    event_types: List[str]
+    user_filter: BloomFilter
+    resource_filter: BloomFilter
+    block_hash: str = ""
+    previous_block_hash: str = ""
+    encryption_key_id: str = ""
+    compressed: bool = True
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_block(cls, block: AuditLogBlock, compressed: bool) -> BlockIndex:
+        """Build an index for a block of entries."""
+        user_filter = BloomFilter.for_capacity(len(block.entries))
+        resource_filter = BloomFilter.for_capacity(len(block.entries))
+        event_types = set()
+        for entry in block.entries:
+            event_types.add(entry.event_type)
+            if entry.user_id:
+                user_filter.add(entry.user_id)
+            if entry.resource_id:
+                resource_filter.add(entry.resource_id)
+
+        timestamps = [entry.timestamp for entry in block.entries]
+        return cls(
+            block_id=block.block_id,
+            start_time=min(timestamps) if timestamps else block.created_at,
+            end_time=max(timestamps) if timestamps else block.created_at,
+            entries_count=len(block.entries),
+            event_types=sorted(event_types),
+            user_filter=user_filter,
+            resource_filter=resource_filter,
+            block_hash=block.block_hash,
+            previous_block_hash=block.previous_block_hash,
+            encryption_key_id=block.encryption_key_id,
+            compressed=compressed,
+            created_at=block.created_at,
+        )
+
+    def may_match(
+        self,
+        start_time: Optional[float],
+        end_time: Optional[float],
+        event_type: Optional[str],
+        user_id: Optional[str],
+        resource_id: Optional[str],
+    ) -> bool:
+        """Check whether the block could contain entries matching the filters."""
+        if start_time and self.end_time < start_time:
+            return False
+        if end_time and self.start_time > end_time:
+            return False
+        if event_type and event_type not in self.event_types:
+            return False
+        if user_id and not self.user_filter.might_contain(user_id):
+            return False
+        if resource_id and not self.resource_filter.might_contain(resource_id):
+            return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert index to dictionary."""
+        return {
+            "block_id": self.block_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "entries_count": self.entries_count,
+            "event_types": self.event_types,
+            "user_filter": self.user_filter.to_dict(),
+            "resource_filter": self.resource_filter.to_dict(),
+            "block_hash": self.block_hash,
+            "previous_block_hash": self.previous_block_hash,
+            "encryption_key_id": self.encryption_key_id,
+            "compressed": self.compressed,
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> BlockIndex:
+        """Create index from dictionary."""
+        return cls(
+            block_id=data["block_id"],
+            start_time=data["start_time"],
+            end_time=data["end_time"],
+            entries_count=data["entries_count"],
+            event_types=list(data.get("event_types", [])),
+            user_filter=BloomFilter.from_dict(data["user_filter"]),
+            resource_filter=BloomFilter.from_dict(data["resource_filter"]),
+            block_hash=data.get("block_hash", ""),
+            previous_block_hash=data.get("previous_block_hash", ""),
+            encryption_key_id=data.get("encryption_key_id", ""),
+            compressed=data.get("compressed", True),
+            created_at=data.get("created_at", 0.0),
+        )
+
+
 @dataclass
 class EncryptedAuditConfig:
     """Configuration for encrypted audit system."""
@@ -195,6 +362,12 @@ class EncryptedAuditConfig:
     # Performance settings
     max_memory_entries: int = 10000
     flush_interval_seconds: int = 300  # 5 minutes
+    search_parallel_blocks: int = 4  # Candidate blocks decrypted concurrently
+
+    # Verification settings
+    verification_workers: Optional[int] = None  # Defaults to CPU count
+    verification_blocks_per_task: int = 16
+    verification_use_processes: bool = True
 
     # Security settings
     enable_tamper_detection: bool = True
@@ -260,6 +433,22 @@ class KeyManager:
         """Get key by ID."""
         return self.keys.get(key_id)
 
+    def export_key_material(self) -> Dict[str, Any]:
+        """
+        Export key material for offline verification.
+
+        The result is the key file format read by
+        ``python -m resync.core.audit_chain_verifier``. It contains secrets
+        and must be stored accordingly.
+        """
+        return {
+            "hmac_key": base64.b64encode(self.hmac_key).decode(),
+            "keys": {
+                key_id: base64.b64encode(key.key_data).decode()
+                for key_id, key in self.keys.items()
+            },
+        }
+
     def list_keys(self) -> List[Dict[str, Any]]:
         """List all keys with metadata."""
         return [
@@ -303,6 +492,8 @@ class EncryptedAuditTrail:
         # Block management
         self.current_block: Optional[AuditLogBlock] = None
         self.block_counter = 0
+        self.block_indexes: Dict[str, BlockIndex] = {}
+        self._flush_lock = asyncio.Lock()
 
         # Statistics
         self.total_entries = 0
@@ -338,11 +529,28 @@ class EncryptedAuditTrail:
                 logger.warning(f"Failed to load block counter: {e}")
                 self.block_counter = 0
 
+        # Load sidecar block indexes
+        for index_file in self.audit_log_dir.glob("block_*.idx"):
+            try:
+                index = BlockIndex.from_dict(
+                    json.loads(index_file.read_text(encoding="utf-8"))
+                )
+                self.block_indexes[index.block_id] = index
+            except Exception as e:
+                logger.warning(f"Failed to load block index {index_file.name}: {e}")
+
+        # Never reuse the id of a block already on disk, even if the counter
+        # file is stale
+        for block_file in self.audit_log_dir.glob("block_*.audit"):
+            self.block_counter = max(self.block_counter, block_number(block_file) + 1)
+
     async def start(self) -> None:
         """Start the encrypted audit trail system."""
         if self._running:
             return
 
+        await self.rebuild_missing_indexes()
+
         self._running = True
         self._flush_task = asyncio.create_task(self._flush_worker())
         self._archival_task = asyncio.create_task(self._archival_worker())
@@ -460,11 +668,151 @@ class EncryptedAuditTrail:
         if len(results) >= limit:
             return results
 
-        # Search in archived blocks (simplified - would need full implementation)
-        # This would decrypt and search through archived blocks
+        # Search archived blocks, newest first, decrypting only candidates
+        candidates = self._candidate_blocks(
+            start_time, end_time, event_type, user_id, resource_id
+        )
+        window = max(1, self.config.search_parallel_blocks)
+
+        for i in range(0, len(candidates), window):
+            batch = candidates[i : i + window]
+            block_entries = await asyncio.gather(
+                *(asyncio.to_thread(self._load_block_entries, idx) for idx in batch)
+            )
+            for entries in block_entries:
+                for entry in entries:
+                    if self._matches_filters(
+                        entry, start_time, end_time, event_type, user_id, resource_id
+                    ):
+                        results.append(entry)
+                        if len(results) >= limit:
+                            return results
 
         return results
 
+    def _candidate_blocks(
+        self,
+        start_time: Optional[float],
+        end_time: Optional[float],
+        event_type: Optional[str],
+        user_id: Optional[str],
+        resource_id: Optional[str],
+    ) -> List[BlockIndex]:
+        """Return indexes of blocks that may hold matching entries, newest first."""
+        candidates = [
+            index
+            for index in self.block_indexes.values()
+            if index.may_match(start_time, end_time, event_type, user_id, resource_id)
+        ]
+        candidates.sort(key=lambda index: index.end_time, reverse=True)
+        return candidates
+
+    def _load_block_entries(self, index: BlockIndex) -> List[AuditEntry]:
+        """Read and decrypt a block from disk (blocking; run in a worker thread)."""
+        key = self.key_manager.get_key_by_id(index.encryption_key_id)
+        if key is None:
+            logger.warning(
+                f"Encryption key {index.encryption_key_id} unavailable for block {index.block_id}"
+            )
+            return []
+
+        block_file = self.audit_log_dir / f"{index.block_id}.audit"
+        try:
+            payload = block_file.read_bytes()
+            if payload[:1] == b"{":
+                # Legacy JSON block with base64-wrapped ciphertext
+                payload = base64.b64decode(json.loads(payload)["encrypted_data"])
+
+            data = Fernet(key.get_fernet_key()).decrypt(payload)
+            if index.compressed:
+                data = gzip.decompress(data)
+
+            return [AuditEntry.from_dict(item) for item in json.loads(data)]
+        except Exception as e:
+            logger.error(f"Failed to load audit block {index.block_id}: {e}")
+            return []
+
+    async def rebuild_missing_indexes(self) -> int:
+        """
+        Index blocks on disk that have no sidecar index, such as legacy JSON
+        blocks written before indexes existed.
+
+        Blocks are decrypted with the keys currently held by the key manager;
+        blocks whose key is unavailable are skipped and retried on the next
+        call. Returns the number of indexes rebuilt.
+        """
+        missing = sorted(
+            (
+                block_file
+                for block_file in self.audit_log_dir.glob("block_*.audit")
+                if block_file.stem not in self.block_indexes
+            ),
+            key=block_number,
+        )
+        rebuilt = 0
+        for block_file in missing:
+            index = await asyncio.to_thread(self._rebuild_index, block_file)
+            if index is not None:
+                self.block_indexes[index.block_id] = index
+                rebuilt += 1
+
+        if rebuilt:
+            logger.info(f"Rebuilt {rebuilt} missing audit block indexes")
+        return rebuilt
+
+    def _rebuild_index(self, block_file: Path) -> Optional[BlockIndex]:
+        """Decrypt a block file and write its sidecar index (blocking)."""
+        try:
+            payload = block_file.read_bytes()
+            metadata: Dict[str, Any] = {}
+            if payload[:1] == b"{":
+                # Legacy JSON block with base64-wrapped ciphertext
+                legacy = json.loads(payload)
+                metadata = legacy.get("metadata", {})
+                payload = base64.b64decode(legacy["encrypted_data"])
+
+            key_id = metadata.get("encryption_key_id")
+            keys = (
+                [self.key_manager.get_key_by_id(key_id)]
+                if key_id
+                else list(self.key_manager.keys.values())
+            )
+            for key in keys:
+                if key is None:
+                    continue
+                try:
+                    data = Fernet(key.get_fernet_key()).decrypt(payload)
+                    break
+                except InvalidToken:
+                    continue
+            else:
+                logger.warning(
+                    f"No encryption key available to index audit block {block_file.stem}"
+                )
+                return None
+
+            compressed = data[:2] == b"\x1f\x8b"
+            if compressed:
+                data = gzip.decompress(data)
+
+            block = AuditLogBlock(
+                block_id=block_file.stem,
+                entries=[AuditEntry.from_dict(item) for item in json.loads(data)],
+                created_at=metadata.get("created_at", block_file.stat().st_mtime),
+                block_hash=metadata.get("block_hash", ""),
+                previous_block_hash=metadata.get("previous_block_hash", ""),
+                encryption_key_id=key.key_id,
+            )
+            index = BlockIndex.from_block(block, compressed)
+            _atomic_write(
+                block_file.with_suffix(".idx"),
+                json.dumps(index.to_dict(), separators=(",", ":")).encode(),
+            )
+            return index
+        except Exception as e:
+            logger.error(f"Failed to rebuild index for audit block {block_file.stem}: {e}")
+            return None
+
     def _matches_filters(
         self,
         entry: AuditEntry,
@@ -487,12 +835,17 @@ class EncryptedAuditTrail:
             return False
         return True
 
-    async def verify_integrity(self, full_chain_check: bool = False) -> Dict[str, Any]:
+    async def verify_integrity(
+        self,
+        full_chain_check: bool = False,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
         """
         Verify the integrity of audit logs.
 
         Args:
-            full_chain_check: Perform full hash chain verification (expensive)
+            full_chain_check: Verify archived blocks since the last checkpoint
+            progress_callback: Called with progress events during block verification
 
         Returns:
             Integrity verification results
@@ -521,9 +874,11 @@ class EncryptedAuditTrail:
                     results["integrity_status"] = "compromised"
                     results["issues_found"].append("signatures_invalid")
 
-            # Full chain verification (expensive)
+            # Block chain verification (incremental from last checkpoint)
             if full_chain_check:
-                full_check = await self._verify_full_chain()
+                full_check = await self._verify_full_chain(progress_callback)
+                results["blocks_verified"] = full_check["blocks_verified"]
+                results["entries_verified"] = full_check["entries_verified"]
                 if not full_check["valid"]:
                     results["integrity_status"] = "compromised"
                     results["issues_found"].extend(full_check["issues"])
@@ -538,60 +893,67 @@ class EncryptedAuditTrail:
         return results
 
     async def _verify_hash_chain(self) -> bool:
-        """Verify the current hash chain integrity."""
+        """Verify the hash chain of pending entries off the event loop."""
         if not self.config.enable_hash_chaining or not self.pending_entries:
             return True
 
-        # For now, just verify that entries have proper hash values
-        # Full chain verification would require loading all historical blocks
-        for entry in self.pending_entries:
-            # Verify entry hash is correctly calculated
-            expected_hash = hashlib.sha256(
-                json.dumps(
-                    {
-                        "entry_id": entry.entry_id,
-                        "timestamp": entry.timestamp,
-                        "event_type": entry.event_type,
-                        "user_id": entry.user_id,
-                        "resource_id": entry.resource_id,
-                        "action": entry.action,
-                        "details": entry.details,
-                        "ip_address": entry.ip_address,
-                        "user_agent": entry.user_agent,
-                        "session_id": entry.session_id,
-                    },
-                    sort_keys=True,
-                    separators=(",", ":"),
-                ).encode()
-            ).hexdigest()
-
-            if entry.hash_value != expected_hash:
-                return False
-
-        return True
+        entries = [entry.to_dict() for entry in self.pending_entries]
+        issues = await asyncio.to_thread(
+            verify_entries, entries, None, True, False
+        )
+        return not issues
 
     async def _verify_signatures(self) -> bool:
-        """Verify HMAC signatures."""
+        """Verify HMAC signatures of pending entries off the event loop."""
         if not self.config.enable_signatures or not self.pending_entries:
             return True
 
-        for entry in self.pending_entries:
-            expected_signature = self._calculate_signature(entry)
-            if expected_signature != entry.signature:
-                return False
+        entries = [entry.to_dict() for entry in self.pending_entries]
+        issues = await asyncio.to_thread(
+            verify_entries, entries, self.key_manager.hmac_key, False, True
+        )
+        return not issues
+
+    def _create_chain_verifier(self) -> ChainVerifier:
+        """Create a verifier for the archived blocks of this trail."""
+
+        def key_lookup(key_id: str) -> Optional[bytes]:
+            key = self.key_manager.get_key_by_id(key_id)
+            return key.get_fernet_key() if key else None
+
+        return ChainVerifier(
+            directory=self.audit_log_dir,
+            key_lookup=key_lookup,
+            hmac_key=self.key_manager.hmac_key,
+            check_chain=self.config.enable_hash_chaining,
+            check_signatures=self.config.enable_signatures,
+            max_workers=self.config.verification_workers,
+            blocks_per_task=self.config.verification_blocks_per_task,
+            use_processes=self.config.verification_use_processes,
+        )
 
-        return True
+    async def iter_verify_chain(
+        self, incremental: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Verify archived blocks, yielding progress events and a final summary."""
+        async for event in self._create_chain_verifier().iter_verify(incremental):
+            yield event
 
-    async def _verify_full_chain(self) -> Dict[str, Any]:
-        """Perform full chain verification across all archived blocks."""
-        # This would verify all archived blocks
-        # Simplified implementation
-        return {
-            "valid": True,
-            "issues": [],
-            "blocks_verified": 0,
-            "entries_verified": 0,
-        }
+    async def _verify_full_chain(
+        self,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Verify archived blocks since the last signed checkpoint."""
+        summary: Dict[str, Any] = {}
+        async for event in self.iter_verify_chain():
+            if event["event"] == "complete":
+                summary = event
+            elif progress_callback is not None:
+                progress_callback(event)
+
+        if not summary["valid"]:
+            self.integrity_violations += len(summary["issues"])
+        return summary
 
     async def export_forensic_data(
         self, start_time: float, end_time: float, include_encrypted: bool = False
@@ -658,6 +1020,7 @@ class EncryptedAuditTrail:
             "storage": {
                 "audit_log_directory": str(self.audit_log_dir),
                 "blocks_created": self.block_counter,
+                "indexed_blocks": len(self.block_indexes),
                 "compression_enabled": self.config.compression_enabled,
             },
             "configuration": {
@@ -669,98 +1032,106 @@ class EncryptedAuditTrail:
 
     async def _flush_pending_entries(self) -> None:
         """Flush pending entries to encrypted storage."""
-        if not self.pending_entries:
-            return
-
-        # Create new block
-        block_id = f"block_{self.block_counter:06d}"
-        self.block_counter += 1
-
-        block = AuditLogBlock(
-            block_id=block_id,
-            entries=list(self.pending_entries),
-            created_at=time.time(),
-            previous_block_hash=self.chain_hash,
-        )
-
-        # Generate block hash
-        block.generate_block_hash()
-
-        # Encrypt block
-        await self._encrypt_block(block)
-
-        # Save block
-        await self._save_block(block)
-
-        # Clear pending entries
-        self.pending_entries.clear()
-
-        # Update chain hash
-        self.chain_hash = block.block_hash
+        async with self._flush_lock:
+            if not self.pending_entries:
+                return
+
+            # Snapshot the pending entries; they stay queued until the block is
+            # saved, so a failed encryption or write loses nothing
+            entries = list(self.pending_entries)
+
+            # Create new block, sealing the chain hash of its last entry
+            block_id = f"block_{self.block_counter:06d}"
+
+            block = AuditLogBlock(
+                block_id=block_id,
+                entries=entries,
+                created_at=time.time(),
+                previous_block_hash=self.chain_hash,
+            )
 
-        # Save chain state
-        await self._save_chain_state()
+            # Generate block hash
+            block.generate_block_hash()
+
+            # Encrypt block
+            await self._encrypt_block(block)
+
+            # Save block and its sidecar index
+            await self._save_block(block)
+            self.block_counter += 1
+
+            # Drop the flushed entries; events logged meanwhile were appended
+            # after them and are kept for the next block
+            flushed = {id(entry) for entry in entries}
+            while self.pending_entries and id(self.pending_entries[0]) in flushed:
+                self.pending_entries.popleft()
+
+            # The entry chain is left alone: events logged during the awaits
+            # above already link to it, and the next block's first entry
+            # links to this block's last one. Without entry chaining, blocks
+            # are linked by their own hashes instead.
+            if not self.config.enable_hash_chaining:
+                self.chain_hash = block.block_hash
+
+            # Save chain state as of this block; later entries are not on disk
+            await self._save_chain_state(
+                block.previous_block_hash
+                if self.config.enable_hash_chaining
+                else block.block_hash
+            )
 
-        logger.debug(f"Flushed {len(block.entries)} entries to block {block_id}")
+            logger.debug(f"Flushed {len(block.entries)} entries to block {block_id}")
 
     async def _encrypt_block(self, block: AuditLogBlock) -> None:
-        """Encrypt a block of audit entries."""
+        """Encrypt a block of audit entries off the event loop."""
         active_key = self.key_manager.get_active_key()
-        fernet = Fernet(active_key.get_fernet_key())
+        block.encryption_key_id = active_key.key_id
+        block.encrypted_data = await asyncio.to_thread(
+            self._serialize_and_encrypt, block.entries, active_key
+        )
 
-        # Serialize entries
-        entries_data = [entry.to_dict() for entry in block.entries]
-        json_data = json.dumps(entries_data, separators=(",", ":"))
+    def _serialize_and_encrypt(
+        self, entries: List[AuditEntry], key: EncryptionKey
+    ) -> bytes:
+        """Serialize, compress and encrypt entries (blocking)."""
+        data = json.dumps(
+            [entry.to_dict() for entry in entries], separators=(",", ":")
+        ).encode()
 
-        # Compress if enabled
         if self.config.compression_enabled:
-            json_data = gzip.compress(
-                json_data.encode(), compresslevel=self.config.compression_level
-            )
-        else:
-            json_data = json_data.encode()
+            data = gzip.compress(data, compresslevel=self.config.compression_level)
 
-        # Encrypt
-        block.encrypted_data = fernet.encrypt(json_data)
+        return Fernet(key.get_fernet_key()).encrypt(data)
 
     async def _save_block(self, block: AuditLogBlock) -> None:
-        """Save encrypted block to disk."""
-        block_file = self.audit_log_dir / f"{block.block_id}.audit"
-
-        # Prepare block metadata
-        metadata = {
-            "block_id": block.block_id,
-            "created_at": block.created_at,
-            "entries_count": len(block.entries),
-            "block_hash": block.block_hash,
-            "previous_block_hash": block.previous_block_hash,
-            "encryption_key_id": (
-                block.entries[0].encryption_key_id if block.entries else ""
-            ),
-            "compressed": self.config.compression_enabled,
-        }
-
-        # Combine metadata and encrypted data
-        block_data = {
-            "metadata": metadata,
-            "encrypted_data": base64.b64encode(block.encrypted_data).decode(),
-        }
-
-        # Save to file
-        async with asyncio.Lock():  # File system operations need locking
-            with open(block_file, "w", encoding="utf-8") as f:
-                json.dump(block_data, f, separators=(",", ":"))
-
-    async def _save_chain_state(self) -> None:
-        """Save current chain state to disk."""
-        chain_file = self.audit_log_dir / "chain_hash.txt"
-        counter_file = self.audit_log_dir / "block_counter.txt"
+        """Save encrypted block and its sidecar index to disk."""
+        index = BlockIndex.from_block(block, self.config.compression_enabled)
+        await asyncio.to_thread(self._write_block_files, block, index)
+        self.block_indexes[index.block_id] = index
+
+    def _write_block_files(self, block: AuditLogBlock, index: BlockIndex) -> None:
+        """Write block ciphertext, then its index (blocking)."""
+        # The index is written last so its presence implies a complete block
+        _atomic_write(
+            self.audit_log_dir / f"{block.block_id}.audit", block.encrypted_data
+        )
+        _atomic_write(
+            self.audit_log_dir / f"{block.block_id}.idx",
+            json.dumps(index.to_dict(), separators=(",", ":")).encode(),
+        )
 
-        with open(chain_file, "w") as f:
-            f.write(self.chain_hash)
+    async def _save_chain_state(self, chain_hash: str) -> None:
+        """Save the chain state of the last flushed block to disk."""
+        await asyncio.to_thread(
+            self._write_chain_state, chain_hash, self.block_counter
+        )
 
-        with open(counter_file, "w") as f:
-            f.write(str(self.block_counter))
+    def _write_chain_state(self, chain_hash: str, block_counter: int) -> None:
+        """Write chain state files (blocking)."""
+        _atomic_write(self.audit_log_dir / "chain_hash.txt", chain_hash.encode())
+        _atomic_write(
+            self.audit_log_dir / "block_counter.txt", str(block_counter).encode()
+        )
 
     async def _flush_worker(self) -> None:
         """Background worker for periodic flushing."""
@@ -833,6 +1204,14 @@ class EncryptedAuditTrail:
                 logger.error(f"Verification worker error: {e}")
 
 
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write bytes to a file atomically via a temporary file and rename."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
 # Global encrypted audit trail instance
 encrypted_audit_trail = EncryptedAuditTrail()
 
@@ -11,8 +11,8 @@ import inspect
 from functools import wraps
 from typing import Any, Callable, Type, TypeVar, get_type_hints
 
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from resync.core.agent_manager import AgentManager
 from resync.core.audit_queue import AsyncAuditQueue
@@ -187,42 +187,43 @@ get_file_ingestor = get_service(IFileIngestor)
 get_teams_integration = get_service(TeamsIntegration)
 
 
-class DIMiddleware(BaseHTTPMiddleware):
+class DIMiddleware:
     """
     Middleware that ensures the DI container is properly initialized and
     available for each request.
     """
 
-    def __init__(self, app: FastAPI, container_instance: DIContainer = container):
+    def __init__(self, app: ASGIApp, container_instance: DIContainer = container):
         """
         Initialize the middleware with the application and container.
 
         Args:
-            app: The FastAPI application.
+            app: The ASGI application.
             container_instance: The DI container to use.
         """
-        super().__init__(app)
+        self.app = app
         self.container = container_instance
         logger.info("DIMiddleware initialized")
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Process the request and attach the container to it.
+        Attach the container to the request state and pass the request on.
 
         Args:
-            request: The incoming request.
-            call_next: The next middleware or route handler.
-
-        Returns:
-            The response from the next handler.
+            scope: The ASGI connection scope.
+            receive: The ASGI receive channel.
+            send: The ASGI send channel.
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         try:
             # Attach the container to the request state
-            request.state.container = self.container
+            scope.setdefault("state", {})["container"] = self.container
 
             # Continue processing the request
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
         except Exception as e:
             logger.error("error_in_DIMiddleware_dispatch", error=str(e))
             # Re-raise the exception to be handled by other error handlers
@@ -1,17 +1,25 @@
 # resync/core/file_ingestor.py
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import hashlib
+import json
 import os
 import re
 import shutil
+import zipfile
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Iterator
+from typing import AsyncIterator, Callable, Iterator, Optional
+from xml.etree import ElementTree
 
 import docx
 import openpyxl
 import pypdf  # Corrected import for pypdf
 from openpyxl.utils.exceptions import InvalidFileException
 
+from resync.core.chunking import chunk_segments, chunk_text
 from resync.core.exceptions import FileProcessingError, KnowledgeGraphError
 from resync.core.interfaces import IFileIngestor, IKnowledgeGraph
 from resync.core.structured_logger import get_logger
@@ -19,6 +27,9 @@ from resync.settings import settings
 
 logger = get_logger(__name__)
 
+# Chunk ids deleted per knowledge graph query
+DELETE_BATCH_SIZE = 500
+
 
 def is_path_protected(file_path: Path) -> bool:
     """
@@ -76,49 +87,190 @@ def is_path_in_knowledge_base(file_path: Path) -> bool:
     return False
 
 
-# --- Text Chunking --- #
+def file_content_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# --- Ingestion Manifest --- #
+
+
+@dataclass
+class ManifestEntry:
+    """What was ingested from one file, and the file state it came from."""
+
+    size: int
+    mtime_ns: int
+    content_hash: str
+    chunk_ids: list[str] = field(default_factory=list)
+
+
+class IngestionManifest:
+    """
+    Persisted record of ingested files, keyed by resolved path.
+
+    Lets startup reindexing skip files whose size and mtime (or, failing
+    that, content hash) are unchanged, and retract the chunks of files that
+    were deleted while the service was down. Saved atomically as JSON, in a
+    worker thread and at most once per ``save_delay`` seconds; bulk
+    operations can hold saving until they end with ``deferred_save()``.
+    """
+
+    def __init__(self, path: Path, save_delay: float = 1.0):
+        self.path = Path(path)
+        self.save_delay = save_delay
+        self.entries: dict[str, ManifestEntry] = {}
+        self._defer_depth = 0
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_lock = asyncio.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.entries = {
+                key: ManifestEntry(**value) for key, value in data["files"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                "ingestion_manifest_unreadable", path=str(self.path), error=str(e)
+            )
+            self.entries = {}
+
+    @staticmethod
+    def key(file_path: Path) -> str:
+        return str(file_path.resolve())
+
+    def get(self, file_path: Path) -> Optional[ManifestEntry]:
+        return self.entries.get(self.key(file_path))
+
+    def is_unchanged(self, file_path: Path, stat: os.stat_result) -> bool:
+        """Cheap check: same size and mtime as when the file was ingested."""
+        entry = self.get(file_path)
+        return (
+            entry is not None
+            and entry.size == stat.st_size
+            and entry.mtime_ns == stat.st_mtime_ns
+        )
 
+    def record(self, file_path: Path, entry: ManifestEntry) -> None:
+        self.entries[self.key(file_path)] = entry
+        self._changed()
 
-def chunk_text(
-    text: str, chunk_size: int = 1000, chunk_overlap: int = 200
-) -> Iterator[str]:
-    """Splits a long text into smaller chunks with overlap."""
-    if not text:
-        return
+    def pop(self, file_path: Path) -> Optional[ManifestEntry]:
+        entry = self.entries.pop(self.key(file_path), None)
+        if entry is not None:
+            self._changed()
+        return entry
 
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        yield text[start:end]
-        start += chunk_size - chunk_overlap
+    def _changed(self) -> None:
+        self._dirty = True
+        if self._defer_depth:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()  # No event loop to save from later
+            return
+        task = self._save_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        await asyncio.sleep(self.save_delay)
+        await self.flush()
+
+    @contextlib.asynccontextmanager
+    async def deferred_save(self) -> AsyncIterator[None]:
+        """Batch many updates into a single save at the end."""
+        self._defer_depth += 1
+        try:
+            yield
+        finally:
+            self._defer_depth -= 1
+            if not self._defer_depth:
+                await self.flush()
+
+    async def flush(self) -> None:
+        """Save pending changes now, from a worker thread."""
+        async with self._save_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            # Entries are replaced rather than resized in place, so a shallow
+            # copy is a consistent snapshot for the writer thread
+            if not await asyncio.to_thread(self._write, dict(self.entries)):
+                self._dirty = True
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        if self._write(dict(self.entries)):
+            self._dirty = False
+
+    def _write(self, entries: dict[str, ManifestEntry]) -> bool:
+        data = {"files": {key: asdict(e) for key, e in entries.items()}}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.error("failed_to_save_ingestion_manifest", error=str(e))
+            return False
 
 
 # --- File Readers --- #
 
 
-def read_pdf(file_path: Path) -> str:
-    """Extracts text from a PDF file."""
+def _raise_if_partial(
+    yielded: bool, file_type: str, file_path: Path, error: Exception
+) -> None:
+    """
+    Fail a reader that already yielded content.
+
+    A file that cannot be read at all yields nothing, which ingestion treats
+    as no content. Once some text was produced the rest is missing, and
+    ending quietly would record the truncated file as ingested.
+    """
+    if yielded:
+        raise FileProcessingError(
+            f"Failed to read the rest of {file_type} {file_path}"
+        ) from error
+
+
+def iter_pdf(file_path: Path) -> Iterator[str]:
+    """Yields the text of a PDF file page by page."""
     logger.info("reading_pdf_file", file_path=str(file_path))
+    yielded = False
     try:
         reader = pypdf.PdfReader(file_path)
-        text = "".join(
-            page.extract_text() for page in reader.pages if page.extract_text()
-        )
-        return text
+        for page in reader.pages:
+            text = page.extract_text()
+            if text:
+                yielded = True
+                yield text
     except FileNotFoundError as e:
         logger.error("pdf_file_not_found", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "PDF", file_path, e)
     except PermissionError as e:
         logger.error(
             "permission_denied_reading_pdf", file_path=str(file_path), error=str(e)
         )
-        return ""
+        _raise_if_partial(yielded, "PDF", file_path, e)
     except pypdf.errors.PdfReadError as e:
         logger.error("pdf_read_error", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "PDF", file_path, e)
     except ValueError as e:
         logger.error("invalid_pdf_content", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "PDF", file_path, e)
     except Exception as e:  # Catch any other pypdf or system errors
         logger.critical(
             "unexpected_error_reading_pdf",
@@ -129,6 +281,11 @@ def read_pdf(file_path: Path) -> str:
         raise FileProcessingError(f"Failed to process PDF {file_path}") from e
 
 
+def read_pdf(file_path: Path) -> str:
+    """Extracts text from a PDF file."""
+    return "\n".join(iter_pdf(file_path))
+
+
 def read_json(file_path: Path) -> str:
     """Extracts text from a JSON file."""
     logger.info("reading_json_file", file_path=str(file_path))
@@ -247,77 +404,83 @@ def read_doc(file_path: Path) -> str:
         raise FileProcessingError(f"Failed to process DOC file {file_path}") from e
 
 
-def read_xls(file_path: Path) -> str:
-    """Extracts text from an XLS file (older Excel format)."""
+def _iter_openpyxl_rows(workbook) -> Iterator[str]:
+    """Yields a header per sheet and one ``a | b | c`` line per non-empty row."""
+    try:
+        for sheet_name in workbook.sheetnames:
+            yield f"Sheet: {sheet_name}"
+            for row in workbook[sheet_name].iter_rows(values_only=True):
+                row_text = " | ".join(str(cell) for cell in row if cell is not None)
+                if row_text.strip():
+                    yield row_text
+    finally:
+        workbook.close()
+
+
+def iter_xls(file_path: Path) -> Iterator[str]:
+    """Yields the text of an XLS file (older Excel format) row by row."""
     logger.info("reading_xls_file", file_path=str(file_path))
+    yielded = False
     try:
         # Try to use openpyxl first (it can sometimes handle .xls files)
         try:
             workbook = openpyxl.load_workbook(file_path, read_only=True)
-            text_parts = []
-
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                text_parts.append(f"Sheet: {sheet_name}")
-
-                for row in sheet.iter_rows(values_only=True):
-                    # Convert row to text, filtering out None values
-                    row_text = " | ".join(str(cell) for cell in row if cell is not None)
-                    if row_text.strip():
-                        text_parts.append(row_text)
-
-                text_parts.append("")  # Empty line between sheets
-
-            workbook.close()
-            return "\n".join(text_parts)
-
         except Exception as e:  # openpyxl might fail on .xls
             # Log that openpyxl failed, will try xlrd fallback
             logger.debug(f"openpyxl library failed on XLS file, trying xlrd: {e}")
+        else:
+            for row_text in _iter_openpyxl_rows(workbook):
+                yielded = True
+                yield row_text
+            return
 
         # Fallback: try to use xlrd if available, or return message
         try:
             import xlrd
-
-            workbook = xlrd.open_workbook(file_path)
-            text_parts = []
-
-            for sheet_name in workbook.sheet_names():
-                sheet = workbook.sheet_by_name(sheet_name)
-                text_parts.append(f"Sheet: {sheet_name}")
-
-                for row_idx in range(sheet.nrows):
-                    row = sheet.row_values(row_idx)
-                    # Convert row to text, filtering out None values
-                    row_text = " | ".join(
-                        str(cell)
-                        for cell in row
-                        if cell is not None and str(cell).strip()
-                    )
-                    if row_text.strip():
-                        text_parts.append(row_text)
-
-                text_parts.append("")  # Empty line between sheets
-
-            return "\n".join(text_parts)
-
         except ImportError:
             logger.warning("xls_file_requires_xlrd_library", file_path=str(file_path))
-            return f"[XLS file: {file_path.name} - Install xlrd for better support]"
+            yield f"[XLS file: {file_path.name} - Install xlrd for better support]"
+            return
+
+        try:
+            # on_demand loads one sheet at a time instead of the whole workbook
+            workbook = xlrd.open_workbook(file_path, on_demand=True)
+            try:
+                for sheet_name in workbook.sheet_names():
+                    sheet = workbook.sheet_by_name(sheet_name)
+                    yielded = True
+                    yield f"Sheet: {sheet_name}"
+
+                    for row_idx in range(sheet.nrows):
+                        row = sheet.row_values(row_idx)
+                        # Convert row to text, filtering out None values
+                        row_text = " | ".join(
+                            str(cell)
+                            for cell in row
+                            if cell is not None and str(cell).strip()
+                        )
+                        if row_text.strip():
+                            yield row_text
+                    workbook.unload_sheet(sheet_name)
+            finally:
+                workbook.release_resources()
         except Exception as e:
             logger.error(
                 "error_processing_xls_file", file_path=str(file_path), error=str(e)
             )
-            return f"[XLS file: {file_path.name} - Processing error: {e}]"
+            _raise_if_partial(yielded, "XLS file", file_path, e)
+            yield f"[XLS file: {file_path.name} - Processing error: {e}]"
 
+    except FileProcessingError:
+        raise
     except FileNotFoundError as e:
         logger.error("xls_file_not_found", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "XLS file", file_path, e)
     except PermissionError as e:
         logger.error(
             "permission_denied_reading_xls_file", file_path=str(file_path), error=str(e)
         )
-        return ""
+        _raise_if_partial(yielded, "XLS file", file_path, e)
     except Exception as e:  # Catch other potential library or system errors
         logger.critical(
             "unexpected_error_reading_xls_file",
@@ -328,6 +491,11 @@ def read_xls(file_path: Path) -> str:
         raise FileProcessingError(f"Failed to process XLS file {file_path}") from e
 
 
+def read_xls(file_path: Path) -> str:
+    """Extracts text from an XLS file (older Excel format)."""
+    return "\n".join(iter_xls(file_path))
+
+
 def read_md(file_path: Path) -> str:
     """Extracts text from a Markdown file."""
     logger.info("reading_markdown_file", file_path=str(file_path))
@@ -361,29 +529,60 @@ def read_md(file_path: Path) -> str:
         raise FileProcessingError(f"Failed to process Markdown file {file_path}") from e
 
 
-def read_docx(file_path: Path) -> str:
-    """Extracts text from a DOCX file."""
+_WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_WORD_BODY = f"{_WORD_NAMESPACE}body"
+_WORD_PARAGRAPH = f"{_WORD_NAMESPACE}p"
+_WORD_TEXT = f"{_WORD_NAMESPACE}t"
+
+
+def iter_docx(file_path: Path) -> Iterator[str]:
+    """
+    Yields the text of a DOCX file paragraph by paragraph.
+
+    Parses ``word/document.xml`` incrementally and discards each paragraph
+    once read, instead of building the whole document tree like
+    ``docx.Document`` does.
+    """
     logger.info("reading_docx_file", file_path=str(file_path))
+    yielded = False
     try:
-        doc = docx.Document(file_path)
-        text = "\n".join(para.text for para in doc.paragraphs if para.text)
-        return text
+        with zipfile.ZipFile(file_path) as package:
+            with package.open("word/document.xml") as document:
+                body = None
+                events = ElementTree.iterparse(document, events=("start", "end"))
+                for event, element in events:
+                    if event == "start":
+                        if element.tag == _WORD_BODY:
+                            body = element
+                        continue
+                    if element.tag != _WORD_PARAGRAPH:
+                        continue
+                    text = "".join(
+                        node.text or "" for node in element.iter(_WORD_TEXT)
+                    )
+                    # Drop parsed content so the tree never grows with the file
+                    element.clear()
+                    if body is not None:
+                        body.clear()
+                    if text:
+                        yielded = True
+                        yield text
     except FileNotFoundError as e:
         logger.error("docx_file_not_found", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "DOCX file", file_path, e)
     except PermissionError as e:
         logger.error(
             "permission_denied_reading_docx_file",
             file_path=str(file_path),
             error=str(e),
         )
-        return ""  # Corrected import for PackageNotFoundError
-    except docx.opc.exceptions.PackageNotFoundError as e:
+        _raise_if_partial(yielded, "DOCX file", file_path, e)
+    except (zipfile.BadZipFile, KeyError) as e:
         logger.error("invalid_docx_package", file_path=str(file_path), error=str(e))
-        return ""
-    except ValueError as e:
+        _raise_if_partial(yielded, "DOCX file", file_path, e)
+    except ElementTree.ParseError as e:
         logger.error("invalid_docx_content", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "DOCX file", file_path, e)
     except Exception as e:  # Catch other potential library or system errors
         logger.critical(
             "unexpected_error_reading_docx_file",
@@ -394,39 +593,36 @@ def read_docx(file_path: Path) -> str:
         raise FileProcessingError(f"Failed to process DOCX file {file_path}") from e
 
 
-def read_excel(file_path: Path) -> str:
-    """Extracts text from an XLSX file, iterating through all sheets and cells."""
+def read_docx(file_path: Path) -> str:
+    """Extracts text from a DOCX file."""
+    return "\n".join(iter_docx(file_path))
+
+
+def iter_excel(file_path: Path) -> Iterator[str]:
+    """Yields the text of an XLSX file sheet header by header and row by row."""
     logger.info("reading_excel_file", file_path=str(file_path))
-    text_parts = []
+    yielded = False
     try:
         workbook = openpyxl.load_workbook(file_path, read_only=True)
-        for sheetname in workbook.sheetnames:
-            sheet = workbook[sheetname]
-            text_parts.append(f"Sheet: {sheetname}\n")
-            for row in sheet.iter_rows():
-                row_texts = []
-                for cell in row:
-                    if cell.value is not None:
-                        row_texts.append(str(cell.value))
-                if row_texts:
-                    text_parts.append(" | ".join(row_texts))
-        return "\n".join(text_parts)
+        for row_text in _iter_openpyxl_rows(workbook):
+            yielded = True
+            yield row_text
     except FileNotFoundError as e:
         logger.error("excel_file_not_found", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "Excel file", file_path, e)
     except PermissionError as e:
         logger.error(
             "permission_denied_reading_excel_file",
             file_path=str(file_path),
             error=str(e),
         )
-        return ""
+        _raise_if_partial(yielded, "Excel file", file_path, e)
     except InvalidFileException as e:
         logger.error("invalid_excel_file", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "Excel file", file_path, e)
     except ValueError as e:
         logger.error("invalid_excel_content", file_path=str(file_path), error=str(e))
-        return ""
+        _raise_if_partial(yielded, "Excel file", file_path, e)
     except Exception as e:  # Catch other potential library or system errors
         logger.critical(
             "unexpected_error_reading_excel_file",
@@ -437,6 +633,11 @@ def read_excel(file_path: Path) -> str:
         raise FileProcessingError(f"Failed to process Excel file {file_path}") from e
 
 
+def read_excel(file_path: Path) -> str:
+    """Extracts text from an XLSX file, iterating through all sheets and cells."""
+    return "\n".join(iter_excel(file_path))
+
+
 # --- Main Ingestion Logic --- #
 
 
@@ -447,12 +648,17 @@ class FileIngestor(IFileIngestor):
     This class handles file uploads, saving, and processing for RAG.
     """
 
-    def __init__(self, knowledge_graph: IKnowledgeGraph):
+    def __init__(
+        self,
+        knowledge_graph: IKnowledgeGraph,
+        manifest_path: Optional[Path] = None,
+    ):
         """
         Initialize the FileIngestor with dependencies.
 
         Args:
             knowledge_graph: The knowledge graph service to store extracted content
+            manifest_path: Where to persist the ingestion manifest
         """
         self.knowledge_graph = knowledge_graph
         self.rag_directory = settings.BASE_DIR / "rag"
@@ -466,6 +672,21 @@ class FileIngestor(IFileIngestor):
             ".doc": read_doc,
             ".xls": read_xls,
         }
+        # Streaming readers for formats that can be too large to hold as one
+        # string; other formats fall back to file_readers
+        self.segment_readers: dict[str, Callable[[Path], Iterator[str]]] = {
+            ".pdf": iter_pdf,
+            ".docx": iter_docx,
+            ".xlsx": iter_excel,
+            ".xls": iter_xls,
+        }
+        # What has been ingested from each file, including its chunk ids
+        self.manifest = IngestionManifest(
+            manifest_path
+            or getattr(
+                settings, "RAG_MANIFEST_PATH", settings.BASE_DIR / ".rag_manifest.json"
+            )
+        )
         # Ensure the RAG directory exists
         self.rag_directory.mkdir(exist_ok=True)
         logger.info("file_ingestor_initialized", rag_directory=str(self.rag_directory))
@@ -536,76 +757,215 @@ class FileIngestor(IFileIngestor):
             logger.info("file_in_protected_directory", file_path=str(file_path))
 
         file_ext = file_path.suffix.lower()
+        segment_reader = self.segment_readers.get(file_ext)
         reader = self.file_readers.get(file_ext)
 
-        if not reader:
+        if not segment_reader and not reader:
             logger.warning("unsupported_file_type", file_extension=file_ext)
             return False
 
-        # Read the file content
-        content = reader(file_path)
-        if not content:
+        stat = file_path.stat()
+        content_hash = await asyncio.to_thread(file_content_hash, file_path)
+        previous = self.manifest.get(file_path)
+
+        # Stream the content through the chunker into the knowledge graph, so
+        # only the current segment and chunk are held in memory
+        if segment_reader:
+            chunks = chunk_segments(segment_reader(file_path))
+        else:
+            chunks = chunk_text(reader(file_path))
+
+        chunk_ids: list[str] = []
+        chunk_count = 0
+        total_chunks = 0
+        try:
+            for i, chunk in enumerate(chunks):
+                total_chunks += 1
+                try:
+                    metadata = {
+                        "source_file": str(file_path.name),
+                        "chunk_index": i + 1,
+                    }
+                    # Here we add the chunk to the knowledge graph
+                    chunk_id = await self.knowledge_graph.add_content(
+                        content=chunk, metadata=metadata
+                    )
+                    if chunk_id:
+                        chunk_ids.append(chunk_id)
+                    chunk_count += 1
+                except KnowledgeGraphError as e:
+                    logger.error(
+                        "knowledge_graph_error_adding_chunk",
+                        chunk_index=i + 1,
+                        file_path=str(file_path),
+                        error=str(e),
+                        exc_info=True,
+                    )
+                except ValueError as e:
+                    logger.error(
+                        "value_error_adding_chunk",
+                        chunk_index=i + 1,
+                        file_path=str(file_path),
+                        error=str(e),
+                        exc_info=True,
+                    )
+                except TypeError as e:
+                    logger.error(
+                        "type_error_adding_chunk",
+                        chunk_index=i + 1,
+                        file_path=str(file_path),
+                        error=str(e),
+                        exc_info=True,
+                    )
+                except Exception:
+                    logger.critical(
+                        "critical_unhandled_error_adding_chunk",
+                        chunk_index=i + 1,
+                        file_path=str(file_path),
+                        exc_info=True,
+                    )
+                    # We don't re-raise here to allow processing of other chunks
+        except Exception:
+            # The reader failed partway: take back what this read added, so
+            # the previous version (if any) stays the one on record
+            logger.error(
+                "reader_failed_during_ingestion",
+                file_path=str(file_path),
+                chunks_added=len(chunk_ids),
+            )
+            await self._discard_partial(file_path, chunk_ids, previous)
+            raise
+
+        if not total_chunks:
+            # Whatever was ingested from the file before stays in place
             logger.warning("no_content_extracted", file_path=str(file_path))
             return False
 
-        # Chunk the content and add to knowledge graph
-        chunks = list(chunk_text(content))
-        chunk_count = 0
-        for i, chunk in enumerate(chunks):
+        if previous is not None:
+            # Re-ingesting a file replaces its old chunks once the new ones are
+            # in; old chunks that could not be deleted are retried on removal
+            _, stale_ids = await self._delete_chunks(previous.chunk_ids, file_path)
+            chunk_ids.extend(stale_ids)
+
+        self.manifest.record(
+            file_path,
+            ManifestEntry(
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                content_hash=content_hash,
+                chunk_ids=chunk_ids,
+            ),
+        )
+        logger.info(
+            "successfully_ingested_chunks",
+            chunk_count=chunk_count,
+            total_chunks=total_chunks,
+            file_path=str(file_path),
+        )
+        return chunk_count > 0
+
+    async def remove_file(self, file_path: Path) -> int:
+        """
+        Removes the chunks previously ingested from a file.
+
+        Args:
+            file_path: Path of the (possibly already deleted) file
+
+        Returns:
+            Number of chunks removed from the knowledge graph
+        """
+        entry = self.manifest.get(file_path)
+        if entry is None:
+            return 0
+
+        removed, remaining = await self._delete_chunks(entry.chunk_ids, file_path)
+        if remaining:
+            # Keep what could not be deleted, so a later removal retries it
+            entry.chunk_ids = remaining
+            self.manifest.record(file_path, entry)
+        else:
+            self.manifest.pop(file_path)
+
+        logger.info(
+            "removed_ingested_chunks",
+            removed_count=removed,
+            file_path=str(file_path),
+        )
+        return removed
+
+    async def _discard_partial(
+        self,
+        file_path: Path,
+        chunk_ids: list[str],
+        previous: Optional[ManifestEntry],
+    ) -> None:
+        """Deletes the chunks of an ingestion that failed partway."""
+        _, leftover = await self._delete_chunks(chunk_ids, file_path)
+        if not leftover:
+            return
+        # Record what could not be deleted, so the next ingestion or removal
+        # of the file retracts it
+        if previous is not None:
+            previous.chunk_ids = previous.chunk_ids + leftover
+        else:
+            # A stat no file has, so the file is never taken as unchanged
+            previous = ManifestEntry(
+                size=-1, mtime_ns=-1, content_hash="", chunk_ids=leftover
+            )
+        self.manifest.record(file_path, previous)
+
+    async def _delete_chunks(
+        self, chunk_ids: list[str], file_path: Path
+    ) -> tuple[int, list[str]]:
+        """
+        Deletes chunks in batches.
+
+        Returns:
+            The number of chunks deleted, and the ids left undeleted after
+            a knowledge graph error
+        """
+        removed = 0
+        for start in range(0, len(chunk_ids), DELETE_BATCH_SIZE):
             try:
-                metadata = {
-                    "source_file": str(file_path.name),
-                    "chunk_index": i + 1,
-                    "total_chunks": len(chunks),
-                }
-                # Here we add the chunk to the knowledge graph
-                await self.knowledge_graph.add_content(content=chunk, metadata=metadata)
-                chunk_count += 1
-            except KnowledgeGraphError as e:
-                logger.error(
-                    "knowledge_graph_error_adding_chunk",
-                    chunk_index=i + 1,
-                    file_path=str(file_path),
-                    error=str(e),
-                    exc_info=True,
-                )
-            except ValueError as e:
-                logger.error(
-                    "value_error_adding_chunk",
-                    chunk_index=i + 1,
-                    file_path=str(file_path),
-                    error=str(e),
-                    exc_info=True,
+                removed += await self.knowledge_graph.delete_content(
+                    chunk_ids[start : start + DELETE_BATCH_SIZE]
                 )
-            except TypeError as e:
+            except KnowledgeGraphError as e:
                 logger.error(
-                    "type_error_adding_chunk",
-                    chunk_index=i + 1,
+                    "knowledge_graph_error_removing_chunks",
+                    chunk_count=len(chunk_ids) - start,
                     file_path=str(file_path),
                     error=str(e),
-                    exc_info=True,
                 )
-            except Exception:
-                logger.critical(
-                    "critical_unhandled_error_adding_chunk",
-                    chunk_index=i + 1,
-                    file_path=str(file_path),
-                    exc_info=True,
-                )
-                # We don't re-raise here to allow processing of other chunks
+                return removed, chunk_ids[start:]
+        return removed, []
 
-        logger.info(
-            "successfully_ingested_chunks",
-            chunk_count=chunk_count,
-            total_chunks=len(chunks),
-            file_path=str(file_path),
-        )
-        return chunk_count > 0
+
+async def _is_unchanged(manifest: IngestionManifest, file_path: Path) -> bool:
+    """Whether a file matches its manifest entry, by stat first and then by hash."""
+    stat = file_path.stat()
+    if manifest.is_unchanged(file_path, stat):
+        return True
+
+    entry = manifest.get(file_path)
+    if entry is None or entry.size != stat.st_size:
+        return False
+    if await asyncio.to_thread(file_content_hash, file_path) != entry.content_hash:
+        return False
+
+    # Touched but identical: remember the new mtime so the next check is cheap
+    entry.mtime_ns = stat.st_mtime_ns
+    manifest.record(file_path, entry)
+    return True
 
 
 async def load_existing_rag_documents(file_ingestor: IFileIngestor) -> int:
     """
-    Load all existing documents from RAG directories into the knowledge graph.
+    Load new or changed documents from RAG directories into the knowledge graph.
+
+    If the ingestor keeps an ingestion manifest, files that are unchanged
+    since they were last ingested are skipped, and chunks of files deleted
+    since then are retracted. Otherwise every file is ingested.
 
     Args:
         file_ingestor: The file ingestor instance
@@ -613,44 +973,68 @@ async def load_existing_rag_documents(file_ingestor: IFileIngestor) -> int:
     Returns:
         Number of documents processed
     """
+    manifest: Optional[IngestionManifest] = getattr(file_ingestor, "manifest", None)
     processed_count = 0
+    skipped_count = 0
+    retracted_count = 0
+    seen: set[str] = set()
+
+    async with manifest.deferred_save() if manifest else contextlib.nullcontext():
+        # Process all knowledge base directories
+        for knowledge_dir in settings.KNOWLEDGE_BASE_DIRS:
+            knowledge_path = settings.BASE_DIR / knowledge_dir
+
+            if not knowledge_path.exists():
+                logger.warning(
+                    "knowledge_base_directory_not_found",
+                    knowledge_path=str(knowledge_path),
+                )
+                continue
 
-    # Process all knowledge base directories
-    for knowledge_dir in settings.KNOWLEDGE_BASE_DIRS:
-        knowledge_path = settings.BASE_DIR / knowledge_dir
-
-        if not knowledge_path.exists():
-            logger.warning(
-                "knowledge_base_directory_not_found", knowledge_path=str(knowledge_path)
+            logger.info(
+                "processing_knowledge_base_directory", knowledge_path=str(knowledge_path)
             )
-            continue
-
-        logger.info(
-            "processing_knowledge_base_directory", knowledge_path=str(knowledge_path)
-        )
 
-        # Walk through all files in the directory tree
-        for file_path in knowledge_path.rglob("*"):
-            if file_path.is_file() and not file_path.name.startswith("."):
-                # Check if file is in protected directories (should be processed)
-                if is_path_in_knowledge_base(file_path):
-                    try:
-                        logger.info(
-                            "loading_existing_document", filename=file_path.name
-                        )
-                        await file_ingestor.ingest_file(file_path)
-                        processed_count += 1
-                    except FileProcessingError as e:
-                        logger.error(
-                            "failed_to_process_document",
-                            file_path=str(file_path),
-                            error=str(e),
-                            exc_info=True,
-                        )
-                else:
+            # Walk through all files in the directory tree
+            for file_path in knowledge_path.rglob("*"):
+                if not file_path.is_file() or file_path.name.startswith("."):
+                    continue
+                if not is_path_in_knowledge_base(file_path):
                     logger.debug("skipping_protected_file", file_path=str(file_path))
+                    continue
+
+                if manifest is not None:
+                    seen.add(manifest.key(file_path))
+                    if await _is_unchanged(manifest, file_path):
+                        skipped_count += 1
+                        continue
+
+                try:
+                    logger.info("loading_existing_document", filename=file_path.name)
+                    await file_ingestor.ingest_file(file_path)
+                    processed_count += 1
+                except FileProcessingError as e:
+                    logger.error(
+                        "failed_to_process_document",
+                        file_path=str(file_path),
+                        error=str(e),
+                        exc_info=True,
+                    )
 
-    logger.info("loaded_existing_rag_documents", processed_count=processed_count)
+        # Retract chunks of files that were deleted since they were ingested
+        if manifest is not None:
+            for key in list(manifest.entries):
+                file_path = Path(key)
+                if key not in seen and not file_path.exists():
+                    await file_ingestor.remove_file(file_path)
+                    retracted_count += 1
+
+    logger.info(
+        "loaded_existing_rag_documents",
+        processed_count=processed_count,
+        skipped_count=skipped_count,
+        retracted_count=retracted_count,
+    )
     return processed_count
 
 
@@ -0,0 +1,270 @@
+"""
+Columnar health history storage.
+
+Health history is kept as fixed-size ring buffers of numeric columns
+(timestamp, overall status, per-component status and latency) instead of
+lists of result objects. Every sample is folded into several tiers of
+increasing bucket width, for example 1s, 1m and 1h, so recent history is
+kept at full resolution and older history survives as coarser buckets.
+Memory use is fixed by the tier capacities, however long the process runs.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from resync.core.health_models import ComponentHealth, HealthStatus
+
+# Numeric status codes ordered by severity, so the worst status in a bucket
+# is simply the maximum code. Matches HealthCheckService's status priority.
+STATUS_CODES: Dict[HealthStatus, int] = {
+    HealthStatus.HEALTHY: 0,
+    HealthStatus.UNKNOWN: 1,
+    HealthStatus.DEGRADED: 2,
+    HealthStatus.UNHEALTHY: 3,
+}
+STATUS_BY_CODE: Dict[int, HealthStatus] = {v: k for k, v in STATUS_CODES.items()}
+NO_DATA = 255  # Status code for buckets where a component was not checked
+
+# (bucket width in seconds, number of buckets kept)
+DEFAULT_TIERS: Tuple[Tuple[int, int], ...] = ((1, 3600), (60, 1440), (3600, 720))
+
+
+class HistoryTier:
+    """
+    Ring buffer of fixed-width buckets at one resolution.
+
+    Each bucket stores the worst overall and per-component status seen in
+    it and the mean component latency. Samples are merged into the newest
+    slot in place until one for a later bucket arrives.
+    """
+
+    __slots__ = (
+        "resolution",
+        "capacity",
+        "timestamps",
+        "overall",
+        "status",
+        "latency",
+        "complete",
+        "_head",
+        "_size",
+        "_open_start",
+        "_latency_sum",
+        "_latency_count",
+    )
+
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.timestamps = array("d", [0.0]) * capacity
+        self.overall = array("B", [NO_DATA]) * capacity
+        self.status: Dict[str, array] = {}
+        self.latency: Dict[str, array] = {}
+        self.complete = True  # False once any bucket has been evicted
+        self._head = 0  # Next slot to write
+        self._size = 0
+        # Start and latency totals of the newest (still filling) bucket
+        self._open_start: Optional[float] = None
+        self._latency_sum: Dict[str, float] = {}
+        self._latency_count: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        timestamp: float,
+        overall: int,
+        components: Sequence[Tuple[str, int, Optional[float]]],
+    ) -> None:
+        start = timestamp - timestamp % self.resolution
+        if start != self._open_start:
+            self._open_bucket(start)
+        slot = (self._head - 1) % self.capacity
+
+        self.overall[slot] = max(self.overall[slot], overall)
+        for name, code, latency in components:
+            column = self.status.get(name)
+            if column is None:
+                column = self.status[name] = array("B", [NO_DATA]) * self.capacity
+                self.latency[name] = array("f", [math.nan]) * self.capacity
+            previous = column[slot]
+            column[slot] = code if previous == NO_DATA else max(previous, code)
+            if latency is not None:
+                total = self._latency_sum.get(name, 0.0) + latency
+                count = self._latency_count.get(name, 0) + 1
+                self._latency_sum[name] = total
+                self._latency_count[name] = count
+                self.latency[name][slot] = total / count
+
+    def _open_bucket(self, start: float) -> None:
+        slot = self._head
+        if self._size == self.capacity:
+            self.complete = False
+        self.timestamps[slot] = start
+        self.overall[slot] = 0
+        for name, column in self.status.items():
+            column[slot] = NO_DATA
+            self.latency[name][slot] = math.nan
+        self._head = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self._open_start = start
+        self._latency_sum.clear()
+        self._latency_count.clear()
+
+    def oldest(self) -> Optional[float]:
+        """Start of the oldest bucket held, if any."""
+        if not self._size:
+            return None
+        return self.timestamps[(self._head - self._size) % self.capacity]
+
+    def drop_before(self, cutoff: float) -> int:
+        """Drop buckets older than ``cutoff``; returns how many."""
+        dropped = 0
+        while self._size and self.oldest() < cutoff:
+            self._size -= 1
+            dropped += 1
+        if dropped:
+            self.complete = False
+        if not self._size:
+            self._open_start = None
+        return dropped
+
+    def query(
+        self,
+        start: float,
+        end: float,
+        components: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """Columns for buckets starting in ``[start, end]``, oldest first."""
+        names = list(self.status if components is None else components)
+        slots = [
+            i % self.capacity
+            for i in range(self._head - self._size, self._head)
+            if start <= self.timestamps[i % self.capacity] <= end
+        ]
+
+        result_components: Dict[str, Dict[str, List[Any]]] = {}
+        for name in names:
+            column = self.status.get(name)
+            if column is None:
+                result_components[name] = {
+                    "status": [None] * len(slots),
+                    "latency_ms": [None] * len(slots),
+                }
+                continue
+            latency = self.latency[name]
+            result_components[name] = {
+                "status": [
+                    None if column[slot] == NO_DATA else column[slot] for slot in slots
+                ],
+                "latency_ms": [
+                    None if math.isnan(latency[slot]) else latency[slot]
+                    for slot in slots
+                ],
+            }
+
+        return {
+            "resolution_seconds": self.resolution,
+            "timestamps": [self.timestamps[slot] for slot in slots],
+            "overall_status": [self.overall[slot] for slot in slots],
+            "components": result_components,
+        }
+
+    def memory_bytes(self) -> int:
+        columns = [self.timestamps, self.overall]
+        columns.extend(self.status.values())
+        columns.extend(self.latency.values())
+        return sum(c.itemsize * len(c) for c in columns)
+
+
+class HealthHistoryStore:
+    """
+    Fixed-memory health history, downsampled across resolution tiers.
+
+    Range queries pick the finest tier that still covers the requested
+    start (or has never evicted anything) and return plain column lists, so
+    dashboards never materialize result models. Status columns hold the
+    codes in ``STATUS_CODES`` (``None`` where a component was not checked);
+    latencies are in ms.
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[int, int]] = DEFAULT_TIERS):
+        self.tiers = [
+            HistoryTier(resolution, capacity)
+            for resolution, capacity in sorted(tiers)
+            if capacity > 0
+        ]
+
+    def __len__(self) -> int:
+        """Number of samples held at the finest resolution."""
+        return len(self.tiers[0])
+
+    def record(
+        self,
+        timestamp: datetime,
+        overall_status: HealthStatus,
+        components: Mapping[str, ComponentHealth],
+    ) -> None:
+        """Fold one health check result into every tier."""
+        values = [
+            (name, STATUS_CODES[c.status], c.response_time_ms)
+            for name, c in components.items()
+        ]
+        ts = timestamp.timestamp()
+        overall = STATUS_CODES[overall_status]
+        for tier in self.tiers:
+            tier.add(ts, overall, values)
+
+    def select_tier(
+        self, start: Optional[float], resolution: Optional[int] = None
+    ) -> HistoryTier:
+        """Finest tier covering ``start`` (or with at least ``resolution``)."""
+        if resolution is not None:
+            for tier in self.tiers:
+                if tier.resolution >= resolution:
+                    return tier
+            return self.tiers[-1]
+        for tier in self.tiers:
+            oldest = tier.oldest()
+            if (
+                start is None
+                or tier.complete
+                or (oldest is not None and oldest <= start)
+            ):
+                return tier
+        # Nothing covers it: use the tier reaching furthest back
+        return min(
+            self.tiers,
+            key=lambda t: t.oldest() if t.oldest() is not None else math.inf,
+        )
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        components: Optional[Iterable[str]] = None,
+        resolution: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Columnar history between ``start`` and ``end``."""
+        start_ts = start.timestamp() if start is not None else None
+        tier = self.select_tier(start_ts, resolution)
+        return tier.query(
+            start_ts if start_ts is not None else -math.inf,
+            end.timestamp() if end is not None else math.inf,
+            components,
+        )
+
+    def drop_before(self, cutoff: datetime) -> int:
+        """Drop buckets older than ``cutoff`` from every tier."""
+        cutoff_ts = cutoff.timestamp()
+        dropped = [tier.drop_before(cutoff_ts) for tier in self.tiers]
+        return dropped[0]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the column buffers (allocated up front)."""
+        return sum(tier.memory_bytes() for tier in self.tiers)
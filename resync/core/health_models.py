@@ -90,6 +90,19 @@ class HealthCheckConfig:
     memory_threshold_percent: float = 85.0  # Memory usage warning threshold
     cpu_threshold_percent: float = 80.0  # CPU usage warning threshold
 
+    # Per-component deadlines and cache refresh intervals
+    component_timeout_seconds: float = 5.0  # Deadline for components not listed below
+    component_timeouts: Dict[str, float] = field(default_factory=dict)
+    component_refresh_intervals: Dict[str, float] = field(
+        default_factory=lambda: {
+            "memory": 15.0,
+            "cpu": 15.0,
+            "connection_pools": 30.0,
+            "websocket_pool": 30.0,
+            "file_system": 120.0,
+        }
+    )  # Components not listed refresh every check_interval_seconds
+
     # Alert settings
     alert_enabled: bool = True
     alert_threshold_degraded: int = 1  # Number of degraded components to trigger alert
@@ -106,7 +119,7 @@ class HealthCheckConfig:
     response_time_threshold_ms: int = 1000  # Response time threshold in milliseconds
 
     # Memory bounds configuration
-    max_history_entries: int = 1000  # Maximum number of health history entries
+    max_history_entries: int = 1000  # Full-resolution (1s) history buckets kept
     history_cleanup_threshold: float = 0.8  # Cleanup when 80% of max entries reached
     history_cleanup_batch_size: int = 100  # Number of entries to remove per cleanup
     enable_memory_monitoring: bool = True  # Enable memory usage monitoring
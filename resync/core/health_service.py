@@ -1,21 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import tempfile
 import time
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-# Soft import for aiofiles (optional dependency)
-try:
-    import aiofiles  # type: ignore
-except ImportError:
-    aiofiles = None  # type: ignore
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
 import psutil
 import structlog
 
 from resync.core.connection_pool_manager import get_advanced_connection_pool_manager
+from resync.core.health_history import STATUS_BY_CODE, HealthHistoryStore
 from resync.core.health_models import (
     ComponentHealth,
     ComponentType,
@@ -26,7 +22,7 @@ from resync.core.health_models import (
 )
 from resync.settings import settings
 
-from .health_utils import get_health_checks_dict, initialize_health_result
+from .health_utils import get_health_check_functions, initialize_health_result
 
 logger = structlog.get_logger(__name__)
 
@@ -79,11 +75,26 @@ _health_service_lock = asyncio.Lock()
 
 
 class HealthCheckService:
-    """Comprehensive health check service for all system components."""
+    """
+    Comprehensive health check service for all system components.
+
+    Each component check runs under its own deadline, so a slow or hung
+    dependency is reported on its own instead of timing out the whole check.
+    Results are cached per component and refreshed in the background on
+    individual intervals; ``get_cached_health_check`` serves the latest
+    snapshot without running any probes.
+    """
 
     def __init__(self, config: Optional[HealthCheckConfig] = None):
         self.config = config or HealthCheckConfig()
-        self.health_history: List[HealthStatusHistory] = []
+        # Columnar history: 1s samples, downsampled to 1m and 1h buckets
+        self.health_history = HealthHistoryStore(
+            (
+                (1, self.config.max_history_entries),
+                (60, 24 * 60),
+                (3600, self.config.history_retention_days * 24),
+            )
+        )
         self.last_health_check: Optional[datetime] = None
         self.component_cache: Dict[str, ComponentHealth] = {}
         self.cache_expiry = timedelta(seconds=self.config.check_interval_seconds)
@@ -102,6 +113,13 @@ class HealthCheckService:
         # Performance metrics
         self._cache_hits = 0
         self._cache_misses = 0
+        # Per-component refresh state (time.monotonic() of the last probe)
+        self._component_refreshed_at: Dict[str, float] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._metadata: Dict[str, Any] = {}
+        self._cached_result: Optional[HealthCheckResult] = None
+        self._full_check_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
 
     async def start_monitoring(self) -> None:
         """Start continuous health monitoring."""
@@ -125,22 +143,58 @@ class HealthCheckService:
         logger.info("health_check_monitoring_stopped")
 
     async def _monitoring_loop(self) -> None:
-        """Continuous monitoring loop."""
+        """Continuous monitoring loop, refreshing each component when it is due."""
         while self._is_monitoring:
             try:
-                await self.perform_comprehensive_health_check()
-                await asyncio.sleep(self.config.check_interval_seconds)
+                await self.refresh_due_components()
+                await asyncio.sleep(self._monitoring_tick())
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error("error_in_health_monitoring_loop", error=str(e))
                 await asyncio.sleep(10)  # Brief pause on error
 
+    def _refresh_interval(self, component_name: str) -> float:
+        """Seconds between background probes of a component."""
+        return self.config.component_refresh_intervals.get(
+            component_name, self.config.check_interval_seconds
+        )
+
+    def _component_timeout(self, component_name: str) -> float:
+        """Deadline for a single probe of a component."""
+        if component_name in self.config.component_timeouts:
+            return self.config.component_timeouts[component_name]
+        defaults = {
+            "database": self.config.database_timeout_seconds,
+            "redis": self.config.redis_timeout_seconds,
+            "tws_monitor": self.config.external_api_timeout_seconds,
+        }
+        return defaults.get(component_name, self.config.component_timeout_seconds)
+
+    def _monitoring_tick(self) -> float:
+        """Sleep between monitoring passes: the shortest refresh interval."""
+        intervals = [
+            self._refresh_interval(name) for name in get_health_check_functions(self)
+        ]
+        return max(1.0, min(intervals))
+
+    def _due_components(self) -> List[str]:
+        """Components whose cached result is older than their refresh interval."""
+        now = time.monotonic()
+        return [
+            name
+            for name in get_health_check_functions(self)
+            if name not in self._component_refreshed_at
+            or now - self._component_refreshed_at[name]
+            >= self._refresh_interval(name)
+        ]
+
     async def _get_performance_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics for health monitoring."""
         try:
-            # Get system metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # Get system metrics; interval=None compares against the previous
+            # call instead of blocking the event loop for a sampling window
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
 
             # Get connection pool metrics if available
@@ -160,79 +214,98 @@ class HealthCheckService:
 
     async def _get_connection_pool_stats(self) -> Dict[str, Any]:
         """Get connection pool statistics."""
+        timeout = self._component_timeout("connection_pools")
         try:
             pool_manager = get_advanced_connection_pool_manager()
-            return await pool_manager.force_health_check()
+            return await asyncio.wait_for(
+                pool_manager.force_health_check(), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("connection_pool_stats_timed_out", timeout_seconds=timeout)
+            return {"error": f"Timed out after {timeout}s"}
         except Exception as e:
             logger.warning("failed_to_get_connection_pool_stats", error=str(e))
             return {"error": str(e)}
 
-    async def perform_comprehensive_health_check(self) -> HealthCheckResult:
-        """Perform comprehensive health check with proactive monitoring."""
+    async def _run_component_check(
+        self, component_name: str, check: Callable[[], Awaitable[ComponentHealth]]
+    ) -> ComponentHealth:
+        """Run one component check under its own deadline."""
+        timeout = self._component_timeout(component_name)
         start_time = time.time()
-        correlation_id = f"health_{int(start_time)}"
+        try:
+            health = await asyncio.wait_for(check(), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Timeout indicates unhealthiness, but only for this component
+            logger.error(
+                "health_check_timed_out",
+                component_name=component_name,
+                timeout_seconds=timeout,
+            )
+            health = ComponentHealth(
+                name=component_name,
+                component_type=self._get_component_type(component_name),
+                status=HealthStatus.UNHEALTHY,
+                message=f"Check timeout: no response within {timeout}s",
+                response_time_ms=(time.time() - start_time) * 1000,
+                last_check=datetime.now(),
+                error_count=1,
+            )
+        except Exception as e:
+            logger.error(
+                "health_check_failed", component_name=component_name, error=str(e)
+            )
+            health = ComponentHealth(
+                name=component_name,
+                component_type=self._get_component_type(component_name),
+                status=HealthStatus.UNKNOWN,
+                message=f"Check failed: {str(e)}",
+                response_time_ms=(time.time() - start_time) * 1000,
+                last_check=datetime.now(),
+                error_count=1,
+            )
+        self._component_refreshed_at[component_name] = time.monotonic()
+        return health
 
-        logger.debug(
-            "starting_comprehensive_health_check", correlation_id=correlation_id
-        )
+    async def _check_components(
+        self, component_names: List[str]
+    ) -> Dict[str, ComponentHealth]:
+        """
+        Probe the given components concurrently.
 
-        # Initialize result with enhanced metadata
+        A component already being probed is not probed twice; callers share
+        the in-flight result. Probes are shielded so a cancelled caller (for
+        example a dropped HTTP request) does not abort them for everyone else.
+        """
+        checks = get_health_check_functions(self)
+        tasks: Dict[str, asyncio.Task] = {}
+        for name in component_names:
+            task = self._refreshing.get(name)
+            if task is None:
+                task = asyncio.create_task(self._run_component_check(name, checks[name]))
+                self._refreshing[name] = task
+                task.add_done_callback(
+                    lambda _task, name=name: self._refreshing.pop(name, None)
+                )
+            tasks[name] = task
+
+        results = await asyncio.gather(*(asyncio.shield(t) for t in tasks.values()))
+        return dict(zip(tasks.keys(), results, strict=True))
+
+    def _build_result(
+        self,
+        components: Dict[str, ComponentHealth],
+        start_time: float,
+        correlation_id: str,
+    ) -> HealthCheckResult:
+        """Assemble a health check result from per-component results."""
         result = initialize_health_result(correlation_id)
         result.metadata = {
             "check_start_time": start_time,
             "proactive_checks": True,
-            "performance_metrics": await self._get_performance_metrics(),
-            "connection_pool_stats": await self._get_connection_pool_stats(),
+            **self._metadata,
         }
-
-        # Perform all health checks in parallel
-        health_checks = get_health_checks_dict(self)
-
-        # Execute all checks with timeout protection
-        try:
-            check_results = await asyncio.wait_for(
-                asyncio.gather(*health_checks.values(), return_exceptions=True),
-                timeout=30.0,  # 30 second global timeout
-            )
-        except asyncio.TimeoutError:
-            # Handle timeout by creating timeout errors for all checks
-            logger.error("health_check_timed_out", timeout_seconds=30)
-            check_results = [
-                asyncio.TimeoutError(f"Health check component {name} timed out")
-                for name in health_checks.keys()
-            ]
-
-        # Process results
-        for component_name, check_result in zip(
-            health_checks.keys(), check_results, strict=False
-        ):
-            if isinstance(check_result, Exception):
-                # Handle check failure
-                logger.error(
-                    "health_check_failed",
-                    component_name=component_name,
-                    error=str(check_result),
-                )
-                component_health = ComponentHealth(
-                    name=component_name,
-                    component_type=self._get_component_type(component_name),
-                    status=HealthStatus.UNKNOWN,
-                    message=f"Check failed: {str(check_result)}",
-                    last_check=datetime.now(),
-                )
-                # For timeout errors specifically, we may want to handle them differently
-                if isinstance(check_result, asyncio.TimeoutError):
-                    component_health = ComponentHealth(
-                        name=component_name,
-                        component_type=self._get_component_type(component_name),
-                        status=HealthStatus.UNHEALTHY,  # Timeout indicates unhealthiness
-                        message=f"Check timeout: {str(check_result)}",
-                        last_check=datetime.now(),
-                    )
-            else:
-                component_health = check_result
-
-            result.components[component_name] = component_health
+        result.components = components
 
         # Determine overall status
         result.overall_status = self._calculate_overall_status(result.components)
@@ -264,12 +337,39 @@ class HealthCheckService:
             "timestamp": time.time(),
             "memory_usage_mb": self._get_current_memory_usage(),
         }
+        return result
 
-        # Update history
+    async def _publish_result(self, result: HealthCheckResult) -> None:
+        """Record a fresh result in history and make it the cached snapshot."""
+        # History compares against the cache, so update it before the cache
         await self._update_health_history(result)
 
         self.last_health_check = datetime.now()
         await self._update_cache(result.components)
+        self._cached_result = result
+
+    async def perform_comprehensive_health_check(self) -> HealthCheckResult:
+        """Probe every component now, each under its own deadline."""
+        start_time = time.time()
+        correlation_id = f"health_{int(start_time)}"
+
+        logger.debug(
+            "starting_comprehensive_health_check", correlation_id=correlation_id
+        )
+
+        # Metrics, pool stats and all component checks run in parallel
+        performance_metrics, pool_stats, components = await asyncio.gather(
+            self._get_performance_metrics(),
+            self._get_connection_pool_stats(),
+            self._check_components(list(get_health_check_functions(self))),
+        )
+        self._metadata = {
+            "performance_metrics": performance_metrics,
+            "connection_pool_stats": pool_stats,
+        }
+
+        result = self._build_result(components, start_time, correlation_id)
+        await self._publish_result(result)
 
         logger.debug(
             "health_check_completed",
@@ -278,6 +378,68 @@ class HealthCheckService:
 
         return result
 
+    async def refresh_due_components(self) -> HealthCheckResult:
+        """
+        Re-probe only the components whose refresh interval has elapsed.
+
+        Components that are not due keep their cached result. Falls back to a
+        full check when nothing has been cached yet.
+        """
+        if self._cached_result is None:
+            return await self._shared_full_check()
+
+        due = self._due_components()
+        if not due:
+            return self._cached_result
+
+        start_time = time.time()
+        correlation_id = f"health_{int(start_time)}"
+        fresh, performance_metrics = await asyncio.gather(
+            self._check_components(due), self._get_performance_metrics()
+        )
+        self._metadata["performance_metrics"] = performance_metrics
+        if "connection_pools" in due:
+            self._metadata["connection_pool_stats"] = (
+                await self._get_connection_pool_stats()
+            )
+
+        components = await self._get_all_cached_components()
+        components.update(fresh)
+        result = self._build_result(components, start_time, correlation_id)
+        await self._publish_result(result)
+
+        logger.debug("health_components_refreshed", components=due)
+        return result
+
+    async def get_cached_health_check(self) -> HealthCheckResult:
+        """
+        Get the latest health result without running any probes.
+
+        Results are kept fresh by the monitoring loop. Without it, stale
+        components are refreshed in the background and the current snapshot
+        is returned immediately. Only the very first call waits for a check.
+        """
+        result = self._cached_result
+        if result is None:
+            self._cache_misses += 1
+            return await self._shared_full_check()
+
+        self._cache_hits += 1
+        if not self._is_monitoring and (
+            self._refresh_task is None or self._refresh_task.done()
+        ):
+            if self._due_components():
+                self._refresh_task = asyncio.create_task(self.refresh_due_components())
+        return result
+
+    async def _shared_full_check(self) -> HealthCheckResult:
+        """Run a full check, sharing it between concurrent callers."""
+        if self._full_check_task is None or self._full_check_task.done():
+            self._full_check_task = asyncio.create_task(
+                self.perform_comprehensive_health_check()
+            )
+        return await asyncio.shield(self._full_check_task)
+
     async def perform_proactive_health_checks(self) -> Dict[str, Any]:
         """
         Perform proactive health checks for connection pools and critical components.
@@ -926,34 +1088,16 @@ class HealthCheckService:
                 status = HealthStatus.HEALTHY
                 message = f"Disk space OK: {disk_usage_percent:.1f}% used"
 
-            # Test file system write capability with proper cleanup
-            import uuid
-
-            file_id = uuid.uuid4().hex
-            test_file = Path(tempfile.gettempdir()) / f"health_check_{file_id}.tmp"
-            write_test = "File system write test not completed"
-            try:
-                if aiofiles is None:
-                    write_test = "File system write test skipped (aiofiles not available)"
-                else:
-                    async with aiofiles.open(test_file, "w") as f:
-                        await f.write("health check test")
-                write_test = "File system write test passed"
-            except Exception as e:
-                write_test = f"File system write test failed: {e}"
+            # Check the temp directory is writable without creating files on
+            # every probe
+            temp_dir = tempfile.gettempdir()
+            if os.access(temp_dir, os.W_OK | os.X_OK):
+                write_test = "Temp directory writable"
+            else:
+                write_test = f"Temp directory not writable: {temp_dir}"
                 if status == HealthStatus.HEALTHY:
                     status = HealthStatus.DEGRADED
                 message += f", {write_test}"
-            finally:
-                # Always attempt cleanup, but don't fail the health check if cleanup fails
-                try:
-                    if test_file.exists() and aiofiles is not None:
-                        await aiofiles.os.remove(test_file)
-                except:
-                    # Just log if cleanup fails, don't affect the health check result
-                    logger.warning(
-                        "failed_to_cleanup_temp_file", test_file=str(test_file)
-                    )
 
             response_time = (time.time() - start_time) * 1000
 
@@ -1397,17 +1541,19 @@ class HealthCheckService:
             self.component_cache[component_name] = health
 
     async def _update_health_history(self, result: HealthCheckResult) -> None:
-        """Update health history with memory bounds and efficient cleanup."""
-        # Create new history entry
+        """Record a result in the columnar history and log status changes."""
         component_changes = await self._get_component_changes(result.components)
-        history_entry = HealthStatusHistory(
-            timestamp=result.timestamp,
-            overall_status=result.overall_status,
-            component_changes=component_changes,
-        )
+        if component_changes and self.component_cache:
+            logger.info(
+                "health_component_status_changed",
+                changes={name: s.value for name, s in component_changes.items()},
+            )
 
-        # Add to history
-        self.health_history.append(history_entry)
+        self.health_history.record(
+            result.timestamp or datetime.now(),
+            result.overall_status,
+            result.components,
+        )
 
         # Perform cleanup if needed
         asyncio.create_task(self._cleanup_health_history())
@@ -1417,53 +1563,22 @@ class HealthCheckService:
             asyncio.create_task(self._update_memory_usage())
 
     async def _cleanup_health_history(self) -> None:
-        """Perform efficient cleanup of health history based on multiple criteria."""
+        """Drop history older than the retention window.
+
+        The ring buffers bound the number of entries on their own; this only
+        enforces ``history_retention_days``.
+        """
         async with self._cleanup_lock:
             try:
-                current_size = len(self.health_history)
-                max_entries = self.config.max_history_entries
-                int(max_entries * self.config.history_cleanup_threshold)
-
-                # Check if cleanup is needed based on size
-                if current_size > max_entries:
-                    # Remove oldest entries to get back to threshold
-                    entries_to_remove = (
-                        current_size
-                        - max_entries
-                        + self.config.history_cleanup_batch_size
-                    )
-                    self.health_history = self.health_history[entries_to_remove:]
-                    logger.debug(
-                        "cleaned_up_health_history_entries_size_based",
-                        entries_to_remove=entries_to_remove,
-                    )
-
-                # Check if cleanup is needed based on age
                 cutoff_date = datetime.now() - timedelta(
                     days=self.config.history_retention_days
                 )
-                original_size = len(self.health_history)
-                self.health_history = [
-                    entry
-                    for entry in self.health_history
-                    if entry.timestamp >= cutoff_date
-                ]
-                removed_by_age = original_size - len(self.health_history)
+                removed_by_age = self.health_history.drop_before(cutoff_date)
                 if removed_by_age > 0:
                     logger.debug(
                         "cleaned_up_health_history_entries_age_based",
                         removed_by_age=removed_by_age,
                     )
-
-                # Ensure we don't go below minimum required entries
-                min_entries = max(10, self.config.history_cleanup_batch_size)
-                if (
-                    len(self.health_history) < min_entries
-                    and original_size >= min_entries
-                ):
-                    # Keep at least some recent history
-                    self.health_history = self.health_history[-min_entries:]
-
             except Exception as e:
                 logger.error("error_during_health_history_cleanup", error=str(e))
 
@@ -1487,39 +1602,21 @@ class HealthCheckService:
     async def _update_memory_usage(self) -> None:
         """Update memory usage tracking for health history."""
         try:
-            # Estimate memory usage of health history
-            history_size = len(self.health_history)
-            if history_size > 0:
-                # More realistic estimation: each entry ~2KB (accounting for metadata and history)
-                estimated_size_bytes = history_size * 2048
-                self._memory_usage_mb = estimated_size_bytes / (1024 * 1024)
-
-                # Alert if memory usage exceeds threshold
-                if self._memory_usage_mb > self.config.memory_usage_threshold_mb:
-                    logger.warning(
-                        "health_history_memory_usage_exceeds_threshold",
-                        current_usage_mb=round(self._memory_usage_mb, 2),
-                        threshold_mb=self.config.memory_usage_threshold_mb,
-                    )
-            else:
-                self._memory_usage_mb = 0.0
+            self._memory_usage_mb = self._get_current_memory_usage()
 
+            # Alert if memory usage exceeds threshold
+            if self._memory_usage_mb > self.config.memory_usage_threshold_mb:
+                logger.warning(
+                    "health_history_memory_usage_exceeds_threshold",
+                    current_usage_mb=round(self._memory_usage_mb, 2),
+                    threshold_mb=self.config.memory_usage_threshold_mb,
+                )
         except Exception as e:
             logger.error("error_updating_memory_usage", error=str(e))
 
     def _get_current_memory_usage(self) -> float:
-        """Get current approximate memory usage."""
-        try:
-            # Rough estimation of health history memory usage
-            history_size = len(self.health_history)
-            if history_size > 0:
-                # More realistic estimation: each entry ~2KB
-                estimated_size_bytes = history_size * 2048
-                return round(estimated_size_bytes / (1024 * 1024), 2)
-            else:
-                return 0.0
-        except:
-            return 0.0
+        """Get the memory held by the health history column buffers."""
+        return round(self.health_history.memory_bytes() / (1024 * 1024), 2)
 
     def get_memory_usage(self) -> Dict[str, Any]:
         """Get current memory usage statistics."""
@@ -1528,7 +1625,9 @@ class HealthCheckService:
             "memory_usage_mb": round(self._memory_usage_mb, 2),
             "max_entries": self.config.max_history_entries,
             "retention_days": self.config.history_retention_days,
-            "cleanup_threshold_percent": self.config.history_cleanup_threshold * 100,
+            "history_resolutions_seconds": [
+                tier.resolution for tier in self.health_history.tiers
+            ],
             "memory_threshold_mb": self.config.memory_usage_threshold_mb,
             "enable_monitoring": self.config.enable_memory_monitoring,
         }
@@ -1546,23 +1645,56 @@ class HealthCheckService:
             "memory_usage_mb": round(self._memory_usage_mb, 2),
         }
 
+    def query_health_history(
+        self,
+        hours: float = 24,
+        components: Optional[List[str]] = None,
+        resolution_seconds: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get columnar health history for dashboards.
+
+        Served straight from the history ring buffers at the finest
+        resolution that covers the requested window. Status values are the
+        codes in ``health_history.STATUS_CODES``.
+        """
+        return self.health_history.query(
+            start=datetime.now() - timedelta(hours=hours),
+            components=components,
+            resolution=resolution_seconds,
+        )
+
     def get_health_history(
         self, hours: int = 24, max_entries: Optional[int] = None
     ) -> List[HealthStatusHistory]:
         """Get health history for the specified number of hours with optional entry limit."""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-
-        # Filter by time
-        filtered_history = [
-            entry for entry in self.health_history if entry.timestamp >= cutoff_time
-        ]
-
-        # Apply entry limit if specified
-        if max_entries is not None and len(filtered_history) > max_entries:
+        if max_entries == 0:
+            return []
+        series = self.query_health_history(hours)
+        timestamps = series["timestamps"]
+        first = 0
+        if max_entries is not None and len(timestamps) > max_entries:
             # Return most recent entries
-            filtered_history = filtered_history[-max_entries:]
-
-        return filtered_history
+            first = len(timestamps) - max_entries
+
+        history = []
+        previous: Dict[str, Optional[int]] = {}
+        for i in range(len(timestamps)):
+            changes = {}
+            for name, column in series["components"].items():
+                code = column["status"][i]
+                if code is not None and code != previous.get(name):
+                    changes[name] = STATUS_BY_CODE[code]
+                    previous[name] = code
+            if i >= first:
+                history.append(
+                    HealthStatusHistory(
+                        timestamp=datetime.fromtimestamp(timestamps[i]),
+                        overall_status=STATUS_BY_CODE[series["overall_status"][i]],
+                        component_changes=changes,
+                    )
+                )
+        return history
 
     async def get_component_health(
         self, component_name: str
@@ -1571,7 +1703,13 @@ class HealthCheckService:
         health = await self._get_cached_component(component_name)
         if health:
             age = datetime.now() - health.last_check
-            if age < self.cache_expiry:
+            # Components refreshed less often than check_interval stay valid
+            # for two of their own refresh intervals
+            expiry = max(
+                self.cache_expiry,
+                timedelta(seconds=2 * self._refresh_interval(component_name)),
+            )
+            if age < expiry:
                 self._cache_hits += 1
                 return health
             # Cache expirado, remove do cache
@@ -1587,32 +1725,23 @@ class HealthCheckService:
 
         # For now, just perform a fresh health check
         try:
-            if component_name == "database":
-                health = await self._check_database_health()
-            elif component_name == "redis":
-                health = await self._check_redis_health()
-            elif component_name == "cache_hierarchy":
-                health = await self._check_cache_health()
-            elif component_name == "file_system":
-                health = await self._check_file_system_health()
-            elif component_name == "memory":
-                health = await self._check_memory_health()
-            elif component_name == "cpu":
-                health = await self._check_cpu_health()
-            elif component_name == "tws_monitor":
-                health = await self._check_tws_monitor_health()
-            elif component_name == "connection_pools":
-                health = await self._check_connection_pools_health()
-            elif component_name == "websocket_pool":
-                health = await self._check_websocket_pool_health()
-            else:
+            check = get_health_check_functions(self).get(component_name)
+            if check is None:
                 logger.warning(
                     "unknown_component_for_recovery", component_name=component_name
                 )
                 return False
+            health = await self._run_component_check(component_name, check)
 
             # Update cache with new health status
             await self._update_cached_component(component_name, health)
+            if self._cached_result is not None:
+                start_time = time.time()
+                self._cached_result = self._build_result(
+                    await self._get_all_cached_components(),
+                    start_time,
+                    f"health_{int(start_time)}",
+                )
             return health.status == HealthStatus.HEALTHY
 
         except Exception as e:
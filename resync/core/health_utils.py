@@ -27,6 +27,29 @@ def initialize_health_result(correlation_id: str) -> HealthCheckResult:
     )
 
 
+def get_health_check_functions(health_service_instance: Any) -> Dict[str, Any]:
+    """
+    Get dictionary of all health check methods, keyed by component name.
+
+    Args:
+        health_service_instance: Instance of health service with check methods
+
+    Returns:
+        Dict[str, Any]: Dictionary mapping check names to bound check methods
+    """
+    return {
+        "database": health_service_instance._check_database_health,
+        "redis": health_service_instance._check_redis_health,
+        "cache_hierarchy": health_service_instance._check_cache_health,
+        "file_system": health_service_instance._check_file_system_health,
+        "memory": health_service_instance._check_memory_health,
+        "cpu": health_service_instance._check_cpu_health,
+        "tws_monitor": health_service_instance._check_tws_monitor_health,
+        "connection_pools": health_service_instance._check_connection_pools_health,
+        "websocket_pool": health_service_instance._check_websocket_pool_health,
+    }
+
+
 def get_health_checks_dict(health_service_instance: Any) -> Dict[str, Any]:
     """
     Get dictionary of all health check coroutines.
@@ -38,13 +61,6 @@ def get_health_checks_dict(health_service_instance: Any) -> Dict[str, Any]:
         Dict[str, Any]: Dictionary mapping check names to coroutine objects
     """
     return {
-        "database": health_service_instance._check_database_health(),
-        "redis": health_service_instance._check_redis_health(),
-        "cache_hierarchy": health_service_instance._check_cache_health(),
-        "file_system": health_service_instance._check_file_system_health(),
-        "memory": health_service_instance._check_memory_health(),
-        "cpu": health_service_instance._check_cpu_health(),
-        "tws_monitor": health_service_instance._check_tws_monitor_health(),
-        "connection_pools": health_service_instance._check_connection_pools_health(),
-        "websocket_pool": health_service_instance._check_websocket_pool_health(),
+        name: check()
+        for name, check in get_health_check_functions(health_service_instance).items()
     }
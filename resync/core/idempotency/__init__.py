@@ -5,7 +5,7 @@ Idempotency system package.
 from .config import IdempotencyConfig, config
 from .exceptions import IdempotencyError, IdempotencyKeyError, IdempotencyStorageError, IdempotencyConflictError
 from .manager import IdempotencyManager
-from .models import IdempotencyRecord, RequestContext
+from .models import ClaimResult, IdempotencyRecord, RequestContext
 from .storage import IdempotencyStorage
 from .validation import validate_idempotency_key, generate_idempotency_key
 
@@ -17,6 +17,7 @@ __all__ = [
     "IdempotencyStorageError",
     "IdempotencyConflictError",
     "IdempotencyManager",
+    "ClaimResult",
     "IdempotencyRecord",
     "RequestContext",
     "IdempotencyStorage",
@@ -14,6 +14,10 @@ class IdempotencyConfig:
     key_prefix: str = "idempotency"
     processing_prefix: str = "processing"
     max_response_size_kb: int = 64  # 64KB máximo por resposta
+    compression_threshold_bytes: int = 1024  # Comprime registros maiores
+    processing_ttl_seconds: int = 300  # Validade da marca de processamento
+    local_cache_size: int = 1024  # Registros no LRU em processo
+    local_cache_ttl_seconds: float = 5.0  # Tempo de vida no LRU em processo
 
 
 # Instância global de configuração
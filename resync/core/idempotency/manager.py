@@ -1,16 +1,28 @@
 """
 Gerenciador principal de idempotency refatorado.
+
+``claim`` resolve em uma única ida ao Redis (script Lua atômico) se há
+resposta em cache, se a operação pode começar ou se outra requisição já a
+executa; ``execute_idempotent`` e o middleware usam esse caminho.
 """
 
-from datetime import datetime
-from typing import Any, Dict, Optional
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from redis.asyncio import Redis
 
-from resync.core.idempotency.config import config
-from resync.core.idempotency.exceptions import IdempotencyStorageError
-from resync.core.idempotency.models import IdempotencyRecord
-from resync.core.idempotency.storage import IdempotencyStorage
+from resync.core.exceptions import ResourceConflictError
+from resync.core.idempotency.config import IdempotencyConfig, config as default_config
+from resync.core.idempotency.exceptions import IdempotencyKeyError, IdempotencyStorageError
+from resync.core.idempotency.models import ClaimResult, IdempotencyRecord
+from resync.core.idempotency.storage import (
+    CLAIM_ACQUIRED,
+    CLAIM_IN_PROGRESS,
+    IdempotencyStorage,
+)
 from resync.core.idempotency.validation import IdempotencyKeyValidator
 from resync.core.idempotency.metrics import IdempotencyMetrics
 from resync.core.structured_logger import get_logger
@@ -27,18 +39,80 @@ class IdempotencyManager:
     executadas múltiplas vezes.
     """
 
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Redis, config: Optional[IdempotencyConfig] = None):
         self.redis = redis_client
-        self.storage = IdempotencyStorage(redis_client)
+        self.config = config or default_config
+        self.storage = IdempotencyStorage(redis_client, self.config)
         self.metrics = IdempotencyMetrics()
 
         logger.info(
             "Idempotency manager initialized",
-            ttl_hours=config.ttl_hours,
-            redis_db=config.redis_db,
-            max_response_size_kb=config.max_response_size_kb,
+            ttl_hours=self.config.ttl_hours,
+            redis_db=self.config.redis_db,
+            max_response_size_kb=self.config.max_response_size_kb,
+            compression_threshold_bytes=self.config.compression_threshold_bytes,
         )
 
+    async def claim(
+        self,
+        idempotency_key: str,
+        request_data: Optional[Dict[str, Any]] = None,
+        ttl_seconds: Optional[int] = None,
+    ) -> ClaimResult:
+        """
+        Reivindica a chave de idempotência em uma única operação atômica
+
+        Args:
+            idempotency_key: Chave de idempotência
+            request_data: Dados da requisição para validação (opcional)
+            ttl_seconds: TTL da marca de processamento
+
+        Returns:
+            ``cached`` com a resposta armazenada; ``claimed`` com o token que
+            deve ser passado a ``cache_response`` ou ``release``;
+            ``in_progress`` se outra requisição já executa a operação;
+            ``mismatch`` se a chave foi usada com outra requisição; ou
+            ``unavailable`` se a chave é inválida ou o Redis falhou
+        """
+        self.metrics.total_requests += 1
+        token = uuid.uuid4().hex
+
+        try:
+            self._validate_key(idempotency_key)
+            status, record = await self.storage.claim(
+                self._make_key(idempotency_key),
+                self._make_processing_key(idempotency_key),
+                token,
+                ttl_seconds or self.config.processing_ttl_seconds,
+            )
+        except IdempotencyKeyError as e:
+            logger.warning(
+                "Invalid idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+            return ClaimResult("unavailable")
+        except IdempotencyStorageError as e:
+            self.metrics.storage_errors += 1
+            logger.error(
+                "Failed to claim idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+            return ClaimResult("unavailable")
+
+        if status == CLAIM_ACQUIRED:
+            self.metrics.cache_misses += 1
+            return ClaimResult("claimed", token=token)
+        if status == CLAIM_IN_PROGRESS:
+            self.metrics.concurrent_blocks += 1
+            return ClaimResult("in_progress")
+
+        response = self._response_from_record(idempotency_key, record, request_data)
+        if response is None:
+            return ClaimResult("mismatch")
+        return ClaimResult("cached", response=response)
+
     async def get_cached_response(
         self, idempotency_key: str, request_data: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
@@ -56,7 +130,7 @@ class IdempotencyManager:
 
         try:
             # Validar chave
-            IdempotencyKeyValidator.validate(idempotency_key)
+            self._validate_key(idempotency_key)
             
             key = self._make_key(idempotency_key)
             cached_record = await self.storage.get(key)
@@ -75,34 +149,10 @@ class IdempotencyManager:
                 )
                 return None
 
-            # Validar hash da requisição se fornecido
-            if request_data is not None:
-                current_hash = self._hash_request_data(request_data)
-                if current_hash != cached_record.request_hash:
-                    logger.warning(
-                        "Idempotency key collision detected",
-                        idempotency_key=idempotency_key,
-                        stored_hash=cached_record.request_hash,
-                        current_hash=current_hash,
-                    )
-                    # Em caso de colisão, não usar cache
-                    return None
-
-            self.metrics.cache_hits += 1
-
-            logger.debug(
-                "Idempotency cache hit",
-                idempotency_key=idempotency_key,
-                age_seconds=(self._now() - cached_record.created_at).total_seconds(),
+            return self._response_from_record(
+                idempotency_key, cached_record, request_data
             )
 
-            return {
-                "status_code": cached_record.status_code,
-                "data": cached_record.response_data,
-                "cached_at": cached_record.created_at.isoformat(),
-                "expires_at": cached_record.expires_at.isoformat(),
-            }
-
         except IdempotencyKeyError as e:
             logger.warning(
                 "Invalid idempotency key",
@@ -134,6 +184,8 @@ class IdempotencyManager:
         status_code: int = 200,
         request_data: Optional[Dict[str, Any]] = None,
         metadata: Optional[Dict[str, Any]] = None,
+        claim_token: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
     ) -> bool:
         """
         Armazena resposta para chave de idempotência
@@ -144,30 +196,24 @@ class IdempotencyManager:
             status_code: Código de status HTTP
             request_data: Dados da requisição para hash
             metadata: Metadados adicionais
+            claim_token: Token de ``claim``; a marca de processamento é
+                liberada na mesma operação atômica
+            ttl_seconds: TTL da resposta (padrão: ``ttl_hours``)
 
         Returns:
             True se armazenado com sucesso, False caso contrário
         """
         try:
             # Validar chave
-            IdempotencyKeyValidator.validate(idempotency_key)
-            
-            # Verificar tamanho da resposta
-            response_size = len(str(response_data).encode("utf-8"))
-            max_size_bytes = config.max_response_size_kb * 1024
-
-            if response_size > max_size_bytes:
-                logger.warning(
-                    "Response too large for idempotency cache",
-                    idempotency_key=idempotency_key,
-                    size_kb=response_size / 1024,
-                    max_size_kb=config.max_response_size_kb,
-                )
-                return False
+            self._validate_key(idempotency_key)
 
             # Criar registro
             now = self._now()
-            expires_at = now + timedelta(hours=config.ttl_hours)
+            expires_at = now + (
+                timedelta(seconds=ttl_seconds)
+                if ttl_seconds
+                else timedelta(hours=self.config.ttl_hours)
+            )
 
             record = IdempotencyRecord(
                 idempotency_key=idempotency_key,
@@ -181,17 +227,45 @@ class IdempotencyManager:
                 request_metadata=metadata or {},
             )
 
+            # Verificar tamanho da resposta (JSON antes da compressão)
+            value, response_size = self.storage.encode(record)
+            max_size_bytes = self.config.max_response_size_kb * 1024
+
+            if response_size > max_size_bytes:
+                logger.warning(
+                    "Response too large for idempotency cache",
+                    idempotency_key=idempotency_key,
+                    size_kb=response_size / 1024,
+                    max_size_kb=self.config.max_response_size_kb,
+                )
+                if claim_token:
+                    await self.release(idempotency_key, claim_token)
+                return False
+
             # Armazenar
             key = self._make_key(idempotency_key)
-            ttl_seconds = int((expires_at - now).total_seconds())
-            success = await self.storage.set(key, record, ttl_seconds)
+            ttl = int((expires_at - now).total_seconds())
+            if claim_token:
+                success = await self.storage.complete(
+                    key,
+                    self._make_processing_key(idempotency_key),
+                    claim_token,
+                    value,
+                    ttl,
+                    record,
+                )
+            else:
+                success = await self.storage.set_encoded(key, value, ttl, record)
 
             if success:
+                if response_size > self.config.compression_threshold_bytes:
+                    self.metrics.compressed_writes += 1
                 logger.debug(
                     "Response cached for idempotency",
                     idempotency_key=idempotency_key,
-                    ttl_seconds=ttl_seconds,
+                    ttl_seconds=ttl,
                     size_kb=response_size / 1024,
+                    stored_kb=len(value) / 1024,
                 )
                 return True
             else:
@@ -224,6 +298,81 @@ class IdempotencyManager:
             )
             return False
 
+    async def release(self, idempotency_key: str, claim_token: str) -> bool:
+        """
+        Libera a chave reivindicada por ``claim`` sem armazenar resposta
+
+        Args:
+            idempotency_key: Chave de idempotência
+            claim_token: Token retornado por ``claim``
+
+        Returns:
+            True se a marca de processamento ainda era nossa e foi removida
+        """
+        try:
+            return await self.storage.release(
+                self._make_processing_key(idempotency_key), claim_token
+            )
+        except IdempotencyStorageError as e:
+            self.metrics.storage_errors += 1
+            logger.error(
+                "Failed to release idempotency key",
+                idempotency_key=idempotency_key,
+                error=str(e),
+            )
+            return False
+
+    async def execute_idempotent(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[int] = None,
+        request_data: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """
+        Executa ``func`` no máximo uma vez por chave de idempotência
+
+        Args:
+            key: Chave de idempotência
+            func: Operação assíncrona sem argumentos
+            ttl_seconds: TTL da resposta armazenada
+            request_data: Dados da requisição para validação (opcional)
+
+        Returns:
+            Resultado de ``func``, ou a resposta armazenada (JSON) de uma
+            execução anterior com a mesma chave
+
+        Raises:
+            ResourceConflictError: Se a operação já está em processamento
+        """
+        claim = await self.claim(key, request_data)
+        if claim.cached:
+            return claim.response["data"]
+        if claim.in_progress:
+            raise ResourceConflictError(
+                "Operation already in progress", details={"idempotency_key": key}
+            )
+
+        try:
+            result = await func()
+        except BaseException:
+            if claim.claimed:
+                await self.release(key, claim.token)
+            raise
+
+        if claim.claimed:
+            data = (
+                result.model_dump(mode="json") if hasattr(result, "model_dump") else result
+            )
+            await self.cache_response(
+                key,
+                data,
+                request_data=request_data,
+                claim_token=claim.token,
+                ttl_seconds=ttl_seconds,
+            )
+        return result
+
     async def is_processing(self, idempotency_key: str) -> bool:
         """
         Verifica se operação já está em processamento
@@ -235,7 +384,7 @@ class IdempotencyManager:
             True se já está em processamento
         """
         try:
-            IdempotencyKeyValidator.validate(idempotency_key)
+            self._validate_key(idempotency_key)
             processing_key = self._make_processing_key(idempotency_key)
             return await self.storage.exists(processing_key)
         except IdempotencyKeyError as e:
@@ -276,20 +425,15 @@ class IdempotencyManager:
             True se marcado com sucesso
         """
         try:
-            IdempotencyKeyValidator.validate(idempotency_key)
+            self._validate_key(idempotency_key)
             processing_key = self._make_processing_key(idempotency_key)
             data = {
                 "started_at": self._now().isoformat(),
                 "ttl_seconds": ttl_seconds,
             }
-            success = await self.storage.set(processing_key, IdempotencyRecord(
-                idempotency_key=idempotency_key,
-                request_hash="",
-                response_data=data,
-                status_code=200,
-                created_at=self._now(),
-                expires_at=self._now() + timedelta(seconds=ttl_seconds),
-            ), ttl_seconds)
+            success = await self.storage.set_value(
+                processing_key, json.dumps(data), ttl_seconds
+            )
             
             if success:
                 logger.debug(
@@ -340,7 +484,7 @@ class IdempotencyManager:
             True se removido com sucesso
         """
         try:
-            IdempotencyKeyValidator.validate(idempotency_key)
+            self._validate_key(idempotency_key)
             processing_key = self._make_processing_key(idempotency_key)
             deleted = await self.storage.delete(processing_key)
 
@@ -388,21 +532,20 @@ class IdempotencyManager:
             True se invalidada com sucesso
         """
         try:
-            IdempotencyKeyValidator.validate(idempotency_key)
+            self._validate_key(idempotency_key)
             key = self._make_key(idempotency_key)
             processing_key = self._make_processing_key(idempotency_key)
 
             # Remover ambos: resposta cacheada e marca de processamento
-            deleted_count = await self.storage.delete(key)
-            deleted_processing = await self.storage.delete(processing_key)
+            deleted_count = await self.storage.delete(key, processing_key)
 
             logger.info(
                 "Idempotency key invalidated",
                 idempotency_key=idempotency_key,
-                keys_deleted=deleted_count + (1 if deleted_processing else 0),
+                keys_deleted=deleted_count,
             )
 
-            return deleted_count > 0 or deleted_processing
+            return deleted_count > 0
 
         except IdempotencyKeyError as e:
             logger.warning(
@@ -435,18 +578,62 @@ class IdempotencyManager:
             "cache_hits": self.metrics.cache_hits,
             "cache_misses": self.metrics.cache_misses,
             "hit_rate": self.metrics.hit_rate,
+            "local_hits": self.storage.local.hits,
             "concurrent_blocks": self.metrics.concurrent_blocks,
             "storage_errors": self.metrics.storage_errors,
             "expired_cleanups": self.metrics.expired_cleanups,
+            "compressed_writes": self.metrics.compressed_writes,
         }
 
     def _make_key(self, idempotency_key: str) -> str:
         """Cria chave Redis para resposta cacheada"""
-        return f"{config.key_prefix}:{idempotency_key}"
+        return f"{self.config.key_prefix}:{idempotency_key}"
 
     def _make_processing_key(self, idempotency_key: str) -> str:
         """Cria chave Redis para marca de processamento"""
-        return f"{config.processing_prefix}:{idempotency_key}"
+        return f"{self.config.processing_prefix}:{idempotency_key}"
+
+    def _validate_key(self, idempotency_key: str) -> None:
+        """Valida a chave, levantando IdempotencyKeyError se inválida"""
+        try:
+            IdempotencyKeyValidator.validate(idempotency_key)
+        except ValueError as e:
+            raise IdempotencyKeyError(str(e)) from e
+
+    def _response_from_record(
+        self,
+        idempotency_key: str,
+        record: IdempotencyRecord,
+        request_data: Optional[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """Resposta em cache, ou None se a requisição não corresponde ao registro"""
+        # Validar hash da requisição se fornecido
+        if request_data is not None and record.request_hash:
+            current_hash = self._hash_request_data(request_data)
+            if current_hash != record.request_hash:
+                logger.warning(
+                    "Idempotency key collision detected",
+                    idempotency_key=idempotency_key,
+                    stored_hash=record.request_hash,
+                    current_hash=current_hash,
+                )
+                # Em caso de colisão, não usar cache
+                return None
+
+        self.metrics.cache_hits += 1
+
+        logger.debug(
+            "Idempotency cache hit",
+            idempotency_key=idempotency_key,
+            age_seconds=(self._now() - record.created_at).total_seconds(),
+        )
+
+        return {
+            "status_code": record.status_code,
+            "data": record.response_data,
+            "cached_at": record.created_at.isoformat(),
+            "expires_at": record.expires_at.isoformat(),
+        }
 
     def _hash_request_data(self, request_data: Dict[str, Any]) -> str:
         """
@@ -459,14 +646,11 @@ class IdempotencyManager:
             Hash SHA256 dos dados
         """
         # Normalizar dados para hash consistente
-        import json
         normalized = json.dumps(request_data, sort_keys=True)
-        import hashlib
         return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
 
     def _now(self) -> datetime:
         """Obtém data/hora atual"""
-        from datetime import datetime
         return datetime.utcnow()
 
     def _is_expired(self, record: IdempotencyRecord) -> bool:
@@ -15,6 +15,7 @@ class IdempotencyMetrics:
     concurrent_blocks: int = 0
     storage_errors: int = 0
     expired_cleanups: int = 0
+    compressed_writes: int = 0
 
     @property
     def hit_rate(self) -> float:
@@ -71,3 +71,24 @@ class RequestContext:
         # Gerar hash
         request_json = json.dumps(request_data, sort_keys=True)
         return hashlib.sha256(request_json.encode()).hexdigest()
+
+
+@dataclass
+class ClaimResult:
+    """Resultado da reivindicação atômica de uma chave de idempotency"""
+
+    status: str  # "cached", "claimed", "in_progress", "mismatch" ou "unavailable"
+    response: Optional[Dict[str, Any]] = None  # Resposta em cache, se "cached"
+    token: Optional[str] = None  # Dono da marca de processamento, se "claimed"
+
+    @property
+    def cached(self) -> bool:
+        return self.status == "cached"
+
+    @property
+    def claimed(self) -> bool:
+        return self.status == "claimed"
+
+    @property
+    def in_progress(self) -> bool:
+        return self.status == "in_progress"
@@ -1,49 +1,221 @@
 """
 Abstração de armazenamento para o sistema de idempotency.
+
+Registros são gravados como JSON; acima de ``compression_threshold_bytes``
+o JSON é comprimido com zlib e gravado em base64 com o prefixo ``z:``, o que
+funciona também com clientes ``decode_responses=True``. A reivindicação de
+uma chave (resposta em cache ou marca de processamento) é feita em um único
+script Lua, atômico no Redis. Registros lidos ficam alguns segundos em um
+LRU local, evitando o Redis em repetições da mesma chave.
 """
 
-from typing import Optional
+import base64
+import json
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
 
 from redis.asyncio import Redis
 
+from resync.core.idempotency.config import IdempotencyConfig, config as default_config
 from resync.core.idempotency.exceptions import IdempotencyStorageError
 from resync.core.idempotency.models import IdempotencyRecord
 
+_COMPRESSED_PREFIX = "z:"
+
+# Resultado de ``claim``
+CLAIM_CACHED, CLAIM_ACQUIRED, CLAIM_IN_PROGRESS = 1, 0, 2
+
+# KEYS: registro, marca de processamento; ARGV: token, TTL da marca
+CLAIM_SCRIPT = """
+local record = redis.call("get", KEYS[1])
+if record then
+  return {1, record}
+end
+if redis.call("set", KEYS[2], ARGV[1], "NX", "EX", ARGV[2]) then
+  return {0, ""}
+end
+return {2, ""}
+"""
+
+# KEYS: registro, marca de processamento; ARGV: token, registro, TTL
+COMPLETE_SCRIPT = """
+redis.call("set", KEYS[1], ARGV[2], "EX", ARGV[3])
+if redis.call("get", KEYS[2]) == ARGV[1] then
+  redis.call("del", KEYS[2])
+end
+return 1
+"""
+
+# KEYS: marca de processamento; ARGV: token
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+  return redis.call("del", KEYS[1])
+else
+  return 0
+end
+"""
+
+
+class LocalRecordCache:
+    """LRU em processo de registros concluídos, com TTL curto"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, IdempotencyRecord]]" = OrderedDict()
+        self.hits = 0
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, record: IdempotencyRecord) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, record)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def encode_record(record: IdempotencyRecord, compression_threshold: int) -> Tuple[str, int]:
+    """Serializa o registro; retorna o valor gravado e o tamanho do JSON"""
+    serialized = json.dumps(record.to_dict(), separators=(",", ":")).encode("utf-8")
+    if len(serialized) <= compression_threshold:
+        return serialized.decode("utf-8"), len(serialized)
+    compressed = base64.b64encode(zlib.compress(serialized, 6)).decode("ascii")
+    return _COMPRESSED_PREFIX + compressed, len(serialized)
+
+
+def decode_record(value: Union[str, bytes]) -> IdempotencyRecord:
+    """Desserializa um valor gravado por ``encode_record``"""
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if value.startswith(_COMPRESSED_PREFIX):
+        value = zlib.decompress(base64.b64decode(value[len(_COMPRESSED_PREFIX):]))
+    return IdempotencyRecord.from_dict(json.loads(value))
+
 
 class IdempotencyStorage:
     """Abstração de armazenamento para o sistema de idempotency"""
 
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Redis, config: Optional[IdempotencyConfig] = None):
         self.redis = redis_client
+        self.config = config or default_config
+        self.local = LocalRecordCache(
+            self.config.local_cache_size, self.config.local_cache_ttl_seconds
+        )
+        self._claim = redis_client.register_script(CLAIM_SCRIPT)
+        self._complete = redis_client.register_script(COMPLETE_SCRIPT)
+        self._release = redis_client.register_script(RELEASE_SCRIPT)
+
+    def encode(self, record: IdempotencyRecord) -> Tuple[str, int]:
+        """Valor a gravar para o registro e tamanho do JSON não comprimido"""
+        return encode_record(record, self.config.compression_threshold_bytes)
 
     async def get(self, key: str) -> Optional[IdempotencyRecord]:
         """Recupera registro de idempotency"""
+        record = self.local.get(key)
+        if record is not None:
+            return record
         try:
-            cached_data = await self.redis.get(key)
-            if not cached_data:
-                return None
-            
-            record_data = await self.redis.get(key)
-            if not record_data:
-                return None
-            
-            record_dict = await self.redis.get(key)
-            if not record_dict:
+            value = await self.redis.get(key)
+            if not value:
                 return None
-            
-            return IdempotencyRecord.from_dict(record_dict)
+            record = decode_record(value)
         except Exception as e:
             raise IdempotencyStorageError(f"Failed to get idempotency record: {str(e)}")
+        self.local.put(key, record)
+        return record
 
     async def set(self, key: str, record: IdempotencyRecord, ttl_seconds: int) -> bool:
         """Armazena registro de idempotency"""
+        value, _ = self.encode(record)
+        return await self.set_encoded(key, value, ttl_seconds, record)
+
+    async def set_encoded(
+        self, key: str, value: str, ttl_seconds: int, record: IdempotencyRecord
+    ) -> bool:
+        """Armazena um registro já serializado por ``encode``"""
         try:
-            data = record.to_dict()
-            serialized_data = str(data)
-            success = await self.redis.setex(key, ttl_seconds, serialized_data)
-            return bool(success)
+            success = await self.redis.setex(key, ttl_seconds, value)
         except Exception as e:
             raise IdempotencyStorageError(f"Failed to set idempotency record: {str(e)}")
+        if success:
+            self.local.put(key, record)
+        return bool(success)
+
+    async def set_value(self, key: str, value: str, ttl_seconds: int) -> bool:
+        """Armazena um valor simples (ex.: marca de processamento)"""
+        try:
+            return bool(await self.redis.setex(key, ttl_seconds, value))
+        except Exception as e:
+            raise IdempotencyStorageError(f"Failed to set value: {str(e)}")
+
+    async def claim(
+        self, key: str, processing_key: str, token: str, ttl_seconds: int
+    ) -> Tuple[int, Optional[IdempotencyRecord]]:
+        """
+        Em uma única operação atômica: retorna o registro em cache, ou marca
+        a chave como em processamento com ``token``, ou informa que outra
+        requisição já a processa.
+        """
+        record = self.local.get(key)
+        if record is not None:
+            return CLAIM_CACHED, record
+        try:
+            status, value = await self._claim(
+                keys=[key, processing_key], args=[token, ttl_seconds]
+            )
+            status = int(status)
+            if status != CLAIM_CACHED:
+                return status, None
+            record = decode_record(value)
+        except Exception as e:
+            raise IdempotencyStorageError(f"Failed to claim idempotency key: {str(e)}")
+        self.local.put(key, record)
+        return CLAIM_CACHED, record
+
+    async def complete(
+        self,
+        key: str,
+        processing_key: str,
+        token: str,
+        value: str,
+        ttl_seconds: int,
+        record: IdempotencyRecord,
+    ) -> bool:
+        """Grava o registro e libera a marca de processamento, se ainda for nossa"""
+        try:
+            await self._complete(
+                keys=[key, processing_key], args=[token, value, ttl_seconds]
+            )
+        except Exception as e:
+            raise IdempotencyStorageError(f"Failed to complete idempotency key: {str(e)}")
+        self.local.put(key, record)
+        return True
+
+    async def release(self, processing_key: str, token: str) -> bool:
+        """Remove a marca de processamento, se ainda for nossa"""
+        try:
+            return bool(await self._release(keys=[processing_key], args=[token]))
+        except Exception as e:
+            raise IdempotencyStorageError(f"Failed to release idempotency key: {str(e)}")
 
     async def exists(self, key: str) -> bool:
         """Verifica se chave existe"""
@@ -52,10 +224,11 @@ class IdempotencyStorage:
         except Exception as e:
             raise IdempotencyStorageError(f"Failed to check existence: {str(e)}")
 
-    async def delete(self, key: str) -> bool:
-        """Remove chave"""
+    async def delete(self, *keys: str) -> int:
+        """Remove chaves; retorna quantas existiam"""
+        for key in keys:
+            self.local.discard(key)
         try:
-            deleted = await self.redis.delete(key)
-            return deleted > 0
+            return int(await self.redis.delete(*keys))
         except Exception as e:
             raise IdempotencyStorageError(f"Failed to delete key: {str(e)}")
@@ -39,6 +39,12 @@ class IKnowledgeGraph(Protocol):
         """Stores a conversation between a user and an agent."""
         ...
 
+    async def add_conversations(
+        self, conversations: list[dict[str, Any]]
+    ) -> list[str]:
+        """Stores several conversations (add_conversation arguments) at once."""
+        ...
+
     async def search_similar_issues(
         self, query: str, limit: int = 5
     ) -> list[dict[str, Any]]:
@@ -127,6 +133,14 @@ class IKnowledgeGraph(Protocol):
         """Deletes a memory from the knowledge graph."""
         ...
 
+    async def delete_content(self, content_ids: list[str]) -> int:
+        """Deletes content nodes (e.g., document chunks) from the knowledge graph."""
+        ...
+
+    def delete_content_sync(self, content_ids: list[str]) -> int:
+        """Deletes content nodes (e.g., document chunks) from the knowledge graph."""
+        ...
+
     async def add_observations(self, memory_id: str, observations: list[str]) -> None:
         """Adds observations to a memory in the knowledge graph."""
         ...
@@ -184,6 +198,10 @@ class IFileIngestor(Protocol):
         """Ingests a single file into the knowledge graph."""
         ...
 
+    async def remove_file(self, file_path: Path) -> int:
+        """Removes the chunks previously ingested from a file."""
+        ...
+
 
 @runtime_checkable
 class IAgentManager(Protocol):
@@ -193,6 +211,10 @@ class IAgentManager(Protocol):
         """Loads agent configurations."""
         ...
 
+    async def warm_up(self, agent_ids: Optional[list[str]] = None) -> dict[str, float]:
+        """Builds agents ahead of their first chat."""
+        ...
+
     async def get_agent(self, agent_id: str) -> Any:
         """Retrieves an agent by its ID."""
         ...
@@ -5,6 +5,7 @@ from typing import Any
 from neo4j import AsyncGraphDatabase
 from neo4j import exceptions as neo4j_exceptions
 
+from resync.core.embedding_service import get_embedding_service
 from resync.core.exceptions import KnowledgeGraphError
 from resync.core.structured_logger import get_logger
 from resync.core.circuit_breaker import CircuitBreaker
@@ -88,15 +89,25 @@ class AsyncKnowledgeGraph:
         Returns:
             Uma string contendo o contexto relevante.
         """
-        # SEGURO: A query Cypher usa um placeholder ($query_text) para o parâmetro.
+        # A query é embutida pelo serviço compartilhado (em lote e com cache);
+        # o índice vetorial recebe o vetor, não o texto.
+        try:
+            query_vector = await get_embedding_service().embed(user_query)
+        except Exception as e:
+            logger.error("error_embedding_query_for_kg", error=str(e), exc_info=True)
+            raise KnowledgeGraphError(
+                "Failed to embed query for knowledge graph search."
+            ) from e
+
+        # SEGURO: A query Cypher usa placeholders ($query_vector) para os parâmetros.
         # O input do usuário é passado separadamente no dicionário de parâmetros.
         query = """
-        CALL db.index.vector.queryNodes('embedding_index', $top_k, $query_text)
+        CALL db.index.vector.queryNodes('embedding_index', $top_k, $query_vector)
         YIELD node, score
         RETURN node.text AS text, score
         ORDER BY score DESC
         """
-        params = {"query_text": user_query, "top_k": top_k}
+        params = {"query_vector": query_vector, "top_k": top_k}
 
         try:
             async with self.driver.session() as session:
@@ -155,6 +166,52 @@ class AsyncKnowledgeGraph:
                 "Failed to store conversation in knowledge graph."
             ) from e
 
+    async def add_conversations(
+        self, conversations: list[dict[str, Any]]
+    ) -> list[str]:
+        """
+        Stores several conversations in one transaction.
+
+        Each item has the add_conversation arguments: user_query,
+        agent_response, agent_id and an optional context.
+        """
+        query = """
+        UNWIND $conversations AS conv
+        CREATE (c:Conversation {
+            user_query: conv.user_query,
+            agent_response: conv.agent_response,
+            agent_id: conv.agent_id,
+            model_used: conv.model_used,
+            timestamp: datetime()
+        })
+        RETURN id(c) as conversation_id
+        """
+        params = {
+            "conversations": [
+                {
+                    "user_query": conv["user_query"],
+                    "agent_response": conv["agent_response"],
+                    "agent_id": conv["agent_id"],
+                    "model_used": (conv.get("context") or {}).get(
+                        "model_used", "unknown"
+                    ),
+                }
+                for conv in conversations
+            ]
+        }
+
+        try:
+            async with self.driver.session() as session:
+                result = await session.run(query, params)
+                records = await result.data()
+                logger.debug("added_conversations_to_kg", count=len(records))
+                return [str(record["conversation_id"]) for record in records]
+        except neo4j_exceptions.Neo4jError as e:
+            logger.error("error_adding_conversations_to_kg", error=str(e), exc_info=True)
+            raise KnowledgeGraphError(
+                "Failed to store conversations in knowledge graph."
+            ) from e
+
     async def search_similar_issues(
         self, query: str, limit: int = 5
     ) -> list[dict[str, Any]]:
@@ -271,6 +328,27 @@ class AsyncKnowledgeGraph:
             logger.error("error_deleting_memory", error=str(e), exc_info=True)
             raise KnowledgeGraphError("Failed to delete memory.") from e
 
+    async def delete_content(self, content_ids: list[str]) -> int:
+        """Deletes content nodes (e.g., document chunks) by id in one query."""
+        if not content_ids:
+            return 0
+        query = """
+        UNWIND $content_ids AS content_id
+        MATCH (n:Content) WHERE id(n) = content_id
+        DETACH DELETE n
+        RETURN count(*) AS deleted
+        """
+        params = {"content_ids": [int(content_id) for content_id in content_ids]}
+
+        try:
+            async with self.driver.session() as session:
+                result = await session.run(query, params)
+                record = await result.single()
+                return int(record["deleted"]) if record else 0
+        except neo4j_exceptions.Neo4jError as e:
+            logger.error("error_deleting_content", error=str(e), exc_info=True)
+            raise KnowledgeGraphError("Failed to delete content.") from e
+
     async def add_observations(self, memory_id: str, observations: list[str]) -> None:
         """Adds observations to a memory in the knowledge graph."""
         query = """
@@ -446,15 +524,25 @@ class AsyncKnowledgeGraph:
         Returns:
             Uma string contendo o contexto relevante.
         """
-        # SEGURO: A query Cypher usa um placeholder ($query_text) para o parâmetro.
+        # A query é embutida pelo serviço compartilhado (em lote e com cache);
+        # o índice vetorial recebe o vetor, não o texto.
+        try:
+            query_vector = await get_embedding_service().embed(user_query)
+        except Exception as e:
+            logger.error("error_embedding_query_for_kg", error=str(e), exc_info=True)
+            raise KnowledgeGraphError(
+                "Failed to embed query for knowledge graph search."
+            ) from e
+
+        # SEGURO: A query Cypher usa placeholders ($query_vector) para os parâmetros.
         # O input do usuário é passado separadamente no dicionário de parâmetros.
         query = """
-        CALL db.index.vector.queryNodes('embedding_index', $top_k, $query_text)
+        CALL db.index.vector.queryNodes('embedding_index', $top_k, $query_vector)
         YIELD node, score
         RETURN node.text AS text, score
         ORDER BY score DESC
         """
-        params = {"query_text": user_query, "top_k": top_k}
+        params = {"query_vector": query_vector, "top_k": top_k}
 
         try:
             async with self.driver.session() as session:
@@ -513,6 +601,52 @@ class AsyncKnowledgeGraph:
                 "Failed to store conversation in knowledge graph."
             ) from e
 
+    async def add_conversations(
+        self, conversations: list[dict[str, Any]]
+    ) -> list[str]:
+        """
+        Stores several conversations in one transaction.
+
+        Each item has the add_conversation arguments: user_query,
+        agent_response, agent_id and an optional context.
+        """
+        query = """
+        UNWIND $conversations AS conv
+        CREATE (c:Conversation {
+            user_query: conv.user_query,
+            agent_response: conv.agent_response,
+            agent_id: conv.agent_id,
+            model_used: conv.model_used,
+            timestamp: datetime()
+        })
+        RETURN id(c) as conversation_id
+        """
+        params = {
+            "conversations": [
+                {
+                    "user_query": conv["user_query"],
+                    "agent_response": conv["agent_response"],
+                    "agent_id": conv["agent_id"],
+                    "model_used": (conv.get("context") or {}).get(
+                        "model_used", "unknown"
+                    ),
+                }
+                for conv in conversations
+            ]
+        }
+
+        try:
+            async with self.driver.session() as session:
+                result = await session.run(query, params)
+                records = await result.data()
+                logger.debug("added_conversations_to_kg", count=len(records))
+                return [str(record["conversation_id"]) for record in records]
+        except neo4j_exceptions.Neo4jError as e:
+            logger.error("error_adding_conversations_to_kg", error=str(e), exc_info=True)
+            raise KnowledgeGraphError(
+                "Failed to store conversations in knowledge graph."
+            ) from e
+
     async def search_similar_issues(
         self, query: str, limit: int = 5
     ) -> list[dict[str, Any]]:
@@ -629,6 +763,27 @@ class AsyncKnowledgeGraph:
             logger.error("error_deleting_memory", error=str(e), exc_info=True)
             raise KnowledgeGraphError("Failed to delete memory.") from e
 
+    async def delete_content(self, content_ids: list[str]) -> int:
+        """Deletes content nodes (e.g., document chunks) by id in one query."""
+        if not content_ids:
+            return 0
+        query = """
+        UNWIND $content_ids AS content_id
+        MATCH (n:Content) WHERE id(n) = content_id
+        DETACH DELETE n
+        RETURN count(*) AS deleted
+        """
+        params = {"content_ids": [int(content_id) for content_id in content_ids]}
+
+        try:
+            async with self.driver.session() as session:
+                result = await session.run(query, params)
+                record = await result.single()
+                return int(record["deleted"]) if record else 0
+        except neo4j_exceptions.Neo4jError as e:
+            logger.error("error_deleting_content", error=str(e), exc_info=True)
+            raise KnowledgeGraphError("Failed to delete content.") from e
+
     async def add_observations(self, memory_id: str, observations: list[str]) -> None:
         """Adds observations to a memory in the knowledge graph."""
         query = """
@@ -772,6 +927,9 @@ class AsyncKnowledgeGraph:
     def delete_memory_sync(self, memory_id: str) -> None:
         return asyncio.run(self.delete_memory(memory_id))
 
+    def delete_content_sync(self, content_ids: list[str]) -> int:
+        return asyncio.run(self.delete_content(content_ids))
+
     def add_observations_sync(self, memory_id: str, observations: list[str]) -> None:
         return asyncio.run(self.add_observations(memory_id, observations))
 
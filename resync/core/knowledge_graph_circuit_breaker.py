@@ -86,6 +86,22 @@ class CircuitBreakerAsyncKnowledgeGraph:
                 ) from e
             raise
 
+    async def add_conversations(
+        self, conversations: list[dict[str, Any]]
+    ) -> list[str]:
+        """Stores several conversations with circuit breaker protection."""
+        try:
+            return await neo4j_circuit_breaker.call(
+                self._kg.add_conversations, conversations
+            )
+        except RuntimeError as e:
+            if "Circuit breaker is open" in str(e):
+                logger.warning("neo4j_circuit_breaker_open", operation="add_conversations")
+                raise KnowledgeGraphError(
+                    "Neo4j service is temporarily unavailable due to circuit breaker protection."
+                ) from e
+            raise
+
     async def search_similar_issues(
         self, query: str, limit: int = 5
     ) -> list[dict[str, Any]]:
@@ -235,6 +235,8 @@ class RuntimeMetrics:
         self.agent_mock_fallbacks = MetricCounter()
         self.agent_active_count = MetricGauge()
         self.agent_orchestration_time = MetricHistogram(help_text="Agent orchestration duration seconds")
+        self.agent_creation_time = MetricHistogram(help_text="Agent construction duration seconds")
+        self.agent_cold_starts = MetricCounter()
 
         # Cache
         self.cache_hits = MetricCounter()
@@ -274,6 +276,49 @@ class RuntimeMetrics:
         self.tws_status_requests_failed = MetricCounter()
         self.tws_workstations_total = MetricGauge()
         self.tws_jobs_total = MetricGauge()
+        self.tws_concurrency_limit = MetricGauge()
+        self.tws_inflight_requests = MetricGauge()
+        self.tws_queue_delay = MetricHistogram(help_text="TWS request queueing delay seconds")
+        self.tws_limiter_rejections = MetricCounter()
+        self.tws_requests_per_call = MetricHistogram(
+            boundaries=[1, 2, 3, 4, 6, 9], help_text="TWS HTTP requests per logical call"
+        )
+        self.tws_retries = MetricCounter()
+        self.tws_hedged_requests = MetricCounter()
+        self.tws_retry_budget_exhausted = MetricCounter()
+
+        # RAG ingestion
+        self.rag_ingestion_queue_depth = MetricGauge()
+        self.rag_ingestion_active = MetricGauge()
+        self.rag_files_ingested = MetricCounter()
+        self.rag_files_removed = MetricCounter()
+        self.rag_files_skipped = MetricCounter()
+        self.rag_ingestion_failures = MetricCounter()
+        self.rag_ingestion_duration = MetricHistogram(
+            help_text="RAG file ingestion duration seconds"
+        )
+
+        # Chat persistence and IA auditing
+        self.conversation_queue_depth = MetricGauge()
+        self.conversations_persisted = MetricCounter()
+        self.conversation_write_failures = MetricCounter()
+        self.conversation_batch_size = MetricHistogram(
+            boundaries=[1, 2, 5, 10, 25, 50, 100],
+            help_text="Conversations per knowledge graph write",
+        )
+        self.auditor_sweeps = MetricCounter()
+        self.auditor_triggers_coalesced = MetricCounter()
+
+        # Embeddings
+        self.embedding_cache_hits = MetricCounter()
+        self.embedding_cache_misses = MetricCounter()
+        self.embedding_requests_coalesced = MetricCounter()
+        self.embedding_api_calls = MetricCounter()
+        self.embedding_api_failures = MetricCounter()
+        self.embedding_batch_size = MetricHistogram(
+            boundaries=[1, 2, 4, 8, 16, 32, 64, 128, 256], help_text="Texts per embedding API call"
+        )
+        self.embedding_latency = MetricHistogram(help_text="Embedding API call duration seconds")
 
         # Connection validation
         self.connection_validations_total = MetricCounter()
@@ -438,6 +483,7 @@ class RuntimeMetrics:
                 "initializations": self.agent_initializations.value,
                 "creation_failures": self.agent_creation_failures.value,
                 "mock_fallbacks": self.agent_mock_fallbacks.value,
+                "cold_starts": self.agent_cold_starts.value,
                 "active_count": self.agent_active_count.get(),
             },
             "cache": {
@@ -70,6 +70,7 @@ class ConnectionPool(ABC, Generic[T]):
         self._wait_times: deque[float] = deque(
             maxlen=1000
         )  # Track connection acquisition times for metrics
+        self._wait_times_sum = 0.0
 
     async def initialize(self) -> None:
         """Initialize the connection pool."""
@@ -120,15 +121,31 @@ class ConnectionPool(ABC, Generic[T]):
     async def _close_pool(self) -> None:
         """Close the connection pool - to be implemented by subclasses."""
 
+    def record_wait_time(self, wait_time: float) -> None:
+        """
+        Record a wait time sample without locking.
+
+        Safe to call from the event loop thread only: there is no await, so
+        the update cannot interleave with another coroutine.
+        """
+        if len(self._wait_times) == self._wait_times.maxlen:
+            self._wait_times_sum -= self._wait_times[0]
+        self._wait_times.append(wait_time)
+        self._wait_times_sum += wait_time
+        self.stats = dataclasses.replace(
+            self.stats, average_wait_time=self._wait_times_sum / len(self._wait_times)
+        )
+
+    def record_stat(self, stat_name: str, amount: int = 1) -> None:
+        """Increment a statistic without locking (event loop thread only)."""
+        self.stats = dataclasses.replace(
+            self.stats, **{stat_name: getattr(self.stats, stat_name, 0) + amount}
+        )
+
     async def update_wait_time(self, wait_time: float) -> None:
         """Update wait time statistics."""
         async with self._stats_lock:
-            self._wait_times.append(wait_time)
-            # Calculate average
-            if self._wait_times:
-                average = sum(self._wait_times) / len(self._wait_times)
-                # Update stats with new average (immutable, so create new instance)
-                self.stats = dataclasses.replace(self.stats, average_wait_time=average)
+            self.record_wait_time(wait_time)
 
     async def increment_stat(self, stat_name: str, amount: int = 1) -> None:
         """Increment a statistic in a thread-safe manner."""
@@ -5,10 +5,12 @@ Separated to follow Single Responsibility Principle.
 
 from __future__ import annotations
 
+import importlib.util
 import logging
 import time
 from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, Optional
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 
 import httpx
 
@@ -19,27 +21,117 @@ from resync.core.pools.base_pool import ConnectionPool, ConnectionPoolConfig
 logger = logging.getLogger(__name__)
 
 
+def http2_available() -> bool:
+    """Check whether the optional ``h2`` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class UpstreamPoolConfig:
+    """Connection limits for a single upstream host within an HTTP pool."""
+
+    max_connections: int
+    max_keepalive_connections: Optional[int] = None
+    http2: Optional[bool] = None  # None inherits the pool setting
+
+
+class _PoolTimingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that measures time spent waiting for a pooled connection.
+
+    httpcore emits trace events only once a request has been assigned a
+    connection (either ``connection.connect_tcp`` for a new one or
+    ``*.send_request_headers`` for a reused one), so the delay until the
+    first trace event is the pool acquisition time.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        on_wait: Callable[[float], None],
+    ) -> None:
+        self._transport = transport
+        self._on_wait = on_wait
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired = False
+        upstream_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal acquired
+            if not acquired:
+                acquired = True
+                self._on_wait(time.perf_counter() - started)
+            if upstream_trace is not None:
+                await upstream_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
 class HTTPConnectionPool(ConnectionPool[httpx.AsyncClient]):
-    """HTTP connection pool for external API calls."""
+    """
+    HTTP connection pool for external API calls.
+
+    Supports HTTP/2 multiplexing (when ``h2`` is installed) and per-upstream
+    connection limits via ``upstreams``, a mapping of httpx mount patterns
+    (e.g. ``"http://tws-host:31111"``) to :class:`UpstreamPoolConfig`.
+    HTTP/2 is negotiated via ALPN on ``https://`` URLs; set
+    ``http2_prior_knowledge`` to speak HTTP/2 directly to cleartext upstreams.
+    """
 
     def __init__(
-        self, config: ConnectionPoolConfig, base_url: str, **client_kwargs: Any
+        self,
+        config: ConnectionPoolConfig,
+        base_url: str,
+        http2: bool = False,
+        upstreams: Optional[Dict[str, UpstreamPoolConfig]] = None,
+        http2_prior_knowledge: bool = False,
+        **client_kwargs: Any,
     ) -> None:
         super().__init__(config)
         self.base_url = base_url
+        self.http2 = http2
+        self.http2_prior_knowledge = http2_prior_knowledge
+        self.upstreams = upstreams or {}
         self.client_kwargs = client_kwargs
         self._client: Optional[httpx.AsyncClient] = None
 
+    def _resolve_http2(self, requested: bool) -> bool:
+        """Return whether HTTP/2 can be used, falling back to HTTP/1.1."""
+        if requested and not http2_available():
+            logger.warning(
+                f"HTTP/2 requested for pool '{self.config.pool_name}' but 'h2' "
+                "is not installed; using HTTP/1.1"
+            )
+            return False
+        return requested
+
+    def _create_transport(
+        self, max_connections: int, max_keepalive: int, http2: bool
+    ) -> httpx.AsyncBaseTransport:
+        """Create a timed transport with its own connection limits."""
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_keepalive, max_connections),
+            keepalive_expiry=self.config.idle_timeout,
+        )
+        http2 = self._resolve_http2(http2)
+        transport = httpx.AsyncHTTPTransport(
+            limits=limits,
+            http1=not (http2 and self.http2_prior_knowledge),
+            http2=http2,
+            trust_env=True,
+        )
+        return _PoolTimingTransport(transport, self.record_wait_time)
+
     async def _setup_pool(self) -> None:
         """Setup HTTP connection pool using httpx."""
         try:
-            # Configure httpx client with connection pooling
-            limits = httpx.Limits(
-                max_connections=self.config.max_size,
-                max_keepalive_connections=max(self.config.min_size, 10),
-                keepalive_expiry=self.config.idle_timeout,
-            )
-
             timeout = httpx.Timeout(
                 connect=self.config.connection_timeout,
                 read=self.config.connection_timeout,
@@ -47,18 +139,31 @@ class HTTPConnectionPool(ConnectionPool[httpx.AsyncClient]):
                 pool=self.config.connection_timeout,
             )
 
-            transport = httpx.AsyncHTTPTransport(limits=limits, trust_env=True)
+            # Keep every connection opened under load warm until idle_timeout
+            transport = self._create_transport(
+                self.config.max_size, self.config.max_size, self.http2
+            )
+            mounts = {
+                pattern: self._create_transport(
+                    upstream.max_connections,
+                    upstream.max_keepalive_connections or upstream.max_connections,
+                    self.http2 if upstream.http2 is None else upstream.http2,
+                )
+                for pattern, upstream in self.upstreams.items()
+            }
 
             # Create the httpx client with connection pooling
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
                 timeout=timeout,
                 transport=transport,
+                mounts=mounts or None,
                 **self.client_kwargs,
             )
 
             logger.info(
                 f"HTTP connection pool '{self.config.pool_name}' initialized with {self.config.min_size}-{self.config.max_size} connections"
+                f" (http2={self.http2}, upstreams={len(self.upstreams)})"
             )
         except Exception as e:
             logger.error(f"Failed to setup HTTP connection pool: {e}")
@@ -68,34 +173,27 @@ class HTTPConnectionPool(ConnectionPool[httpx.AsyncClient]):
 
     @asynccontextmanager
     async def get_connection(self) -> AsyncIterator[httpx.AsyncClient]:
-        """Get an HTTP connection from the pool."""
+        """
+        Get an HTTP connection from the pool.
+
+        httpx pools connections internally, so this hands out the shared
+        client; the real pool wait is measured per request by the transport.
+        """
         if not self._initialized or self._shutdown:
             raise TWSConnectionError("HTTP pool not initialized or shutdown")
 
-        start_time = time.time()
-
         try:
-            # Record pool request
-            await self.increment_stat("pool_hits")
-
             # Get connection (httpx handles pooling)
             if not self._client:
                 raise TWSConnectionError("HTTP client not available")
 
+            self.record_stat("pool_hits")
             yield self._client
 
         except Exception as e:
-            await self.increment_stat("pool_misses")
+            self.record_stat("pool_misses")
             logger.error(f"Failed to get HTTP connection: {e}")
             raise TWSConnectionError(f"Failed to acquire HTTP connection: {e}") from e
-        finally:
-            wait_time = time.time() - start_time
-            await self.update_wait_time(wait_time)
-
-            # Record connection metrics
-            logger.debug(
-                f"HTTP connection acquired in {wait_time:.3f}s for pool {self.config.pool_name}"
-            )
 
     async def _close_pool(self) -> None:
         """Close the HTTP connection pool."""
@@ -16,7 +16,7 @@ from resync.core.pools.base_pool import (
     ConnectionPoolStats,
 )
 from resync.core.pools.db_pool import DatabaseConnectionPool
-from resync.core.pools.http_pool import HTTPConnectionPool
+from resync.core.pools.http_pool import HTTPConnectionPool, UpstreamPoolConfig
 from resync.core.pools.redis_pool import RedisConnectionPool
 from resync.settings import settings
 
@@ -172,7 +172,20 @@ class ConnectionPoolManager:
                         health_check_interval=settings.HTTP_POOL_HEALTH_CHECK_INTERVAL,
                         max_lifetime=settings.HTTP_POOL_MAX_LIFETIME,
                     )
-                    http_pool = HTTPConnectionPool(http_config, tws_base_url)
+                    http_pool = HTTPConnectionPool(
+                        http_config,
+                        tws_base_url,
+                        http2=getattr(settings, "HTTP_POOL_HTTP2", False),
+                        http2_prior_knowledge=getattr(
+                            settings, "HTTP_POOL_HTTP2_PRIOR_KNOWLEDGE", False
+                        ),
+                        upstreams={
+                            pattern: UpstreamPoolConfig(**limits)
+                            for pattern, limits in (
+                                getattr(settings, "HTTP_POOL_UPSTREAMS", None) or {}
+                            ).items()
+                        },
+                    )
                     await http_pool.initialize()
                     self.pools["tws_http"] = http_pool
 
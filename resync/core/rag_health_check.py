@@ -222,7 +222,7 @@ class RAGHealthCheck:
 
             # Test text chunking
             from resync.core.file_ingestor import chunk_text
-            chunks = list(chunk_text(test_content, chunk_size=50, chunk_overlap=10))
+            chunks = list(chunk_text(test_content, max_tokens=16, overlap_tokens=4))
 
             # Verify chunks were created
             chunking_works = len(chunks) > 0 and all(len(chunk.strip()) > 0 for chunk in chunks)
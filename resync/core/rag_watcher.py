@@ -3,33 +3,260 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from pathlib import Path
+from typing import Dict, List, Optional, Set
 
-from watchfiles import awatch
+from watchfiles import Change, awatch
 
+from resync.core.file_ingestor import file_content_hash
 from resync.core.interfaces import IFileIngestor
+from resync.core.metrics import runtime_metrics
 from resync.settings import settings
 
 logger = logging.getLogger(__name__)
 
 RAG_DIRECTORY = settings.BASE_DIR / "rag"
 
+# Actions a worker can take for a path; the latest event for a path wins
+_UPSERT = "upsert"
+_DELETE = "delete"
+
+
+class RAGDirectoryWatcher:
+    """
+    Watches a directory and feeds file changes into a bounded ingestion queue.
+
+    Bursts of events are coalesced per path (the latest change wins), each
+    path is queued at most once, and a fixed pool of workers drains the
+    queue. Before ingesting, a worker waits for the file's size and mtime
+    to stop changing so partially copied files are not read, then skips
+    files whose content hash is unchanged or already ingested from another
+    path. Modified files are re-indexed and deleted files have their chunks
+    removed; files skipped as duplicates of a removed file are then ingested
+    in its place.
+    """
+
+    def __init__(
+        self,
+        file_ingestor: IFileIngestor,
+        directory: Path = RAG_DIRECTORY,
+        workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        debounce_ms: Optional[int] = None,
+        settle_seconds: Optional[float] = None,
+    ):
+        self.file_ingestor = file_ingestor
+        self.directory = Path(directory)
+        self.workers = workers or getattr(settings, "RAG_WATCHER_WORKERS", 4)
+        self.debounce_ms = debounce_ms or getattr(
+            settings, "RAG_WATCHER_DEBOUNCE_MS", 1600
+        )
+        self.settle_seconds = (
+            settle_seconds
+            if settle_seconds is not None
+            else getattr(settings, "RAG_WATCHER_SETTLE_SECONDS", 1.0)
+        )
+        self.queue: asyncio.Queue[Path] = asyncio.Queue(
+            maxsize=max_queue_size
+            or getattr(settings, "RAG_WATCHER_MAX_QUEUE_SIZE", 1000)
+        )
+
+        # Coalescing state: latest action per path, and paths queued or in work
+        self._pending: Dict[Path, str] = {}
+        self._queued: Set[Path] = set()
+        self._active: Set[Path] = set()
+
+        # Content dedup: path -> hash, hash -> path it was ingested from, and
+        # hash -> paths skipped because their owner had the same content
+        self._hashes: Dict[Path, str] = {}
+        self._hash_owners: Dict[str, Path] = {}
+        self._duplicates: Dict[str, Set[Path]] = {}
+
+        self._worker_tasks: List[asyncio.Task] = []
+
+    async def run(self) -> None:
+        """Watch the directory until cancelled."""
+        self.directory.mkdir(exist_ok=True)
+        self.start_workers()
+        logger.info(f"Starting RAG watcher on directory: {self.directory}")
+        try:
+            async for changes in awatch(self.directory, debounce=self.debounce_ms):
+                for change, path_str in changes:
+                    action = _DELETE if change == Change.deleted else _UPSERT
+                    await self.schedule(Path(path_str), action)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in RAG directory watcher: {e}", exc_info=True)
+        finally:
+            await self.stop_workers()
+            manifest = getattr(self.file_ingestor, "manifest", None)
+            if manifest is not None:
+                await manifest.flush()
+
+    def start_workers(self) -> None:
+        """Start the ingestion worker pool."""
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop_workers(self) -> None:
+        """Cancel the ingestion workers."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks.clear()
+
+    async def schedule(self, file_path: Path, action: str = _UPSERT) -> None:
+        """
+        Record the latest action for a path and queue it if needed.
+
+        Waits for room in the queue, so a flood of events applies
+        backpressure to the watcher instead of spawning unbounded work.
+        """
+        if file_path.name.startswith("."):
+            return
+        self._pending[file_path] = action
+        if file_path in self._queued or file_path in self._active:
+            return  # Already waiting or being processed; it will see the update
+
+        self._queued.add(file_path)
+        await self.queue.put(file_path)
+        self._update_gauges()
+
+    async def join(self) -> None:
+        """Wait until every queued path has been processed."""
+        await self.queue.join()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the current ingestion backlog."""
+        return {
+            "queued": self.queue.qsize(),
+            "active": len(self._active),
+            "pending": len(self._pending),
+            "tracked_files": len(self._hashes),
+        }
+
+    def _update_gauges(self) -> None:
+        runtime_metrics.rag_ingestion_queue_depth.set(self.queue.qsize())
+        runtime_metrics.rag_ingestion_active.set(len(self._active))
+
+    async def _worker(self) -> None:
+        while True:
+            file_path = await self.queue.get()
+            self._queued.discard(file_path)
+            self._active.add(file_path)
+            self._update_gauges()
+            try:
+                # Events that arrived while this path was in work are handled here
+                while (action := self._pending.pop(file_path, None)) is not None:
+                    await self._process(file_path, action)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                runtime_metrics.rag_ingestion_failures.increment()
+                logger.error(f"Failed to process RAG file {file_path}: {e}", exc_info=True)
+            finally:
+                self._active.discard(file_path)
+                self._update_gauges()
+                self.queue.task_done()
+
+    async def _process(self, file_path: Path, action: str) -> None:
+        if action == _DELETE or not await self._wait_until_settled(file_path):
+            await self._remove(file_path)
+            return
+
+        if file_path.is_dir():
+            return
+
+        content_hash = await asyncio.to_thread(file_content_hash, file_path)
+        if self._known_hash(file_path) == content_hash:
+            runtime_metrics.rag_files_skipped.increment()
+            logger.debug(f"Skipping unchanged RAG file: {file_path.name}")
+            return
+
+        owner = self._hash_owners.get(content_hash)
+        if owner is not None and owner != file_path and owner.exists():
+            # Remembered so the file is ingested if the owner is removed
+            self._duplicates.setdefault(content_hash, set()).add(file_path)
+            runtime_metrics.rag_files_skipped.increment()
+            logger.info(f"Skipping {file_path.name}: same content as {owner.name}")
+            return
+
+        if self._known_hash(file_path) is not None:
+            # ingest_file replaces the chunks previously ingested from the file
+            logger.info(f"Re-indexing modified RAG file: {file_path.name}")
+        else:
+            logger.info(f"New file detected in RAG directory: {file_path.name}")
+
+        started = time.perf_counter()
+        if await self.file_ingestor.ingest_file(file_path):
+            previous_hash = self._forget(file_path)
+            self._hashes[file_path] = content_hash
+            self._hash_owners[content_hash] = file_path
+            runtime_metrics.rag_files_ingested.increment()
+            if previous_hash is not None and previous_hash not in self._hash_owners:
+                await self._ingest_duplicates(previous_hash)
+        else:
+            runtime_metrics.rag_ingestion_failures.increment()
+        runtime_metrics.rag_ingestion_duration.observe(time.perf_counter() - started)
+
+    def _known_hash(self, file_path: Path) -> Optional[str]:
+        """Hash of what was last ingested from a path, if known."""
+        content_hash = self._hashes.get(file_path)
+        if content_hash is None:
+            # Fall back to the ingestor's persisted manifest across restarts
+            manifest = getattr(self.file_ingestor, "manifest", None)
+            entry = manifest.get(file_path) if manifest is not None else None
+            content_hash = entry.content_hash if entry is not None else None
+        return content_hash
+
+    def _forget(self, file_path: Path) -> Optional[str]:
+        content_hash = self._hashes.pop(file_path, None)
+        if content_hash is not None and self._hash_owners.get(content_hash) == file_path:
+            del self._hash_owners[content_hash]
+        return content_hash
+
+    async def _remove(self, file_path: Path) -> None:
+        content_hash = self._forget(file_path)
+        # The ingestor's manifest may know the file even if this watcher does not
+        if await self.file_ingestor.remove_file(file_path) or content_hash:
+            runtime_metrics.rag_files_removed.increment()
+            logger.info(f"Removed RAG file from index: {file_path.name}")
+        if content_hash is not None and content_hash not in self._hash_owners:
+            await self._ingest_duplicates(content_hash)
+
+    async def _ingest_duplicates(self, content_hash: str) -> None:
+        """Ingest files skipped as duplicates of content that is no longer indexed."""
+        for file_path in sorted(self._duplicates.pop(content_hash, ())):
+            if file_path in self._queued or file_path in self._active:
+                continue  # Its pending run will no longer find an owner
+            # Processed in this worker: queueing from a worker could block on
+            # a full queue that only workers drain
+            self._active.add(file_path)
+            try:
+                action: Optional[str] = _UPSERT
+                while action is not None:
+                    await self._process(file_path, action)
+                    action = self._pending.pop(file_path, None)
+            finally:
+                self._active.discard(file_path)
+
+    async def _wait_until_settled(self, file_path: Path) -> bool:
+        """Wait until size and mtime stop changing; False if the file vanished."""
+        previous = None
+        while True:
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                return False
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current == previous:
+                return True
+            previous = current
+            await asyncio.sleep(self.settle_seconds)
+
 
 async def watch_rag_directory(file_ingestor: IFileIngestor) -> None:
-    """Watches the rag/ directory for new files and triggers ingestion."""
-    # Ensure the directory exists
-    RAG_DIRECTORY.mkdir(exist_ok=True)
-
-    logger.info(f"Starting RAG watcher on directory: {RAG_DIRECTORY}")
-    try:
-        async for changes in awatch(RAG_DIRECTORY):
-            for change_type, path_str in changes:
-                # We only care about new files being added.
-                if change_type.name == "added":
-                    file_path = Path(path_str)
-                    logger.info(f"New file detected in RAG directory: {file_path.name}")
-                    # Schedule ingestion as a background task to avoid blocking the watcher
-                    asyncio.create_task(file_ingestor.ingest_file(file_path))
-
-    except Exception as e:
-        logger.error(f"Error in RAG directory watcher: {e}", exc_info=True)
+    """Watches the rag/ directory and ingests added, modified and deleted files."""
+    await RAGDirectoryWatcher(file_ingestor).run()
@@ -0,0 +1,306 @@
+"""
+Budgeted retries, deadline propagation and hedged requests for outbound calls.
+
+Retry loops nested at several layers multiply: two retries around a call
+that itself retries three times can turn one logical call into nine or more
+requests against a downstream that is already struggling. ``BudgetedRetry``
+is meant to be the single retry layer, applied once at the transport:
+- A token-bucket retry budget: every logical call deposits a fraction of a
+  token and every retry or hedge spends a whole one, so extra attempts stay
+  below a fixed share of traffic (10% by default) no matter how many
+  callers are failing at once
+- Deadline propagation through a context variable, so each attempt, backoff
+  and hedge is bounded by the time the original caller has left
+- Hedged requests for idempotent calls: when the first attempt is slower
+  than the recent p95 latency a second one is started, and the first
+  response wins
+- Attempts per logical call, retries, hedges and budget rejections exported
+  as metrics
+
+Deadlines are set by the caller and apply to everything awaited inside,
+including tasks spawned there::
+
+    with deadline(5.0):
+        details = await tws_client.get_job_details(job_id)
+
+API commands and queries get one from ``CQRSDispatcher``, chat messages
+from the WebSocket handler, and chat tools a shorter one of their own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from resync.core.exceptions import TimeoutError as AppTimeoutError
+from resync.core.metrics import MetricCounter, MetricHistogram
+from resync.core.structured_logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Absolute time.monotonic() by which the current operation must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound the enclosed calls (and tasks they spawn) to ``seconds`` from now.
+
+    A nested deadline can only shorten the one already in effect.
+    """
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires_at if current is None else min(current, expires_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    expires_at = _deadline.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+class DeadlineExceededError(AppTimeoutError):
+    """Raised when the caller's deadline expires before a call completes."""
+
+    def __init__(self, operation: str):
+        super().__init__(message=f"Deadline exceeded for {operation}")
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of logical calls.
+
+    Each call deposits ``ratio`` tokens and each retry or hedge withdraws
+    one. A small time-based refill (``min_retries_per_second``) lets a
+    low-traffic client still retry occasionally. Tokens are capped at
+    ``max_tokens`` so a long quiet period cannot bank a retry storm.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_retries_per_second: float = 0.1,
+        max_tokens: float = 10.0,
+    ):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self.requests = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def _refill(self, amount: float = 0.0) -> None:
+        now = time.monotonic()
+        amount += (now - self._updated) * self.min_retries_per_second
+        self._updated = now
+        self._tokens = min(self.max_tokens, self._tokens + amount)
+
+    def record_request(self) -> None:
+        """Account for a logical call (not its retries)."""
+        self.requests += 1
+        self._refill(self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Spend a token for a retry or hedge; False if the budget is spent."""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.retries += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "tokens": round(self._tokens, 2),
+            "requests": self.requests,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "retry_ratio": self.retries / self.requests if self.requests else 0.0,
+        }
+
+
+class BudgetedRetry:
+    """
+    Single retry layer with a retry budget, deadlines and hedging.
+
+    ``call`` runs ``op(timeout)`` where ``timeout`` is the time the attempt
+    may take: ``attempt_timeout`` capped by the remaining deadline. Failures
+    matching ``retry_on`` are retried with capped, fully jittered backoff
+    while the budget, the deadline and ``max_retries`` allow.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: Optional[RetryBudget] = None,
+        max_retries: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 5.0,
+        attempt_timeout: Optional[float] = None,
+        retry_on: Tuple[type, ...] = (ConnectionError, asyncio.TimeoutError),
+        hedge_after: Optional[float] = None,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        attempts_histogram: Optional[MetricHistogram] = None,
+        retries_counter: Optional[MetricCounter] = None,
+        hedges_counter: Optional[MetricCounter] = None,
+        budget_exhausted_counter: Optional[MetricCounter] = None,
+    ):
+        self.name = name
+        self.budget = budget or RetryBudget()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.retry_on = retry_on
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: Deque[float] = deque(maxlen=256)
+
+        self._attempts_histogram = attempts_histogram
+        self._retries_counter = retries_counter
+        self._hedges_counter = hedges_counter
+        self._budget_exhausted_counter = budget_exhausted_counter
+
+    def hedge_delay(self) -> Optional[float]:
+        """Delay before hedging: recent latency quantile, else ``hedge_after``."""
+        if self.hedge_after is None:
+            return None
+        if len(self._latencies) < self.hedge_min_samples:
+            return self.hedge_after
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, math.ceil(self.hedge_quantile * len(ordered)) - 1)
+        return ordered[index]
+
+    def _timeout(self) -> Optional[float]:
+        remaining = remaining_time()
+        if remaining is None:
+            return self.attempt_timeout
+        if remaining <= 0:
+            raise DeadlineExceededError(self.name)
+        if self.attempt_timeout is None:
+            return remaining
+        return min(self.attempt_timeout, remaining)
+
+    async def call(
+        self, op: Callable[[Optional[float]], Awaitable[T]], *, idempotent: bool = False
+    ) -> T:
+        """Run ``op`` with budgeted retries; hedge it if ``idempotent``."""
+        self.budget.record_request()
+        sent = [0]  # Requests issued for this logical call
+        attempt = 0
+        try:
+            while True:
+                try:
+                    if idempotent and self.hedge_after is not None:
+                        return await self._hedged(op, sent)
+                    return await self._attempt(op, sent)
+                except self.retry_on as e:
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise
+                    delay = random.uniform(
+                        0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                    )
+                    remaining = remaining_time()
+                    if remaining is not None and delay >= remaining:
+                        raise
+                    if not self.budget.try_acquire():
+                        if self._budget_exhausted_counter is not None:
+                            self._budget_exhausted_counter.increment()
+                        logger.warning(
+                            "retry_budget_exhausted", name=self.name, error=type(e).__name__
+                        )
+                        raise
+                    if self._retries_counter is not None:
+                        self._retries_counter.increment()
+                    logger.warning(
+                        "retrying_call",
+                        name=self.name,
+                        attempt=attempt,
+                        delay=round(delay, 3),
+                        error=type(e).__name__,
+                    )
+                    await asyncio.sleep(delay)
+        finally:
+            if self._attempts_histogram is not None:
+                self._attempts_histogram.observe(sent[0])
+
+    async def _attempt(
+        self, op: Callable[[Optional[float]], Awaitable[T]], sent: List[int]
+    ) -> T:
+        timeout = self._timeout()
+        sent[0] += 1
+        started = time.monotonic()
+        if remaining_time() is None:
+            result = await op(timeout)
+        else:
+            try:
+                result = await asyncio.wait_for(op(timeout), timeout)
+            except asyncio.TimeoutError:
+                if remaining_time() <= 0:
+                    raise DeadlineExceededError(self.name) from None
+                raise
+        self._latencies.append(time.monotonic() - started)
+        return result
+
+    async def _hedged(
+        self, op: Callable[[Optional[float]], Awaitable[T]], sent: List[int]
+    ) -> T:
+        tasks = [asyncio.ensure_future(self._attempt(op, sent))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if done:
+                return tasks[0].result()
+            if not self.budget.try_acquire():
+                return await tasks[0]
+
+            if self._hedges_counter is not None:
+                self._hedges_counter.increment()
+            logger.debug("hedging_call", name=self.name)
+            tasks.append(asyncio.ensure_future(self._attempt(op, sent)))
+
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not pending:
+                    # Both attempts failed: surface the last failure
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
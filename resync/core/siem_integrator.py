@@ -9,20 +9,27 @@ This module provides comprehensive SIEM integration capabilities including:
 - Custom integration APIs
 - Event enrichment and filtering
 - Performance monitoring and alerting
+
+Delivery pipeline: each event is rendered once per wire format and fanned
+out to one dispatcher per connector. Dispatchers batch by size and time,
+deliver concurrently with their own bounded queues, and append batches
+they cannot deliver to a per-connector spool file that is replayed once
+the SIEM is reachable again.
 """
 
 from __future__ import annotations
 
 import asyncio
 import json
+import os
 import secrets
 import time
 from abc import ABC, abstractmethod
-from collections import deque
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from enum import Enum
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 import aiohttp
 
@@ -94,6 +101,41 @@ class SIEMEvent:
     tags: Set[str] = field(default_factory=set)
     custom_fields: Dict[str, Any] = field(default_factory=dict)
 
+    # Rendered payloads by format, shared by every connector using that format
+    _rendered: Dict[EventFormat, str] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def render(self, event_format: EventFormat) -> str:
+        """Render the event in ``event_format``, formatting it only once."""
+        rendered = self._rendered.get(event_format)
+        if rendered is None:
+            if event_format == EventFormat.CEF:
+                rendered = self.to_cef()
+            elif event_format == EventFormat.LEEF:
+                rendered = self.to_leef()
+            elif event_format == EventFormat.RAW:
+                rendered = self.message
+            else:
+                rendered = self.to_json()
+            self._rendered[event_format] = rendered
+        return rendered
+
+    def to_record(self) -> Dict[str, Any]:
+        """Convert event to a JSON-serializable record for spooling."""
+        record = {
+            f.name: getattr(self, f.name) for f in fields(self) if f.init
+        }
+        record["tags"] = sorted(self.tags)
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "SIEMEvent":
+        """Rebuild an event from a record produced by ``to_record``."""
+        record = dict(record)
+        record["tags"] = set(record.get("tags", ()))
+        return cls(**record)
+
     def to_cef(self) -> str:
         """Convert event to CEF format."""
         cef_version = 0
@@ -193,6 +235,11 @@ class SIEMConfiguration:
     enable_ssl_verification: bool = True
     custom_config: Dict[str, Any] = field(default_factory=dict)
 
+    # Delivery pipeline
+    event_format: EventFormat = EventFormat.JSON
+    flush_interval_seconds: Optional[float] = None  # Defaults to the integrator's
+    max_queue_size: int = 10000
+
     def get_auth_headers(self) -> Dict[str, str]:
         """Get authentication headers."""
         headers = dict(self.headers)
@@ -239,6 +286,17 @@ class SIEMConnector(ABC):
         """Send batch of events to SIEM. Returns number of events sent successfully."""
         pass
 
+    async def send_events(self, events: List[SIEMEvent]) -> List[SIEMEvent]:
+        """
+        Send a batch of events and return those that were not delivered.
+
+        ``send_events_batch`` only reports a count, so unless every event was
+        accepted the whole batch is returned; connectors that know which
+        events were rejected override this.
+        """
+        sent = await self.send_events_batch(events)
+        return [] if sent >= len(events) else list(events)
+
     @abstractmethod
     async def health_check(self) -> Dict[str, Any]:
         """Perform health check on SIEM connection."""
@@ -248,6 +306,10 @@ class SIEMConnector(ABC):
         """Check if connector is connected."""
         return self.status == SIEMStatus.CONNECTED
 
+    def encode_event(self, event: SIEMEvent) -> str:
+        """Render an event in this connector's configured format."""
+        return event.render(self.config.event_format)
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get connector metrics."""
         return {
@@ -317,7 +379,7 @@ class SplunkConnector(SIEMConnector):
             splunk_events = []
             for event in events:
                 splunk_event = {
-                    "event": event.to_json(),
+                    "event": self.encode_event(event),
                     "time": event.timestamp,
                     "host": "hwa-new-system",
                     "source": event.source,
@@ -414,8 +476,12 @@ class ELKConnector(SIEMConnector):
 
     async def send_events_batch(self, events: List[SIEMEvent]) -> int:
         """Send batch of events to ELK using bulk API."""
+        return len(events) - len(await self.send_events(events))
+
+    async def send_events(self, events: List[SIEMEvent]) -> List[SIEMEvent]:
+        """Send events with the bulk API; returns the events it rejected."""
         if not self.session or not self.is_connected():
-            return 0
+            return list(events)
 
         try:
             # Prepare bulk request
@@ -426,33 +492,38 @@ class ELKConnector(SIEMConnector):
                     "index": {"_index": "security-events", "_id": event.event_id}
                 }
                 bulk_data.append(json.dumps(index_meta))
-                bulk_data.append(event.to_json())
+                bulk_data.append(event.render(EventFormat.JSON))
 
             payload = "\n".join(bulk_data) + "\n"
 
             async with self.session.post(self.bulk_endpoint, data=payload) as response:
                 if response.status == 200:
                     result = await response.json()
-                    successful = sum(
-                        1
-                        for item in result.get("items", [])
-                        if item.get("index", {}).get("status") == 201
-                    )
-                    self.events_sent += successful
+                    # Items are in request order. 200 means an existing document
+                    # was overwritten, e.g. when a spooled batch is replayed with
+                    # the same event ids
+                    items = result.get("items", [])
+                    rejected = [
+                        event
+                        for event, item in zip(events, items)
+                        if item.get("index", {}).get("status") not in (200, 201)
+                    ]
+                    rejected.extend(events[len(items):])
+                    self.events_sent += len(events) - len(rejected)
                     self.last_event_sent = time.time()
-                    return successful
+                    return rejected
                 else:
                     logger.error(
                         f"ELK bulk send failed: {response.status} - {await response.text()}"
                     )
-                    return 0
+                    return list(events)
 
         except Exception as e:
             logger.error(f"ELK batch send error: {e}")
             self.connection_failures += 1
             if self.connection_failures >= 3:
                 self.status = SIEMStatus.ERROR
-            return 0
+            return list(events)
 
     async def health_check(self) -> Dict[str, Any]:
         """Perform ELK health check."""
@@ -476,6 +547,346 @@ class ELKConnector(SIEMConnector):
             return {"status": "error", "error": str(e)}
 
 
+class EventSpool:
+    """
+    Append-only JSON-lines spool of undelivered events for one connector.
+
+    Batches are appended as they fail and replayed from a committed read
+    offset, which is kept next to the spool file so a restart resumes where
+    delivery stopped. Once everything has been replayed both files are
+    removed. File I/O runs in worker threads, one operation at a time; the
+    offset and the number of pending events are read on first use.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.offset_path = self.path.with_name(self.path.name + ".offset")
+        self.pending = 0
+
+        self._offset = 0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        """Read the committed offset and count the events left to replay."""
+        async with self._lock:
+            if not self._loaded:
+                self._offset, self.pending = await asyncio.to_thread(self._load)
+                self._loaded = True
+
+    def _load(self) -> Tuple[int, int]:
+        offset = 0
+        if self.offset_path.exists():
+            try:
+                offset = int(self.offset_path.read_text() or 0)
+            except ValueError:
+                logger.warning(f"Ignoring corrupt spool offset: {self.offset_path}")
+        if not self.path.exists():
+            return offset, 0
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return offset, sum(1 for _ in f)
+
+    async def append(self, events: List[SIEMEvent]) -> None:
+        """Append events to the end of the spool."""
+        if not events:
+            return
+        await self.load()
+        async with self._lock:
+            await asyncio.to_thread(self._append, events)
+            self.pending += len(events)
+
+    def _append(self, events: List[SIEMEvent]) -> None:
+        lines = "".join(
+            json.dumps(event.to_record(), separators=(",", ":"), default=str) + "\n"
+            for event in events
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def read(self, limit: int) -> Tuple[List[SIEMEvent], int, int]:
+        """
+        Read up to ``limit`` events from the committed offset.
+
+        Returns:
+            The events, the offset just past them and the number of lines
+            consumed (unparseable lines are consumed but skipped)
+        """
+        await self.load()
+        async with self._lock:
+            return await asyncio.to_thread(self._read, self._offset, limit)
+
+    def _read(self, offset: int, limit: int) -> Tuple[List[SIEMEvent], int, int]:
+        events: List[SIEMEvent] = []
+        consumed = 0
+        if not self.path.exists():
+            return events, offset, consumed
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while consumed < limit:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # EOF or a partially written line
+                offset += len(line)
+                consumed += 1
+                try:
+                    events.append(SIEMEvent.from_record(json.loads(line)))
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Skipping corrupt spool entry in {self.path}: {e}")
+        return events, offset, consumed
+
+    async def commit(self, offset: int, consumed: int) -> None:
+        """Mark everything before ``offset`` as delivered."""
+        await self.load()
+        async with self._lock:
+            self.pending = max(0, self.pending - consumed)
+            removed = await asyncio.to_thread(self._commit, offset, self.pending)
+            self._offset = 0 if removed else offset
+
+    def _commit(self, offset: int, pending: int) -> bool:
+        """Persist the offset; returns whether the drained spool was removed."""
+        if pending == 0 and offset >= self.path.stat().st_size:
+            self.path.unlink(missing_ok=True)
+            self.offset_path.unlink(missing_ok=True)
+            return True
+
+        tmp_path = self.offset_path.with_name(self.offset_path.name + ".tmp")
+        tmp_path.write_text(str(offset))
+        os.replace(tmp_path, self.offset_path)
+        return False
+
+
+class ConnectorDispatcher:
+    """
+    Batches and delivers events to a single SIEM connector.
+
+    Each connector has its own bounded queue and worker, so a slow or
+    failing SIEM only backs up its own queue. Batches are flushed at
+    ``batch_size`` events or ``flush_interval`` seconds after the first
+    event arrived, and the events the SIEM did not accept are retried with
+    exponential backoff, then spooled when they still cannot be delivered
+    (or when the queue overflows). Spooled events are replayed one batch at
+    a time between live batches.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connector: SIEMConnector,
+        circuit_breaker: SIEMCircuitBreaker,
+        flush_interval: float,
+        spool: Optional[EventSpool] = None,
+    ):
+        self.name = name
+        self.connector = connector
+        self.circuit_breaker = circuit_breaker
+        self.spool = spool
+        config = connector.config
+        self.batch_size = max(1, config.batch_size)
+        self.flush_interval = (
+            config.flush_interval_seconds
+            if config.flush_interval_seconds is not None
+            else flush_interval
+        )
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=config.max_queue_size)
+
+        # Statistics
+        self.batches_sent = 0
+        self.events_delivered = 0
+        self.events_spooled = 0
+        self.events_replayed = 0
+        self.events_dropped = 0
+
+        self._in_flight: List[SIEMEvent] = []
+        self._task: Optional[asyncio.Task] = None
+        # Events that overflowed the queue, spooled by a background task
+        self._overflow: List[SIEMEvent] = []
+        self._overflow_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the delivery worker."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker and deliver or spool whatever is still queued."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._in_flight:
+            await self._spool(self._in_flight)
+            self._in_flight = []
+        await self.flush()
+        if self._overflow_task:
+            await self._overflow_task
+
+    def submit(self, event: SIEMEvent) -> bool:
+        """Queue an event without blocking; overflow goes to the spool."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self._overflow.append(event)
+            if self._overflow_task is None or self._overflow_task.done():
+                self._overflow_task = asyncio.create_task(self._spool_overflow())
+            return False
+
+    def is_available(self) -> bool:
+        """Whether the connector can currently accept events."""
+        if not self.connector.is_connected():
+            return False
+        if self.circuit_breaker.is_open(self.name):
+            # Let a batch through as a probe once the recovery timeout passed
+            if not self.circuit_breaker.can_attempt(self.name):
+                return False
+            self.circuit_breaker.attempt_reset(self.name)
+        return True
+
+    async def flush(self) -> None:
+        """Deliver everything queued right now, spooling what fails."""
+        while not self.queue.empty():
+            batch = self._drain(self.batch_size)
+            await self._spool(await self._deliver(batch, attempts=1))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get delivery metrics."""
+        return {
+            "queue_size": self.queue.qsize(),
+            "batches_sent": self.batches_sent,
+            "events_delivered": self.events_delivered,
+            "events_spooled": self.events_spooled,
+            "events_replayed": self.events_replayed,
+            "events_dropped": self.events_dropped,
+            "spool_pending": self.spool.pending if self.spool else 0,
+        }
+
+    async def _run(self) -> None:
+        if self.spool:
+            await self.spool.load()  # Events left by a previous run
+        while True:
+            try:
+                batch = await self._next_batch()
+                delivered = True
+                if batch:
+                    # Spooled by stop() if the worker is cancelled mid-delivery
+                    self._in_flight = batch
+                    undelivered = await self._deliver(batch)
+                    self._in_flight = []
+                    await self._spool(undelivered)
+                    delivered = not undelivered
+
+                if delivered and self.spool and self.spool.pending:
+                    await self._replay_batch()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"SIEM dispatcher error for {self.name}: {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    async def _next_batch(self) -> List[SIEMEvent]:
+        """Wait for a full batch or until the flush interval expires."""
+        loop = asyncio.get_running_loop()
+        try:
+            first = await asyncio.wait_for(self.queue.get(), self.flush_interval)
+        except asyncio.TimeoutError:
+            return []
+
+        batch = [first]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            batch.extend(self._drain(self.batch_size - len(batch)))
+            if len(batch) >= self.batch_size:
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _drain(self, limit: int) -> List[SIEMEvent]:
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    async def _deliver(
+        self, events: List[SIEMEvent], attempts: Optional[int] = None
+    ) -> List[SIEMEvent]:
+        """Send events, retrying those not accepted; returns the undelivered ones."""
+        attempts = attempts or max(1, self.connector.config.retry_attempts)
+        delay = self.connector.config.retry_delay_seconds
+
+        for attempt in range(attempts):
+            if not self.is_available():
+                return events
+            try:
+                undelivered = await self.connector.send_events(events)
+            except Exception as e:
+                logger.error(f"Error sending events to {self.name}: {e}")
+                undelivered = events
+
+            sent = len(events) - len(undelivered)
+            if sent > 0:
+                self.batches_sent += 1
+                self.events_delivered += sent
+            if not undelivered:
+                return []
+            if sent == 0:
+                self.circuit_breaker.record_failure(self.name)
+            events = undelivered
+            if attempt + 1 < attempts:
+                await asyncio.sleep(delay * (2**attempt))
+
+        logger.warning(f"Failed to send {len(events)} events to {self.name}")
+        return events
+
+    async def _replay_batch(self) -> None:
+        if not self.is_available():
+            return
+        events, offset, consumed = await self.spool.read(self.batch_size)
+        undelivered: List[SIEMEvent] = []
+        if events:
+            undelivered = await self._deliver(events, attempts=1)
+            if len(undelivered) == len(events):
+                return
+            # Rejected events go back to the end of the spool
+            await self.spool.append(undelivered)
+        await self.spool.commit(offset, consumed)
+        self.events_replayed += len(events) - len(undelivered)
+
+    async def _spool_overflow(self) -> None:
+        while self._overflow:
+            events, self._overflow = self._overflow, []
+            await self._spool(events)
+
+    async def _spool(self, events: List[SIEMEvent]) -> None:
+        if not events:
+            return
+        if self.spool is None:
+            self.events_dropped += len(events)
+            logger.warning(f"Dropping {len(events)} undeliverable events for {self.name}")
+            return
+        try:
+            await self.spool.append(events)
+            self.events_spooled += len(events)
+        except OSError as e:
+            self.events_dropped += len(events)
+            logger.error(f"Failed to spool events for {self.name}: {e}")
+
+
 class SIEMIntegrator:
     """
     Main SIEM integration system with multi-SIEM support and failover.
@@ -497,20 +908,19 @@ class SIEMIntegrator:
         self.correlation_engine = EventCorrelationEngine()
         self.enrichment_engine = EventEnrichmentEngine()
 
-        # Processing
-        self.event_buffer: deque = deque(maxlen=1000)
-        self.batch_size = self.config.get("batch_size", 50)
+        # Processing: one dispatcher per connector, spooling to spool_directory
+        self.dispatchers: Dict[str, ConnectorDispatcher] = {}
         self.flush_interval = self.config.get("flush_interval_seconds", 5.0)
+        spool_directory = self.config.get("spool_directory")
+        self.spool_directory = Path(spool_directory) if spool_directory else None
 
         # Statistics
         self.events_processed = 0
         self.events_dropped = 0
         self.correlation_events = 0
-        self.last_flush = time.time()
 
         # Background tasks
         self._processor_task: Optional[asyncio.Task] = None
-        self._flusher_task: Optional[asyncio.Task] = None
         self._monitor_task: Optional[asyncio.Task] = None
         self._running = False
 
@@ -523,8 +933,9 @@ class SIEMIntegrator:
             return
 
         self._running = True
+        for dispatcher in self.dispatchers.values():
+            dispatcher.start()
         self._processor_task = asyncio.create_task(self._event_processor())
-        self._flusher_task = asyncio.create_task(self._batch_flusher())
         self._monitor_task = asyncio.create_task(self._health_monitor())
 
         logger.info("SIEM integrator started")
@@ -536,10 +947,7 @@ class SIEMIntegrator:
 
         self._running = False
 
-        # Flush remaining events
-        await self._flush_events()
-
-        for task in [self._processor_task, self._flusher_task, self._monitor_task]:
+        for task in [self._processor_task, self._monitor_task]:
             if task:
                 task.cancel()
                 try:
@@ -547,6 +955,12 @@ class SIEMIntegrator:
                 except asyncio.CancelledError:
                     pass
 
+        # Hand queued events to the dispatchers, then flush them concurrently
+        self._fan_out_queued()
+        await asyncio.gather(
+            *(dispatcher.stop() for dispatcher in self.dispatchers.values())
+        )
+
         # Disconnect all connectors
         for connector in self.connectors.values():
             await connector.disconnect()
@@ -564,7 +978,7 @@ class SIEMIntegrator:
                 logger.warning(f"Unsupported SIEM type: {config.siem_type}")
                 return False
 
-            self.connectors[name] = connector
+            self.register_connector(name, connector)
             logger.info(f"Added SIEM connector: {name} ({config.siem_type.value})")
             return True
 
@@ -572,6 +986,21 @@ class SIEMIntegrator:
             logger.error(f"Failed to add SIEM connector {name}: {e}")
             return False
 
+    def register_connector(self, name: str, connector: SIEMConnector) -> None:
+        """Register a connector instance and its delivery dispatcher."""
+        spool = (
+            EventSpool(self.spool_directory / f"{name}.jsonl")
+            if self.spool_directory
+            else None
+        )
+        dispatcher = ConnectorDispatcher(
+            name, connector, self.circuit_breaker, self.flush_interval, spool
+        )
+        self.connectors[name] = connector
+        self.dispatchers[name] = dispatcher
+        if self._running:
+            dispatcher.start()
+
     async def send_security_event(
         self,
         event_type: str,
@@ -627,9 +1056,13 @@ class SIEMIntegrator:
 
     def get_connector_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all connectors."""
-        return {
-            name: connector.get_metrics() for name, connector in self.connectors.items()
-        }
+        status = {}
+        for name, connector in self.connectors.items():
+            status[name] = connector.get_metrics()
+            dispatcher = self.dispatchers.get(name)
+            if dispatcher:
+                status[name]["delivery"] = dispatcher.get_metrics()
+        return status
 
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get overall system metrics."""
@@ -641,7 +1074,10 @@ class SIEMIntegrator:
                 "dropped": self.events_dropped,
                 "correlated": self.correlation_events,
                 "queue_size": self.event_queue.qsize(),
-                "buffer_size": len(self.event_buffer),
+                "buffer_size": sum(d.queue.qsize() for d in self.dispatchers.values()),
+                "spooled": sum(
+                    d.spool.pending for d in self.dispatchers.values() if d.spool
+                ),
             },
             "connectors": {
                 "total": len(self.connectors),
@@ -679,76 +1115,31 @@ class SIEMIntegrator:
         return categories.get(event_type, "general")
 
     async def _event_processor(self) -> None:
-        """Process events from the queue."""
+        """Fan queued events out to every connector's dispatcher."""
         while self._running:
             try:
-                # Get event from queue
                 event = await self.event_queue.get()
-
-                # Add to buffer for batching
-                self.event_buffer.append(event)
-
-                # Process immediately if buffer is full
-                if len(self.event_buffer) >= self.batch_size:
-                    await self._flush_events()
+                self._dispatch(event)
+                self._fan_out_queued()
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Event processor error: {e}")
 
-    async def _batch_flusher(self) -> None:
-        """Periodically flush event batches."""
-        while self._running:
+    def _fan_out_queued(self) -> None:
+        """Dispatch everything currently waiting in the event queue."""
+        while True:
             try:
-                await asyncio.sleep(self.flush_interval)
-
-                # Check if it's time to flush
-                if (
-                    len(self.event_buffer) > 0
-                    and time.time() - self.last_flush >= self.flush_interval
-                ):
-                    await self._flush_events()
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Batch flusher error: {e}")
-
-    async def _flush_events(self) -> None:
-        """Flush buffered events to SIEMs."""
-        if not self.event_buffer:
-            return
-
-        events_to_send = list(self.event_buffer)
-        self.event_buffer.clear()
-
-        # Send to all active connectors
-        successful_sends = 0
-
-        for name, connector in self.connectors.items():
-            if connector.is_connected() and not self.circuit_breaker.is_open(name):
-                try:
-                    sent = await connector.send_events_batch(events_to_send)
-                    successful_sends += sent
-
-                    if sent == 0:
-                        self.circuit_breaker.record_failure(name)
-                        logger.warning(f"Failed to send events to {name}")
-
-                except Exception as e:
-                    self.circuit_breaker.record_failure(name)
-                    logger.error(f"Error sending events to {name}: {e}")
-            else:
-                logger.debug(f"Skipping {name}: not connected or circuit open")
-
-        self.last_flush = time.time()
-
-        if successful_sends < len(events_to_send):
-            failed_count = len(events_to_send) - successful_sends
-            logger.warning(
-                f"Failed to send {failed_count} out of {len(events_to_send)} events"
-            )
+                event = self.event_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            self._dispatch(event)
+
+    def _dispatch(self, event: SIEMEvent) -> None:
+        # The event object is shared, so each format is rendered only once
+        for dispatcher in self.dispatchers.values():
+            dispatcher.submit(event)
 
     async def _health_monitor(self) -> None:
         """Monitor health of SIEM connections."""
@@ -1,22 +1,33 @@
 """Asynchronous task management system.
 
 This module provides a comprehensive task execution framework with:
-- Priority-based task scheduling
+- Priority-based task scheduling with weighted fairness (no starvation)
 - Retry logic with configurable delays
 - Timeout handling for long-running tasks
-- Concurrent execution with configurable worker pools
-- Task status tracking and statistics
+- Concurrent execution by a fixed pool of worker coroutines
+- A separate bounded executor for synchronous task functions
+- Task status tracking and statistics with TTL eviction of finished tasks
+- Optional durable task state in SQLite so jobs survive restarts
 - Graceful shutdown and cleanup
 """
 
 from __future__ import annotations
 
 import asyncio
+import functools
+import importlib
+import json
+import sqlite3
+import threading
+import time
 import uuid
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Awaitable, Callable
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque
 
 from resync.core.structured_logger import get_logger
 
@@ -42,6 +53,17 @@ class TaskPriority(Enum):
     CRITICAL = 4
 
 
+# Share of dispatch slots each priority gets while several levels are queued
+DEFAULT_PRIORITY_WEIGHTS: dict[TaskPriority, int] = {
+    TaskPriority.CRITICAL: 8,
+    TaskPriority.HIGH: 4,
+    TaskPriority.NORMAL: 2,
+    TaskPriority.LOW: 1,
+}
+
+_FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
 @dataclass
 class Task:
     """Represents a task to be executed."""
@@ -62,40 +84,243 @@ class Task:
     retry_count: int = 0
     retry_delay: float = 1.0
     timeout: float | None = None
+    persistent: bool = False
+
+
+def _func_ref(func: Callable[..., Any]) -> str | None:
+    """Return an importable ``module:qualname`` reference, if the function has one."""
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", "")
+    if not module or not qualname or "<" in qualname:
+        return None
+    return f"{module}:{qualname}"
+
+
+def _resolve_func(ref: str) -> Callable[..., Any]:
+    """Import the function named by a ``module:qualname`` reference."""
+    module_name, qualname = ref.split(":", 1)
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+class SQLiteTaskStore:
+    """
+    Durable task state backed by SQLite.
+
+    Only tasks whose function is importable by reference and whose arguments
+    and results are JSON-serializable are persisted. On restart, pending and
+    interrupted (running) tasks are loaded back and requeued.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                func_ref TEXT NOT NULL,
+                args TEXT NOT NULL,
+                kwargs TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                completed_at TEXT,
+                result TEXT,
+                error TEXT,
+                max_retries INTEGER NOT NULL,
+                retry_count INTEGER NOT NULL,
+                retry_delay REAL NOT NULL,
+                timeout REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def serialize(task: Task) -> tuple[Any, ...] | None:
+        """Build a row for a task, or None if it cannot be persisted."""
+        func_ref = _func_ref(task.func) if task.func else None
+        if func_ref is None:
+            return None
+        try:
+            args = json.dumps(list(task.args))
+            kwargs = json.dumps(task.kwargs)
+            result = None if task.result is None else json.dumps(task.result)
+        except (TypeError, ValueError):
+            return None
+        return (
+            task.id,
+            task.name,
+            func_ref,
+            args,
+            kwargs,
+            task.status.value,
+            task.priority.value,
+            task.created_at.isoformat(),
+            task.completed_at.isoformat() if task.completed_at else None,
+            result,
+            str(task.error) if task.error else None,
+            task.max_retries,
+            task.retry_count,
+            task.retry_delay,
+            task.timeout,
+        )
+
+    def save(self, row: tuple[Any, ...]) -> None:
+        """Insert or update a task row."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self._conn.commit()
+
+    def delete(self, task_ids: list[str]) -> None:
+        """Remove task rows."""
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids]
+            )
+            self._conn.commit()
+
+    def load_unfinished(self) -> list[Task]:
+        """Load pending and interrupted tasks as runnable Task objects."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, name, func_ref, args, kwargs, priority, created_at,"
+                " max_retries, retry_count, retry_delay, timeout"
+                " FROM tasks WHERE status IN (?, ?) ORDER BY created_at",
+                (TaskStatus.PENDING.value, TaskStatus.RUNNING.value),
+            ).fetchall()
+
+        tasks = []
+        for row in rows:
+            try:
+                func = _resolve_func(row[2])
+            except (ImportError, AttributeError) as e:
+                logger.warning(f"Cannot restore task {row[0]} ({row[2]}): {e}")
+                continue
+            tasks.append(
+                Task(
+                    id=row[0],
+                    name=row[1],
+                    func=func,
+                    args=tuple(json.loads(row[3])),
+                    kwargs=json.loads(row[4]),
+                    priority=TaskPriority(row[5]),
+                    created_at=datetime.fromisoformat(row[6]),
+                    max_retries=row[7],
+                    retry_count=row[8],
+                    retry_delay=row[9],
+                    timeout=row[10],
+                    persistent=True,
+                )
+            )
+        return tasks
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
 
 
 class TaskManager:
-    """Manages asynchronous task execution with priority and retry support."""
+    """
+    Manages asynchronous task execution with priority and retry support.
+
+    ``max_workers`` worker coroutines pull from per-priority queues, so up to
+    ``max_workers`` tasks run at once. Dispatch uses smooth weighted
+    round-robin across the non-empty priorities: higher priorities get more
+    slots, but LOW tasks still make progress under sustained load.
+    """
 
-    def __init__(self, max_workers: int = 10):
+    def __init__(
+        self,
+        max_workers: int = 10,
+        sync_workers: int = 4,
+        sync_executor: str = "thread",
+        task_ttl: float = 3600.0,
+        priority_weights: dict[TaskPriority, int] | None = None,
+        persistence_path: str | Path | None = None,
+    ):
         self.max_workers = max_workers
+        self.sync_workers = sync_workers
+        self.sync_executor = sync_executor
+        self.task_ttl = task_ttl
+        self.priority_weights = dict(priority_weights or DEFAULT_PRIORITY_WEIGHTS)
+        self.persistence_path = persistence_path
+
         self.tasks: dict[str, Task] = {}
-        self.task_queue: asyncio.PriorityQueue[tuple[int, str]] = (
-            asyncio.PriorityQueue()
-        )
         self.running_tasks: dict[str, asyncio.Task[Any]] = {}
-        self.semaphore = asyncio.Semaphore(max_workers)
+        self._queues: dict[TaskPriority, Deque[str]] = {
+            priority: deque() for priority in TaskPriority
+        }
+        self._current_weights: dict[TaskPriority, int] = {
+            priority: 0 for priority in TaskPriority
+        }
+        self._available = asyncio.Semaphore(0)
+        self._finished: Deque[tuple[float, str]] = deque()
         self._shutdown = False
 
-        # Start the task processor
-        self._processor_task = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._executor: Executor | None = None
+        self._store: SQLiteTaskStore | None = None
+        # Expired persistent task ids waiting to be deleted from the store
+        self._expired_ids: list[str] = []
+        self._delete_task: asyncio.Task[None] | None = None
 
     async def start(self):
-        """Start the task manager."""
-        if self._processor_task is None or self._processor_task.done():
-            self._processor_task = asyncio.create_task(self._process_tasks())
+        """Start the worker pool and restore persisted tasks."""
+        if self._workers and not all(worker.done() for worker in self._workers):
+            return
+
+        self._shutdown = False
+        if self.persistence_path and self._store is None:
+            self._store = await asyncio.to_thread(SQLiteTaskStore, self.persistence_path)
+            for task in await asyncio.to_thread(self._store.load_unfinished):
+                if task.id not in self.tasks:
+                    self.tasks[task.id] = task
+                    self._enqueue(task)
+                    logger.info(f"Task restored: {task.id} - {task.name}")
+
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"task-manager-worker-{i}")
+            for i in range(self.max_workers)
+        ]
 
     async def stop(self):
         """Stop the task manager."""
         self._shutdown = True
 
         # Cancel all running tasks
-        for task in self.running_tasks.values():
+        for task in list(self.running_tasks.values()):
             task.cancel()
 
-        # Wait for processor to finish
-        if self._processor_task and not self._processor_task.done():
-            await self._processor_task
+        # Wake idle workers so they observe the shutdown flag
+        for _ in self._workers:
+            self._available.release()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._delete_task is not None:
+            await asyncio.gather(self._delete_task, return_exceptions=True)
+            self._delete_task = None
+        if self._store is not None:
+            await asyncio.to_thread(self._store.close)
+            self._store = None
 
     async def submit(
         self,
@@ -106,25 +331,29 @@ class TaskManager:
         max_retries: int = 0,
         retry_delay: float = 1.0,
         timeout: float | None = None,
+        persistent: bool = False,
         **kwargs: Any,
     ) -> str:
         """Submit a task for asynchronous execution.
 
         Args:
             name: Human-readable task name for monitoring
-            func: Async callable to execute
+            func: Async or sync callable to execute
             *args: Positional arguments for the function
-            priority: Task execution priority (LOW/NORMAL/HIGH)
+            priority: Task execution priority (LOW/NORMAL/HIGH/CRITICAL)
             max_retries: Maximum retry attempts on failure
             retry_delay: Delay between retry attempts in seconds
             timeout: Maximum execution time in seconds
+            persistent: Keep task state in the SQLite store (requires
+                ``persistence_path``, an importable function and
+                JSON-serializable arguments)
             **kwargs: Keyword arguments for the function
 
         Returns:
             Unique task identifier string
 
         Raises:
-            ValueError: If task manager is not running
+            ValueError: If a persistent task cannot be stored
         """
 
         task = Task(
@@ -136,13 +365,22 @@ class TaskManager:
             max_retries=max_retries,
             retry_delay=retry_delay,
             timeout=timeout,
+            persistent=persistent,
         )
 
-        self.tasks[task.id] = task
+        if persistent:
+            if self.persistence_path is None:
+                raise ValueError("Persistent tasks require a persistence_path")
+            if SQLiteTaskStore.serialize(task) is None:
+                raise ValueError(
+                    f"Task '{name}' cannot be persisted: the function must be importable"
+                    " and its arguments JSON-serializable"
+                )
 
-        # Use negative priority for max-heap behavior (higher priority = lower number)
-        priority_value = -priority.value
-        await self.task_queue.put((priority_value, task.id))
+        self._evict_expired()
+        self.tasks[task.id] = task
+        await self._persist(task)
+        self._enqueue(task)
 
         logger.info(f"Task submitted: {task.id} - {name}")
         return task.id
@@ -158,45 +396,57 @@ class TaskManager:
 
         task = self.tasks[task_id]
 
-        if task.status in [
-            TaskStatus.COMPLETED,
-            TaskStatus.FAILED,
-            TaskStatus.CANCELLED,
-        ]:
+        if task.status in _FINISHED_STATUSES:
             return False
 
         if task_id in self.running_tasks:
             self.running_tasks[task_id].cancel()
-            task.status = TaskStatus.CANCELLED
-            task.completed_at = datetime.now()
             return True
 
-        # Task is still in queue
-        task.status = TaskStatus.CANCELLED
-        task.completed_at = datetime.now()
+        # Task is still queued; workers skip cancelled entries
+        await self._finish(task, TaskStatus.CANCELLED)
         return True
 
-    async def _process_tasks(self):
-        """Process tasks from the queue."""
+    def _enqueue(self, task: Task) -> None:
+        """Queue a task for the workers."""
+        self._queues[task.priority].append(task.id)
+        self._available.release()
+
+    def _next_task_id(self) -> str | None:
+        """Pick the next task id using smooth weighted round-robin."""
+        total = 0
+        selected: TaskPriority | None = None
+        for priority, queue in self._queues.items():
+            if not queue:
+                continue
+            weight = self.priority_weights.get(priority, 1)
+            total += weight
+            self._current_weights[priority] += weight
+            if (
+                selected is None
+                or self._current_weights[priority] > self._current_weights[selected]
+            ):
+                selected = priority
+
+        if selected is None:
+            return None
+        self._current_weights[selected] -= total
+        return self._queues[selected].popleft()
+
+    async def _worker(self) -> None:
+        """Pull tasks from the queues and run them one at a time."""
+        while True:
+            await self._available.acquire()
+            if self._shutdown:
+                return
+
+            task_id = self._next_task_id()
+            task = self.tasks.get(task_id) if task_id else None
+            if task is None or task.status != TaskStatus.PENDING:
+                continue
 
-        while not self._shutdown:
             try:
-                # Get next task from queue with timeout
-                try:
-                    priority_value, task_id = await asyncio.wait_for(
-                        self.task_queue.get(), timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    continue
-
-                task = self.tasks.get(task_id)
-                if not task or task.status == TaskStatus.CANCELLED:
-                    continue
-
-                # Acquire semaphore to limit concurrent tasks
-                async with self.semaphore:
-                    await self._execute_task(task)
-
+                await self._execute_task(task)
             except Exception as e:
                 logger.error(f"Error processing tasks: {e}")
 
@@ -208,6 +458,7 @@ class TaskManager:
 
         task.status = TaskStatus.RUNNING
         task.started_at = datetime.now()
+        await self._persist(task)
 
         # Create the actual asyncio task
         async def task_wrapper():
@@ -225,12 +476,16 @@ class TaskManager:
         asyncio_task = asyncio.create_task(task_wrapper())
         self.running_tasks[task.id] = asyncio_task
 
-        # Wait for completion
+        # Wait for completion; cancelling the task must not kill the worker
         try:
-            await asyncio_task
+            await asyncio.wait([asyncio_task])
         finally:
             self.running_tasks.pop(task.id, None)
 
+        if task.status == TaskStatus.RUNNING and asyncio_task.cancelled():
+            # Cancelled before the wrapper got to run
+            await self._handle_task_cancellation(task)
+
     async def _run_task_function(self, task: Task) -> Any:
         """Execute the task function with appropriate handling."""
         if asyncio.iscoroutinefunction(task.func):
@@ -249,32 +504,41 @@ class TaskManager:
         else:
             return await task.func(*task.args, **task.kwargs)
 
+    def _get_executor(self) -> Executor:
+        """Create the bounded executor for sync task functions on first use."""
+        if self._executor is None:
+            if self.sync_executor == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.sync_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.sync_workers, thread_name_prefix="task-manager"
+                )
+        return self._executor
+
     async def _run_sync_function(self, task: Task) -> Any:
-        """Run a sync task function in executor."""
+        """Run a sync task function in the dedicated executor."""
         if task.func is None:
             raise ValueError("Task function is not set")
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
+        call = functools.partial(task.func, *task.args, **task.kwargs)
+        future = loop.run_in_executor(self._get_executor(), call)
         if task.timeout:
-            return await asyncio.wait_for(
-                loop.run_in_executor(None, task.func, *task.args, **task.kwargs),
-                timeout=task.timeout,
-            )
+            return await asyncio.wait_for(future, timeout=task.timeout)
         else:
-            return await loop.run_in_executor(
-                None, task.func, *task.args, **task.kwargs
-            )
+            return await future
 
     async def _handle_task_success(self, task: Task, result: Any) -> None:
         """Handle successful task completion."""
         task.result = result
-        task.status = TaskStatus.COMPLETED
-        task.completed_at = datetime.now()
+        await self._finish(task, TaskStatus.COMPLETED)
         logger.info(f"Task completed: {task.id} - {task.name}")
 
     async def _handle_task_cancellation(self, task: Task) -> None:
         """Handle task cancellation."""
-        task.status = TaskStatus.CANCELLED
-        task.completed_at = datetime.now()
+        if self._shutdown and task.persistent:
+            # Interrupted by shutdown: leave it pending so it resumes on restart
+            return
+        await self._finish(task, TaskStatus.CANCELLED)
         logger.info(f"Task cancelled: {task.id} - {task.name}")
 
     async def _handle_task_failure(self, task: Task, error: Exception) -> None:
@@ -286,38 +550,87 @@ class TaskManager:
         if task.retry_count < task.max_retries:
             task.retry_count += 1
             task.status = TaskStatus.PENDING
+            await self._persist(task)
             # Schedule retry
             asyncio.create_task(self._schedule_retry(task))
         else:
-            task.status = TaskStatus.FAILED
-            task.completed_at = datetime.now()
+            await self._finish(task, TaskStatus.FAILED)
 
     async def _schedule_retry(self, task: Task):
         """Schedule a task retry with delay."""
 
         await asyncio.sleep(task.retry_delay * task.retry_count)
 
-        if task.status == TaskStatus.PENDING:
-            # Use negative priority for max-heap behavior
-            priority_value = -task.priority.value
-            await self.task_queue.put((priority_value, task.id))
+        if task.status == TaskStatus.PENDING and not self._shutdown:
+            self._enqueue(task)
 
-    def get_stats(self) -> dict[str, Any]:
-        """Get task manager statistics."""
+    async def _finish(self, task: Task, status: TaskStatus) -> None:
+        """Record a terminal status and schedule the record for eviction."""
+        task.status = status
+        task.completed_at = datetime.now()
+        self._finished.append((time.monotonic() + self.task_ttl, task.id))
+        await self._persist(task)
 
-        from collections import Counter
+    async def _persist(self, task: Task) -> None:
+        """Write task state to the store, if the task is persistent."""
+        if not task.persistent or self._store is None:
+            return
+        row = SQLiteTaskStore.serialize(task)
+        if row is None:
+            logger.warning(f"Task {task.id} result is not serializable; not persisted")
+            return
+        try:
+            await asyncio.to_thread(self._store.save, row)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to persist task {task.id}: {e}")
+
+    def _evict_expired(self) -> None:
+        """Drop finished task records older than the TTL."""
+        now = time.monotonic()
+        expired: list[str] = []
+        while self._finished and self._finished[0][0] <= now:
+            _, task_id = self._finished.popleft()
+            task = self.tasks.get(task_id)
+            if task is not None and task.status in _FINISHED_STATUSES:
+                del self.tasks[task_id]
+                if task.persistent:
+                    expired.append(task_id)
+
+        if expired and self._store is not None:
+            # Deleted off the event loop, like every other store call
+            self._expired_ids.extend(expired)
+            if self._delete_task is None or self._delete_task.done():
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    return  # Not on the loop; deleted on the next eviction there
+                self._delete_task = loop.create_task(self._delete_expired())
+
+    async def _delete_expired(self) -> None:
+        """Delete the queued expired task ids from the store."""
+        while self._expired_ids and self._store is not None:
+            expired, self._expired_ids = self._expired_ids, []
+            try:
+                await asyncio.to_thread(self._store.delete, expired)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to delete expired tasks: {e}")
 
+    def get_stats(self) -> dict[str, Any]:
+        """Get task manager statistics."""
+        self._evict_expired()
         status_counts = Counter(task.status.value for task in self.tasks.values())
 
         return {
             "total_tasks": len(self.tasks),
             "running_tasks": len(self.running_tasks),
-            "queued_tasks": self.task_queue.qsize(),
+            "queued_tasks": sum(len(queue) for queue in self._queues.values()),
+            "queued_by_priority": {
+                priority.name.lower(): len(queue)
+                for priority, queue in self._queues.items()
+            },
             "max_workers": self.max_workers,
-            "available_workers": (
-                self.semaphore._value
-                if hasattr(self.semaphore, "_value")
-                else "unknown"
-            ),
+            "available_workers": self.max_workers - len(self.running_tasks),
+            "sync_workers": self.sync_workers,
+            "persistent": self._store is not None,
             "status_counts": status_counts,
         }
@@ -14,6 +14,7 @@ from typing import Any, Dict, List, Optional
 
 import structlog
 
+from resync.core.adaptive_concurrency import RequestPriority, request_priority
 from resync.core.exceptions import PerformanceError
 from resync.core.interfaces import ITWSClient
 from resync.core.teams_integration import get_teams_integration
@@ -101,7 +102,10 @@ class TWSMonitor:
             return
 
         self._is_monitoring = True
-        self._monitoring_task = asyncio.create_task(self._monitoring_loop())
+        # The task inherits this context, so monitoring probes yield to
+        # interactive and dashboard TWS calls
+        with request_priority(RequestPriority.BACKGROUND):
+            self._monitoring_task = asyncio.create_task(self._monitoring_loop())
         logger.info("tws_monitoring_started")
 
     async def stop_monitoring(self) -> None:
@@ -8,14 +8,22 @@ This module provides intelligent behavioral analysis including:
 - Risk scoring based on behavioral patterns
 - Temporal analysis of user activities
 - Machine learning-based user classification
+
+Profiles and sessions hold incremental aggregates only (fixed-size
+hour/day arrays, Welford statistics, decayed counters, bounded sets), so
+analysis and statistics cost O(1) per activity and per-user memory stays
+bounded however long the history grows.
 """
 
 from __future__ import annotations
 
 import asyncio
 import hashlib
+import itertools
+import math
 import time
-from collections import defaultdict, deque
+from array import array
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Set
@@ -64,34 +72,162 @@ class UserActivity:
         return hashlib.md5(key.encode()).hexdigest()
 
 
-@dataclass
+class RunningStats:
+    """Welford running mean/variance in constant memory."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        return self.variance**0.5
+
+
+class BoundedSet:
+    """
+    Insertion-ordered set that keeps at most ``capacity`` recent members.
+
+    ``seen`` counts distinct values added (exact until the first eviction),
+    which is all the risk factors need: they saturate at a handful of IPs or
+    user agents.
+    """
+
+    __slots__ = ("_items", "capacity", "seen")
+
+    def __init__(self, capacity: int) -> None:
+        self._items: Dict[str, None] = {}
+        self.capacity = capacity
+        self.seen = 0
+
+    def add(self, value: str) -> None:
+        if value in self._items:
+            return
+        self.seen += 1
+        if len(self._items) >= self.capacity:
+            del self._items[next(iter(self._items))]
+        self._items[value] = None
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._items
+
+    def __len__(self) -> int:
+        return self.seen
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+# Half-life of the decayed error and activity counters
+_DECAY_HALF_LIFE_SECONDS = 3600.0
+_DECAY_RATE = math.log(2) / _DECAY_HALF_LIFE_SECONDS
+
+# Caps that bound per-user memory regardless of history length
+_MAX_TRACKED_ENDPOINTS = 64
+_MAX_TRACKED_IPS = 16
+_MAX_TRACKED_USER_AGENTS = 8
+_MAX_TRACKED_ACTIONS = 32
+
+
 class UserProfile:
-    """Profile of user behavior patterns."""
+    """
+    Profile of user behavior patterns.
 
-    user_id: str
-    created_at: float = field(default_factory=time.time)
-    last_activity: float = field(default_factory=time.time)
-
-    # Activity patterns
-    total_activities: int = 0
-    unique_endpoints: Set[str] = field(default_factory=set)
-    activity_frequency: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
-
-    # Temporal patterns
-    hourly_pattern: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
-    daily_pattern: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
-    session_durations: List[float] = field(default_factory=list)
-
-    # Behavioral metrics
-    avg_response_time: float = 0.0
-    error_rate: float = 0.0
-    unique_ips: Set[str] = field(default_factory=set)
-    unique_user_agents: Set[str] = field(default_factory=set)
-
-    # Risk indicators
-    suspicious_patterns: List[str] = field(default_factory=list)
-    risk_score: float = 0.0
-    last_risk_update: float = field(default_factory=time.time)
+    Every aggregate is updated incrementally in O(1): hour-of-day and
+    day-of-week counts live in fixed-size arrays, response times use a
+    Welford running mean, recent errors and activity are exponentially
+    decayed counters, and distinct endpoints/IPs/user agents are kept in
+    small bounded sets.
+    """
+
+    __slots__ = (
+        "user_id",
+        "created_at",
+        "last_activity",
+        "last_access",
+        "total_activities",
+        "error_count",
+        "unique_endpoints",
+        "activity_frequency",
+        "hourly_pattern",
+        "daily_pattern",
+        "active_hours",
+        "out_of_hours_count",
+        "response_times",
+        "session_durations",
+        "unique_ips",
+        "unique_user_agents",
+        "recent_errors",
+        "recent_activities",
+        "decayed_at",
+        "suspicious_patterns",
+        "risk_score",
+        "last_risk_update",
+    )
+
+    def __init__(
+        self,
+        user_id: str,
+        created_at: Optional[float] = None,
+        last_activity: Optional[float] = None,
+    ) -> None:
+        now = time.time()
+        self.user_id = user_id
+        self.created_at = created_at if created_at is not None else now
+        self.last_activity = last_activity if last_activity is not None else now
+        self.last_access = now
+
+        # Activity patterns
+        self.total_activities = 0
+        self.error_count = 0
+        self.unique_endpoints = BoundedSet(_MAX_TRACKED_ENDPOINTS)
+        self.activity_frequency: Dict[str, int] = {}
+
+        # Temporal patterns
+        self.hourly_pattern = array("I", [0] * 24)
+        self.daily_pattern = array("I", [0] * 7)
+        self.active_hours = 0
+        self.out_of_hours_count = 0
+        self.session_durations = RunningStats()
+
+        # Behavioral metrics
+        self.response_times = RunningStats()
+        self.unique_ips = BoundedSet(_MAX_TRACKED_IPS)
+        self.unique_user_agents = BoundedSet(_MAX_TRACKED_USER_AGENTS)
+        self.recent_errors = 0.0
+        self.recent_activities = 0.0
+        self.decayed_at = self.created_at
+
+        # Risk indicators
+        self.suspicious_patterns: deque = deque(maxlen=10)
+        self.risk_score = 0.0
+        self.last_risk_update = now
+
+    @property
+    def avg_response_time(self) -> float:
+        return self.response_times.mean
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.total_activities if self.total_activities else 0.0
+
+    @property
+    def recent_error_rate(self) -> float:
+        """Error rate with older activity exponentially down-weighted."""
+        return self.recent_errors / self.recent_activities if self.recent_activities else 0.0
 
     def update_activity(self, activity: UserActivity) -> None:
         """Update profile with new activity."""
@@ -100,9 +236,18 @@ class UserProfile:
 
         # Update patterns
         self.unique_endpoints.add(activity.endpoint)
-        self.activity_frequency[activity.action] += 1
-        self.hourly_pattern[activity.hour_of_day] += 1
-        self.daily_pattern[activity.day_of_week] += 1
+        action = activity.action
+        if action in self.activity_frequency or len(self.activity_frequency) < _MAX_TRACKED_ACTIONS:
+            self.activity_frequency[action] = self.activity_frequency.get(action, 0) + 1
+
+        local_time = time.localtime(activity.timestamp)
+        hour = local_time.tm_hour
+        if self.hourly_pattern[hour] == 0:
+            self.active_hours += 1
+        self.hourly_pattern[hour] += 1
+        self.daily_pattern[local_time.tm_wday] += 1
+        if not 9 <= hour <= 17:
+            self.out_of_hours_count += 1
 
         # Update network info
         if activity.ip_address:
@@ -115,33 +260,37 @@ class UserProfile:
 
     def _update_metrics(self, activity: UserActivity) -> None:
         """Update behavioral metrics."""
-        # Update average response time
-        if self.total_activities == 1:
-            self.avg_response_time = activity.response_time
-        else:
-            self.avg_response_time = (
-                (self.avg_response_time * (self.total_activities - 1))
-                + activity.response_time
-            ) / self.total_activities
+        self.response_times.add(activity.response_time)
 
-        # Update error rate
         is_error = activity.status_code >= 400
-        total_errors = int(self.error_rate * (self.total_activities - 1))
         if is_error:
-            total_errors += 1
-        self.error_rate = total_errors / self.total_activities
+            self.error_count += 1
+
+        # Decay the recent counters to the activity time, then add it
+        elapsed = activity.timestamp - self.decayed_at
+        if elapsed > 0:
+            decay = math.exp(-_DECAY_RATE * elapsed)
+            self.recent_errors *= decay
+            self.recent_activities *= decay
+            self.decayed_at = activity.timestamp
+        self.recent_activities += 1.0
+        if is_error:
+            self.recent_errors += 1.0
 
-    def calculate_risk_score(self) -> float:
+    def add_session_duration(self, duration: float) -> None:
+        """Record the duration of a finished session."""
+        self.session_durations.add(duration)
+
+    def calculate_risk_score(self, current_hour: Optional[int] = None) -> float:
         """Calculate behavioral risk score (0.0 to 1.0)."""
         score = 0.0
         factors = []
 
         # Factor 1: Unusual timing (weight: 0.3)
-        current_hour = datetime.now().hour
-        expected_activities = self.hourly_pattern.get(current_hour, 0)
-        avg_activities = sum(self.hourly_pattern.values()) / max(
-            1, len(self.hourly_pattern)
-        )
+        if current_hour is None:
+            current_hour = datetime.now().hour
+        expected_activities = self.hourly_pattern[current_hour]
+        avg_activities = self.total_activities / max(1, self.active_hours)
 
         if avg_activities > 0:
             timing_anomaly = abs(expected_activities - avg_activities) / avg_activities
@@ -149,8 +298,8 @@ class UserProfile:
             score += 0.3 * timing_score
             factors.append(f"timing_anomaly:{timing_score:.2f}")
 
-        # Factor 2: High error rate (weight: 0.25)
-        error_score = min(1.0, self.error_rate * 4)  # 25% error rate = max score
+        # Factor 2: High recent error rate (weight: 0.25)
+        error_score = min(1.0, self.recent_error_rate * 4)  # 25% error rate = max score
         score += 0.25 * error_score
         factors.append(f"error_rate:{error_score:.2f}")
 
@@ -162,8 +311,8 @@ class UserProfile:
         factors.append(f"network_diversity:{network_score:.2f}")
 
         # Factor 4: Session anomalies (weight: 0.15)
-        if self.session_durations:
-            avg_session = sum(self.session_durations) / len(self.session_durations)
+        if self.session_durations.count:
+            avg_session = self.session_durations.mean
             # Very short sessions might indicate automated access
             if avg_session < 60:  # Less than 1 minute
                 session_score = 0.8
@@ -175,27 +324,24 @@ class UserProfile:
             factors.append(f"session_anomaly:{session_score:.2f}")
 
         # Factor 5: Activity burst (weight: 0.1)
-        # Check for sudden activity spikes
+        # Check for sudden activity spikes around the current hour
         recent_activities = sum(
-            count
-            for hour, count in self.hourly_pattern.items()
-            if abs(hour - current_hour) <= 1
+            self.hourly_pattern[hour]
+            for hour in (current_hour - 1, current_hour, current_hour + 1)
+            if 0 <= hour <= 23
         )
-        total_activities = sum(self.hourly_pattern.values())
-        burst_ratio = recent_activities / max(1, total_activities)
+        burst_ratio = recent_activities / max(1, self.total_activities)
 
         if burst_ratio > 0.5:  # More than 50% of activity in recent hours
             burst_score = min(1.0, (burst_ratio - 0.5) * 4)
             score += 0.1 * burst_score
             factors.append(f"activity_burst:{burst_score:.2f}")
 
-        # Update suspicious patterns
+        # Update suspicious patterns (the deque keeps only the last 10)
         if score > 0.6:
             self.suspicious_patterns.append(
                 f"high_risk_score_{score:.2f}_at_{time.time()}"
             )
-            # Keep only last 10 patterns
-            self.suspicious_patterns = self.suspicious_patterns[-10:]
 
         self.risk_score = min(1.0, score)
         self.last_risk_update = time.time()
@@ -217,28 +363,65 @@ class UserProfile:
             "unique_ips": len(self.unique_ips),
             "unique_user_agents": len(self.unique_user_agents),
             "avg_response_time": self.avg_response_time,
+            "response_time_std": self.response_times.std_dev,
             "error_rate": self.error_rate,
+            "recent_error_rate": self.recent_error_rate,
             "risk_score": self.risk_score,
             "top_activities": sorted(
                 self.activity_frequency.items(), key=lambda x: x[1], reverse=True
             )[:5],
             "peak_hours": sorted(
-                self.hourly_pattern.items(), key=lambda x: x[1], reverse=True
+                ((hour, count) for hour, count in enumerate(self.hourly_pattern) if count),
+                key=lambda x: x[1],
+                reverse=True,
             )[:3],
-            "suspicious_patterns": self.suspicious_patterns[-3:],  # Last 3
+            "suspicious_patterns": list(self.suspicious_patterns)[-3:],  # Last 3
         }
 
 
-@dataclass
 class SessionAnalysis:
-    """Analysis of user session behavior."""
+    """
+    Analysis of user session behavior.
 
-    session_id: str
-    user_id: str
-    start_time: float
-    last_activity: float = 0.0
-    activities: List[UserActivity] = field(default_factory=list)
-    is_active: bool = True
+    Keeps running interval statistics instead of the activity list, so bot
+    scoring is O(1) however long the session runs.
+    """
+
+    __slots__ = (
+        "session_id",
+        "user_id",
+        "start_time",
+        "last_activity",
+        "is_active",
+        "activity_count",
+        "intervals",
+        "unique_endpoints",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: str,
+        start_time: float,
+        last_activity: float = 0.0,
+        is_active: bool = True,
+    ) -> None:
+        self.session_id = session_id
+        self.user_id = user_id
+        self.start_time = start_time
+        self.last_activity = last_activity
+        self.is_active = is_active
+        self.activity_count = 0
+        self.intervals = RunningStats()
+        self.unique_endpoints = BoundedSet(_MAX_TRACKED_ENDPOINTS)
+
+    def add_activity(self, activity: UserActivity) -> None:
+        """Fold an activity into the session statistics."""
+        if self.activity_count:
+            self.intervals.add(max(0.0, activity.timestamp - self.last_activity))
+        self.activity_count += 1
+        self.unique_endpoints.add(activity.endpoint)
+        self.last_activity = max(self.last_activity, activity.timestamp)
 
     @property
     def duration(self) -> float:
@@ -247,22 +430,10 @@ class SessionAnalysis:
             return self.last_activity - self.start_time
         return time.time() - self.start_time
 
-    @property
-    def activity_count(self) -> int:
-        """Get number of activities in session."""
-        return len(self.activities)
-
     @property
     def avg_time_between_activities(self) -> float:
         """Calculate average time between activities."""
-        if len(self.activities) < 2:
-            return 0.0
-
-        timestamps = sorted([a.timestamp for a in self.activities])
-        intervals = [
-            timestamps[i + 1] - timestamps[i] for i in range(len(timestamps) - 1)
-        ]
-        return sum(intervals) / len(intervals)
+        return self.intervals.mean if self.intervals.count else 0.0
 
     def analyze_bot_probability(self) -> float:
         """
@@ -274,41 +445,27 @@ class SessionAnalysis:
         score = 0.0
 
         # Factor 1: Activity frequency (bots often have regular patterns)
-        if len(self.activities) > 10:
-            intervals = []
-            for i in range(1, len(self.activities)):
-                interval = (
-                    self.activities[i].timestamp - self.activities[i - 1].timestamp
-                )
-                intervals.append(interval)
-
-            if intervals:
-                # Calculate coefficient of variation (lower = more regular = more bot-like)
-                mean_interval = sum(intervals) / len(intervals)
-                variance = sum((x - mean_interval) ** 2 for x in intervals) / len(
-                    intervals
-                )
-                std_dev = variance**0.5
-                cv = std_dev / max(0.001, mean_interval)  # Coefficient of variation
-
-                # Low CV indicates very regular intervals (bot-like)
-                if cv < 0.3:  # Very regular
-                    score += 0.4
-                elif cv < 0.6:  # Somewhat regular
-                    score += 0.2
+        if self.activity_count > 10:
+            # Coefficient of variation (lower = more regular = more bot-like)
+            cv = self.intervals.std_dev / max(0.001, self.intervals.mean)
+
+            # Low CV indicates very regular intervals (bot-like)
+            if cv < 0.3:  # Very regular
+                score += 0.4
+            elif cv < 0.6:  # Somewhat regular
+                score += 0.2
 
         # Factor 2: Activity rate (bots often have high activity rates)
         duration_hours = self.duration / 3600
         if duration_hours > 0:
-            activity_rate = len(self.activities) / duration_hours
+            activity_rate = self.activity_count / duration_hours
             if activity_rate > 60:  # More than 1 activity per minute
                 score += 0.3
             elif activity_rate > 30:  # More than 1 activity per 2 minutes
                 score += 0.15
 
         # Factor 3: Endpoint diversity (bots often hit few endpoints repeatedly)
-        unique_endpoints = len(set(a.endpoint for a in self.activities))
-        endpoint_diversity = unique_endpoints / max(1, len(self.activities))
+        endpoint_diversity = len(self.unique_endpoints) / max(1, self.activity_count)
 
         if endpoint_diversity < 0.1:  # Less than 10% unique endpoints
             score += 0.3
@@ -358,18 +515,28 @@ class BehavioralAnalysisEngine:
     def __init__(self, config: Optional[BehavioralAnalysisConfig] = None):
         self.config = config or BehavioralAnalysisConfig()
 
-        # User profiles
-        self.user_profiles: Dict[str, UserProfile] = {}
-        self.profile_access_times: Dict[str, float] = {}
+        # User profiles, least recently accessed first (LRU bounded by max_profiles)
+        self.user_profiles: "OrderedDict[str, UserProfile]" = OrderedDict()
 
         # Session tracking
         self.active_sessions: Dict[str, SessionAnalysis] = {}
         self.session_history: deque = deque(maxlen=self.config.max_session_history)
+        self._session_history_duration = 0.0
 
         # Risk monitoring
         self.high_risk_users: Set[str] = set()
         self.recent_alerts: Dict[str, float] = {}  # user_id -> last_alert_time
 
+        # Global aggregates, maintained incrementally for O(1) get_stats
+        self._global_hourly = array("Q", [0] * 24)
+        self._global_daily = array("Q", [0] * 7)
+        self._risk_level_counts: Dict[str, int] = {
+            "high": 0,
+            "medium": 0,
+            "low": 0,
+            "minimal": 0,
+        }
+
         # Statistics
         self.total_activities_processed = 0
         self.bots_detected = 0
@@ -447,22 +614,65 @@ class BehavioralAnalysisEngine:
         user_id = activity.user_id
 
         # Get or create profile
-        if user_id not in self.user_profiles:
-            self.user_profiles[user_id] = UserProfile(user_id=user_id)
+        profile = self.user_profiles.get(user_id)
+        if profile is None:
+            profile = UserProfile(user_id=user_id)
+            self.user_profiles[user_id] = profile
+            self._risk_level_counts[self._calculate_risk_level(profile.risk_score)] += 1
+            while len(self.user_profiles) > self.config.max_profiles:
+                self._remove_profile(next(iter(self.user_profiles)))
+        else:
+            self.user_profiles.move_to_end(user_id)
 
-        profile = self.user_profiles[user_id]
         profile.update_activity(activity)
-        self.profile_access_times[user_id] = time.time()
+        profile.last_access = time.time()
+
+        local_time = time.localtime(activity.timestamp)
+        self._global_hourly[local_time.tm_hour] += 1
+        self._global_daily[local_time.tm_wday] += 1
 
         # Recalculate risk score periodically
         if time.time() - profile.last_risk_update > 300:  # Every 5 minutes
-            profile.calculate_risk_score()
+            self._refresh_risk_score(profile)
+
+    def _refresh_risk_score(
+        self, profile: UserProfile, current_hour: Optional[int] = None
+    ) -> float:
+        """Recalculate a profile's risk score and keep the aggregates in sync."""
+        old_level = self._calculate_risk_level(profile.risk_score)
+        risk_score = profile.calculate_risk_score(current_hour)
+        new_level = self._calculate_risk_level(risk_score)
+        if new_level != old_level:
+            self._risk_level_counts[old_level] -= 1
+            self._risk_level_counts[new_level] += 1
 
         # Check if user became high risk
-        if profile.risk_score >= self.config.high_risk_threshold:
-            self.high_risk_users.add(user_id)
-        elif profile.risk_score < self.config.medium_risk_threshold:
-            self.high_risk_users.discard(user_id)
+        if risk_score >= self.config.high_risk_threshold:
+            self.high_risk_users.add(profile.user_id)
+        elif risk_score < self.config.medium_risk_threshold:
+            self.high_risk_users.discard(profile.user_id)
+        return risk_score
+
+    def _remove_profile(self, user_id: str) -> None:
+        """Drop a profile and its contribution to the aggregates."""
+        profile = self.user_profiles.pop(user_id, None)
+        if profile is None:
+            return
+        self._risk_level_counts[self._calculate_risk_level(profile.risk_score)] -= 1
+        self.high_risk_users.discard(user_id)
+        self.recent_alerts.pop(user_id, None)
+
+    def _archive_session(self, session: SessionAnalysis) -> None:
+        """Move a finished session to the bounded history."""
+        session.is_active = False
+        if len(self.session_history) == self.session_history.maxlen:
+            self._session_history_duration -= self.session_history[0].duration
+        self.session_history.append(session)
+        self._session_history_duration += session.duration
+
+        profile = self.user_profiles.get(session.user_id)
+        if profile is not None:
+            profile.add_session_duration(session.duration)
 
     async def _update_session_analysis(self, activity: UserActivity) -> None:
         """Update session analysis with new activity."""
@@ -479,15 +689,14 @@ class BehavioralAnalysisEngine:
             )
 
         session = self.active_sessions[session_id]
-        session.activities.append(activity)
-        session.last_activity = activity.timestamp
+        session.add_activity(activity)
 
         # Check for session timeout
         if time.time() - session.last_activity > (
             self.config.session_timeout_minutes * 60
         ):
             # Move to history
-            self.session_history.append(session)
+            self._archive_session(session)
             del self.active_sessions[session_id]
 
     async def _perform_comprehensive_analysis(
@@ -501,7 +710,9 @@ class BehavioralAnalysisEngine:
             return {"error": "User profile not found"}
 
         # Basic risk assessment
-        risk_score = profile.calculate_risk_score()
+        risk_score = self._refresh_risk_score(
+            profile, time.localtime(activity.timestamp).tm_hour
+        )
         risk_level = self._calculate_risk_level(risk_score)
 
         # Session analysis
@@ -554,40 +765,32 @@ class BehavioralAnalysisEngine:
         """Analyze temporal patterns for anomalies."""
         anomalies = []
 
+        local_time = time.localtime(activity.timestamp)
+
         # Check unusual hour
-        current_hour = activity.hour_of_day
-        expected_activities = profile.hourly_pattern.get(current_hour, 0)
-        avg_activities = sum(profile.hourly_pattern.values()) / max(
-            1, len(profile.hourly_pattern)
-        )
+        current_hour = local_time.tm_hour
+        expected_activities = profile.hourly_pattern[current_hour]
+        avg_activities = profile.total_activities / max(1, profile.active_hours)
 
         if avg_activities > 0 and expected_activities < avg_activities * 0.1:
             anomalies.append(f"unusual_hour_{current_hour}")
 
         # Check unusual day
-        current_day = activity.day_of_week
-        if profile.daily_pattern:
-            max_day = max(
-                profile.daily_pattern.keys(), key=lambda k: profile.daily_pattern[k]
-            )
-            if (
-                current_day != max_day
-                and profile.daily_pattern.get(current_day, 0)
-                < profile.daily_pattern[max_day] * 0.2
-            ):
-                anomalies.append(f"unusual_day_{current_day}")
+        current_day = local_time.tm_wday
+        daily = profile.daily_pattern
+        max_day = max(range(7), key=daily.__getitem__)
+        if (
+            daily[max_day]
+            and current_day != max_day
+            and daily[current_day] < daily[max_day] * 0.2
+        ):
+            anomalies.append(f"unusual_day_{current_day}")
 
         # Check business hours violation
-        if not activity.is_business_hours and profile.total_activities > 10:
-            # Calculate percentage of activities outside business hours
-            out_of_hours = sum(
-                count
-                for hour, count in profile.hourly_pattern.items()
-                if not (9 <= hour <= 17)
-            )
-            total_activities = sum(profile.hourly_pattern.values())
-
-            if total_activities > 0 and (out_of_hours / total_activities) < 0.3:
+        if not 9 <= current_hour <= 17 and profile.total_activities > 10:
+            # Percentage of activities outside business hours
+            out_of_hours_ratio = profile.out_of_hours_count / profile.total_activities
+            if out_of_hours_ratio < 0.3:
                 anomalies.append("outside_business_hours")
 
         return anomalies
@@ -734,20 +937,17 @@ class BehavioralAnalysisEngine:
         current_time = time.time()
         ttl_seconds = self.config.profile_ttl_days * 24 * 3600
 
-        to_remove = []
-        for user_id, last_access in self.profile_access_times.items():
-            if current_time - last_access > ttl_seconds:
-                to_remove.append(user_id)
-
-        for user_id in to_remove:
-            if user_id in self.user_profiles:
-                del self.user_profiles[user_id]
-            if user_id in self.profile_access_times:
-                del self.profile_access_times[user_id]
-            self.high_risk_users.discard(user_id)
+        # Profiles are kept in access order, so stop at the first fresh one
+        removed = 0
+        while self.user_profiles:
+            user_id, profile = next(iter(self.user_profiles.items()))
+            if current_time - profile.last_access <= ttl_seconds:
+                break
+            self._remove_profile(user_id)
+            removed += 1
 
-        if to_remove:
-            logger.info(f"Cleaned up {len(to_remove)} old user profiles")
+        if removed:
+            logger.info(f"Cleaned up {removed} old user profiles")
 
     async def _cleanup_expired_sessions(self) -> None:
         """Clean up expired sessions."""
@@ -760,9 +960,7 @@ class BehavioralAnalysisEngine:
                 expired_sessions.append(session_id)
 
         for session_id in expired_sessions:
-            session = self.active_sessions[session_id]
-            self.session_history.append(session)
-            del self.active_sessions[session_id]
+            self._archive_session(self.active_sessions.pop(session_id))
 
         if expired_sessions:
             logger.debug(f"Moved {len(expired_sessions)} sessions to history")
@@ -790,7 +988,7 @@ class BehavioralAnalysisEngine:
             for user_id in list(self.high_risk_users):
                 if user_id in self.user_profiles:
                     profile = self.user_profiles[user_id]
-                    current_risk = profile.calculate_risk_score()
+                    current_risk = self._refresh_risk_score(profile)
 
                     # If risk has decreased, remove from high-risk list
                     if current_risk < self.config.medium_risk_threshold:
@@ -802,17 +1000,13 @@ class BehavioralAnalysisEngine:
     async def _update_risk_scores(self) -> None:
         """Update risk scores for active users."""
         async with self._lock:
-            # Update risk scores for recently active users
+            # Most recently active profiles are at the end of the LRU order
             current_time = time.time()
-            recently_active = [
-                user_id
-                for user_id, last_access in self.profile_access_times.items()
-                if current_time - last_access < 3600  # Active in last hour
-            ]
-
-            for user_id in recently_active[:50]:  # Limit to avoid overload
-                if user_id in self.user_profiles:
-                    self.user_profiles[user_id].calculate_risk_score()
+            recent = itertools.islice(reversed(self.user_profiles.values()), 50)
+            for profile in list(recent):  # Limit to avoid overload
+                if current_time - profile.last_access >= 3600:  # Active in last hour
+                    break
+                self._refresh_risk_score(profile)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive behavioral analysis statistics."""
@@ -840,41 +1034,24 @@ class BehavioralAnalysisEngine:
 
     def _calculate_risk_distribution(self) -> Dict[str, int]:
         """Calculate distribution of user risk levels."""
-        distribution = {"high": 0, "medium": 0, "low": 0, "minimal": 0}
-
-        for profile in self.user_profiles.values():
-            risk_level = self._calculate_risk_level(profile.risk_score)
-            distribution[risk_level] += 1
-
-        return distribution
+        return dict(self._risk_level_counts)
 
     def _calculate_avg_session_duration(self) -> float:
         """Calculate average session duration."""
         if not self.session_history:
             return 0.0
-
-        total_duration = sum(session.duration for session in self.session_history)
-        return total_duration / len(self.session_history)
+        return self._session_history_duration / len(self.session_history)
 
     def _analyze_global_temporal_patterns(self) -> Dict[str, Any]:
         """Analyze global temporal patterns across all users."""
-        hourly_activity = defaultdict(int)
-        daily_activity = defaultdict(int)
-
-        for profile in self.user_profiles.values():
-            for hour, count in profile.hourly_pattern.items():
-                hourly_activity[hour] += count
-            for day, count in profile.daily_pattern.items():
-                daily_activity[day] += count
-
-        peak_hour = max(hourly_activity.items(), key=lambda x: x[1], default=(0, 0))[0]
-        peak_day = max(daily_activity.items(), key=lambda x: x[1], default=(0, 0))[0]
+        hourly = self._global_hourly
+        daily = self._global_daily
 
         return {
-            "peak_hour": peak_hour,
-            "peak_day": peak_day,
-            "total_activities_by_hour": dict(hourly_activity),
-            "total_activities_by_day": dict(daily_activity),
+            "peak_hour": max(range(24), key=hourly.__getitem__),
+            "peak_day": max(range(7), key=daily.__getitem__),
+            "total_activities_by_hour": {h: c for h, c in enumerate(hourly) if c},
+            "total_activities_by_day": {d: c for d, c in enumerate(daily) if c},
         }
 
     def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -906,7 +1083,7 @@ class BehavioralAnalysisEngine:
             return {"active_sessions": 0, "analysis": {}}
 
         # Analyze user's sessions
-        total_activities = sum(len(session.activities) for session in user_sessions)
+        total_activities = sum(session.activity_count for session in user_sessions)
         avg_duration = sum(session.duration for session in user_sessions) / len(
             user_sessions
         )
@@ -2,8 +2,9 @@
 CQRS dispatcher for routing commands and queries to their respective handlers.
 """
 
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 
+from resync.core.retry_budget import deadline
 from resync.cqrs.base import (
     CommandResult,
     ICommand,
@@ -70,17 +71,27 @@ from resync.cqrs.query_handlers import (
     GetWorkstationsStatusQueryHandler,
     SearchJobsQueryHandler,
 )
+from resync.settings import settings
 
 
 class CQRSDispatcher:
     """
     Central dispatcher for CQRS commands and queries.
     Routes commands/queries to their appropriate handlers.
+
+    API requests reach TWS through here, so each command or query runs under
+    a deadline of ``request_deadline`` seconds that bounds the retries,
+    backoff and hedges of the TWS calls it makes.
     """
 
-    def __init__(self):
+    def __init__(self, request_deadline: Optional[float] = None):
         self.command_handlers: Dict[Type[ICommand], ICommandHandler] = {}
         self.query_handlers: Dict[Type[IQuery], IQueryHandler] = {}
+        self.request_deadline = (
+            request_deadline
+            if request_deadline is not None
+            else getattr(settings, "API_REQUEST_DEADLINE_SECONDS", 30.0)
+        )
 
     def register_command_handler(
         self, command_type: Type[ICommand], handler: ICommandHandler
@@ -99,7 +110,8 @@ class CQRSDispatcher:
             raise ValueError(f"No handler registered for command type: {command_type}")
 
         handler = self.command_handlers[command_type]
-        return await handler.execute(command)
+        with deadline(self.request_deadline):
+            return await handler.execute(command)
 
     async def execute_query(self, query: IQuery) -> QueryResult:
         """Execute a query by routing it to the appropriate handler."""
@@ -108,7 +120,8 @@ class CQRSDispatcher:
             raise ValueError(f"No handler registered for query type: {query_type}")
 
         handler = self.query_handlers[query_type]
-        return await handler.execute(query)
+        with deadline(self.request_deadline):
+            return await handler.execute(query)
 
 
 # Global dispatcher instance
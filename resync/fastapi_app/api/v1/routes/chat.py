@@ -9,6 +9,7 @@ from resync.RAG.microservice.core.embedding_service import EmbeddingService
 from resync.RAG.microservice.core.vector_store import get_default_store
 from resync.RAG.microservice.core.retriever import RagRetriever
 from resync.RAG.microservice.core.ingest import IngestService
+from resync.RAG.microservice.core.lexical_index import get_default_lexical_index
 
 from ..dependencies import get_logger
 from ..models.request_models import ChatMessageRequest, ChatHistoryQuery
@@ -33,8 +34,13 @@ async def _get_rag_components():
         try:
             _rag_embedding_service = EmbeddingService()
             _rag_vector_store = get_default_store()
-            _rag_retriever = RagRetriever(_rag_embedding_service, _rag_vector_store)
-            _rag_ingest_service = IngestService(_rag_embedding_service, _rag_vector_store)
+            _rag_lexical_index = get_default_lexical_index()
+            _rag_retriever = RagRetriever(
+                _rag_embedding_service, _rag_vector_store, _rag_lexical_index
+            )
+            _rag_ingest_service = IngestService(
+                _rag_embedding_service, _rag_vector_store, lexical_index=_rag_lexical_index
+            )
             _rag_initialized = True
             print("✅ RAG components initialized successfully (lazy)")
         except Exception as e:
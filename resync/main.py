@@ -415,6 +415,8 @@ async def main() -> None:
             port=getattr(settings, "server_port", 8000),
             log_config=None,   # usar nosso logging estruturado
             access_log=False,  # logs de acesso via middleware, se necessário
+            # Compress coalesced chat stream frames when the client supports it
+            ws_per_message_deflate=getattr(settings, "WS_PER_MESSAGE_DEFLATE", True),
         )
         server = uvicorn.Server(config)
 
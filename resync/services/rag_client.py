@@ -9,6 +9,7 @@ from typing import Any, Optional
 import httpx
 from pydantic import BaseModel
 
+from resync.core.pools.http_pool import http2_available
 from resync.core.resilience import CircuitBreakerManager, retry_with_backoff_async
 from resync.core.structured_logger import get_logger
 from resync.settings import settings
@@ -48,13 +49,15 @@ class RAGServiceClient:
         self.max_retries = 3
         self.retry_backoff = 1.0  # seconds
         
-        # Initialize HTTP client
+        # Initialize HTTP client (HTTP/2 multiplexes concurrent queries over
+        # a single connection when enabled and 'h2' is installed)
         self.http_client = httpx.AsyncClient(
             timeout=httpx.Timeout(timeout=30.0, connect=10.0),
             limits=httpx.Limits(
                 max_connections=10,
                 max_keepalive_connections=5
-            )
+            ),
+            http2=getattr(settings, "RAG_SERVICE_HTTP2", False) and http2_available(),
         )
         
         # Centralized circuit breaker manager
@@ -16,12 +16,12 @@ from typing import Any
 
 import httpx
 from dateutil import parser
+from resync.core.adaptive_concurrency import AdaptiveConcurrencyLimiter
 from resync.core.cache_hierarchy import get_cache_hierarchy
-from resync.core.resilience import (
-    CircuitBreakerError,
-    CircuitBreakerManager,
-    retry_with_backoff_async,
-)
+from resync.core.exceptions import ServiceUnavailableError
+from resync.core.metrics import runtime_metrics
+from resync.core.resilience import CircuitBreakerManager
+from resync.core.retry_budget import BudgetedRetry, DeadlineExceededError, RetryBudget
 from resync_new.config.settings import settings  # New import
 from resync_new.core.connection_pool_manager import get_connection_pool_manager
 from resync_new.utils.exceptions import TWSConnectionError
@@ -60,6 +60,29 @@ SAFE_JOB_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]+$")
 # Default timeout for HTTP requests to prevent indefinite hangs
 DEFAULT_TIMEOUT = 30.0
 
+# Responses that indicate TWS is overloaded and should reduce the in-flight limit
+_OVERLOAD_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Methods safe to hedge (send twice and keep the first response)
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+
+class _TWSOverloadError(httpx.HTTPStatusError):
+    """HTTP status error signalling that TWS is overloaded."""
+
+
+def _is_limiter_rejection(error: BaseException | None) -> bool:
+    """Whether ``error``, or an error it wraps, is the limiter shedding a call."""
+    while error is not None:
+        if isinstance(error, ServiceUnavailableError):
+            return True
+        error = (
+            getattr(error, "original_exception", None)
+            or error.__cause__
+            or error.__context__
+        )
+    return False
+
 
 # --- Caching Mechanism ---
 # CacheEntry and SimpleTTLCache moved to resync.core.async_cache
@@ -117,8 +140,11 @@ class OptimizedTWSClient:
         # Register circuit breakers for all TWS endpoints
         self.cbm.register("tws_http_client", fail_max=3, reset_timeout=30)
         self.cbm.register("tws_ping", fail_max=5, reset_timeout=60)
+        self.cbm.register("tws_check_connection", fail_max=5, reset_timeout=60)
         self.cbm.register("tws_workstations", fail_max=3, reset_timeout=30)
         self.cbm.register("tws_jobs_status", fail_max=3, reset_timeout=30)
+        self.cbm.register("tws_critical_path", fail_max=3, reset_timeout=30)
+        self.cbm.register("tws_job_status", fail_max=3, reset_timeout=30)
         self.cbm.register("tws_system_status", fail_max=2, reset_timeout=60)
         self.cbm.register("tws_job_details", fail_max=3, reset_timeout=30)
         self.cbm.register("tws_job_history", fail_max=3, reset_timeout=30)
@@ -131,6 +157,43 @@ class OptimizedTWSClient:
             "tws_performance_metrics", fail_max=2, reset_timeout=60
         )
 
+        # Adaptive limit on in-flight requests to TWS; interactive calls
+        # (chat tools) are admitted before dashboard and monitoring traffic
+        self.limiter = AdaptiveConcurrencyLimiter(
+            name="tws",
+            initial_limit=getattr(settings, "TWS_MAX_CONCURRENT_REQUESTS", 10),
+            min_limit=getattr(settings, "TWS_MIN_CONCURRENT_REQUESTS", 2),
+            max_limit=getattr(settings, "TWS_MAX_CONCURRENCY_LIMIT", 50),
+            max_queue_delay=getattr(settings, "TWS_MAX_QUEUE_DELAY", 30.0),
+            drop_on=(httpx.TimeoutException, httpx.TransportError, _TWSOverloadError),
+            limit_gauge=runtime_metrics.tws_concurrency_limit,
+            inflight_gauge=runtime_metrics.tws_inflight_requests,
+            queue_delay_histogram=runtime_metrics.tws_queue_delay,
+            rejections_counter=runtime_metrics.tws_limiter_rejections,
+        )
+
+        # Single retry layer for every HTTP request: retries limited to a
+        # share of traffic, bounded by the caller's deadline, GETs hedged
+        self.retry = BudgetedRetry(
+            name="tws",
+            budget=RetryBudget(
+                ratio=getattr(settings, "TWS_RETRY_BUDGET_RATIO", 0.1),
+                min_retries_per_second=getattr(
+                    settings, "TWS_MIN_RETRIES_PER_SECOND", 0.1
+                ),
+            ),
+            max_retries=getattr(settings, "TWS_MAX_RETRIES", 2),
+            base_delay=0.5,
+            max_delay=5.0,
+            attempt_timeout=self.timeout,
+            retry_on=(httpx.TransportError, asyncio.TimeoutError),
+            hedge_after=getattr(settings, "TWS_HEDGE_AFTER_SECONDS", 2.0),
+            attempts_histogram=runtime_metrics.tws_requests_per_call,
+            retries_counter=runtime_metrics.tws_retries,
+            hedges_counter=runtime_metrics.tws_hedged_requests,
+            budget_exhausted_counter=runtime_metrics.tws_retry_budget_exhausted,
+        )
+
     async def _get_http_client(self) -> Any:
         """Get HTTP client from connection pool or use direct client."""
         if self.use_connection_pool:
@@ -155,7 +218,14 @@ class OptimizedTWSClient:
     async def _make_request(
         self, method: str, url: str, **kwargs: Any
     ) -> httpx.Response:
-        """Makes an HTTP request with retry logic using connection pool."""
+        """
+        Makes an HTTP request through the client's single retry layer.
+
+        Retries are bounded by the shared retry budget and by the caller's
+        deadline (see ``resync.core.retry_budget.deadline``); idempotent
+        requests are hedged when the first attempt is slow. The methods
+        calling this must not add retries of their own.
+        """
         logger.debug("Making request: %s %s", method.upper(), url)
 
         # Get client from connection pool or use direct client
@@ -163,25 +233,29 @@ class OptimizedTWSClient:
         if client is None:
             raise TWSConnectionError("No HTTP client available")
 
-        async def _once():
-            response = await client.request(method, url, **kwargs)
-            response.raise_for_status()
+        async def _once(timeout: float | None):
+            request_kwargs = kwargs
+            if timeout is not None and "timeout" not in kwargs:
+                request_kwargs = {**kwargs, "timeout": timeout}
+            async with self.limiter.limit_call():
+                response = await client.request(method, url, **request_kwargs)
+                if response.status_code in _OVERLOAD_STATUS_CODES:
+                    # Feed overload signals to the limiter, then surface
+                    # them as the usual HTTP status error
+                    try:
+                        response.raise_for_status()
+                    except httpx.HTTPStatusError as e:
+                        raise _TWSOverloadError(
+                            str(e), request=e.request, response=e.response
+                        ) from e
+                response.raise_for_status()
             return response
 
-        async def _call():
-            return await self.cbm.call("tws_http_client", _once)
-
-        return await retry_with_backoff_async(
-            _call,
-            retries=3,
-            base_delay=1.0,
-            cap=10.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
+        async def _call(timeout: float | None):
+            return await self.cbm.call("tws_http_client", _once, timeout)
+
+        return await self.retry.call(
+            _call, idempotent=method.upper() in _IDEMPOTENT_METHODS
         )
 
     @asynccontextmanager
@@ -211,6 +285,11 @@ class OptimizedTWSClient:
                 f"Network error during API request: {e.request.url}",
                 original_exception=e,
             )
+        except DeadlineExceededError as e:
+            logger.warning("Deadline exceeded during API request: %s", url)
+            raise TWSConnectionError(
+                "Deadline exceeded during API request", original_exception=e
+            )
         except Exception as e:
             logger.error(
                 "An unexpected error occurred during API request: %s", e
@@ -236,27 +315,20 @@ class OptimizedTWSClient:
             if client is None:
                 raise TWSConnectionError("No HTTP client available for ping")
 
-            # Use a simple HEAD request to the base URL to test connectivity
-            async def _once():
-                response = await client.head("", timeout=5.0)
-                response.raise_for_status()
+            # Use a simple HEAD request to the base URL to test connectivity,
+            # admitted by the limiter like every other TWS request
+            async def _once(timeout: float | None):
+                async with self.limiter.limit_call():
+                    response = await client.head(
+                        "", timeout=min(timeout or 5.0, 5.0)
+                    )
+                    response.raise_for_status()
                 return response
 
-            async def _call():
-                return await self.cbm.call("tws_ping", _once)
-
-            await retry_with_backoff_async(
-                _call,
-                retries=2,
-                base_delay=0.5,
-                cap=3.0,
-                jitter=True,
-                retry_on=(
-                    httpx.RequestError,
-                    httpx.TimeoutException,
-                    CircuitBreakerError,
-                ),
-            )
+            async def _call(timeout: float | None):
+                return await self.cbm.call("tws_ping", _once, timeout)
+
+            await self.retry.call(_call)
         except httpx.TimeoutException as e:
             logger.warning("TWS server ping timed out")
             raise TWSConnectionError(
@@ -281,21 +353,7 @@ class OptimizedTWSClient:
                 async with self._api_request("GET", "/plan/current") as data:
                     return "planId" in data
 
-            async def _call():
-                return await self.cbm.call("tws_check_connection", _once)
-
-            return await retry_with_backoff_async(
-                _call,
-                retries=2,
-                base_delay=1.0,
-                cap=5.0,
-                jitter=True,
-                retry_on=(
-                    httpx.RequestError,
-                    httpx.TimeoutException,
-                    CircuitBreakerError,
-                ),
-            )
+            return await self.cbm.call("tws_check_connection", _once)
         except TWSConnectionError:
             return False
 
@@ -316,21 +374,7 @@ class OptimizedTWSClient:
                     else []
                 )
 
-        async def _call():
-            return await self.cbm.call("tws_workstations", _once)
-
-        workstations = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        workstations = await self.cbm.call("tws_workstations", _once)
         await self.cache.set(
             cache_key, workstations
         )  # ttl not supported in current cache implementation
@@ -353,21 +397,7 @@ class OptimizedTWSClient:
                     else []
                 )
 
-        async def _call():
-            return await self.cbm.call("tws_jobs_status", _once)
-
-        jobs = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        jobs = await self.cbm.call("tws_jobs_status", _once)
         await self.cache.set(
             cache_key, jobs
         )  # ttl not supported in current cache implementation
@@ -393,21 +423,7 @@ class OptimizedTWSClient:
                     else []
                 )
 
-        async def _call():
-            return await self.cbm.call("tws_critical_path", _once)
-
-        critical_jobs = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        critical_jobs = await self.cbm.call("tws_critical_path", _once)
         await self.cache.set(
             cache_key, critical_jobs
         )  # ttl not supported in current cache implementation
@@ -507,21 +523,7 @@ class OptimizedTWSClient:
                     )
                 raise ValueError(f"Unexpected data format for job {job_id}")
 
-        async def _call():
-            return await self.cbm.call("tws_job_details", _once)
-
-        job_details = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        job_details = await self.cbm.call("tws_job_details", _once)
         await self.cache.set(cache_key, job_details.dict())
         return job_details
 
@@ -589,21 +591,7 @@ class OptimizedTWSClient:
 
                 return executions
 
-        async def _call():
-            return await self.cbm.call("tws_job_history", _once)
-
-        executions = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        executions = await self.cbm.call("tws_job_history", _once)
         await self.cache.set(cache_key, [e.dict() for e in executions])
         return executions
 
@@ -630,21 +618,7 @@ class OptimizedTWSClient:
                     log_content = data
                 return log_content
 
-        async def _call():
-            return await self.cbm.call("tws_job_log", _once)
-
-        log_content = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        log_content = await self.cbm.call("tws_job_log", _once)
         await self.cache.set(cache_key, log_content)
         return log_content
 
@@ -693,21 +667,7 @@ class OptimizedTWSClient:
                     )
                 raise ValueError("Unexpected data format for plan details")
 
-        async def _call():
-            return await self.cbm.call("tws_plan_details", _once)
-
-        plan_details = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        plan_details = await self.cbm.call("tws_plan_details", _once)
         await self.cache.set(cache_key, plan_details.dict())
         return plan_details
 
@@ -742,21 +702,7 @@ class OptimizedTWSClient:
                     f"Unexpected data format for job dependencies {job_id}"
                 )
 
-        async def _call():
-            return await self.cbm.call("tws_job_dependencies", _once)
-
-        dependency_tree = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        dependency_tree = await self.cbm.call("tws_job_dependencies", _once)
         await self.cache.set(cache_key, dependency_tree.dict())
         return dependency_tree
 
@@ -808,21 +754,7 @@ class OptimizedTWSClient:
 
                 return resources
 
-        async def _call():
-            return await self.cbm.call("tws_resource_usage", _once)
-
-        resources = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        resources = await self.cbm.call("tws_resource_usage", _once)
         await self.cache.set(cache_key, [r.dict() for r in resources])
         return resources
 
@@ -876,21 +808,7 @@ class OptimizedTWSClient:
 
                 return events
 
-        async def _call():
-            return await self.cbm.call("tws_event_log", _once)
-
-        events = await retry_with_backoff_async(
-            _call,
-            retries=2,
-            base_delay=1.0,
-            cap=5.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        events = await self.cbm.call("tws_event_log", _once)
         await self.cache.set(cache_key, [e.dict() for e in events])
         return events
 
@@ -933,21 +851,7 @@ class OptimizedTWSClient:
                     "Unexpected data format for performance metrics"
                 )
 
-        async def _call():
-            return await self.cbm.call("tws_performance_metrics", _once)
-
-        performance_data = await retry_with_backoff_async(
-            _call,
-            retries=3,
-            base_delay=1.0,
-            cap=8.0,
-            jitter=True,
-            retry_on=(
-                httpx.RequestError,
-                httpx.TimeoutException,
-                CircuitBreakerError,
-            ),
-        )
+        performance_data = await self.cbm.call("tws_performance_metrics", _once)
         await self.cache.set(cache_key, performance_data.dict())
         return performance_data
 
@@ -962,6 +866,11 @@ class OptimizedTWSClient:
 
         Returns:
             Dictionary mapping job_id to JobStatus
+
+        Raises:
+            ServiceUnavailableError: If the concurrency limiter shed some of
+                the requests; statuses fetched meanwhile are cached, so a
+                retry only asks TWS for the rest
         """
         results: dict[str, JobStatus] = {}
 
@@ -980,19 +889,24 @@ class OptimizedTWSClient:
             else:
                 uncached_jobs.append(job_id)
 
-        # Process uncached jobs in parallel with concurrency control
+        # Process uncached jobs in parallel. The fan-out is capped so a large
+        # batch does not fill the adaptive limiter's queue on its own
         if uncached_jobs:
-            # Limit concurrent requests to prevent overwhelming the server
             semaphore = asyncio.Semaphore(
                 getattr(settings, "TWS_MAX_CONCURRENT_REQUESTS", 10)
             )
+            rejected: list[str] = []
 
             async def fetch_single_job(
                 job_id: str,
             ) -> tuple[str, JobStatus | None]:
                 async with semaphore:
                     try:
-                        url = f"/model/jobdefinition/{job_id}?engineName={self.engine_name}&engineOwner={self.engine_owner}"
+                        url = (
+                            f"/model/jobdefinition/{job_id}"
+                            f"?engineName={self.engine_name}"
+                            f"&engineOwner={self.engine_owner}"
+                        )
                         async with self._api_request("GET", url) as data:
                             if isinstance(data, dict):
                                 job_status = JobStatus(**data)
@@ -1002,13 +916,18 @@ class OptimizedTWSClient:
                                 )  # ttl not supported in current cache implementation
                                 return job_id, job_status
                             logger.warning(
-                                f"Unexpected data format for job {job_id}: expected dict, got {type(data)}"
+                                f"Unexpected data format for job {job_id}: "
+                                f"expected dict, got {type(data)}"
                             )
                             return job_id, None
                     except Exception as e:
-                        logger.warning(
-                            f"Failed to get status for job {job_id}: {e}"
-                        )
+                        if _is_limiter_rejection(e):
+                            # Overload, not an unknown status: reported below
+                            rejected.append(job_id)
+                        else:
+                            logger.warning(
+                                f"Failed to get status for job {job_id}: {e}"
+                            )
                         return job_id, None
 
             # Execute all requests concurrently
@@ -1028,6 +947,16 @@ class OptimizedTWSClient:
                     if job_status is not None:
                         results[job_id] = job_status
 
+            if rejected:
+                logger.warning(
+                    f"TWS limiter shed {len(rejected)} of {len(uncached_jobs)} "
+                    "job status requests"
+                )
+                raise ServiceUnavailableError(
+                    "TWS is overloaded; job statuses could not all be fetched",
+                    details={"rejected_job_ids": rejected},
+                )
+
         return results
 
     async def get_job_status(self, job_id: str) -> dict[str, Any]:
@@ -1059,21 +988,7 @@ class OptimizedTWSClient:
                     async with self._api_request("GET", url) as data:
                         return data if isinstance(data, dict) else {}
 
-                async def _call():
-                    return await self.cbm.call("tws_job_status", _once)
-
-                job_status = await retry_with_backoff_async(
-                    _call,
-                    retries=2,
-                    base_delay=1.0,
-                    cap=5.0,
-                    jitter=True,
-                    retry_on=(
-                        httpx.RequestError,
-                        httpx.TimeoutException,
-                        CircuitBreakerError,
-                    ),
-                )
+                job_status = await self.cbm.call("tws_job_status", _once)
                 await self.cache.set(cache_key, job_status)
                 return job_status
 
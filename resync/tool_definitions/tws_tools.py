@@ -5,17 +5,23 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from resync.core.adaptive_concurrency import RequestPriority, request_priority
 from resync.core.exceptions import (
     ToolConnectionError,
     ToolExecutionError,
     ToolProcessingError,
     TWSConnectionError,
 )
+from resync.core.retry_budget import deadline
 from resync.services.tws_service import OptimizedTWSClient
+from resync.settings import settings
 
 # --- Logging Setup ---
 logger = logging.getLogger(__name__)
 
+# Time a chat tool may spend on TWS, retries included, before giving up
+TOOL_DEADLINE_SECONDS = getattr(settings, "TWS_TOOL_DEADLINE_SECONDS", 20.0)
+
 
 class TWSToolReadOnly(BaseModel):
     """
@@ -44,7 +50,10 @@ class TWSStatusTool(TWSToolReadOnly):
 
         try:
             logger.info("TWSStatusTool: Fetching system status.")
-            status = await self.tws_client.get_system_status()
+            with request_priority(RequestPriority.INTERACTIVE), deadline(
+                TOOL_DEADLINE_SECONDS
+            ):
+                status = await self.tws_client.get_system_status()
 
             workstation_summary = ", ".join(
                 [f"{ws.name} ({ws.status})" for ws in status.workstations]
@@ -93,7 +102,10 @@ class TWSTroubleshootingTool(TWSToolReadOnly):
 
         try:
             logger.info("TWSTroubleshootingTool: Fetching system status for analysis.")
-            status = await self.tws_client.get_system_status()
+            with request_priority(RequestPriority.INTERACTIVE), deadline(
+                TOOL_DEADLINE_SECONDS
+            ):
+                status = await self.tws_client.get_system_status()
 
             failed_jobs = [j for j in status.jobs if j.status.upper() == "ABEND"]
             down_workstations = [
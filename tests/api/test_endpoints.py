@@ -13,12 +13,12 @@ from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
 
 from resync.api.health import health_router, shutdown_health_service
+from resync.core.health_history import STATUS_CODES
 from resync.core.health_models import (
     ComponentHealth,
     ComponentType,
     HealthCheckResult,
     HealthStatus,
-    HealthStatusHistory,
 )
 
 
@@ -43,7 +43,7 @@ class TestHealthEndpoint:
         """Test the /health/core endpoint with all components healthy."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
 
         mock_result = HealthCheckResult(
@@ -76,7 +76,7 @@ class TestHealthEndpoint:
                 ),
             },
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -92,14 +92,14 @@ class TestHealthEndpoint:
         assert "file_system" in data["core_components"]
         assert "other_service" not in data["core_components"]
         mock_get_health_service.assert_awaited_once()
-        mock_health_service.perform_comprehensive_health_check.assert_awaited_once()
+        mock_health_service.get_cached_health_check.assert_awaited_once()
 
     @patch("resync.api.health.get_health_check_service", new_callable=AsyncMock)
     def test_health_summary_degraded(self, mock_get_health_service, client):
         """Test the /health summary endpoint with a degraded component."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
 
         alert_dict = {"message": "Redis connection is slow"}
@@ -110,7 +110,7 @@ class TestHealthEndpoint:
             alerts=[alert_dict],
             performance_metrics={"db_query_time": 50},
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -129,7 +129,7 @@ class TestHealthEndpoint:
         """Test the /health/detailed endpoint with an unhealthy component."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
 
         mock_result = HealthCheckResult(
@@ -145,7 +145,7 @@ class TestHealthEndpoint:
                 ),
             },
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -178,7 +178,7 @@ class TestHealthEndpoint:
         """Test the /health/ready endpoint when the system is ready."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
 
         mock_result = HealthCheckResult(
@@ -192,7 +192,7 @@ class TestHealthEndpoint:
                 )
             },
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -209,7 +209,7 @@ class TestHealthEndpoint:
         """Test the /health/ready endpoint when a core component is unhealthy."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
 
         mock_result = HealthCheckResult(
@@ -223,7 +223,7 @@ class TestHealthEndpoint:
                 )
             },
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -284,7 +284,7 @@ class TestHealthEndpoint:
         """Test the /health/redis endpoint when Redis is healthy."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
 
         mock_result = HealthCheckResult(
@@ -300,7 +300,7 @@ class TestHealthEndpoint:
                 )
             },
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -320,7 +320,7 @@ class TestHealthEndpoint:
         """Test the /health/redis endpoint when Redis is unhealthy."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
 
         mock_result = HealthCheckResult(
@@ -334,7 +334,7 @@ class TestHealthEndpoint:
                 )
             },
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -400,8 +400,8 @@ class TestHealthEndpoint:
         """Test the /health/detailed endpoint with history included."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
-        mock_health_service.get_health_history = MagicMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
+        mock_health_service.query_health_history = MagicMock()
         mock_get_health_service.return_value = mock_health_service
 
         mock_result = HealthCheckResult(
@@ -409,14 +409,15 @@ class TestHealthEndpoint:
             timestamp=datetime.now(),
             components={},
         )
-        history_entry = HealthStatusHistory(
-            timestamp=datetime.now() - timedelta(hours=1),
-            overall_status=HealthStatus.DEGRADED,
-        )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
-        mock_health_service.get_health_history.return_value = [history_entry]
+        mock_health_service.query_health_history.return_value = {
+            "resolution_seconds": 60,
+            "timestamps": [(datetime.now() - timedelta(hours=1)).timestamp()],
+            "overall_status": [STATUS_CODES[HealthStatus.DEGRADED]],
+            "components": {},
+        }
 
         # Act
         response = client.get("/health/detailed?include_history=true")
@@ -427,14 +428,61 @@ class TestHealthEndpoint:
         assert data["overall_status"] == "healthy"
         assert len(data["history"]) == 1
         assert data["history"][0]["overall_status"] == "degraded"
-        mock_health_service.get_health_history.assert_called_once_with(24)
+        mock_health_service.query_health_history.assert_called_once_with(24)
+
+    @patch("resync.api.health.get_health_check_service", new_callable=AsyncMock)
+    def test_health_history_columnar(self, mock_get_health_service, client):
+        """Test the /health/history endpoint returns columns with a legend."""
+        # Arrange
+        mock_health_service = MagicMock()
+        mock_health_service.query_health_history = MagicMock(
+            return_value={
+                "resolution_seconds": 1,
+                "timestamps": [1.0, 2.0],
+                "overall_status": [0, 3],
+                "components": {"redis": {"status": [0, 3], "latency_ms": [1.5, None]}},
+            }
+        )
+        mock_get_health_service.return_value = mock_health_service
+
+        # Act
+        response = client.get("/health/history?hours=2&component=redis")
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data["components"]["redis"]["status"] == [0, 3]
+        assert data["status_codes"]["unhealthy"] == 3
+        mock_health_service.query_health_history.assert_called_once_with(
+            2.0, components=["redis"], resolution_seconds=None
+        )
+
+    @patch("resync.api.health.get_health_check_service", new_callable=AsyncMock)
+    def test_health_history_errors(self, mock_get_health_service, client):
+        """Test the /health/history endpoint maps query failures to HTTP errors."""
+        # Arrange
+        mock_health_service = MagicMock()
+        mock_get_health_service.return_value = mock_health_service
+
+        # Act / Assert
+        mock_health_service.query_health_history.side_effect = ValueError("bad")
+        response = client.get("/health/history?hours=2")
+        assert response.status_code == 400
+
+        mock_health_service.query_health_history.side_effect = RuntimeError("boom")
+        response = client.get("/health/history?hours=2")
+        assert response.status_code == 500
+        assert "boom" in response.json()["detail"]
+
+        response = client.get("/health/history?resolution_seconds=0")
+        assert response.status_code == 422
 
     @patch("resync.api.health.get_health_check_service", new_callable=AsyncMock)
     def test_health_core_unhealthy(self, mock_get_health_service, client):
         """Test the /health/core endpoint with an unhealthy core component."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
 
         mock_result = HealthCheckResult(
@@ -449,7 +497,7 @@ class TestHealthEndpoint:
                 )
             },
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -528,7 +576,7 @@ class TestHealthEndpoint:
         """Test /health endpoint with auto_enable flag."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
         mock_result = HealthCheckResult(
             overall_status=HealthStatus.HEALTHY,
@@ -537,7 +585,7 @@ class TestHealthEndpoint:
             alerts=[],
             performance_metrics={},
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -556,7 +604,7 @@ class TestHealthEndpoint:
         """Test /health/core with a degraded component."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
         mock_result = HealthCheckResult(
             overall_status=HealthStatus.DEGRADED,
@@ -570,7 +618,7 @@ class TestHealthEndpoint:
                 )
             },
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -587,14 +635,14 @@ class TestHealthEndpoint:
         """Test /health/redis when the redis component is not in the health check."""
         # Arrange
         mock_health_service = MagicMock()
-        mock_health_service.perform_comprehensive_health_check = AsyncMock()
+        mock_health_service.get_cached_health_check = AsyncMock()
         mock_get_health_service.return_value = mock_health_service
         mock_result = HealthCheckResult(
             overall_status=HealthStatus.HEALTHY,
             timestamp=datetime.now(),
             components={},  # No redis component
         )
-        mock_health_service.perform_comprehensive_health_check.return_value = (
+        mock_health_service.get_cached_health_check.return_value = (
             mock_result
         )
 
@@ -0,0 +1,143 @@
+"""
+Unit tests for AdaptiveConcurrencyLimiter.
+
+Tests verify:
+- In-flight calls never exceed the current limit.
+- Waiting calls are admitted in priority order.
+- Errors shrink the limit and flat latency lets it grow.
+- Queue timeouts are rejected with ServiceUnavailableError.
+- Limit and queueing delay are published to metrics.
+"""
+
+import asyncio
+
+import pytest
+
+from resync.core.adaptive_concurrency import (
+    AdaptiveConcurrencyLimiter,
+    RequestPriority,
+    request_priority,
+)
+from resync.core.exceptions import ServiceUnavailableError
+from resync.core.metrics import MetricGauge, MetricHistogram
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Tests for admission control and limit adaptation."""
+
+    @pytest.mark.asyncio
+    async def test_inflight_bounded_by_limit(self):
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=3, max_limit=3)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.limit_call():
+                peak = max(peak, limiter.inflight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(20)))
+
+        assert peak == 3
+        assert limiter.inflight == 0
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_interactive_calls_admitted_first(self):
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=1, max_limit=1)
+        order = []
+        gate = asyncio.Event()
+
+        async def blocker():
+            async with limiter.limit_call():
+                await gate.wait()
+
+        async def call(name, priority):
+            with request_priority(priority):
+                async with limiter.limit_call():
+                    order.append(name)
+
+        blocking = asyncio.create_task(blocker())
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.create_task(call("dashboard", RequestPriority.DEFAULT)),
+            asyncio.create_task(call("monitor", RequestPriority.BACKGROUND)),
+            asyncio.create_task(call("chat", RequestPriority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert limiter.queued == 3
+
+        gate.set()
+        await asyncio.gather(blocking, *waiting)
+
+        assert order == ["chat", "dashboard", "monitor"]
+
+    @pytest.mark.asyncio
+    async def test_errors_shrink_limit(self):
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=20, min_limit=2)
+
+        for _ in range(10):
+            with pytest.raises(ConnectionError):
+                async with limiter.limit_call():
+                    raise ConnectionError("refused")
+
+        assert limiter.limit < 10
+        assert limiter.dropped_calls == 10
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_change_limit(self):
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=10)
+
+        with pytest.raises(ValueError):
+            async with limiter.limit_call():
+                raise ValueError("bad input")
+
+        assert limiter.limit == 10
+        assert limiter.dropped_calls == 0
+
+    def test_flat_latency_grows_limit_and_rising_latency_shrinks_it(self):
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=10, max_limit=200)
+
+        for _ in range(200):
+            limiter._inflight += 1
+            limiter.release(0.05, inflight=limiter.limit)
+        grown = limiter.limit
+        assert grown > 10
+
+        for _ in range(200):
+            limiter._inflight += 1
+            limiter.release(0.5, inflight=limiter.limit)
+        assert limiter.limit < grown
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_rejected(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            "test", initial_limit=1, max_limit=1, max_queue_delay=0.01
+        )
+        await limiter.acquire()
+
+        with pytest.raises(ServiceUnavailableError):
+            await limiter.acquire()
+
+        assert limiter.rejected_calls == 1
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_published(self):
+        limit_gauge = MetricGauge()
+        inflight_gauge = MetricGauge()
+        queue_delay = MetricHistogram()
+        limiter = AdaptiveConcurrencyLimiter(
+            "test",
+            initial_limit=4,
+            limit_gauge=limit_gauge,
+            inflight_gauge=inflight_gauge,
+            queue_delay_histogram=queue_delay,
+        )
+
+        async with limiter.limit_call():
+            assert inflight_gauge.get() == 1
+
+        assert limit_gauge.get() == limiter.limit
+        assert inflight_gauge.get() == 0
+        assert queue_delay._count == 1
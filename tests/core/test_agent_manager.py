@@ -97,8 +97,11 @@ async def test_load_agents_from_nonexistent_file(
     # Act
     await agent_manager_instance.load_agents_from_config(config_path=non_existent_path)
 
-    # Assert
-    assert agent_manager_instance.agents == {}
+    # Assert: the built-in configuration is kept, and its agents are warmed up
+    assert agent_manager_instance.agent_configs == agent_manager_instance._builtin_configs
+    assert set(agent_manager_instance.agents) == {
+        config.id for config in agent_manager_instance._builtin_configs
+    }
 
 
 @pytest.mark.asyncio
@@ -120,8 +123,8 @@ async def test_load_agents_from_invalid_json(
             config_path=invalid_json_file
         )
 
-    # Also assert that the internal state remains clean
-    assert agent_manager_instance.agents == {}
+    # Also assert that the configuration is untouched
+    assert agent_manager_instance.agent_configs == agent_manager_instance._builtin_configs
 
 
 @pytest.mark.asyncio
@@ -182,4 +185,4 @@ async def test_async_agent_loading(mock_config_file: Path):
             # Assert
             assert "test-agent-1" in agent_manager.agents
             agent = await agent_manager.get_agent("test-agent-1")
-            assert agent is not None
\ No newline at end of file
+            assert agent is not None
@@ -0,0 +1,174 @@
+"""
+Unit tests for agent warm-up and hot reload of the agent config file.
+
+Tests verify:
+- Warm-up builds every configured agent, with bounded concurrency.
+- Loading the config file builds each agent once, with or without a file.
+- Reloading rebuilds only the agents whose configuration changed.
+- Prepared tools are kept per manager instance.
+- Editing the config file reloads the agents and notifies clients.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from resync.core.agent_manager import AgentManager
+from resync.core.config_watcher import handle_config_change, watch_agent_config
+
+
+@pytest.fixture
+def agent_manager(monkeypatch):
+    """A fresh AgentManager whose agent builds are recorded."""
+    monkeypatch.setattr(AgentManager, "_instance", None)
+    manager = AgentManager(tws_client_factory=lambda: None)
+    manager.builds = []
+
+    async def create_agent(agent_id):
+        manager.builds.append(agent_id)
+        config = await manager.get_agent_config(agent_id)
+        return SimpleNamespace(id=agent_id, backstory=config.backstory)
+
+    monkeypatch.setattr(manager, "_create_agent", create_agent)
+    return manager
+
+
+def write_config(path: Path, manager: AgentManager, **changes) -> None:
+    """Writes the built-in agents to ``path``, with ``changes`` on the first."""
+    configs = [config.model_dump(mode="json") for config in manager._builtin_configs]
+    configs[0].update(changes)
+    path.write_text(json.dumps({"agents": configs}))
+
+
+class TestWarmUp:
+    """Tests for building agents ahead of the first chat."""
+
+    @pytest.mark.asyncio
+    async def test_warm_up_builds_agents_concurrently(self, agent_manager, monkeypatch):
+        agent_manager.settings = SimpleNamespace(MAX_CONCURRENT_AGENT_CREATIONS=1)
+        running = peak = 0
+
+        async def create_agent(agent_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return SimpleNamespace(id=agent_id)
+
+        monkeypatch.setattr(agent_manager, "_create_agent", create_agent)
+
+        timings = await agent_manager.warm_up()
+
+        configured = {config.id for config in agent_manager.agent_configs}
+        assert set(timings) == configured
+        assert set(agent_manager.agents) == configured
+        assert peak == 1
+        # Already built agents are not built again
+        assert await agent_manager.warm_up() == {}
+
+    @pytest.mark.asyncio
+    async def test_load_builds_each_agent_once(self, agent_manager, tmp_path):
+        config_file = tmp_path / "agents.json"
+        write_config(config_file, agent_manager)
+
+        await agent_manager.load_agents_from_config(config_path=config_file)
+
+        assert sorted(agent_manager.builds) == sorted(
+            config.id for config in agent_manager.agent_configs
+        )
+
+    @pytest.mark.asyncio
+    async def test_load_without_config_file_warms_up(self, agent_manager, tmp_path):
+        await agent_manager.load_agents_from_config(config_path=tmp_path / "missing.json")
+
+        assert set(agent_manager.agents) == {
+            config.id for config in agent_manager._builtin_configs
+        }
+
+    @pytest.mark.asyncio
+    async def test_reload_rebuilds_only_changed_agents(self, agent_manager, tmp_path):
+        await agent_manager.warm_up()
+        before = dict(agent_manager.agents)
+        changed = agent_manager._builtin_configs[0].id
+        config_file = tmp_path / "agents.json"
+        write_config(config_file, agent_manager, backstory="Reloaded from disk")
+
+        await agent_manager.load_agents_from_config(config_path=config_file)
+
+        assert agent_manager.agents[changed] is not before[changed]
+        assert agent_manager.agents[changed].backstory == "Reloaded from disk"
+        for agent_id, agent in before.items():
+            if agent_id != changed:
+                assert agent_manager.agents[agent_id] is agent
+
+    def test_tool_cache_is_per_instance(self, agent_manager, monkeypatch):
+        agent_manager.tools = {"tool": lambda: None}
+        prepared = agent_manager._agent_tools()
+
+        monkeypatch.setattr(AgentManager, "_instance", None)
+        other = AgentManager(tws_client_factory=lambda: None)
+        other.tools = {}
+
+        assert other._agent_tools() == {}
+        assert agent_manager._agent_tools() is prepared
+
+
+class FakeConnectionManager:
+    def __init__(self):
+        self.messages = []
+
+    async def broadcast(self, message):
+        self.messages.append(json.loads(message))
+
+
+class TestConfigReload:
+    """Tests for reloading agents when the config file changes."""
+
+    @pytest.mark.asyncio
+    async def test_config_change_reloads_and_notifies(self, agent_manager, monkeypatch):
+        connections = FakeConnectionManager()
+        reloads = []
+        monkeypatch.setattr(
+            agent_manager, "load_agents_from_config", lambda: asyncio.sleep(0, reloads.append(1))
+        )
+
+        await handle_config_change(agent_manager, connections)
+
+        assert reloads == [1]
+        [message] = connections.messages
+        assert message["type"] == "config_update"
+        assert {agent["id"] for agent in message["agents"]} == {
+            config.id for config in agent_manager.agent_configs
+        }
+
+    @pytest.mark.asyncio
+    async def test_editing_config_file_rebuilds_agent(self, agent_manager, tmp_path):
+        config_file = tmp_path / "agents.json"
+        write_config(config_file, agent_manager)
+        agent_manager.settings = SimpleNamespace(AGENT_CONFIG_PATH=config_file)
+        await agent_manager.load_agents_from_config()
+        changed = agent_manager._builtin_configs[0].id
+        connections = FakeConnectionManager()
+
+        watcher = asyncio.create_task(
+            watch_agent_config(
+                agent_manager, connections, config_path=config_file, debounce_ms=50
+            )
+        )
+        try:
+            await asyncio.sleep(0.2)  # Let the watcher start
+            write_config(config_file, agent_manager, backstory="Edited")
+            for _ in range(100):
+                if connections.messages:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+
+        assert agent_manager.agents[changed].backstory == "Edited"
+        assert len(connections.messages) == 1
@@ -0,0 +1,263 @@
+"""
+Unit tests for AnomalyDetectionEngine batch scoring and background training.
+
+Tests verify:
+- Queued requests are scored in micro-batches with one model call per batch.
+- analyze_request only enqueues unless asked to wait.
+- Callers never hang: scoring errors, alert errors and stop() resolve them.
+- Training runs in an executor and swaps the model in atomically.
+- Clear outliers are flagged once a model is trained.
+- Trained models are persisted and reloaded on start.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from resync.core.anomaly_detector import (
+    AnomalyDetectionEngine,
+    AnomalyMetrics,
+    IsolationForestDetector,
+    MLModelConfig,
+    _SklearnDetector,
+)
+from resync.core.exceptions import ServiceUnavailableError
+
+
+def normal_request(rng):
+    return AnomalyMetrics(
+        endpoint="/api/v1/status",
+        response_time=rng.gauss(0.1, 0.01),
+        status_code=200,
+        request_size=int(rng.gauss(500, 20)),
+        response_size=int(rng.gauss(2000, 50)),
+    )
+
+
+def outlier_request():
+    return AnomalyMetrics(
+        endpoint="/api/v1/status",
+        response_time=30.0,
+        status_code=500,
+        request_size=900_000,
+        response_size=10,
+    )
+
+
+@pytest.fixture
+def config(tmp_path):
+    return MLModelConfig(
+        min_samples_for_training=200,
+        isolation_forest_n_estimators=20,
+        training_executor="thread",
+        retrain_check_interval_seconds=3600,
+        batch_size=32,
+        model_directory=str(tmp_path / "models"),
+    )
+
+
+async def trained_engine(config):
+    engine = AnomalyDetectionEngine(config)
+    rng = random.Random(0)
+    for _ in range(config.min_samples_for_training):
+        engine.primary_detector.add_training_sample(normal_request(rng))
+    assert await engine._update_models()
+    return engine
+
+
+class TestBatchScoring:
+    """Tests for queued micro-batch scoring."""
+
+    @pytest.mark.asyncio
+    async def test_requests_scored_in_batches(self, config, monkeypatch):
+        engine = await trained_engine(config)
+        calls = []
+        original = engine.primary_detector.score_matrix
+
+        def counting_score_matrix(matrix):
+            calls.append(len(matrix))
+            return original(matrix)
+
+        monkeypatch.setattr(engine.primary_detector, "score_matrix", counting_score_matrix)
+        await engine.start()
+
+        rng = random.Random(1)
+        results = await asyncio.gather(
+            *(engine.analyze_request(normal_request(rng), wait=True) for _ in range(64))
+        )
+        await engine.stop()
+
+        assert len(results) == 64
+        assert sum(calls) == 64
+        assert len(calls) < 64
+        assert max(calls) <= config.batch_size
+
+    @pytest.mark.asyncio
+    async def test_fire_and_forget_only_enqueues(self, config):
+        engine = AnomalyDetectionEngine(config)
+
+        result = await engine.analyze_request(AnomalyMetrics())
+
+        assert result is None
+        assert engine.metrics_buffer.qsize() == 1
+        assert engine.total_requests == 1
+
+    @pytest.mark.asyncio
+    async def test_outlier_detected(self, config):
+        engine = await trained_engine(config)
+
+        normal = await engine.analyze_request(
+            normal_request(random.Random(2)), wait=True
+        )
+        outlier = await engine.analyze_request(outlier_request(), wait=True)
+
+        assert outlier.is_anomaly
+        assert outlier.confidence > normal.confidence
+
+
+class TestFailureHandling:
+    """Tests that no caller waits forever for a score."""
+
+    @pytest.mark.asyncio
+    async def test_scoring_error_fails_every_caller(self, config, monkeypatch):
+        engine = AnomalyDetectionEngine(config)
+
+        def broken_score_batch(matrix, metrics):
+            raise ValueError("model exploded")
+
+        monkeypatch.setattr(engine.primary_detector, "score_batch", broken_score_batch)
+        await engine.start()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(
+                    engine.analyze_request(AnomalyMetrics(), wait=True)
+                    for _ in range(5)
+                ),
+                return_exceptions=True,
+            ),
+            timeout=5,
+        )
+        # The loop keeps scoring after a failed batch
+        monkeypatch.undo()
+        assert await asyncio.wait_for(
+            engine.analyze_request(AnomalyMetrics(), wait=True), 5
+        )
+        await engine.stop()
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_alert_error_keeps_results(self, config, monkeypatch):
+        engine = await trained_engine(config)
+        engine.alert_thresholds = dict.fromkeys(engine.alert_thresholds, 0.0)
+
+        async def broken_alert(result):
+            raise RuntimeError("alerting down")
+
+        monkeypatch.setattr(engine, "_generate_alert", broken_alert)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                engine.analyze_request(outlier_request(), wait=True),
+                engine.analyze_request(normal_request(random.Random(3)), wait=True),
+            ),
+            timeout=5,
+        )
+
+        assert results[0].is_anomaly
+        assert results[1] is not None
+
+    @pytest.mark.asyncio
+    async def test_stop_mid_batch_fails_callers(self, config, monkeypatch):
+        engine = AnomalyDetectionEngine(config)
+        engine.alert_thresholds = dict.fromkeys(engine.alert_thresholds, 0.0)
+        alert_started = asyncio.Event()
+
+        def score_as_anomalies(matrix, metrics):
+            results = [engine.primary_detector._untrained_score(m, 1.0) for m in metrics]
+            for result in results:
+                result.is_anomaly = True
+            return results
+
+        async def slow_alert(result):
+            alert_started.set()
+            await asyncio.sleep(3600)
+
+        monkeypatch.setattr(engine.primary_detector, "score_batch", score_as_anomalies)
+        monkeypatch.setattr(engine, "_generate_alert", slow_alert)
+        await engine.start()
+        waiters = [
+            asyncio.create_task(engine.analyze_request(AnomalyMetrics(), wait=True))
+            for _ in range(3)
+        ]
+
+        # Stop while the batch is stuck alerting on its first result
+        await asyncio.wait_for(alert_started.wait(), 5)
+        await engine.stop()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*waiters, return_exceptions=True), timeout=5
+        )
+        assert all(isinstance(result, ServiceUnavailableError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_stop_fails_queued_requests(self, config):
+        engine = AnomalyDetectionEngine(config)
+        engine._running = True  # Queued, but no loop will score them
+        waiter = asyncio.create_task(
+            engine.analyze_request(AnomalyMetrics(), wait=True)
+        )
+        await asyncio.sleep(0)
+
+        await engine.stop()
+
+        with pytest.raises(ServiceUnavailableError):
+            await asyncio.wait_for(waiter, 5)
+        assert engine.dropped_requests == 1
+
+    def test_detector_base_is_abstract(self, config):
+        with pytest.raises(TypeError):
+            _SklearnDetector(config)
+
+
+class TestTraining:
+    """Tests for background training and persistence."""
+
+    @pytest.mark.asyncio
+    async def test_untrained_until_enough_samples(self, config):
+        detector = IsolationForestDetector(config)
+        detector.add_training_sample(AnomalyMetrics())
+
+        assert not await detector.train()
+        score = await detector.detect(AnomalyMetrics())
+        assert not score.is_anomaly
+        assert not detector.is_trained
+
+    @pytest.mark.asyncio
+    async def test_process_training_swaps_model(self, config):
+        config.training_executor = "process"
+        engine = await trained_engine(config)
+        try:
+            state = engine.primary_detector.state
+            assert state is not None
+            assert state.samples == config.min_samples_for_training
+        finally:
+            await engine.stop()
+            if engine._training_executor is not None:
+                engine._training_executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_model_persisted_and_reloaded(self, config, tmp_path):
+        await trained_engine(config)
+        assert (tmp_path / "models" / "isolation_forest.joblib").exists()
+
+        restarted = AnomalyDetectionEngine(config)
+        await restarted.start()
+        try:
+            assert restarted.primary_detector.is_trained
+            result = await restarted.analyze_request(outlier_request(), wait=True)
+            assert result.is_anomaly
+        finally:
+            await restarted.stop()
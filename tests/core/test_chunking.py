@@ -0,0 +1,167 @@
+"""
+Unit tests for the shared token-aware chunking engine.
+
+Tests verify:
+- The knowledge-graph (file_ingestor) and RAG ingestion paths chunk a
+  document identically.
+- Cuts fall on heading, paragraph and sentence boundaries when possible.
+- Chunks are slices of the source text and their overlap is bounded.
+- Parallel chunking of many documents matches serial chunking and reuses
+  one worker pool across calls.
+"""
+
+import docx
+import pytest
+
+from resync.core import chunking
+from resync.core.chunking import chunk_documents, chunk_segments, chunk_text
+from resync.core.file_ingestor import chunk_segments as kg_chunk_segments
+from resync.core.file_ingestor import iter_docx
+from resync.core.file_ingestor import read_docx
+from resync.RAG.microservice.core.chunking import chunk_text as rag_chunk_text
+
+
+def make_document(sections=20, sentences=12):
+    parts = []
+    for s in range(sections):
+        parts.append(f"# Section {s}")
+        parts.append("")
+        for p in range(2):
+            parts.append(
+                " ".join(
+                    f"Job JOB_{s}_{p}_{i} ran on workstation CPU{i} and ended normally."
+                    for i in range(sentences)
+                )
+            )
+            parts.append("")
+    return "\n".join(parts)
+
+
+class TestConsistency:
+    """Both ingestion paths use the same engine."""
+
+    def test_file_ingestor_and_rag_paths_match(self, tmp_path):
+        path = tmp_path / "runbook.docx"
+        document = docx.Document()
+        for line in make_document().split("\n"):
+            document.add_paragraph(line)
+        document.save(path)
+
+        streamed = list(kg_chunk_segments(iter_docx(path), 64, 8))
+
+        assert streamed == list(rag_chunk_text(read_docx(path), 64, 8))
+        assert len(streamed) > 10
+
+    @pytest.mark.parametrize("max_tokens,overlap", [(512, 64), (40, 10), (7, 0), (10, 9)])
+    def test_segments_match_joined_text(self, max_tokens, overlap):
+        lines = make_document(sections=5).split("\n")
+        segments = ["\n".join(lines[i : i + 3]) for i in range(0, len(lines), 3)]
+
+        assert list(chunk_segments(segments, max_tokens, overlap)) == list(
+            chunk_text("\n".join(segments), max_tokens, overlap)
+        )
+
+
+class TestBoundaries:
+    """Cuts and overlaps prefer structural boundaries."""
+
+    def test_chunks_are_slices_of_the_text(self):
+        text = make_document()
+
+        chunks = list(chunk_text(text, 50, 10))
+
+        assert all(chunk in text for chunk in chunks)
+        assert chunks[0].startswith("# Section 0")
+        assert chunks[-1].endswith("ended normally.")
+
+    def test_cuts_at_sentence_ends(self):
+        text = make_document()
+
+        for chunk in chunk_text(text, 50, 0):
+            assert chunk.endswith(".") or chunk.split("\n")[-1].startswith("#")
+
+    def test_heading_starts_a_chunk(self):
+        first = " ".join(f"Sentence {i} of the intro." for i in range(8))
+        text = f"{first}\n\n## Details\n\n" + " ".join(f"Detail {i}." for i in range(40))
+
+        chunks = list(chunk_text(text, 60, 0))
+
+        assert chunks[0] == first
+        assert chunks[1].startswith("## Details")
+
+    def test_overlap_starts_at_sentence(self):
+        text = " ".join(f"Sentence number {i} is here." for i in range(100))
+
+        chunks = list(chunk_text(text, 40, 12))
+
+        for chunk in chunks[1:]:
+            assert chunk.startswith("Sentence number")
+        for previous, chunk in zip(chunks, chunks[1:]):
+            assert chunk.split(".")[0] in previous
+
+    def test_overlap_is_clamped_and_progress_is_made(self):
+        chunks = list(chunk_text("word " * 100, 5, 50))
+
+        assert len(chunks) > 20
+        assert list(chunk_text("", 5, 2)) == []
+        with pytest.raises(ValueError):
+            list(chunk_text("text", 0))
+
+
+class TestTokenizer:
+    """Token offsets without a tiktoken encoding."""
+
+    def test_fallback_offsets_are_word_starts(self):
+        tokenizer = chunking._Tokenizer()
+
+        assert tokenizer.offsets("Job  A1, ended.") == [0, 3, 7, 8, 14]
+        assert tokenizer.offsets("") == []
+
+
+class TestChunkDocuments:
+    """Parallel chunking across processes."""
+
+    def test_parallel_matches_serial(self):
+        texts = [make_document(sections=3, sentences=i + 2) for i in range(6)]
+
+        serial = chunk_documents(texts, 40, 8, max_workers=1)
+        parallel = chunk_documents(texts, 40, 8, max_workers=2, min_parallel_chars=0)
+
+        assert parallel == serial
+        assert serial == [list(chunk_text(t, 40, 8)) for t in texts]
+
+    def test_empty_batch(self):
+        assert chunk_documents([]) == []
+
+    def test_pool_reused_across_calls(self):
+        texts = [make_document(sections=2, sentences=i + 2) for i in range(4)]
+        try:
+            first = chunk_documents(texts, 40, 8, max_workers=2, min_parallel_chars=0)
+            pool = chunking._pool
+            second = chunk_documents(texts, 40, 8, max_workers=2, min_parallel_chars=0)
+
+            assert pool is not None
+            assert chunking._pool is pool
+            assert second == first
+        finally:
+            chunking.shutdown_chunking_pool()
+        assert chunking._pool is None
+
+    def test_given_executor_used(self):
+        class RecordingExecutor:
+            def __init__(self):
+                self.calls = 0
+
+            def map(self, fn, *iterables, chunksize=1):
+                self.calls += 1
+                return map(fn, *iterables)
+
+        executor = RecordingExecutor()
+        texts = [make_document(sections=2), make_document(sections=3)]
+
+        chunks = chunk_documents(
+            texts, 40, 8, max_workers=2, min_parallel_chars=0, executor=executor
+        )
+
+        assert executor.calls == 1
+        assert chunks == [list(chunk_text(t, 40, 8)) for t in texts]
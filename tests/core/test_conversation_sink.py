@@ -0,0 +1,195 @@
+"""
+Unit tests for write-behind conversation persistence and auditor scheduling.
+
+Tests verify:
+- submit() returns without waiting for the knowledge graph.
+- Queued conversations are written in batches through add_conversations.
+- Failed writes are retried without rewriting what was already stored.
+- stop() writes whatever is still queued.
+- Auditor triggers are coalesced into one sweep per interval or threshold.
+- Sweeps never overlap.
+"""
+
+import asyncio
+
+import pytest
+
+from resync.core.conversation_sink import (
+    AuditorScheduler,
+    Conversation,
+    ConversationSink,
+)
+
+
+class FakeKnowledgeGraph:
+    """Records writes; each write takes ``delay`` seconds."""
+
+    def __init__(self, delay=0.0, batch=True, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.single = []
+        self.batches = []
+        if not batch:
+            self.add_conversations = None
+
+    async def add_conversation(self, user_query, agent_response, agent_id, context=None):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("neo4j unavailable")
+        self.single.append(user_query)
+        return str(len(self.single))
+
+    async def add_conversations(self, conversations):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("neo4j unavailable")
+        self.batches.append([c["user_query"] for c in conversations])
+        return [str(i) for i in range(len(conversations))]
+
+
+def conversation(i):
+    return Conversation(
+        user_query=f"q{i}", agent_response=f"a{i}", agent_id="agent", context={}
+    )
+
+
+class TestConversationSink:
+    """Write-behind batching of conversations."""
+
+    @pytest.mark.asyncio
+    async def test_submit_does_not_wait_for_knowledge_graph(self):
+        kg = FakeKnowledgeGraph(delay=0.2)
+        sink = ConversationSink(kg, flush_interval=0.01)
+        sink.start()
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(20):
+            await sink.submit(conversation(i))
+        elapsed = loop.time() - started
+
+        assert elapsed < 0.1
+        await sink.stop()
+
+    @pytest.mark.asyncio
+    async def test_writes_in_batches(self):
+        kg = FakeKnowledgeGraph()
+        stored = []
+        sink = ConversationSink(
+            kg, batch_size=10, flush_interval=0.05, on_stored=stored.append
+        )
+        for i in range(25):
+            await sink.submit(conversation(i))
+        sink.start()
+
+        await asyncio.sleep(0.2)
+
+        assert [len(batch) for batch in kg.batches] == [10, 10, 5]
+        assert sum(stored) == 25
+        await sink.stop()
+
+    @pytest.mark.asyncio
+    async def test_retry_does_not_rewrite_stored_conversations(self):
+        kg = FakeKnowledgeGraph(batch=False)
+        sink = ConversationSink(kg, retry_delay=0.0)
+
+        async def fail_once(user_query, **kwargs):
+            if user_query == "q1" and not hasattr(fail_once, "failed"):
+                fail_once.failed = True
+                raise ConnectionError("neo4j unavailable")
+            kg.single.append(user_query)
+
+        kg.add_conversation = fail_once
+
+        assert await sink._write([conversation(i) for i in range(3)])
+        assert kg.single == ["q0", "q1", "q2"]
+        assert sink.conversations_written == 3
+
+    @pytest.mark.asyncio
+    async def test_drops_batch_after_retries(self):
+        kg = FakeKnowledgeGraph(failures=3)
+        sink = ConversationSink(kg, retry_attempts=3, retry_delay=0.0)
+
+        assert not await sink._write([conversation(0), conversation(1)])
+        assert sink.conversations_dropped == 2
+        assert kg.batches == []
+
+    @pytest.mark.asyncio
+    async def test_stop_writes_queued_conversations(self):
+        kg = FakeKnowledgeGraph()
+        sink = ConversationSink(kg, batch_size=4, flush_interval=60.0)
+        sink.start()
+        for i in range(6):
+            await sink.submit(conversation(i))
+
+        await sink.stop()
+
+        written = [q for batch in kg.batches for q in batch] + kg.single
+        assert sorted(written) == sorted(f"q{i}" for i in range(6))
+
+
+class TestAuditorScheduler:
+    """Coalescing of auditor triggers."""
+
+    @pytest.mark.asyncio
+    async def test_triggers_coalesced_per_interval(self):
+        sweeps = []
+
+        async def audit():
+            sweeps.append(1)
+
+        scheduler = AuditorScheduler(audit, interval=0.05, batch_threshold=1000)
+        scheduler.start()
+        for _ in range(100):
+            scheduler.notify()
+
+        await asyncio.sleep(0.08)
+
+        assert len(sweeps) == 1
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_threshold_triggers_sweep_early(self):
+        sweeps = []
+
+        async def audit():
+            sweeps.append(1)
+
+        scheduler = AuditorScheduler(audit, interval=60.0, batch_threshold=10)
+        scheduler.start()
+        scheduler.notify(9)
+        await asyncio.sleep(0.01)
+        assert sweeps == []
+
+        scheduler.notify()
+        await asyncio.sleep(0.01)
+
+        assert sweeps == [1]
+        assert scheduler.pending == 0
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_sweeps_never_overlap(self):
+        running = 0
+        peak = 0
+
+        async def audit():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+
+        scheduler = AuditorScheduler(audit, interval=0.01, batch_threshold=1)
+        scheduler.start()
+        for _ in range(10):
+            scheduler.notify()
+            await asyncio.sleep(0.01)
+
+        await asyncio.sleep(0.1)
+
+        assert peak == 1
+        assert scheduler.sweeps < 10
+        await scheduler.stop()
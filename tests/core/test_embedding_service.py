@@ -0,0 +1,198 @@
+"""
+Unit tests for the shared micro-batching embedding service.
+
+Tests verify:
+- Concurrent requests are embedded in one API call, in order.
+- Identical texts requested concurrently are embedded once.
+- Embeddings are served from the persistent cache after a restart.
+- A failed API call fails its requests and is not cached.
+- Without an API client, deterministic hash-based vectors are returned.
+- The requested dimension is sent to models that support it.
+- One shared service exists per model and dimension, stopped on shutdown.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from resync.RAG.microservice.core.config import CFG
+from resync.RAG.microservice.core.embedding_service import EmbeddingService
+from resync.core import embedding_service as embedding_service_module
+from resync.core.embedding_service import (
+    AsyncEmbeddingService,
+    get_embedding_service,
+    hash_embedding,
+    shutdown_embedding_service,
+)
+
+
+class FakeEmbeddingsAPI:
+    """Mimics ``client.embeddings``; the vector of a text is [len(text), i]."""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = []
+        self.options = []
+
+    async def create(self, model, input, **options):
+        self.calls.append(list(input))
+        self.options.append(options)
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("embedding API unavailable")
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=[float(len(text)), float(i)])
+                for i, text in enumerate(input)
+            ]
+        )
+
+
+def make_service(tmp_path, api, **kwargs):
+    return AsyncEmbeddingService(
+        model="test-model",
+        dim=2,
+        cache_path=tmp_path / "embeddings.db",
+        client=SimpleNamespace(embeddings=api),
+        **kwargs,
+    )
+
+
+class TestAsyncEmbeddingService:
+    """Batching, coalescing and caching of embeddings."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self, tmp_path):
+        api = FakeEmbeddingsAPI()
+        service = make_service(tmp_path, api, max_wait=0.02)
+
+        texts = [f"text {'x' * i}" for i in range(20)]
+        vectors = await asyncio.gather(*(service.embed(t) for t in texts))
+
+        assert len(api.calls) == 1
+        assert [v[0] for v in vectors] == [float(len(t)) for t in texts]
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_batch_size_limits_call_size(self, tmp_path):
+        api = FakeEmbeddingsAPI()
+        service = make_service(tmp_path, api, batch_size=8, max_wait=0.02)
+
+        await service.embed_batch([f"text {i}" for i in range(20)])
+
+        assert [len(call) for call in api.calls] == [8, 8, 4]
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_identical_texts_embedded_once(self, tmp_path):
+        api = FakeEmbeddingsAPI(delay=0.02)
+        service = make_service(tmp_path, api)
+
+        results = await asyncio.gather(
+            service.embed_batch(["same", "same", "other"]),
+            service.embed("same"),
+        )
+
+        assert sorted(t for call in api.calls for t in call) == ["other", "same"]
+        assert results[0][0] == results[0][1] == results[1]
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_persistent_cache_survives_restart(self, tmp_path):
+        api = FakeEmbeddingsAPI()
+        service = make_service(tmp_path, api)
+        first = await service.embed_batch(["alpha", "beta"])
+        await service.stop()
+
+        restarted = make_service(tmp_path, api)
+        second = await restarted.embed_batch(["beta", "alpha"])
+
+        assert len(api.calls) == 1
+        assert second == [first[1], first[0]]
+        assert restarted.cache_hits == 2
+        await restarted.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_call_is_not_cached(self, tmp_path):
+        api = FakeEmbeddingsAPI(failures=1)
+        service = make_service(tmp_path, api)
+
+        with pytest.raises(ConnectionError):
+            await service.embed("alpha")
+        vector = await service.embed("alpha")
+
+        assert vector == [5.0, 0.0]
+        assert len(api.calls) == 2
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_fallback_without_client(self, tmp_path):
+        service = AsyncEmbeddingService(dim=64, cache_path=tmp_path / "unused.db")
+        service._client = None
+
+        vectors = await service.embed_batch(["alpha", "alpha", "beta"])
+
+        assert service.uses_fallback
+        assert vectors[0] == vectors[1] == hash_embedding("alpha", 64)
+        assert vectors[2] != vectors[0]
+        assert not (tmp_path / "unused.db").exists()
+
+    @pytest.mark.asyncio
+    async def test_dimensions_sent_when_supported(self, tmp_path):
+        api = FakeEmbeddingsAPI()
+        service = AsyncEmbeddingService(
+            model="text-embedding-3-large",
+            dim=2,
+            cache_path=tmp_path / "embeddings.db",
+            client=SimpleNamespace(embeddings=api),
+        )
+
+        await service.embed("alpha")
+
+        assert api.options == [{"dimensions": 2}]
+        await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_wrong_dimension_rejected(self, tmp_path):
+        api = FakeEmbeddingsAPI()
+        service = make_service(tmp_path, api)
+        service.dim = 3
+
+        with pytest.raises(ValueError):
+            await service.embed("alpha")
+        assert api.options == [{}]
+        await service.stop()
+
+
+class TestSharedServices:
+    """One shared service per model and dimension."""
+
+    @pytest.fixture(autouse=True)
+    def no_shared_services(self, monkeypatch):
+        monkeypatch.setattr(embedding_service_module, "_embedding_services", {})
+
+    @pytest.mark.asyncio
+    async def test_rag_embedder_reuses_shared_service(self):
+        rag = EmbeddingService()
+        other = get_embedding_service("other-model", 8)
+
+        assert rag._service is get_embedding_service(CFG.embed_model, CFG.embed_dim)
+        assert other is get_embedding_service("other-model", 8)
+        assert other is not rag._service
+
+    @pytest.mark.asyncio
+    async def test_shutdown_stops_every_service(self, monkeypatch):
+        stopped = []
+        services = [get_embedding_service("model-a", 4), get_embedding_service("model-b", 4)]
+        for service in services:
+            monkeypatch.setattr(
+                service, "stop", lambda s=service: asyncio.sleep(0, stopped.append(s))
+            )
+
+        await shutdown_embedding_service()
+
+        assert stopped == services
+        assert get_embedding_service("model-a", 4) is not services[0]
@@ -0,0 +1,380 @@
+"""
+Unit tests for EncryptedAuditTrail block storage and indexed search.
+
+Tests verify:
+- Flushed blocks are written as raw ciphertext with a sidecar index.
+- Searches find entries in archived blocks.
+- Block indexes prune blocks that cannot match.
+- Indexes are reloaded from disk on startup.
+- Blocks without an index, such as legacy JSON blocks, are indexed on start.
+- A failed flush keeps the pending entries for the next attempt.
+- Events logged during a flush keep the entry chain intact.
+- Chain verification detects tampering, streams progress and checkpoints.
+- Blocks holding events logged during a flush verify, as do legacy links.
+- Blocks are verified in numeric order.
+- Offline verification works through the CLI.
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+
+import pytest
+from cryptography.fernet import Fernet
+
+from resync.core import audit_chain_verifier
+from resync.core.encrypted_audit import (
+    BlockIndex,
+    BloomFilter,
+    EncryptedAuditConfig,
+    EncryptedAuditTrail,
+)
+
+
+@pytest.fixture
+def audit_trail(tmp_path):
+    """Create an audit trail backed by a temporary directory."""
+    config = EncryptedAuditConfig(audit_log_directory=str(tmp_path))
+    return EncryptedAuditTrail(config)
+
+
+class TestBloomFilter:
+    """Tests for the block index Bloom filter."""
+
+    def test_membership_and_round_trip(self):
+        bloom = BloomFilter.for_capacity(100)
+        for i in range(100):
+            bloom.add(f"user_{i}")
+
+        restored = BloomFilter.from_dict(bloom.to_dict())
+
+        assert all(restored.might_contain(f"user_{i}") for i in range(100))
+        false_positives = sum(
+            restored.might_contain(f"other_{i}") for i in range(1000)
+        )
+        assert false_positives < 50
+
+
+class TestEncryptedAuditSearch:
+    """Tests for searching archived audit blocks."""
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_raw_block_and_index(self, audit_trail, tmp_path):
+        await audit_trail.log_event("login", user_id="alice", action="login")
+        await audit_trail._flush_pending_entries()
+
+        block_file = tmp_path / "block_000000.audit"
+        index_file = tmp_path / "block_000000.idx"
+        assert block_file.exists()
+        assert index_file.exists()
+        # Raw Fernet token, not JSON-wrapped base64
+        assert not block_file.read_bytes().startswith(b"{")
+        assert not audit_trail.pending_entries
+
+    @pytest.mark.asyncio
+    async def test_search_finds_archived_entries(self, audit_trail):
+        await audit_trail.log_event("login", user_id="alice", resource_id="job_1")
+        await audit_trail.log_event("logout", user_id="bob", resource_id="job_2")
+        await audit_trail._flush_pending_entries()
+        await audit_trail.log_event("login", user_id="carol")
+
+        results = await audit_trail.search_events(user_id="bob")
+        assert [entry.user_id for entry in results] == ["bob"]
+
+        results = await audit_trail.search_events(event_type="login")
+        assert {entry.user_id for entry in results} == {"alice", "carol"}
+
+        results = await audit_trail.search_events(resource_id="job_1")
+        assert len(results) == 1
+        assert results[0].hash_value
+
+    @pytest.mark.asyncio
+    async def test_index_prunes_non_matching_blocks(self, audit_trail, monkeypatch):
+        await audit_trail.log_event("login", user_id="alice")
+        await audit_trail._flush_pending_entries()
+        await audit_trail.log_event("export", user_id="bob")
+        await audit_trail._flush_pending_entries()
+
+        loaded = []
+        original = audit_trail._load_block_entries
+
+        def tracking_load(index: BlockIndex):
+            loaded.append(index.block_id)
+            return original(index)
+
+        monkeypatch.setattr(audit_trail, "_load_block_entries", tracking_load)
+
+        results = await audit_trail.search_events(event_type="export")
+        assert [entry.user_id for entry in results] == ["bob"]
+        assert loaded == ["block_000001"]
+
+        loaded.clear()
+        assert await audit_trail.search_events(user_id="mallory") == []
+        assert loaded == []
+
+    @pytest.mark.asyncio
+    async def test_indexes_reload_on_startup(self, audit_trail, tmp_path):
+        await audit_trail.log_event("login", user_id="alice")
+        await audit_trail._flush_pending_entries()
+
+        reopened = EncryptedAuditTrail(
+            EncryptedAuditConfig(audit_log_directory=str(tmp_path))
+        )
+        # Keys are held in memory, so share them with the reopened trail
+        reopened.key_manager = audit_trail.key_manager
+
+        assert "block_000000" in reopened.block_indexes
+        results = await reopened.search_events(user_id="alice")
+        assert len(results) == 1
+
+    @pytest.mark.asyncio
+    async def test_legacy_block_indexed_on_start(self, audit_trail, tmp_path):
+        await audit_trail.log_event("login", user_id="alice")
+        entries = [entry.to_dict() for entry in audit_trail.pending_entries]
+        audit_trail.pending_entries.clear()
+        key = audit_trail.key_manager.get_active_key()
+        ciphertext = Fernet(key.get_fernet_key()).encrypt(
+            gzip.compress(json.dumps(entries).encode())
+        )
+        legacy_block = {
+            "metadata": {
+                "block_id": "block_000000",
+                "created_at": 1700000000.0,
+                "entries_count": 1,
+                "block_hash": "abc",
+                "previous_block_hash": "",
+                "encryption_key_id": key.key_id,
+                "compressed": True,
+            },
+            "encrypted_data": base64.b64encode(ciphertext).decode(),
+        }
+        (tmp_path / "block_000000.audit").write_text(json.dumps(legacy_block))
+
+        reopened = EncryptedAuditTrail(
+            EncryptedAuditConfig(audit_log_directory=str(tmp_path))
+        )
+        reopened.key_manager = audit_trail.key_manager
+        assert reopened.block_counter == 1
+        assert await reopened.search_events(user_id="alice") == []
+
+        assert await reopened.rebuild_missing_indexes() == 1
+
+        assert (tmp_path / "block_000000.idx").exists()
+        assert reopened.block_indexes["block_000000"].block_hash == "abc"
+        results = await reopened.search_events(user_id="alice")
+        assert [entry.user_id for entry in results] == ["alice"]
+
+
+class TestFlushFailure:
+    """Tests for flushes that fail partway."""
+
+    @pytest.mark.asyncio
+    async def test_failed_save_keeps_pending_entries(
+        self, audit_trail, tmp_path, monkeypatch
+    ):
+        await audit_trail.log_event("login", user_id="alice")
+
+        def failing_write(block, index):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(audit_trail, "_write_block_files", failing_write)
+        with pytest.raises(OSError):
+            await audit_trail._flush_pending_entries()
+
+        assert [entry.user_id for entry in audit_trail.pending_entries] == ["alice"]
+        assert audit_trail.block_counter == 0
+
+        monkeypatch.undo()
+        await audit_trail._flush_pending_entries()
+
+        assert not audit_trail.pending_entries
+        assert audit_trail.block_counter == 1
+        results = await audit_trail.search_events(user_id="alice")
+        assert len(results) == 1
+
+    @pytest.mark.asyncio
+    async def test_entries_logged_during_flush_kept(self, audit_trail, monkeypatch):
+        await audit_trail.log_event("login", user_id="alice")
+        original = audit_trail._write_block_files
+
+        def slow_write(block, index):
+            asyncio.run_coroutine_threadsafe(
+                audit_trail.log_event("logout", user_id="bob"), loop
+            ).result()
+            original(block, index)
+
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr(audit_trail, "_write_block_files", slow_write)
+        await audit_trail._flush_pending_entries()
+
+        assert [entry.user_id for entry in audit_trail.pending_entries] == ["bob"]
+
+        # The entry chain continues through the event logged mid-flush
+        await audit_trail.log_event("login", user_id="carol")
+        results = await audit_trail.verify_integrity()
+
+        assert results["integrity_status"] == "valid"
+        flushed = await audit_trail.search_events(user_id="alice")
+        assert audit_trail.pending_entries[0].previous_hash == flushed[0].chain_hash
+
+
+class TestChainVerification:
+    """Tests for parallel, checkpointed hash-chain verification."""
+
+    @pytest.fixture
+    def thread_trail(self, tmp_path):
+        config = EncryptedAuditConfig(
+            audit_log_directory=str(tmp_path),
+            verification_use_processes=False,
+            verification_blocks_per_task=2,
+        )
+        return EncryptedAuditTrail(config)
+
+    async def _write_blocks(self, trail, blocks: int, per_block: int = 3):
+        for b in range(blocks):
+            for i in range(per_block):
+                await trail.log_event("job_run", user_id=f"user_{b}_{i}")
+            await trail._flush_pending_entries()
+
+    @pytest.mark.asyncio
+    async def test_full_chain_valid_and_progress_streamed(self, thread_trail):
+        await self._write_blocks(thread_trail, 5)
+        events = []
+
+        results = await thread_trail.verify_integrity(
+            full_chain_check=True, progress_callback=events.append
+        )
+
+        assert results["integrity_status"] == "valid"
+        assert results["blocks_verified"] == 5
+        assert results["entries_verified"] == 15
+        assert events[-1]["blocks_verified"] == 5
+        assert all(event["event"] == "progress" for event in events)
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_limits_later_runs_to_new_blocks(self, thread_trail):
+        await self._write_blocks(thread_trail, 3)
+        first = await thread_trail._verify_full_chain()
+        assert first["blocks_verified"] == 3
+
+        await self._write_blocks(thread_trail, 2)
+        second = await thread_trail._verify_full_chain()
+
+        assert second["valid"]
+        assert second["blocks_verified"] == 2
+        assert second["blocks_skipped_by_checkpoint"] == 3
+
+    @pytest.mark.asyncio
+    async def test_tampered_block_detected(self, thread_trail, tmp_path):
+        await self._write_blocks(thread_trail, 3)
+        block_file = tmp_path / "block_000001.audit"
+        block_file.write_bytes(block_file.read_bytes()[:-8] + b"AAAAAAAA")
+
+        results = await thread_trail.verify_integrity(full_chain_check=True)
+
+        assert results["integrity_status"] == "compromised"
+        assert any("block_000001" in issue for issue in results["issues_found"])
+
+    @pytest.mark.asyncio
+    async def test_events_logged_during_flush_verify(self, thread_trail, monkeypatch):
+        await self._write_blocks(thread_trail, 1)
+        await thread_trail.log_event("login", user_id="alice")
+        original = thread_trail._write_block_files
+
+        def slow_write(block, index):
+            asyncio.run_coroutine_threadsafe(
+                thread_trail.log_event("logout", user_id="bob"), loop
+            ).result()
+            original(block, index)
+
+        loop = asyncio.get_running_loop()
+        monkeypatch.setattr(thread_trail, "_write_block_files", slow_write)
+        await thread_trail._flush_pending_entries()
+        monkeypatch.undo()
+        await self._write_blocks(thread_trail, 2)
+
+        results = await thread_trail.verify_integrity(full_chain_check=True)
+
+        assert results["integrity_status"] == "valid", results["issues_found"]
+        assert results["blocks_verified"] == 4
+
+    @pytest.mark.asyncio
+    async def test_removed_block_detected(self, thread_trail, tmp_path):
+        await self._write_blocks(thread_trail, 3)
+        (tmp_path / "block_000001.idx").unlink()
+
+        summary = await thread_trail._verify_full_chain()
+
+        assert not summary["valid"]
+        assert "block_link_broken:block_000002" in summary["issues"]
+
+    @pytest.mark.asyncio
+    async def test_legacy_block_links_accepted(self, thread_trail):
+        # Older trails linked the first entry of a block to the previous block hash
+        for b in range(3):
+            await thread_trail.log_event("job_run", user_id=f"user_{b}")
+            await thread_trail._flush_pending_entries()
+            index = thread_trail.block_indexes[f"block_{b:06d}"]
+            thread_trail.chain_hash = index.block_hash
+
+        summary = await thread_trail._verify_full_chain()
+
+        assert summary["valid"], summary["issues"]
+
+    @pytest.mark.asyncio
+    async def test_blocks_verified_in_numeric_order(self, thread_trail, tmp_path):
+        await self._write_blocks(thread_trail, 2)
+        # Block ids outgrow the zero padding after a million blocks
+        for old, new in [("block_000000", "block_999999"), ("block_000001", "block_1000000")]:
+            index = json.loads((tmp_path / f"{old}.idx").read_text())
+            index["block_id"] = new
+            (tmp_path / f"{new}.idx").write_text(json.dumps(index))
+            (tmp_path / f"{old}.audit").rename(tmp_path / f"{new}.audit")
+            (tmp_path / f"{old}.idx").unlink()
+
+        verifier = thread_trail._create_chain_verifier()
+
+        assert [index["block_id"] for index in verifier.load_indexes()] == [
+            "block_999999",
+            "block_1000000",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_stopping_early_shuts_down_pool(self, thread_trail):
+        await self._write_blocks(thread_trail, 4)
+        verifier = thread_trail._create_chain_verifier()
+
+        events = verifier.iter_verify(incremental=False)
+        first = await events.__anext__()
+        await events.aclose()
+
+        assert first["event"] == "progress"
+
+    @pytest.mark.asyncio
+    async def test_process_pool_verification(self, tmp_path):
+        trail = EncryptedAuditTrail(
+            EncryptedAuditConfig(audit_log_directory=str(tmp_path), verification_workers=2)
+        )
+        await self._write_blocks(trail, 4)
+
+        summary = await trail._verify_full_chain()
+
+        assert summary["valid"]
+        assert summary["entries_verified"] == 12
+
+    @pytest.mark.asyncio
+    async def test_offline_cli(self, thread_trail, tmp_path, capsys):
+        await self._write_blocks(thread_trail, 2)
+        key_file = tmp_path / "keys.json"
+        key_file.write_text(json.dumps(thread_trail.key_manager.export_key_material()))
+
+        exit_code = await asyncio.to_thread(
+            audit_chain_verifier.main,
+            ["--directory", str(tmp_path), "--key-file", str(key_file), "--workers", "1"],
+        )
+
+        assert exit_code == 0
+        out = capsys.readouterr().out
+        summary = json.loads(out[out.index("{\n") :])
+        assert summary["blocks_verified"] == 2
@@ -0,0 +1,326 @@
+"""
+Unit tests for incremental startup reindexing with the ingestion manifest.
+
+Tests verify:
+- A restart with an unchanged corpus ingests nothing.
+- New and modified files are ingested, replacing the old chunks.
+- A failed re-read keeps the chunks and manifest entry of the old version.
+- A reader failing partway has the chunks it already produced rolled back.
+- A truncated document is not recorded as ingested.
+- Files touched without content changes are not re-ingested.
+- Chunks of files deleted while the service was down are retracted.
+- Removing a file deletes its chunk nodes from the graph, in batches.
+- The manifest survives a restart, tolerates corruption and batches saves.
+"""
+
+import asyncio
+import itertools
+import os
+import zipfile
+
+import docx
+import pytest
+
+from resync.core import file_ingestor as file_ingestor_module
+from resync.core.exceptions import FileProcessingError, KnowledgeGraphError
+from resync.core.file_ingestor import (
+    FileIngestor,
+    IngestionManifest,
+    load_existing_rag_documents,
+)
+from resync.core.knowledge_graph import AsyncKnowledgeGraph
+
+
+class FakeKnowledgeGraph:
+    """
+    Stores nodes per label, like the Neo4j graph, with sequential ids.
+
+    ``add_content`` creates ``:Content`` nodes; ``delete_memory`` only
+    matches ``:Conversation`` nodes, as its Cypher query does.
+    """
+
+    def __init__(self):
+        self.chunks = {}
+        self.conversations = {}
+        self.delete_batches = []
+        self._ids = itertools.count(1)
+
+    async def add_content(self, content, metadata):
+        chunk_id = str(next(self._ids))
+        self.chunks[chunk_id] = (metadata["source_file"], content)
+        return chunk_id
+
+    async def delete_memory(self, memory_id):
+        self.conversations.pop(memory_id, None)
+
+    async def delete_content(self, content_ids):
+        self.delete_batches.append(list(content_ids))
+        return sum(self.chunks.pop(i, None) is not None for i in content_ids)
+
+    def sources(self):
+        return sorted(source for source, _ in self.chunks.values())
+
+
+@pytest.fixture
+def knowledge_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "kb"
+    directory.mkdir()
+    settings = file_ingestor_module.settings
+    monkeypatch.setattr(settings, "BASE_DIR", tmp_path, raising=False)
+    monkeypatch.setattr(settings, "KNOWLEDGE_BASE_DIRS", [directory], raising=False)
+    monkeypatch.setattr(settings, "PROTECTED_DIRECTORIES", [], raising=False)
+    return directory
+
+
+@pytest.fixture
+def graph():
+    return FakeKnowledgeGraph()
+
+
+def make_ingestor(graph, tmp_path):
+    return FileIngestor(graph, manifest_path=tmp_path / "manifest.json")
+
+
+class TestIncrementalReindex:
+    """Tests for skipping unchanged files on startup."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_corpus_not_reingested(self, knowledge_dir, graph, tmp_path):
+        for i in range(20):
+            (knowledge_dir / f"doc{i}.txt").write_text(f"document {i}")
+
+        assert await load_existing_rag_documents(make_ingestor(graph, tmp_path)) == 20
+        assert len(graph.chunks) == 20
+
+        # Restart: a fresh ingestor reloads the manifest from disk
+        restarted = make_ingestor(graph, tmp_path)
+        assert await load_existing_rag_documents(restarted) == 0
+        assert len(graph.chunks) == 20
+
+    @pytest.mark.asyncio
+    async def test_modified_file_replaces_chunks(self, knowledge_dir, graph, tmp_path):
+        path = knowledge_dir / "doc.txt"
+        path.write_text("version one")
+        await load_existing_rag_documents(make_ingestor(graph, tmp_path))
+
+        path.write_text("version two, which is longer")
+        assert await load_existing_rag_documents(make_ingestor(graph, tmp_path)) == 1
+
+        assert list(graph.chunks.values()) == [("doc.txt", "version two, which is longer")]
+
+    @pytest.mark.asyncio
+    async def test_failed_reread_keeps_old_chunks(
+        self, knowledge_dir, graph, tmp_path, monkeypatch
+    ):
+        path = knowledge_dir / "doc.txt"
+        path.write_text("version one")
+        ingestor = make_ingestor(graph, tmp_path)
+        await load_existing_rag_documents(ingestor)
+        entry = ingestor.manifest.get(path)
+
+        path.write_text("version two")
+        monkeypatch.setitem(ingestor.file_readers, ".txt", lambda _: "")
+
+        assert await ingestor.ingest_file(path) is False
+        assert list(graph.chunks.values()) == [("doc.txt", "version one")]
+        assert ingestor.manifest.get(path) is entry
+
+    @pytest.mark.asyncio
+    async def test_touched_file_not_reingested(self, knowledge_dir, graph, tmp_path):
+        path = knowledge_dir / "doc.txt"
+        path.write_text("same content")
+        await load_existing_rag_documents(make_ingestor(graph, tmp_path))
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        ingestor = make_ingestor(graph, tmp_path)
+
+        assert await load_existing_rag_documents(ingestor) == 0
+        assert ingestor.manifest.is_unchanged(path, path.stat())
+
+    @pytest.mark.asyncio
+    async def test_deleted_file_retracted(self, knowledge_dir, graph, tmp_path):
+        (knowledge_dir / "keep.txt").write_text("keep me")
+        (knowledge_dir / "gone.txt").write_text("delete me")
+        await load_existing_rag_documents(make_ingestor(graph, tmp_path))
+
+        (knowledge_dir / "gone.txt").unlink()
+        ingestor = make_ingestor(graph, tmp_path)
+        await load_existing_rag_documents(ingestor)
+
+        assert graph.sources() == ["keep.txt"]
+        assert len(ingestor.manifest.entries) == 1
+
+
+def failing_reader(file_path):
+    """Streams a few segments, then fails like a corrupt PDF page would."""
+    for i in range(3):
+        yield f"Page {i}. " + "word " * 600
+    raise FileProcessingError(f"Failed to process PDF {file_path}")
+
+
+def write_docx(path, paragraphs):
+    document = docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    document.save(path)
+
+
+def truncate_docx_body(path):
+    """Cuts ``word/document.xml`` short, keeping the package itself readable."""
+    with zipfile.ZipFile(path) as package:
+        members = {name: package.read(name) for name in package.namelist()}
+    body = members["word/document.xml"]
+    members["word/document.xml"] = body[: len(body) * 2 // 3]
+    with zipfile.ZipFile(path, "w") as package:
+        for name, data in members.items():
+            package.writestr(name, data)
+
+
+class TestReaderFailure:
+    """Tests for readers failing after chunks were already added."""
+
+    @pytest.mark.asyncio
+    async def test_truncated_docx_not_recorded(self, knowledge_dir, graph, tmp_path):
+        path = knowledge_dir / "runbook.docx"
+        write_docx(path, ["version one"])
+        ingestor = make_ingestor(graph, tmp_path)
+        await ingestor.ingest_file(path)
+        entry = ingestor.manifest.get(path)
+
+        write_docx(path, [f"Step {i}. " + "word " * 40 for i in range(2000)])
+        truncate_docx_body(path)
+        with pytest.raises(FileProcessingError):
+            await ingestor.ingest_file(path)
+
+        assert list(graph.chunks.values()) == [("runbook.docx", "version one")]
+        assert ingestor.manifest.get(path) is entry
+
+    @pytest.mark.asyncio
+    async def test_partial_chunks_rolled_back(self, knowledge_dir, graph, tmp_path, monkeypatch):
+        path = knowledge_dir / "doc.pdf"
+        path.write_bytes(b"first version")
+        ingestor = make_ingestor(graph, tmp_path)
+        monkeypatch.setitem(ingestor.segment_readers, ".pdf", lambda _: iter(["version one"]))
+        await ingestor.ingest_file(path)
+        entry = ingestor.manifest.get(path)
+
+        path.write_bytes(b"second version")
+        monkeypatch.setitem(ingestor.segment_readers, ".pdf", failing_reader)
+        with pytest.raises(FileProcessingError):
+            await ingestor.ingest_file(path)
+
+        assert list(graph.chunks.values()) == [("doc.pdf", "version one")]
+        assert ingestor.manifest.get(path) is entry
+
+    @pytest.mark.asyncio
+    async def test_undeletable_chunks_recorded(self, knowledge_dir, graph, tmp_path, monkeypatch):
+        path = knowledge_dir / "doc.pdf"
+        path.write_bytes(b"content")
+        ingestor = make_ingestor(graph, tmp_path)
+        monkeypatch.setitem(ingestor.segment_readers, ".pdf", failing_reader)
+
+        async def unavailable(content_ids):
+            raise KnowledgeGraphError("Failed to delete content.")
+
+        monkeypatch.setattr(graph, "delete_content", unavailable)
+        with pytest.raises(FileProcessingError):
+            await ingestor.ingest_file(path)
+
+        # Orphans are tracked, and the file is not taken as already ingested
+        entry = ingestor.manifest.get(path)
+        assert sorted(entry.chunk_ids) == sorted(graph.chunks)
+        assert not ingestor.manifest.is_unchanged(path, path.stat())
+
+
+class TestChunkRemoval:
+    """Tests for retracting the chunks ingested from a file."""
+
+    @pytest.mark.asyncio
+    async def test_remove_file_deletes_chunk_nodes(
+        self, knowledge_dir, graph, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(file_ingestor_module, "DELETE_BATCH_SIZE", 2)
+        path = knowledge_dir / "long.txt"
+        path.write_text("\n\n".join(f"Paragraph {i}. " + "word " * 300 for i in range(5)))
+        (knowledge_dir / "other.txt").write_text("unrelated")
+        ingestor = make_ingestor(graph, tmp_path)
+        await load_existing_rag_documents(ingestor)
+        chunk_count = len(ingestor.manifest.get(path).chunk_ids)
+        assert chunk_count > 2
+
+        assert await ingestor.remove_file(path) == chunk_count
+
+        assert graph.sources() == ["other.txt"]
+        assert ingestor.manifest.get(path) is None
+        assert max(map(len, graph.delete_batches)) == 2
+
+    @pytest.mark.asyncio
+    async def test_delete_content_matches_content_nodes(self):
+        class Result:
+            async def single(self):
+                return {"deleted": 2}
+
+        class Session:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def run(self, query, params):
+                queries.append((query, params))
+                return Result()
+
+        queries = []
+        kg = object.__new__(AsyncKnowledgeGraph)
+        kg.driver = type("Driver", (), {"session": lambda self: Session()})()
+
+        assert await kg.delete_content(["4", "7"]) == 2
+        assert await kg.delete_content([]) == 0
+
+        [(query, params)] = queries
+        assert "UNWIND $content_ids" in query
+        assert "(n:Content)" in query
+        assert params == {"content_ids": [4, 7]}
+
+
+class TestIngestionManifest:
+    """Tests for manifest persistence."""
+
+    def test_corrupt_manifest_starts_empty(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        path.write_text("{not json")
+
+        assert IngestionManifest(path).entries == {}
+
+    @pytest.mark.asyncio
+    async def test_deferred_save_writes_once(self, knowledge_dir, graph, tmp_path, monkeypatch):
+        for i in range(5):
+            (knowledge_dir / f"doc{i}.txt").write_text(f"document {i}")
+        ingestor = make_ingestor(graph, tmp_path)
+        writes = []
+        original = ingestor.manifest._write
+        monkeypatch.setattr(
+            ingestor.manifest, "_write", lambda entries: writes.append(entries) or original(entries)
+        )
+
+        await load_existing_rag_documents(ingestor)
+
+        assert len(writes) == 1
+        assert len(IngestionManifest(tmp_path / "manifest.json").entries) == 5
+
+    @pytest.mark.asyncio
+    async def test_updates_saved_once_after_delay(self, knowledge_dir, graph, tmp_path):
+        ingestor = make_ingestor(graph, tmp_path)
+        ingestor.manifest.save_delay = 0.05
+        for i in range(5):
+            path = knowledge_dir / f"doc{i}.txt"
+            path.write_text(f"document {i}")
+            await ingestor.ingest_file(path)
+        manifest_path = tmp_path / "manifest.json"
+        assert not manifest_path.exists()
+
+        await asyncio.sleep(0.1)
+
+        assert len(IngestionManifest(manifest_path).entries) == 5
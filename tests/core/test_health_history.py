@@ -0,0 +1,112 @@
+"""
+Tests for the columnar health history store.
+
+Tests verify:
+- Samples in the same bucket merge to the worst status and mean latency
+- Every tier is bounded by its capacity
+- Queries pick the finest tier that covers the requested range
+- Components missing from a bucket are reported as None
+- Age-based dropping removes the oldest buckets
+- Memory does not grow with the number of samples
+"""
+
+from datetime import datetime, timedelta
+
+from resync.core.health_history import STATUS_CODES, HealthHistoryStore
+from resync.core.health_models import ComponentHealth, ComponentType, HealthStatus
+
+T0 = datetime(2026, 1, 1)
+
+
+def component(status=HealthStatus.HEALTHY, latency=None):
+    return ComponentHealth(
+        name="c",
+        component_type=ComponentType.OTHER,
+        status=status,
+        response_time_ms=latency,
+    )
+
+
+class TestDownsampling:
+    """Samples fold into each resolution tier."""
+
+    def test_bucket_keeps_worst_status_and_mean_latency(self):
+        store = HealthHistoryStore(((60, 10),))
+        store.record(T0, HealthStatus.HEALTHY, {"db": component(latency=10.0)})
+        store.record(
+            T0 + timedelta(seconds=30),
+            HealthStatus.DEGRADED,
+            {"db": component(HealthStatus.UNHEALTHY, 20.0)},
+        )
+
+        series = store.query()
+
+        assert series["timestamps"] == [T0.timestamp()]
+        assert series["overall_status"] == [STATUS_CODES[HealthStatus.DEGRADED]]
+        assert series["components"]["db"]["status"] == [
+            STATUS_CODES[HealthStatus.UNHEALTHY]
+        ]
+        assert series["components"]["db"]["latency_ms"] == [15.0]
+
+    def test_tiers_are_bounded(self):
+        store = HealthHistoryStore(((1, 100), (60, 10)))
+        for i in range(1000):
+            store.record(T0 + timedelta(seconds=i), HealthStatus.HEALTHY, {})
+
+        assert [len(tier) for tier in store.tiers] == [100, 10]
+        assert len(store) == 100
+
+    def test_query_uses_finest_covering_tier(self):
+        store = HealthHistoryStore(((1, 120), (60, 60), (3600, 24)))
+        for i in range(0, 3 * 3600, 10):
+            store.record(T0 + timedelta(seconds=i), HealthStatus.HEALTHY, {})
+        end = T0 + timedelta(hours=3)
+
+        recent = store.query(start=end - timedelta(seconds=60))
+        hour = store.query(start=end - timedelta(minutes=50))
+        day = store.query(start=end - timedelta(hours=3))
+
+        assert recent["resolution_seconds"] == 1
+        assert hour["resolution_seconds"] == 60
+        assert len(hour["timestamps"]) == 50
+        assert day["resolution_seconds"] == 3600
+        assert store.query(resolution=60)["resolution_seconds"] == 60
+
+    def test_missing_component_is_none(self):
+        store = HealthHistoryStore(((1, 10),))
+        store.record(T0, HealthStatus.HEALTHY, {"db": component(latency=1.0)})
+        store.record(
+            T0 + timedelta(seconds=1), HealthStatus.HEALTHY, {"redis": component()}
+        )
+
+        series = store.query(components=["db", "redis", "cpu"])
+
+        assert series["components"]["db"]["status"] == [0, None]
+        assert series["components"]["redis"]["status"] == [None, 0]
+        assert series["components"]["redis"]["latency_ms"] == [None, None]
+        assert series["components"]["cpu"]["status"] == [None, None]
+
+
+class TestRetention:
+    """History stays within fixed bounds."""
+
+    def test_drop_before(self):
+        store = HealthHistoryStore(((1, 100),))
+        for i in range(10):
+            store.record(T0 + timedelta(seconds=i), HealthStatus.HEALTHY, {})
+
+        dropped = store.drop_before(T0 + timedelta(seconds=4))
+
+        assert dropped == 4
+        assert store.query()["timestamps"][0] == (T0 + timedelta(seconds=4)).timestamp()
+
+    def test_memory_is_flat(self):
+        store = HealthHistoryStore(((1, 50), (60, 50), (3600, 50)))
+        components = {"db": component(latency=1.0), "redis": component(latency=2.0)}
+        store.record(T0, HealthStatus.HEALTHY, components)
+        allocated = store.memory_bytes()
+
+        for i in range(1, 20000):
+            store.record(T0 + timedelta(seconds=i * 5), HealthStatus.HEALTHY, components)
+
+        assert store.memory_bytes() == allocated
@@ -0,0 +1,175 @@
+"""
+Tests for per-component deadlines and cached results in HealthCheckService.
+
+Tests verify:
+- A slow component times out on its own deadline without failing the others
+- A failing component is reported individually
+- Cached reads return the latest snapshot without running probes
+- Background refresh only re-probes components that are due
+- Concurrent cold-start callers share a single full check
+- Recovery updates the cached snapshot
+- The file system probe does not create temp files
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from resync.core.health_models import (
+    ComponentHealth,
+    ComponentType,
+    HealthCheckConfig,
+    HealthStatus,
+)
+from resync.core.health_service import HealthCheckService
+from resync.core.health_utils import get_health_check_functions
+
+
+class FakeCheck:
+    """Stands in for a component check, counting calls."""
+
+    def __init__(self, name, delay=0.0, error=None, status=HealthStatus.HEALTHY):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.status = status
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return ComponentHealth(
+            name=self.name,
+            component_type=ComponentType.OTHER,
+            status=self.status,
+            last_check=datetime.now(),
+        )
+
+
+def make_service(config=None, **overrides):
+    service = HealthCheckService(config or HealthCheckConfig(alert_enabled=False))
+    fakes = {}
+    for name, check in get_health_check_functions(service).items():
+        fake = overrides.get(name) or FakeCheck(name)
+        fakes[name] = fake
+        setattr(service, check.__name__, fake)
+
+    async def no_metrics():
+        return {}
+
+    service._get_performance_metrics = no_metrics
+    service._get_connection_pool_stats = no_metrics
+    return service, fakes
+
+
+class TestComponentDeadlines:
+    """Each component is bounded by its own deadline."""
+
+    @pytest.mark.asyncio
+    async def test_slow_component_times_out_alone(self):
+        config = HealthCheckConfig(
+            alert_enabled=False, component_timeouts={"redis": 0.05}
+        )
+        service, _ = make_service(config, redis=FakeCheck("redis", delay=10))
+
+        started = asyncio.get_running_loop().time()
+        result = await service.perform_comprehensive_health_check()
+        elapsed = asyncio.get_running_loop().time() - started
+
+        assert elapsed < 1.0
+        assert result.components["redis"].status == HealthStatus.UNHEALTHY
+        assert "timeout" in result.components["redis"].message.lower()
+        others = [c for n, c in result.components.items() if n != "redis"]
+        assert all(c.status == HealthStatus.HEALTHY for c in others)
+
+    @pytest.mark.asyncio
+    async def test_failing_component_reported_individually(self):
+        service, _ = make_service(
+            database=FakeCheck("database", error=RuntimeError("connection refused"))
+        )
+
+        result = await service.perform_comprehensive_health_check()
+
+        assert result.components["database"].status == HealthStatus.UNKNOWN
+        assert "connection refused" in result.components["database"].message
+        assert result.components["memory"].status == HealthStatus.HEALTHY
+
+
+class TestCachedResults:
+    """Reads are served from the per-component cache."""
+
+    @pytest.mark.asyncio
+    async def test_cached_read_does_not_probe(self):
+        config = HealthCheckConfig(
+            alert_enabled=False,
+            check_interval_seconds=3600,
+            component_refresh_intervals={},
+        )
+        service, fakes = make_service(config)
+
+        first = await service.get_cached_health_check()
+        second = await service.get_cached_health_check()
+
+        assert second is first
+        assert all(fake.calls == 1 for fake in fakes.values())
+
+    @pytest.mark.asyncio
+    async def test_refresh_only_probes_due_components(self):
+        config = HealthCheckConfig(
+            alert_enabled=False,
+            check_interval_seconds=3600,
+            component_refresh_intervals={"memory": 0},
+        )
+        service, fakes = make_service(config)
+        await service.perform_comprehensive_health_check()
+        fakes["memory"].status = HealthStatus.DEGRADED
+
+        result = await service.refresh_due_components()
+
+        assert fakes["memory"].calls == 2
+        assert fakes["database"].calls == 1
+        assert result.components["memory"].status == HealthStatus.DEGRADED
+        assert (await service.get_cached_health_check()) is result
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_reads_share_one_check(self):
+        service, fakes = make_service(cpu=FakeCheck("cpu", delay=0.05))
+
+        results = await asyncio.gather(
+            *(service.get_cached_health_check() for _ in range(10))
+        )
+
+        assert all(result is results[0] for result in results)
+        assert fakes["cpu"].calls == 1
+
+    @pytest.mark.asyncio
+    async def test_recovery_updates_cached_snapshot(self):
+        service, fakes = make_service(
+            redis=FakeCheck("redis", status=HealthStatus.UNHEALTHY)
+        )
+        await service.perform_comprehensive_health_check()
+        fakes["redis"].status = HealthStatus.HEALTHY
+
+        assert await service.attempt_recovery("redis") is True
+        cached = await service.get_cached_health_check()
+        assert cached.components["redis"].status == HealthStatus.HEALTHY
+        assert await service.attempt_recovery("unknown") is False
+
+
+class TestFileSystemProbe:
+    """The file system check is read-only."""
+
+    @pytest.mark.asyncio
+    async def test_does_not_create_temp_files(self, tmp_path, monkeypatch):
+        import tempfile
+
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+        service = HealthCheckService(HealthCheckConfig())
+
+        health = await service._check_file_system_health()
+
+        assert health.metadata["write_test"] == "Temp directory writable"
+        assert list(tmp_path.iterdir()) == []
@@ -58,26 +58,14 @@ class TestHealthServiceMemoryBounds:
     @pytest.mark.asyncio
     async def test_cleanup_by_age(self, service):
         """Test cleanup based on age retention."""
-        from resync.core.health_models import HealthStatusHistory
-
         # Add old entries
         old_time = datetime.now() - timedelta(days=2)  # Beyond 1 day retention
         for i in range(10):
-            service.health_history.append(
-                HealthStatusHistory(
-                    timestamp=old_time - timedelta(hours=i),
-                    overall_status=HealthStatus.HEALTHY,
-                )
-            )
+            self._record(service, old_time - timedelta(hours=10 - i))
 
         # Add recent entries
         for i in range(5):
-            service.health_history.append(
-                HealthStatusHistory(
-                    timestamp=datetime.now() - timedelta(minutes=i),
-                    overall_status=HealthStatus.HEALTHY,
-                )
-            )
+            self._record(service, datetime.now() - timedelta(minutes=5 - i))
 
         # Force cleanup
         cleanup_result = await service.force_cleanup()
@@ -86,7 +74,7 @@ class TestHealthServiceMemoryBounds:
         assert cleanup_result["cleaned_entries"] >= 10
         assert all(
             entry.timestamp >= datetime.now() - timedelta(days=1)
-            for entry in service.health_history
+            for entry in service.get_health_history(hours=72)
         )
 
     @pytest.mark.asyncio
@@ -111,16 +99,9 @@ class TestHealthServiceMemoryBounds:
 
     def test_get_health_history_with_limits(self, service):
         """Test getting health history with entry limits."""
-        from resync.core.health_models import HealthStatusHistory
-
         # Add test entries
         for i in range(30):
-            service.health_history.append(
-                HealthStatusHistory(
-                    timestamp=datetime.now() - timedelta(hours=i),
-                    overall_status=HealthStatus.HEALTHY,
-                )
-            )
+            self._record(service, datetime.now() - timedelta(hours=30 - i))
 
         # Test with limit
         limited_history = service.get_health_history(hours=12, max_entries=5)
@@ -133,16 +114,9 @@ class TestHealthServiceMemoryBounds:
     @pytest.mark.asyncio
     async def test_force_cleanup(self, service):
         """Test force cleanup functionality."""
-        from resync.core.health_models import HealthStatusHistory
-
-        # Add many entries
+        # Add many entries; the ring buffer keeps max_history_entries
         for i in range(100):
-            service.health_history.append(
-                HealthStatusHistory(
-                    timestamp=datetime.now() - timedelta(minutes=i),
-                    overall_status=HealthStatus.HEALTHY,
-                )
-            )
+            self._record(service, datetime.now() - timedelta(minutes=100 - i))
 
         # Force cleanup
         cleanup_result = await service.force_cleanup()
@@ -150,7 +124,7 @@ class TestHealthServiceMemoryBounds:
         assert "original_entries" in cleanup_result
         assert "cleaned_entries" in cleanup_result
         assert "current_entries" in cleanup_result
-        assert cleanup_result["original_entries"] == 100
+        assert cleanup_result["original_entries"] == 50
         assert cleanup_result["current_entries"] <= 50
 
     def test_memory_bounds_configuration_from_settings(self):
@@ -208,16 +182,9 @@ class TestHealthServiceMemoryBounds:
 
     def test_minimum_history_retention(self, service):
         """Test that minimum history is retained."""
-        from resync.core.health_models import HealthStatusHistory
-
         # Add just a few entries
         for i in range(5):
-            service.health_history.append(
-                HealthStatusHistory(
-                    timestamp=datetime.now() - timedelta(minutes=i),
-                    overall_status=HealthStatus.HEALTHY,
-                )
-            )
+            self._record(service, datetime.now() - timedelta(minutes=5 - i))
 
         # Force cleanup
         asyncio.run(service.force_cleanup())
@@ -225,6 +192,10 @@ class TestHealthServiceMemoryBounds:
         # Should retain all entries since below minimum
         assert len(service.health_history) >= 5
 
+    def _record(self, service, timestamp, status=HealthStatus.HEALTHY):
+        """Helper to record a history sample."""
+        service.health_history.record(timestamp, status, {})
+
     def _create_history_entry(self, result):
         """Helper to create history entry."""
         from resync.core.health_models import HealthStatusHistory
@@ -0,0 +1,203 @@
+"""
+Unit tests for the RAG directory watcher ingestion queue.
+
+Tests verify:
+- Ingestion concurrency is capped by the worker pool.
+- Repeated events for a path are coalesced into one ingestion.
+- Unchanged and duplicate content is skipped by content hash.
+- Skipped duplicates are ingested once their owner is removed or changed.
+- Modified files are re-indexed and deleted files are removed.
+- Files still being written are ingested only once they settle.
+- The queue is bounded and applies backpressure.
+"""
+
+import asyncio
+
+import pytest
+
+from resync.core.rag_watcher import RAGDirectoryWatcher
+
+
+class FakeIngestor:
+    """Records ingestion calls and tracks peak concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.ingested = []
+        self.removed = []
+        self.running = 0
+        self.peak = 0
+
+    async def save_uploaded_file(self, file_name, file_content):
+        raise NotImplementedError
+
+    async def ingest_file(self, file_path):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            self.ingested.append((file_path.name, file_path.read_bytes()))
+            return True
+        finally:
+            self.running -= 1
+
+    async def remove_file(self, file_path):
+        self.removed.append(file_path.name)
+        return 1
+
+
+def make_watcher(tmp_path, ingestor, **kwargs):
+    kwargs.setdefault("workers", 2)
+    kwargs.setdefault("settle_seconds", 0.0)
+    return RAGDirectoryWatcher(ingestor, directory=tmp_path, **kwargs)
+
+
+async def process(watcher, *paths, action="upsert"):
+    for path in paths:
+        await watcher.schedule(path, action)
+    await watcher.join()
+
+
+@pytest.fixture
+def files(tmp_path):
+    def write(name, content):
+        path = tmp_path / name
+        path.write_text(content)
+        return path
+
+    return write
+
+
+class TestIngestionQueue:
+    """Tests for bounded, coalesced ingestion."""
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_caps_concurrency(self, tmp_path, files):
+        ingestor = FakeIngestor(delay=0.01)
+        watcher = make_watcher(tmp_path, ingestor, workers=3)
+        watcher.start_workers()
+
+        paths = [files(f"doc{i}.txt", f"content {i}") for i in range(30)]
+        await process(watcher, *paths)
+        await watcher.stop_workers()
+
+        assert len(ingestor.ingested) == 30
+        assert ingestor.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_repeated_events_coalesced(self, tmp_path, files):
+        ingestor = FakeIngestor()
+        watcher = make_watcher(tmp_path, ingestor)
+        path = files("doc.txt", "hello")
+
+        for _ in range(5):
+            await watcher.schedule(path)
+        assert watcher.queue.qsize() == 1
+
+        watcher.start_workers()
+        await watcher.join()
+        await watcher.stop_workers()
+
+        assert ingestor.ingested == [("doc.txt", b"hello")]
+
+    @pytest.mark.asyncio
+    async def test_queue_is_bounded(self, tmp_path, files):
+        watcher = make_watcher(tmp_path, FakeIngestor(), max_queue_size=2)
+        await watcher.schedule(files("a.txt", "a"))
+        await watcher.schedule(files("b.txt", "b"))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(watcher.schedule(files("c.txt", "c")), 0.05)
+        assert watcher.get_stats()["queued"] == 2
+
+
+class TestContentTracking:
+    """Tests for hash dedup, re-indexing and removal."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_and_duplicate_content_skipped(self, tmp_path, files):
+        ingestor = FakeIngestor()
+        watcher = make_watcher(tmp_path, ingestor)
+        watcher.start_workers()
+
+        original = files("a.txt", "same")
+        await process(watcher, original)
+        await process(watcher, original)  # touched, content unchanged
+        await process(watcher, files("copy.txt", "same"))
+        await watcher.stop_workers()
+
+        assert ingestor.ingested == [("a.txt", b"same")]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_ingested_after_owner_removed(self, tmp_path, files):
+        ingestor = FakeIngestor()
+        watcher = make_watcher(tmp_path, ingestor)
+        watcher.start_workers()
+
+        original = files("a.txt", "same")
+        await process(watcher, original)
+        await process(watcher, files("copy.txt", "same"))
+        original.unlink()
+        await process(watcher, original, action="delete")
+        await watcher.stop_workers()
+
+        assert ingestor.ingested == [("a.txt", b"same"), ("copy.txt", b"same")]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_ingested_after_owner_changed(self, tmp_path, files):
+        ingestor = FakeIngestor()
+        watcher = make_watcher(tmp_path, ingestor)
+        watcher.start_workers()
+
+        original = files("a.txt", "same")
+        await process(watcher, original)
+        await process(watcher, files("copy.txt", "same"))
+        original.write_text("different")
+        await process(watcher, original)
+        await watcher.stop_workers()
+
+        assert ingestor.ingested == [
+            ("a.txt", b"same"),
+            ("a.txt", b"different"),
+            ("copy.txt", b"same"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_modified_reindexed_and_deleted_removed(self, tmp_path, files):
+        ingestor = FakeIngestor()
+        watcher = make_watcher(tmp_path, ingestor)
+        watcher.start_workers()
+
+        path = files("doc.txt", "v1")
+        await process(watcher, path)
+        path.write_text("v2")
+        await process(watcher, path)
+        path.unlink()
+        await process(watcher, path, action="delete")
+        await watcher.stop_workers()
+
+        assert ingestor.ingested == [("doc.txt", b"v1"), ("doc.txt", b"v2")]
+        assert ingestor.removed == ["doc.txt"]
+        assert watcher.get_stats()["tracked_files"] == 0
+
+    @pytest.mark.asyncio
+    async def test_partial_file_waits_to_settle(self, tmp_path):
+        ingestor = FakeIngestor()
+        watcher = make_watcher(tmp_path, ingestor, settle_seconds=0.05)
+        watcher.start_workers()
+        path = tmp_path / "big.txt"
+
+        async def slow_copy():
+            with open(path, "wb") as f:
+                for _ in range(5):
+                    f.write(b"x" * 100)
+                    f.flush()
+                    await asyncio.sleep(0.03)
+
+        copy = asyncio.create_task(slow_copy())
+        await asyncio.sleep(0.01)
+        await process(watcher, path)
+        await copy
+        await watcher.stop_workers()
+
+        assert ingestor.ingested == [("big.txt", b"x" * 500)]
@@ -0,0 +1,182 @@
+"""
+Tests for budgeted retries, deadlines and hedging.
+
+Tests verify:
+- The retry budget caps retries at a fraction of logical calls
+- Transient failures are retried and counted per logical call
+- Retries stop when the budget is spent
+- Deadlines bound attempts and nest by shortening only
+- API queries run under the dispatcher's request deadline
+- Slow idempotent calls are hedged and the first response wins
+- Non-idempotent calls are never hedged
+"""
+
+import asyncio
+
+import pytest
+
+from resync.core.metrics import MetricCounter, MetricHistogram
+from resync.core.retry_budget import (
+    BudgetedRetry,
+    DeadlineExceededError,
+    RetryBudget,
+    deadline,
+    remaining_time,
+)
+from resync.cqrs.dispatcher import CQRSDispatcher
+from resync.cqrs.queries import GetSystemStatusQuery
+
+
+class FlakyOp:
+    """Fails the first ``failures`` attempts, optionally sleeping per attempt."""
+
+    def __init__(self, failures=0, delays=None):
+        self.failures = failures
+        self.delays = list(delays or [])
+        self.calls = 0
+        self.timeouts = []
+
+    async def __call__(self, timeout):
+        self.calls += 1
+        self.timeouts.append(timeout)
+        if self.delays:
+            await asyncio.sleep(self.delays.pop(0))
+        if self.calls <= self.failures:
+            raise ConnectionError("boom")
+        return self.calls
+
+
+def make_retry(budget=None, **kwargs):
+    kwargs.setdefault("base_delay", 0.0)
+    return BudgetedRetry(
+        "test",
+        budget=budget or RetryBudget(min_retries_per_second=0),
+        attempts_histogram=MetricHistogram(boundaries=[1, 2, 3]),
+        retries_counter=MetricCounter(),
+        hedges_counter=MetricCounter(),
+        budget_exhausted_counter=MetricCounter(),
+        **kwargs,
+    )
+
+
+class TestRetryBudget:
+    """Token bucket accounting."""
+
+    def test_retries_limited_to_ratio(self):
+        budget = RetryBudget(ratio=0.1, min_retries_per_second=0, max_tokens=1)
+        budget._tokens = 0
+
+        granted = 0
+        for _ in range(1000):
+            budget.record_request()
+            granted += budget.try_acquire()
+
+        assert granted <= 100
+        assert budget.get_stats()["retry_ratio"] <= 0.1
+
+
+class TestBudgetedRetry:
+    """Retry loop behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_failure(self):
+        retry = make_retry()
+        op = FlakyOp(failures=2)
+
+        assert await retry.call(op) == 3
+        assert retry._retries_counter.value == 2
+        assert retry._attempts_histogram._sum == 3
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        retry = make_retry(max_retries=1)
+        op = FlakyOp(failures=5)
+
+        with pytest.raises(ConnectionError):
+            await retry.call(op)
+        assert op.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_stops_when_budget_spent(self):
+        budget = RetryBudget(ratio=0, min_retries_per_second=0, max_tokens=1)
+        retry = make_retry(budget=budget, max_retries=5)
+
+        with pytest.raises(ConnectionError):
+            await retry.call(FlakyOp(failures=10))
+        op = FlakyOp(failures=10)
+        with pytest.raises(ConnectionError):
+            await retry.call(op)
+
+        assert op.calls == 1  # The single token went to the first call
+        assert retry._budget_exhausted_counter.value == 2
+
+
+class TestDeadlines:
+    """Deadlines propagate through the context."""
+
+    def test_nested_deadline_only_shortens(self):
+        with deadline(10):
+            with deadline(60):
+                assert remaining_time() <= 10
+            with deadline(1):
+                assert remaining_time() <= 1
+        assert remaining_time() is None
+
+    @pytest.mark.asyncio
+    async def test_attempt_timeout_capped_by_deadline(self):
+        retry = make_retry(attempt_timeout=30)
+        op = FlakyOp()
+
+        with deadline(2):
+            await retry.call(op)
+
+        assert op.timeouts[0] <= 2
+
+    @pytest.mark.asyncio
+    async def test_deadline_exceeded(self):
+        retry = make_retry(max_retries=10)
+        op = FlakyOp(delays=[1.0])
+
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceededError):
+                await retry.call(op)
+        assert op.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_dispatcher_sets_request_deadline(self):
+        class RecordingHandler:
+            async def execute(self, query):
+                return remaining_time()
+
+        dispatcher = CQRSDispatcher(request_deadline=5)
+        dispatcher.register_query_handler(GetSystemStatusQuery, RecordingHandler())
+
+        remaining = await dispatcher.execute_query(GetSystemStatusQuery())
+
+        assert 0 < remaining <= 5
+        assert remaining_time() is None
+
+
+class TestHedging:
+    """Idempotent calls are hedged when slow."""
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged(self):
+        retry = make_retry(hedge_after=0.02)
+        op = FlakyOp(delays=[1.0, 0.0])
+
+        started = asyncio.get_running_loop().time()
+        result = await retry.call(op, idempotent=True)
+
+        assert result == 2
+        assert asyncio.get_running_loop().time() - started < 0.5
+        assert retry._hedges_counter.value == 1
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_not_hedged(self):
+        retry = make_retry(hedge_after=0.01)
+        op = FlakyOp(delays=[0.05])
+
+        assert await retry.call(op) == 1
+        assert op.calls == 1
+        assert retry._hedges_counter.value == 0
@@ -0,0 +1,261 @@
+"""
+Unit tests for the SIEM delivery pipeline.
+
+Tests verify:
+- Each event is rendered once per format, however many connectors use it.
+- Dispatchers batch by size and by time.
+- A slow connector does not hold up delivery to the others.
+- Events that cannot be delivered are spooled and replayed in order.
+- Only the events a SIEM rejected from a batch are spooled.
+- The spool survives a restart and resumes from its committed offset.
+"""
+
+import asyncio
+
+import pytest
+
+from resync.core.siem_integrator import (
+    EventSpool,
+    SIEMConfiguration,
+    SIEMConnector,
+    SIEMEvent,
+    SIEMIntegrator,
+    SIEMStatus,
+    SIEMType,
+)
+
+
+class RecordingConnector(SIEMConnector):
+    """In-memory connector that records the batches it receives."""
+
+    def __init__(self, config, delay=0.0):
+        super().__init__(config)
+        self.delay = delay
+        self.batches = []
+        self.healthy = True
+        self.status = SIEMStatus.CONNECTED
+
+    async def connect(self):
+        self.status = SIEMStatus.CONNECTED
+        return True
+
+    async def disconnect(self):
+        self.status = SIEMStatus.DISCONNECTED
+
+    async def send_event(self, event):
+        return await self.send_events_batch([event]) == 1
+
+    async def send_events_batch(self, events):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if not self.healthy:
+            return 0
+        self.batches.append([self.encode_event(e) for e in events])
+        return len(events)
+
+    async def health_check(self):
+        return {"status": "ok"}
+
+    @property
+    def event_ids(self):
+        return [line for batch in self.batches for line in batch]
+
+
+class RejectingConnector(RecordingConnector):
+    """Connector that reports which events of a batch it rejected."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.rejected_ids = {f"evt-{i}" for i in range(1, 10, 2)}
+        self.delivered = []
+
+    async def send_events(self, events):
+        rejected = [e for e in events if e.event_id in self.rejected_ids]
+        self.delivered.extend(e.event_id for e in events if e not in rejected)
+        return rejected
+
+
+def make_config(name, batch_size=10, **kwargs):
+    kwargs.setdefault("retry_attempts", 1)
+    kwargs.setdefault("retry_delay_seconds", 0.0)
+    return SIEMConfiguration(
+        siem_type=SIEMType.CUSTOM,
+        name=name,
+        endpoint_url="http://localhost",
+        batch_size=batch_size,
+        **kwargs,
+    )
+
+
+def make_event(i):
+    return SIEMEvent(
+        event_id=f"evt-{i}",
+        timestamp=1000.0 + i,
+        source="test",
+        event_type="login",
+        severity="low",
+        category="authentication",
+        message=f"event {i}",
+    )
+
+
+def make_integrator(tmp_path=None, **config):
+    config.setdefault("flush_interval_seconds", 0.05)
+    if tmp_path is not None:
+        config["spool_directory"] = str(tmp_path / "spool")
+    return SIEMIntegrator(config)
+
+
+def attach(integrator, connector):
+    integrator.register_connector(connector.config.name, connector)
+    return integrator.dispatchers[connector.config.name]
+
+
+async def wait_until(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+class TestFormatting:
+    """Tests for format-once rendering."""
+
+    @pytest.mark.asyncio
+    async def test_event_rendered_once_per_format(self, monkeypatch):
+        calls = []
+        original = SIEMEvent.to_json
+
+        def counting_to_json(self):
+            calls.append(self.event_id)
+            return original(self)
+
+        monkeypatch.setattr(SIEMEvent, "to_json", counting_to_json)
+        integrator = make_integrator()
+        connectors = [RecordingConnector(make_config(f"c{i}")) for i in range(3)]
+        for connector in connectors:
+            attach(integrator, connector)
+
+        await integrator.start()
+        await integrator.send_custom_event(make_event(1))
+        await wait_until(lambda: all(c.batches for c in connectors))
+        await integrator.stop()
+
+        assert calls == ["evt-1"]
+
+    def test_record_round_trip(self):
+        event = make_event(1)
+        event.tags.add("priority")
+
+        restored = SIEMEvent.from_record(event.to_record())
+
+        assert restored == event
+        assert restored.to_json() == event.to_json()
+
+
+class TestDelivery:
+    """Tests for per-connector batching and concurrency."""
+
+    @pytest.mark.asyncio
+    async def test_batches_by_size_then_time(self):
+        integrator = make_integrator()
+        connector = RecordingConnector(make_config("splunk", batch_size=10))
+        attach(integrator, connector)
+
+        await integrator.start()
+        for i in range(25):
+            await integrator.send_custom_event(make_event(i))
+        await wait_until(lambda: sum(map(len, connector.batches)) == 25)
+        await integrator.stop()
+
+        assert [len(b) for b in connector.batches] == [10, 10, 5]
+
+    @pytest.mark.asyncio
+    async def test_slow_connector_does_not_block_others(self):
+        integrator = make_integrator()
+        slow = RecordingConnector(make_config("slow", batch_size=1), delay=0.5)
+        fast = RecordingConnector(make_config("fast", batch_size=1))
+        attach(integrator, slow)
+        attach(integrator, fast)
+
+        await integrator.start()
+        for i in range(5):
+            await integrator.send_custom_event(make_event(i))
+        await wait_until(lambda: len(fast.batches) == 5, timeout=0.4)
+        assert len(slow.batches) < 5
+        await integrator.stop()
+
+
+class TestSpool:
+    """Tests for spooling and replay across outages."""
+
+    @pytest.mark.asyncio
+    async def test_outage_spooled_and_replayed_in_order(self, tmp_path):
+        integrator = make_integrator(tmp_path)
+        connector = RecordingConnector(make_config("elk", batch_size=4))
+        dispatcher = attach(integrator, connector)
+        connector.healthy = False
+
+        await integrator.start()
+        for i in range(10):
+            await integrator.send_custom_event(make_event(i))
+        await wait_until(lambda: dispatcher.spool.pending == 10)
+
+        connector.healthy = True
+        await wait_until(lambda: dispatcher.spool.pending == 0)
+        await integrator.stop()
+
+        delivered = [line for batch in connector.batches for line in batch]
+        assert [f'"evt-{i}"' in line for i, line in enumerate(delivered)] == [True] * 10
+        assert not (tmp_path / "spool" / "elk.jsonl").exists()
+
+    @pytest.mark.asyncio
+    async def test_queue_overflow_goes_to_spool(self, tmp_path):
+        integrator = make_integrator(tmp_path)
+        connector = RecordingConnector(make_config("splunk", max_queue_size=2))
+        dispatcher = attach(integrator, connector)
+
+        for i in range(5):
+            dispatcher.submit(make_event(i))
+
+        assert dispatcher.queue.qsize() == 2
+        await wait_until(lambda: dispatcher.spool.pending == 3)
+
+    @pytest.mark.asyncio
+    async def test_only_rejected_events_spooled(self, tmp_path):
+        integrator = make_integrator(tmp_path)
+        connector = RejectingConnector(make_config("elk", batch_size=10))
+        dispatcher = attach(integrator, connector)
+
+        await integrator.start()
+        for i in range(10):
+            await integrator.send_custom_event(make_event(i))
+        await wait_until(lambda: dispatcher.spool.pending == 5)
+        assert dispatcher.events_delivered == 5
+
+        connector.rejected_ids.clear()
+        await wait_until(lambda: dispatcher.spool.pending == 0)
+        await integrator.stop()
+
+        assert sorted(connector.delivered) == sorted(f"evt-{i}" for i in range(10))
+        assert dispatcher.events_delivered == 10
+
+    @pytest.mark.asyncio
+    async def test_spool_resumes_from_committed_offset(self, tmp_path):
+        path = tmp_path / "spool.jsonl"
+        spool = EventSpool(path)
+        await spool.append([make_event(i) for i in range(5)])
+
+        events, offset, consumed = await spool.read(2)
+        await spool.commit(offset, consumed)
+
+        reopened = EventSpool(path)
+        await reopened.load()
+        assert reopened.pending == 3
+        events, offset, consumed = await reopened.read(10)
+        assert [e.event_id for e in events] == ["evt-2", "evt-3", "evt-4"]
+
+        await reopened.commit(offset, consumed)
+        assert not path.exists()
@@ -0,0 +1,93 @@
+"""
+Unit tests for streaming document readers and the streaming chunker.
+
+Tests verify:
+- chunk_segments yields exactly what chunk_text yields on the joined text.
+- DOCX paragraphs (including table cells) are streamed in order.
+- XLSX sheets and rows are streamed as segments.
+- Streaming a large DOCX keeps peak memory well below the document size.
+"""
+
+import random
+import tracemalloc
+
+import docx
+import openpyxl
+import pytest
+
+from resync.core.file_ingestor import (
+    chunk_segments,
+    chunk_text,
+    iter_docx,
+    iter_excel,
+    read_docx,
+)
+
+
+class TestChunkSegments:
+    """Tests for the streaming chunker."""
+
+    @pytest.mark.parametrize("chunk_size,overlap", [(1000, 200), (50, 10), (7, 0), (10, 9)])
+    def test_matches_chunk_text_on_joined_text(self, chunk_size, overlap):
+        rng = random.Random(chunk_size)
+        segments = [
+            "".join(rng.choice("abcdef ") for _ in range(rng.randint(0, 3 * chunk_size)))
+            for _ in range(50)
+        ]
+
+        streamed = list(chunk_segments(segments, chunk_size, overlap))
+
+        assert streamed == list(chunk_text("\n".join(segments), chunk_size, overlap))
+
+    def test_empty_input_yields_nothing(self):
+        assert list(chunk_segments([])) == []
+
+
+class TestStreamingReaders:
+    """Tests for the DOCX and XLSX segment readers."""
+
+    def test_docx_paragraphs_and_tables(self, tmp_path):
+        path = tmp_path / "doc.docx"
+        document = docx.Document()
+        document.add_paragraph("first")
+        document.add_paragraph("")
+        document.add_paragraph("second")
+        document.add_table(rows=1, cols=1).cell(0, 0).text = "cell"
+        document.save(path)
+
+        assert list(iter_docx(path)) == ["first", "second", "cell"]
+        assert read_docx(path) == "first\nsecond\ncell"
+
+    def test_invalid_docx_yields_nothing(self, tmp_path):
+        path = tmp_path / "broken.docx"
+        path.write_bytes(b"not a zip file")
+
+        assert list(iter_docx(path)) == []
+
+    def test_excel_rows_streamed(self, tmp_path):
+        path = tmp_path / "sheet.xlsx"
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "jobs"
+        sheet.append(["JOB_A", "SUCC", None])
+        sheet.append([None, None, None])
+        sheet.append(["JOB_B", "ABEND", 3])
+        workbook.save(path)
+
+        assert list(iter_excel(path)) == ["Sheet: jobs", "JOB_A | SUCC", "JOB_B | ABEND | 3"]
+
+    def test_large_docx_memory_is_bounded(self, tmp_path):
+        path = tmp_path / "large.docx"
+        document = docx.Document()
+        for i in range(5000):
+            document.add_paragraph(f"paragraph {i} " + "text " * 40)
+        document.save(path)
+        text_size = len(read_docx(path))
+
+        tracemalloc.start()
+        chunks = sum(1 for _ in chunk_segments(iter_docx(path), 200, 40))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert chunks > 1000
+        assert peak < text_size / 4
@@ -0,0 +1,174 @@
+"""
+Unit tests for tail-based trace sampling.
+
+Tests verify:
+- Fast, successful traces are dropped at trace end.
+- Traces containing an error span are kept with all their spans.
+- Slow traces and route rules are applied from the root span.
+- Late spans follow the decision already made for their trace.
+- Per-trace span buffers and pending traces stay bounded.
+"""
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import Status, StatusCode
+
+from resync.core.distributed_tracing import (
+    DistributedTracingManager,
+    SpanRingBuffer,
+    TailSamplingPolicy,
+    TailSamplingSpanProcessor,
+    TraceConfiguration,
+)
+
+
+@pytest.fixture
+def exporter():
+    return InMemorySpanExporter()
+
+
+def make_tracer(exporter, **kwargs):
+    """Build a tracer whose spans go through a tail sampling processor."""
+    kwargs.setdefault("policy", TailSamplingPolicy(baseline_rate=0.0))
+    processor = TailSamplingSpanProcessor(SimpleSpanProcessor(exporter), **kwargs)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return provider.get_tracer(__name__), processor
+
+
+class TestTailSampling:
+    """Tests for trace-end keep/drop decisions."""
+
+    def test_fast_successful_trace_dropped(self, exporter):
+        tracer, processor = make_tracer(exporter)
+
+        with tracer.start_as_current_span("request"):
+            with tracer.start_as_current_span("db"):
+                pass
+
+        assert exporter.get_finished_spans() == ()
+        assert processor.stats["traces_dropped"] == 1
+        assert processor.pending_traces == 0
+
+    def test_error_trace_kept_with_all_spans(self, exporter):
+        tracer, processor = make_tracer(exporter)
+
+        with tracer.start_as_current_span("request"):
+            with tracer.start_as_current_span("ok_child"):
+                pass
+            with tracer.start_as_current_span("failing_child") as span:
+                span.set_status(Status(StatusCode.ERROR, "boom"))
+
+        names = [span.name for span in exporter.get_finished_spans()]
+        assert names == ["ok_child", "failing_child", "request"]
+        assert processor.stats["traces_kept"] == 1
+
+    def test_slow_trace_kept(self, exporter):
+        tracer, _ = make_tracer(
+            exporter, policy=TailSamplingPolicy(latency_threshold_ms=0.0, baseline_rate=0.0)
+        )
+
+        with tracer.start_as_current_span("request"):
+            pass
+
+        assert len(exporter.get_finished_spans()) == 1
+
+    def test_route_rules(self, exporter):
+        policy = TailSamplingPolicy(
+            baseline_rate=0.0, route_rules={"/api/v1/chat": 1.0, "/health": 0.0}
+        )
+        tracer, _ = make_tracer(exporter, policy=policy)
+
+        with tracer.start_as_current_span("chat", attributes={"http.route": "/api/v1/chat"}):
+            pass
+        with tracer.start_as_current_span("health", attributes={"http.target": "/health/live"}):
+            pass
+
+        assert [span.name for span in exporter.get_finished_spans()] == ["chat"]
+
+    def test_late_span_follows_decision(self, exporter):
+        tracer, _ = make_tracer(exporter)
+
+        with tracer.start_as_current_span("request") as root:
+            root.set_status(Status(StatusCode.ERROR))
+            late = tracer.start_span("background_write")
+        late.end()
+
+        assert [span.name for span in exporter.get_finished_spans()] == [
+            "request",
+            "background_write",
+        ]
+
+    def test_buffers_bounded(self, exporter):
+        tracer, processor = make_tracer(
+            exporter, max_spans_per_trace=4, max_pending_traces=2
+        )
+
+        with tracer.start_as_current_span("request") as root:
+            root.set_status(Status(StatusCode.ERROR))
+            for i in range(10):
+                with tracer.start_as_current_span(f"child_{i}"):
+                    pass
+
+        exported = exporter.get_finished_spans()
+        assert len(exported) == 4
+        assert exported[-1].name == "request"
+        assert processor.stats["spans_overwritten"] == 7
+
+        # Root spans that never end are evicted once too many traces are open
+        open_roots = [tracer.start_span(f"open_{i}") for i in range(3)]
+        for root in open_roots:
+            with tracer.start_as_current_span("child", context=trace.set_span_in_context(root)):
+                pass
+        assert processor.pending_traces == 2
+        assert processor.stats["traces_evicted"] == 1
+
+
+class TestSpanRingBuffer:
+    """Tests for the fixed-capacity span buffer."""
+
+    def test_overwrites_oldest(self):
+        class FakeSpan:
+            def __init__(self, name):
+                self.name = name
+                self.status = Status(StatusCode.UNSET)
+
+        buffer = SpanRingBuffer(3)
+        for i in range(5):
+            buffer.append(FakeSpan(i))
+
+        assert [span.name for span in buffer.drain()] == [2, 3, 4]
+        assert buffer.dropped == 2
+
+
+class TestManagerTailMode:
+    """Tests for tail sampling wired through DistributedTracingManager."""
+
+    def test_manager_exports_only_kept_traces(self, exporter):
+        manager = DistributedTracingManager(
+            TraceConfiguration(
+                sampling_mode="tail",
+                sampling_rate=0.0,
+                span_exporter=exporter,
+            )
+        )
+        tracer = manager.tracer_provider.get_tracer(__name__)
+
+        with tracer.start_as_current_span("fast"):
+            pass
+        with pytest.raises(ValueError):
+            with tracer.start_as_current_span("failing"):
+                raise ValueError("boom")
+
+        manager.force_flush()
+        metrics = manager.get_trace_metrics()["tail_sampling"]
+        manager.shutdown()
+
+        assert [span.name for span in exporter.get_finished_spans()] == ["failing"]
+        assert metrics["traces_kept"] == 1
+        assert metrics["traces_dropped"] == 1
@@ -0,0 +1,187 @@
+"""
+Unit tests for the TaskManager worker pool.
+
+Tests verify:
+- Up to max_workers tasks run concurrently.
+- Weighted fair dispatch keeps LOW tasks from starving.
+- Sync functions run in the dedicated executor with keyword arguments.
+- Cancelling a running task does not stop its worker.
+- Finished task records are evicted after their TTL.
+- Persistent tasks survive a restart through the SQLite store.
+- Expired persistent tasks are deleted from the store off the event loop.
+"""
+
+import asyncio
+import math
+import threading
+
+import pytest
+
+from resync.core.task_manager import TaskManager, TaskPriority, TaskStatus
+
+
+async def wait_for_status(manager, task_id, *statuses, timeout=2.0):
+    """Poll until a task reaches one of the given statuses."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        task = await manager.get_task(task_id)
+        if task is not None and task.status in statuses:
+            return task
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"task {task_id} did not reach {statuses}")
+
+
+class TestTaskManagerWorkers:
+    """Tests for concurrent, fair task execution."""
+
+    @pytest.mark.asyncio
+    async def test_tasks_run_concurrently(self):
+        manager = TaskManager(max_workers=5)
+        await manager.start()
+        running = 0
+        peak = 0
+
+        async def job():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+
+        ids = [await manager.submit("job", job) for _ in range(10)]
+        for task_id in ids:
+            await wait_for_status(manager, task_id, TaskStatus.COMPLETED)
+        await manager.stop()
+
+        assert peak == 5
+
+    @pytest.mark.asyncio
+    async def test_low_priority_not_starved(self):
+        manager = TaskManager(max_workers=1)
+        order = []
+
+        async def job(label):
+            order.append(label)
+
+        for _ in range(30):
+            await manager.submit("high", job, "high", priority=TaskPriority.HIGH)
+        low_id = await manager.submit("low", job, "low", priority=TaskPriority.LOW)
+
+        await manager.start()
+        await wait_for_status(manager, low_id, TaskStatus.COMPLETED)
+        await manager.stop()
+
+        # HIGH has weight 4 and LOW weight 1, so LOW runs within the first 5
+        assert order.index("low") < 5
+
+    @pytest.mark.asyncio
+    async def test_sync_function_uses_executor(self):
+        manager = TaskManager(max_workers=2, sync_workers=2)
+        await manager.start()
+
+        def job(x, scale=1):
+            return threading.current_thread().name, x * scale
+
+        task_id = await manager.submit("sync", job, 3, scale=2)
+        task = await wait_for_status(manager, task_id, TaskStatus.COMPLETED)
+        await manager.stop()
+
+        thread_name, value = task.result
+        assert thread_name.startswith("task-manager")
+        assert value == 6
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_task_keeps_worker(self):
+        manager = TaskManager(max_workers=1)
+        await manager.start()
+
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "done"
+
+        slow_id = await manager.submit("slow", slow)
+        await started.wait()
+        assert await manager.cancel_task(slow_id)
+        await wait_for_status(manager, slow_id, TaskStatus.CANCELLED)
+
+        fast_id = await manager.submit("fast", fast)
+        task = await wait_for_status(manager, fast_id, TaskStatus.COMPLETED)
+        await manager.stop()
+
+        assert task.result == "done"
+
+    @pytest.mark.asyncio
+    async def test_finished_tasks_evicted_after_ttl(self):
+        manager = TaskManager(max_workers=2, task_ttl=0.05)
+        await manager.start()
+
+        async def job():
+            return 1
+
+        task_id = await manager.submit("job", job)
+        await wait_for_status(manager, task_id, TaskStatus.COMPLETED)
+        assert manager.get_stats()["total_tasks"] == 1
+
+        await asyncio.sleep(0.1)
+        assert manager.get_stats()["total_tasks"] == 0
+        assert await manager.get_task(task_id) is None
+        await manager.stop()
+
+
+class TestTaskPersistence:
+    """Tests for durable task state."""
+
+    @pytest.mark.asyncio
+    async def test_pending_task_survives_restart(self, tmp_path):
+        db_path = tmp_path / "tasks.db"
+
+        # No workers, so the task is still pending at shutdown
+        first = TaskManager(max_workers=0, persistence_path=db_path)
+        await first.start()
+        task_id = await first.submit("factorial", math.factorial, 5, persistent=True)
+        await first.stop()
+
+        second = TaskManager(max_workers=1, persistence_path=db_path)
+        await second.start()
+        task = await wait_for_status(second, task_id, TaskStatus.COMPLETED)
+        await second.stop()
+
+        assert task.result == 120
+
+    @pytest.mark.asyncio
+    async def test_unpersistable_task_rejected(self, tmp_path):
+        manager = TaskManager(persistence_path=tmp_path / "tasks.db")
+
+        with pytest.raises(ValueError):
+            await manager.submit("lambda", lambda: None, persistent=True)
+
+    @pytest.mark.asyncio
+    async def test_expired_tasks_deleted_off_loop(self, tmp_path, monkeypatch):
+        manager = TaskManager(
+            max_workers=1, task_ttl=0.05, persistence_path=tmp_path / "tasks.db"
+        )
+        await manager.start()
+        deletes = []
+        delete = manager._store.delete
+
+        def recording_delete(task_ids):
+            deletes.append((list(task_ids), threading.current_thread()))
+            delete(task_ids)
+
+        monkeypatch.setattr(manager._store, "delete", recording_delete)
+        task_id = await manager.submit("factorial", math.factorial, 5, persistent=True)
+        await wait_for_status(manager, task_id, TaskStatus.COMPLETED)
+
+        await asyncio.sleep(0.1)
+        manager.get_stats()
+        await manager.stop()
+
+        [(task_ids, thread)] = deletes
+        assert task_ids == [task_id]
+        assert thread is not threading.main_thread()
@@ -0,0 +1,153 @@
+"""
+Unit tests for incremental behavioral statistics.
+
+Tests verify:
+- Running statistics match batch-computed mean and variance.
+- Per-user sets and temporal patterns stay bounded.
+- Profiles are evicted in LRU order once max_profiles is reached.
+- Global stats come from maintained aggregates, not profile scans.
+- Regular-interval sessions are flagged as bot-like.
+"""
+
+import random
+import statistics
+import time
+
+import pytest
+
+from resync.core.user_behavior import (
+    BehavioralAnalysisConfig,
+    BehavioralAnalysisEngine,
+    RunningStats,
+    SessionAnalysis,
+    UserActivity,
+    UserProfile,
+)
+
+
+class TestIncrementalAggregates:
+    """Tests for O(1) per-activity aggregates."""
+
+    def test_running_stats_match_batch(self):
+        rng = random.Random(0)
+        values = [rng.uniform(0.01, 2.0) for _ in range(1000)]
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+
+        assert stats.mean == pytest.approx(statistics.fmean(values))
+        assert stats.variance == pytest.approx(statistics.pvariance(values))
+
+    def test_profile_memory_is_bounded(self):
+        profile = UserProfile(user_id="u1")
+        start = time.time()
+        for i in range(5000):
+            profile.update_activity(
+                UserActivity(
+                    user_id="u1",
+                    timestamp=start + i * 60,
+                    action=f"action-{i}",
+                    endpoint=f"/api/{i}",
+                    ip_address=f"10.0.{i // 256}.{i % 256}",
+                    user_agent=f"agent-{i}",
+                    response_time=0.1,
+                )
+            )
+
+        assert profile.total_activities == 5000
+        assert sum(profile.hourly_pattern) == 5000
+        assert sum(profile.daily_pattern) == 5000
+        assert len(profile.hourly_pattern) == 24
+        assert len(list(profile.unique_endpoints)) <= 64
+        assert len(list(profile.unique_ips)) <= 16
+        assert len(profile.activity_frequency) <= 32
+        # Distinct counts keep growing even though members are capped
+        assert len(profile.unique_ips) == 5000
+        assert profile.avg_response_time == pytest.approx(0.1)
+
+    def test_recent_error_rate_decays(self):
+        profile = UserProfile(user_id="u1")
+        start = time.time()
+        for i in range(10):
+            profile.update_activity(
+                UserActivity(user_id="u1", timestamp=start + i, status_code=500)
+            )
+        for i in range(10):
+            profile.update_activity(
+                UserActivity(user_id="u1", timestamp=start + 86400 + i)
+            )
+
+        assert profile.error_rate == pytest.approx(0.5)
+        assert profile.recent_error_rate < 0.01
+
+
+class TestSessionAnalysis:
+    """Tests for constant-memory session scoring."""
+
+    def test_regular_intervals_look_like_a_bot(self):
+        session = SessionAnalysis("s1", "u1", start_time=1000.0)
+        for i in range(100):
+            session.add_activity(
+                UserActivity(user_id="u1", timestamp=1000.0 + i, endpoint="/api/x")
+            )
+
+        assert session.activity_count == 100
+        assert session.avg_time_between_activities == pytest.approx(1.0)
+        assert session.analyze_bot_probability() == pytest.approx(1.0)
+
+
+class TestBehavioralAnalysisEngine:
+    """Tests for engine-level bounds and aggregates."""
+
+    @pytest.mark.asyncio
+    async def test_profiles_evicted_lru(self):
+        engine = BehavioralAnalysisEngine(BehavioralAnalysisConfig(max_profiles=3))
+
+        for user_id in ("a", "b", "c", "a", "d"):
+            await engine.analyze_activity(
+                UserActivity(user_id=user_id), generate_alerts=False
+            )
+
+        assert list(engine.user_profiles) == ["c", "a", "d"]
+        assert sum(engine._calculate_risk_distribution().values()) == 3
+
+    @pytest.mark.asyncio
+    async def test_stats_use_maintained_aggregates(self, monkeypatch):
+        engine = BehavioralAnalysisEngine()
+        start = time.time()
+        for i in range(50):
+            await engine.analyze_activity(
+                UserActivity(
+                    user_id=f"user-{i % 5}",
+                    timestamp=start + i,
+                    session_id=f"s-{i % 5}",
+                ),
+                generate_alerts=False,
+            )
+
+        def forbidden(*args, **kwargs):
+            raise AssertionError("get_stats iterated the profiles")
+
+        monkeypatch.setattr(engine.user_profiles, "values", forbidden, raising=False)
+        stats = engine.get_stats()
+
+        temporal = stats["temporal_patterns"]
+        assert sum(temporal["total_activities_by_hour"].values()) == 50
+        assert sum(stats["risk_distribution"].values()) == 5
+
+    @pytest.mark.asyncio
+    async def test_archived_sessions_feed_profile(self):
+        engine = BehavioralAnalysisEngine()
+        start = time.time() - 60
+        for i in range(3):
+            await engine.analyze_activity(
+                UserActivity(user_id="u1", timestamp=start + i * 30, session_id="s1"),
+                generate_alerts=False,
+            )
+
+        engine.config.session_timeout_minutes = 0
+        await engine._cleanup_expired_sessions()
+
+        assert not engine.active_sessions
+        assert engine._calculate_avg_session_duration() == pytest.approx(60.0)
+        assert engine.user_profiles["u1"].session_durations.count == 1
@@ -267,8 +267,10 @@ class TestEndToEndIntegration:
                 response = websocket.receive_text()
                 assert "Test response" in response
 
+        # Written when the session closed; the auditor runs at its next
+        # coalesced sweep, not once per message
         mock_kg.add_conversation.assert_called_once()
-        mock_run_auditor.assert_called_once()
+        mock_run_auditor.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_end_to_end_agent_not_found(
@@ -0,0 +1,199 @@
+"""
+Tests for the pure-ASGI middleware stack.
+
+Tests verify:
+- Header layers inject headers on http.response.start and set request state
+- Streaming responses are passed through chunk by chunk, not buffered
+- A fused pipeline produces the same headers as the layers stacked one by one
+- setdefault-style headers never override ones already on the response
+- Non-HTTP scopes are passed through untouched
+- Header layers must implement on_request
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from resync.api.middleware.asgi import (
+    FusedHeaderMiddleware,
+    HeaderLayer,
+    apply_headers,
+    encode_headers,
+)
+from resync.api.middleware.correlation_id import CorrelationIdMiddleware
+from resync.api.middleware.csp_middleware import CSPMiddleware
+from resync.config.csp import SecurityHeadersMiddleware
+
+
+class DefaultHeaders(HeaderLayer):
+    """Adds a header the CSP layer also sets, without overriding it."""
+
+    HEADERS = encode_headers(
+        {"X-Frame-Options": "SAMEORIGIN", "X-Default": "1"}, overwrite=False
+    )
+
+    def on_request(self, scope):
+        return self.HEADERS
+
+
+LAYERS = [
+    (DefaultHeaders, {}),
+    (CSPMiddleware, {"report_only": True}),
+    (CorrelationIdMiddleware, {}),
+]
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.get("/state")
+    async def state(request: Request):
+        return {
+            "correlation_id": request.state.correlation_id,
+            "nonce": request.state.csp_nonce,
+        }
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i};".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+class TestHeaderLayers:
+    """Header injection by individual layers."""
+
+    def test_correlation_id_and_nonce_in_state(self):
+        app = make_app()
+        app.add_middleware(FusedHeaderMiddleware, layers=LAYERS)
+        client = TestClient(app)
+
+        response = client.get("/state", headers={"X-Correlation-ID": "abc-123"})
+        body = response.json()
+
+        assert body["correlation_id"] == "abc-123"
+        assert response.headers["X-Correlation-ID"] == "abc-123"
+        assert (
+            f"'nonce-{body['nonce']}'"
+            in response.headers["Content-Security-Policy-Report-Only"]
+        )
+
+    def test_setdefault_keeps_existing_header(self):
+        message = {
+            "type": "http.response.start",
+            "headers": [(b"x-frame-options", b"SAMEORIGIN")],
+        }
+
+        apply_headers(message, encode_headers({"X-Frame-Options": "DENY"}, False))
+
+        assert message["headers"] == [(b"x-frame-options", b"SAMEORIGIN")]
+
+    def test_overwrite_replaces_header(self):
+        message = {"type": "http.response.start", "headers": [(b"x-a", b"1")]}
+
+        apply_headers(message, encode_headers({"X-A": "2"}))
+
+        assert message["headers"] == [(b"x-a", b"2")]
+
+
+class TestFusedPipeline:
+    """A fused pipeline behaves like stacked middleware."""
+
+    def test_same_headers_as_stacked(self):
+        stacked = make_app()
+        for cls, kwargs in reversed(LAYERS):
+            stacked.add_middleware(cls, **kwargs)
+        fused = make_app()
+        fused.add_middleware(FusedHeaderMiddleware, layers=LAYERS)
+
+        def headers(app):
+            response = TestClient(app).get("/stream")
+            return {
+                name: value
+                for name, value in response.headers.items()
+                if name not in ("x-correlation-id", "content-security-policy-report-only")
+            }
+
+        assert headers(fused) == headers(stacked)
+        assert headers(fused)["x-frame-options"] == "DENY"
+
+    @pytest.mark.asyncio
+    async def test_streaming_response_not_buffered(self):
+        inner = make_app()
+        app = FusedHeaderMiddleware(inner, layers=LAYERS)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/stream",
+            "raw_path": b"/stream",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "server": ("test", 80),
+            "client": ("test", 1234),
+        }
+        sent = []
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.sleep(10)  # Client stays connected
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+
+        bodies = [m["body"] for m in sent if m["type"] == "http.response.body"]
+        assert bodies[:3] == [b"chunk-0;", b"chunk-1;", b"chunk-2;"]
+        start = sent[0]
+        assert start["type"] == "http.response.start"
+        assert (b"x-content-type-options", b"nosniff") in start["headers"]
+
+    @pytest.mark.asyncio
+    async def test_non_http_scope_passed_through(self):
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope["type"])
+
+        class FailingLayer(HeaderLayer):
+            def on_request(self, scope):
+                raise AssertionError("not an HTTP request")
+
+        middleware = FusedHeaderMiddleware(app, layers=[(FailingLayer, {})])
+        await middleware({"type": "lifespan"}, None, None)
+
+        assert seen == ["lifespan"]
+
+    def test_header_layer_requires_on_request(self):
+        class Incomplete(HeaderLayer):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_csp_config_security_headers_keep_existing(self):
+        app = FastAPI()
+
+        @app.get("/framed")
+        async def framed():
+            return PlainTextResponse("ok", headers={"X-Frame-Options": "SAMEORIGIN"})
+
+        app.add_middleware(SecurityHeadersMiddleware)
+        response = TestClient(app).get("/framed")
+
+        assert response.headers["X-Frame-Options"] == "SAMEORIGIN"
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
@@ -0,0 +1,105 @@
+"""
+Unit tests for HTTPConnectionPool.
+
+Tests verify:
+- Requests succeed against a local keep-alive server and count as pool hits.
+- Pool wait time is measured per request by the timing transport.
+- Per-upstream limits are mounted as separate transports.
+- HTTP/2 falls back to HTTP/1.1 when ``h2`` is not installed.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from resync.core.pools import http_pool
+from resync.core.pools.base_pool import ConnectionPoolConfig
+from resync.core.pools.http_pool import HTTPConnectionPool, UpstreamPoolConfig
+
+
+async def _handle(reader, writer):
+    try:
+        while True:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+@pytest_asyncio.fixture
+async def base_url():
+    """Run a minimal HTTP/1.1 server for the duration of a test."""
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.fixture
+def pool_config():
+    """Small pool configuration for tests."""
+    return ConnectionPoolConfig(
+        pool_name="test_http_pool", min_size=1, max_size=2, connection_timeout=5
+    )
+
+
+class TestHTTPConnectionPool:
+    """Tests for the httpx-backed connection pool."""
+
+    @pytest.mark.asyncio
+    async def test_requests_record_hits_and_wait_time(self, pool_config, base_url):
+        pool = HTTPConnectionPool(pool_config, base_url)
+        await pool.initialize()
+
+        async def call():
+            async with pool.get_connection() as client:
+                response = await client.get("/")
+                assert response.text == "ok"
+
+        await asyncio.gather(*(call() for _ in range(10)))
+        stats = pool.get_stats_copy()
+        await pool.close()
+
+        assert stats["pool_hits"] == 10
+        # One wait sample per request, recorded by the transport
+        assert len(pool._wait_times) == 10
+        assert stats["average_wait_time"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_upstream_limits_mounted(self, pool_config, base_url):
+        pool = HTTPConnectionPool(
+            pool_config,
+            base_url,
+            upstreams={base_url: UpstreamPoolConfig(max_connections=1)},
+        )
+        await pool.initialize()
+
+        async with pool.get_connection() as client:
+            transport = client._transport_for_url(client.build_request("GET", "/").url)
+            response = await client.get("/")
+        await pool.close()
+
+        assert transport is not client._transport
+        assert transport._transport._pool._max_connections == 1
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_http2_falls_back_without_h2(
+        self, pool_config, base_url, monkeypatch
+    ):
+        monkeypatch.setattr(http_pool, "http2_available", lambda: False)
+        pool = HTTPConnectionPool(
+            pool_config, base_url, http2=True, http2_prior_knowledge=True
+        )
+        await pool.initialize()
+
+        async with pool.get_connection() as client:
+            response = await client.get("/")
+        await pool.close()
+
+        assert response.http_version == "HTTP/1.1"
@@ -0,0 +1,128 @@
+"""
+Tests for coalesced agent response streaming.
+
+Tests verify:
+- Tokens are coalesced into a few frames and the full response is intact
+- The first token is sent right away and frames are sent by size
+- Frames keep the JSON envelope clients already parse
+- Tokens that stop arriving are still flushed after flush_interval
+- Chunks are sent as binary frames when the client offers the subprotocol
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from resync.api.utils.stream_handler import (
+    STREAM_SUBPROTOCOL,
+    AgentResponseStreamer,
+    negotiate_stream_subprotocol,
+)
+
+
+class FakeWebSocket:
+    """Records frames as ("text" | "bytes", payload)."""
+
+    def __init__(self, subprotocols=()):
+        self.scope = {"type": "websocket", "subprotocols": list(subprotocols)}
+        self.frames = []
+
+    async def send_text(self, data):
+        self.frames.append(("text", data))
+
+    async def send_bytes(self, data):
+        self.frames.append(("bytes", data))
+
+    async def send_json(self, data):
+        self.frames.append(("text", json.dumps(data)))
+
+
+class StreamingAgent:
+    def __init__(self, tokens, delay=0.0):
+        self.tokens = tokens
+        self.delay = delay
+
+    async def _generate(self):
+        for token in self.tokens:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield token
+
+    def stream(self, query):
+        return self._generate()
+
+
+def chunk_texts(websocket):
+    messages = [json.loads(payload) for kind, payload in websocket.frames if kind == "text"]
+    return [m["message"] for m in messages if m["type"] == "stream"]
+
+
+class TestCoalescing:
+    """Tokens are coalesced into frames."""
+
+    @pytest.mark.asyncio
+    async def test_tokens_coalesced_by_size(self):
+        websocket = FakeWebSocket()
+        tokens = [f"tok{i} " for i in range(1000)]
+        streamer = AgentResponseStreamer(websocket, max_frame_chars=1000)
+
+        response = await streamer.stream_response(StreamingAgent(tokens), "q")
+
+        assert response == "".join(tokens)
+        chunks = chunk_texts(websocket)
+        assert "".join(chunks) == response
+        assert chunks[0] == "tok0 "  # First token is not held back
+        assert len(chunks) < 15
+        assert json.loads(websocket.frames[-1][1]) == {"type": "stream_end"}
+
+    @pytest.mark.asyncio
+    async def test_frame_envelope_unchanged(self):
+        websocket = FakeWebSocket()
+        streamer = AgentResponseStreamer(websocket)
+
+        await streamer.stream_response(StreamingAgent(['say "olá"\n']), "q")
+
+        assert json.loads(websocket.frames[0][1]) == {
+            "type": "stream",
+            "sender": "agent",
+            "message": 'say "olá"\n',
+            "is_chunk": True,
+        }
+
+    @pytest.mark.asyncio
+    async def test_slow_tokens_flushed_by_time(self):
+        websocket = FakeWebSocket()
+        streamer = AgentResponseStreamer(
+            websocket, flush_interval=0.01, max_frame_chars=10**6
+        )
+        tokens = ["a", "b", "c", "d", "e", "f"]
+
+        await streamer.stream_response(StreamingAgent(tokens, delay=0.02), "q")
+
+        chunks = chunk_texts(websocket)
+        assert "".join(chunks) == "abcdef"
+        assert len(chunks) > 2  # Not held until the end of the stream
+
+
+class TestBinaryFrames:
+    """Binary framing negotiated through the WebSocket subprotocol."""
+
+    def test_negotiation(self):
+        assert negotiate_stream_subprotocol(FakeWebSocket([STREAM_SUBPROTOCOL])) == (
+            STREAM_SUBPROTOCOL
+        )
+        assert negotiate_stream_subprotocol(FakeWebSocket(["other"])) is None
+
+    @pytest.mark.asyncio
+    async def test_chunks_sent_as_bytes(self):
+        websocket = FakeWebSocket([STREAM_SUBPROTOCOL])
+        streamer = AgentResponseStreamer(websocket)
+
+        response = await streamer.stream_response(
+            StreamingAgent(["ção ", "ok"]), "q"
+        )
+
+        binary = b"".join(p for kind, p in websocket.frames if kind == "bytes")
+        assert binary.decode("utf-8") == response == "ção ok"
+        assert websocket.frames[-1] == ("text", '{"type":"stream_end"}')
@@ -0,0 +1,89 @@
+"""
+Tests for the keyword-prefiltered threat scanner.
+
+Tests verify:
+- Each rule category is detected
+- The most severe category wins regardless of position in the input
+- XSS after a lower-priority match is still found
+- Streaming over chunks gives the same result as scanning the whole input
+- <script> elements are detected across any number of chunks
+"""
+
+import pytest
+
+from resync.api.validation.threat_scanner import ThreatScanner
+
+
+@pytest.fixture
+def scanner():
+    return ThreatScanner()
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestScan:
+    """Whole-input scanning."""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("<script>alert('xss')</script>", "xss"),
+            ("JavaScript :void(0)", "xss"),
+            ("<img src=x onerror=alert(1)>", "xss"),
+            ("onİ=1", "xss"),  # Lowercasing "İ" adds a combining mark
+            ("'; DROP TABLE users; --", "sql_injection"),
+            ("UNION SELECT * FROM users", "sql_injection"),
+            ("' or '1'='1", "sql_injection"),
+            ("../../etc/passwd", "reconnaissance"),
+            ("%2E%2E/etc/passwd", "reconnaissance"),
+            ("normal input", None),
+            ("selection and deletions are fine", None),
+        ],
+    )
+    def test_categories(self, scanner, text, expected):
+        assert scanner.scan(text) == expected
+
+    def test_most_severe_category_wins(self, scanner):
+        text = "../" + "select 1 " * 1000 + "document.cookie"
+
+        assert scanner.scan(text) == "xss"
+
+    def test_xss_after_lower_priority_match(self, scanner):
+        assert scanner.scan("select onload=1") == "xss"
+        assert scanner.scan("..on..x=") == "reconnaissance"
+        assert scanner.scan("#onclick =") == "xss"
+
+
+class TestStreaming:
+    """Chunked scanning matches whole-input scanning."""
+
+    @pytest.mark.parametrize("size, overlap", [(1, 32), (3, 32), (7, 12), (64, 32)])
+    def test_same_result_as_scan(self, scanner, size, overlap):
+        samples = [
+            "plain text without anything",
+            "a selection of items",  # "select" must not match at a chunk edge
+            "preselect and reexecute",  # Nor at the start of the overlap
+            "users -- comment",
+            "path ../secret then javascript:alert(1)",
+            "<SCRIPT type='text/javascript'>x</script>",
+            "x onİ=1",
+        ]
+        for text in samples:
+            scan = scanner.stream(overlap=overlap)
+            assert scan.feed_all(chunked(text, size)) == scanner.scan(text), text
+
+    def test_script_element_spanning_many_chunks(self, scanner):
+        text = "<script>" + "x" * 10000 + "</script>"
+
+        scan = scanner.stream(overlap=16)
+
+        assert scan.feed_all(chunked(text, 100)) == "xss"
+
+    def test_stops_after_xss(self, scanner):
+        scan = scanner.stream()
+        scan.feed("eval(")
+
+        assert scan.done
+        assert scan.feed("anything") == "xss"